@@ -0,0 +1,93 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: MIT
+"""VMMeteringReport class."""
+
+from dataclasses import dataclass, fields
+from typing import Dict
+
+# report field -> property of record selected from Measure-VM, see HypervHypervisor.measure_vms
+METERING_PROPERTIES = {
+    "duration": "MeteringMilliseconds",
+    "avg_cpu_mhz": "AverageProcessorUsage",
+    "avg_ram_mb": "AverageMemoryUsage",
+    "min_ram_mb": "MinimumMemoryUsage",
+    "max_ram_mb": "MaximumMemoryUsage",
+    "total_disk_mb": "TotalDiskAllocation",
+    "avg_iops": "AggregatedAverageNormalizedIOPS",
+    "disk_read_mb": "AggregatedDiskDataRead",
+    "disk_written_mb": "AggregatedDiskDataWritten",
+    "network_inbound_mb": "NetworkInbound",
+    "network_outbound_mb": "NetworkOutbound",
+}
+_AVERAGES = ("avg_cpu_mhz", "avg_ram_mb", "avg_iops")
+_TOTALS = ("disk_read_mb", "disk_written_mb", "network_inbound_mb", "network_outbound_mb")
+
+
+@dataclass(frozen=True)
+class VMMeteringReport:
+    """Resource usage of VM reported by Measure-VM since metering was enabled or reset.
+
+    vm_name: Name of VM
+    duration: Metering duration in seconds
+    avg_cpu_mhz: Average processor usage in MHz
+    avg_ram_mb: Average memory usage in MB
+    min_ram_mb: Minimum memory usage in MB
+    max_ram_mb: Maximum memory usage in MB
+    total_disk_mb: Disk space allocated in MB
+    avg_iops: Average normalized IOPS of all disks
+    disk_read_mb: Data read from all disks in MB
+    disk_written_mb: Data written to all disks in MB
+    network_inbound_mb: Network traffic received in MB
+    network_outbound_mb: Network traffic sent in MB
+    """
+
+    vm_name: str
+    duration: float = 0.0
+    avg_cpu_mhz: float = 0.0
+    avg_ram_mb: float = 0.0
+    min_ram_mb: float = 0.0
+    max_ram_mb: float = 0.0
+    total_disk_mb: float = 0.0
+    avg_iops: float = 0.0
+    disk_read_mb: float = 0.0
+    disk_written_mb: float = 0.0
+    network_inbound_mb: float = 0.0
+    network_outbound_mb: float = 0.0
+
+    @classmethod
+    def from_record(cls, record: Dict[str, str]) -> "VMMeteringReport":
+        """Create report from record selected from Measure-VM, empty values are 0.
+
+        :param record: property -> value, see METERING_PROPERTIES
+        :return: report
+        """
+        values = {}
+        for field_name, property_name in METERING_PROPERTIES.items():
+            value = record.get(property_name, "").strip()
+            try:
+                values[field_name] = float(value) if value else 0.0
+            except ValueError:
+                values[field_name] = 0.0
+        values["duration"] /= 1000
+        return cls(vm_name=record.get("VMName", ""), **values)
+
+    def since(self, earlier: "VMMeteringReport") -> "VMMeteringReport":
+        """Get usage between earlier report and this one.
+
+        Averages are weighted by metering durations, totals are subtracted, minimum and maximum memory and disk
+        allocation are taken from this report. When metering was reset in between, this report is returned.
+
+        :param earlier: report of the same VM collected earlier
+        :return: report of usage in interval between reports
+        """
+        duration = self.duration - earlier.duration
+        if duration <= 0 or any(getattr(self, name) < getattr(earlier, name) for name in _TOTALS):
+            return self
+        values = {field.name: getattr(self, field.name) for field in fields(self)}
+        values["duration"] = duration
+        for name in _AVERAGES:
+            values[name] = max(0.0, (getattr(self, name) * self.duration - getattr(earlier, name) * earlier.duration))
+            values[name] /= duration
+        for name in _TOTALS:
+            values[name] = getattr(self, name) - getattr(earlier, name)
+        return VMMeteringReport(**values)
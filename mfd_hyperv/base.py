@@ -2,13 +2,22 @@
 # SPDX-License-Identifier: MIT
 """Main module."""
 
-from typing import TYPE_CHECKING
+from typing import ContextManager, Sequence, TYPE_CHECKING
 
 from mfd_common_libs import os_supported
 from mfd_typing import OSName
 
+from mfd_hyperv.connections.batch import BatchingConnection, CommandBatch
+from mfd_hyperv.connections.dry_run import DryRunConnection
+from mfd_hyperv.connections.emulated import EmulatedHyperVConnection
+from mfd_hyperv.connections.session import PowerShellSessionConnection
+from mfd_hyperv.counters import CounterSampler
+from mfd_hyperv.exceptions import HyperVException
 from mfd_hyperv.hw_qos import HWQoS
 from mfd_hyperv.hypervisor import HypervHypervisor
+from mfd_hyperv.instrumentation import CommandMetrics, InstrumentedConnection
+from mfd_hyperv.qos_planner import QoSPlanner
+from mfd_hyperv.topology import TopologyReconciler
 from mfd_hyperv.vm_network_interface_manager import VMNetworkInterfaceManager
 from mfd_hyperv.vswitch_manager import VSwitchManager
 
@@ -20,12 +29,69 @@ class HyperV:
     """Module for HyperV."""
 
     @os_supported(OSName.WINDOWS)
-    def __init__(self, *, connection: "Connection"):
+    def __init__(self, *, connection: "Connection", persistent_session: bool = False, dry_run: bool = False):
         """Class constructor.
 
+        Commands sent by all managers are recorded in shared metrics registry, `connection` attribute is connection
+        used by managers.
+
         :param connection: connection instance of MFD connect class.
+        :param persistent_session: execute powershell commands of all managers in one PowerShell process kept alive
+                                   on host instead of starting new powershell.exe for every command
+        :param dry_run: record commands of all managers in `dry_run` attribute instead of executing them on host,
+                        commands are answered by `connection`, which must be host emulator, see DryRunConnection
+        :raises HyperVException: when dry run is requested with connection which isn't host emulator
         """
+        self.dry_run = None
+        if dry_run:
+            if not isinstance(connection, EmulatedHyperVConnection):
+                raise HyperVException(
+                    f"Dry run answers commands with host emulator, {type(connection).__name__} would execute them, "
+                    "pass EmulatedHyperVConnection prepared with state of host as connection"
+                )
+            connection = self.dry_run = DryRunConnection(connection)
+        self.session = PowerShellSessionConnection(connection) if persistent_session and not dry_run else None
+        if self.session is not None:
+            connection = self.session
+        self.metrics = CommandMetrics()
+        connection = InstrumentedConnection(connection, self.metrics)
+        connection = self._batching_connection = BatchingConnection(connection)
+        self.connection = connection
+
         self.hw_qos = HWQoS(connection)
-        self.hypervisor = HypervHypervisor(connection=connection)
-        self.vswitch_manager = VSwitchManager(connection=connection)
-        self.vm_network_interface_manager = VMNetworkInterfaceManager(connection=connection)
+        self.hypervisor = HypervHypervisor(connection=connection, port_directory=self.hw_qos.port_directory)
+        self.vswitch_manager = VSwitchManager(connection=connection, port_directory=self.hw_qos.port_directory)
+        self.vm_network_interface_manager = VMNetworkInterfaceManager(
+            connection=connection, port_directory=self.hw_qos.port_directory
+        )
+        self.topology = TopologyReconciler(self)
+        self.qos_planner = QoSPlanner(self.hw_qos)
+
+    def batch(self) -> ContextManager[CommandBatch]:
+        """Queue state changing calls of managers and execute them in one host script on exit of scope.
+
+        Queued calls return None, exceptions are raised on exit of scope the same way they would be raised by calls.
+        Query of host state within scope executes queued calls first.
+
+        Usage:
+            with hyperv.batch():
+                for vnic in vnics:
+                    hyperv.vm_network_interface_manager.set_vm_interface_vlan("access", vm_name, vnic, "vlanid", 10)
+
+        :return: context manager of batch scope
+        """
+        return self._batching_connection.batch()
+
+    def create_counter_sampler(self, vswitch_names: Sequence[str] = (), **kwargs) -> CounterSampler:
+        """Create sampler of vSwitch, vNIC and HW QoS queue counters executing one host call per tick.
+
+        Usage:
+            with hyperv.create_counter_sampler(vswitch_names=["VS1"], interval=0.5) as sampler:
+                run_traffic()
+            sampler.buffer.export_csv("counters.csv")
+
+        :param vswitch_names: vSwitches which scheduler queue counters are sampled
+        :param kwargs: other arguments of CounterSampler, e.g. counters, interval, capacity
+        :return: sampler, not started
+        """
+        return CounterSampler(self.connection, vswitch_names=vswitch_names, **kwargs)
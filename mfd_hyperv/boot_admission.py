@@ -0,0 +1,198 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: MIT
+"""Admission control of VM boots during mass VM starts.
+
+Starting many VMs at once saturates host disks and CPUs, so guests boot slowly and DHCP, ping and RPyC waits time out.
+Admission lets next VM start only when load signals of host are under limits: disk queue length, CPU usage and number
+of started VMs which don't have management IP yet. Signals are read in the same host script which polls start jobs,
+see HypervHypervisor.start_vms.
+
+Contents:
+-AdmissionLimits
+    host load under which next VM boot is admitted
+
+-HostLoad
+    load signals read in single tick
+
+-BootAdmission
+    decides how many VMs are started in every tick
+
+-has_mng_ip
+    check if IP addresses of VM contain management IPv4 address
+"""
+
+import logging
+import math
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Tuple
+
+from mfd_common_libs import add_logging_level, log_levels
+from mfd_connect.util.powershell_utils import parse_powershell_list
+
+from mfd_hyperv.counters import COUNTER_COMMAND, parse_counter_samples
+from mfd_hyperv.exceptions import HyperVException
+from mfd_hyperv.helpers import quote_powershell
+
+logger = logging.getLogger(__name__)
+add_logging_level(level_name="MODULE_DEBUG", level_value=log_levels.MODULE_DEBUG)
+
+DISK_QUEUE_COUNTER = r"\PhysicalDisk(_Total)\Current Disk Queue Length"
+CPU_COUNTER = r"\Processor(_Total)\% Processor Time"
+_IPV4_REGEX = re.compile(r"\b(?P<ip>(?:[0-9]{1,3}\.){3}[0-9]{1,3})\b")
+
+
+def has_mng_ip(ip_addresses: str) -> bool:
+    """Check if IP addresses of VM contain IPv4 address assigned by DHCP, link-local addresses are ignored.
+
+    :param ip_addresses: IPAddresses property of VM network adapters, e.g. '{10.10.0.1, fe80::1}'
+    :return: True if VM got management IP
+    """
+    return any(not match.group("ip").startswith("169.254.") for match in _IPV4_REGEX.finditer(ip_addresses))
+
+
+@dataclass
+class AdmissionLimits:
+    """Host load under which next VM boot is admitted.
+
+    max_disk_queue_length: maximum disk queue length of all physical disks
+    max_cpu_percent: maximum processor usage of host
+    max_pending_ips: maximum number of started VMs without management IP, VMs which start job runs included
+    max_admitted_per_tick: maximum number of VMs started in one tick
+    min_in_flight: VMs are admitted regardless of disk and CPU load while fewer VMs are pending, so load not caused
+                   by started VMs cannot stall start of remaining ones
+    """
+
+    max_disk_queue_length: float = 4.0
+    max_cpu_percent: float = 85.0
+    max_pending_ips: int = 8
+    max_admitted_per_tick: int = 2
+    min_in_flight: int = 1
+
+    def __post_init__(self):
+        if self.max_pending_ips < 1 or self.max_admitted_per_tick < 1 or self.min_in_flight < 0:
+            raise HyperVException(
+                "Maximum numbers of pending and admitted VMs must be positive and minimum in-flight VMs must not be "
+                f"negative, got {self}"
+            )
+
+
+@dataclass
+class HostLoad:
+    """Load signals read in single tick, NaN when host didn't report counter.
+
+    disk_queue_length: disk queue length of all physical disks
+    cpu_percent: processor usage of host
+    booting: number of VMs which start job runs
+    waiting_for_ip: number of running VMs without management IP
+    """
+
+    disk_queue_length: float = math.nan
+    cpu_percent: float = math.nan
+    booting: int = 0
+    waiting_for_ip: int = 0
+
+    @property
+    def pending(self) -> int:
+        """Number of started VMs without management IP."""
+        return self.booting + self.waiting_for_ip
+
+
+class BootAdmission:
+    """Admission controller of VM boots used by HypervHypervisor.start_vms.
+
+    Every tick reads load signals of host, started VMs which got management IP are finished. Next VMs are admitted
+    when neither disk queue length nor CPU usage exceeds limits, up to `max_admitted_per_tick` VMs and as long as
+    number of pending VMs doesn't exceed `max_pending_ips`. Signals which host doesn't report don't block admission.
+    """
+
+    def __init__(self, limits: Optional[AdmissionLimits] = None, wait_for_ip: bool = True):
+        """Class constructor.
+
+        :param limits: limits of host load, defaults of AdmissionLimits when not given
+        :param wait_for_ip: whether started VM is pending until its management adapter gets IP, otherwise only until
+                            its start job completes
+        """
+        self.limits = limits or AdmissionLimits()
+        self.wait_for_ip = wait_for_ip
+        self.history: List[Tuple[HostLoad, int]] = []
+
+    def queries(self, pending_vm_names: List[str]) -> Dict[str, str]:
+        """Get commands reading load signals, executed at the end of script polling start jobs.
+
+        :param pending_vm_names: names of running VMs without management IP
+        :return: query name -> command, counters query is the last one
+        """
+        queries = {}
+        if pending_vm_names:
+            names = ", ".join(quote_powershell(vm_name) for vm_name in pending_vm_names)
+            queries["ips"] = f"Get-VMNetworkAdapter -VMName {names} | Select-Object VMName, IPAddresses | fl"
+        paths = ", ".join(f"'{path}'" for path in (DISK_QUEUE_COUNTER, CPU_COUNTER))
+        queries["counters"] = COUNTER_COMMAND.format(paths=f"@({paths})")
+        return queries
+
+    @staticmethod
+    def read_ips(outputs: Dict[str, str]) -> Set[str]:
+        """Get VMs which got management IP.
+
+        :param outputs: query name -> output, see `queries`
+        :return: names of VMs
+        """
+        output = outputs.get("ips", "")
+        records = parse_powershell_list(output) if output.strip() else []
+        return {record["VMName"] for record in records if has_mng_ip(record.get("IPAddresses", ""))}
+
+    @staticmethod
+    def read_load(outputs: Dict[str, str], booting: int, waiting_for_ip: int) -> HostLoad:
+        """Get load of host from outputs of queries.
+
+        :param outputs: query name -> output, see `queries`
+        :param booting: number of VMs which start job runs
+        :param waiting_for_ip: number of running VMs without management IP
+        :return: load of host
+        """
+        samples = parse_counter_samples(outputs.get("counters", ""))
+        return HostLoad(
+            disk_queue_length=samples.get(DISK_QUEUE_COUNTER.lstrip("\\").lower(), math.nan),
+            cpu_percent=samples.get(CPU_COUNTER.lstrip("\\").lower(), math.nan),
+            booting=booting,
+            waiting_for_ip=waiting_for_ip,
+        )
+
+    def blocking_signals(self, load: HostLoad) -> List[str]:
+        """Get signals exceeding limits.
+
+        :param load: load of host
+        :return: descriptions of signals which block admission
+        """
+        blocking = []
+        if load.disk_queue_length > self.limits.max_disk_queue_length:
+            blocking.append(f"disk queue length {load.disk_queue_length:g} > {self.limits.max_disk_queue_length:g}")
+        if load.cpu_percent > self.limits.max_cpu_percent:
+            blocking.append(f"CPU {load.cpu_percent:.1f}% > {self.limits.max_cpu_percent:g}%")
+        if load.pending >= self.limits.max_pending_ips:
+            blocking.append(f"{load.pending} VMs pending >= {self.limits.max_pending_ips}")
+        return blocking
+
+    def admit(self, load: HostLoad, waiting: int) -> int:
+        """Decide how many VMs are started in this tick.
+
+        :param load: load of host read in this tick
+        :param waiting: number of VMs not started yet
+        :return: number of VMs to start
+        """
+        if not waiting:
+            return 0
+        blocking = self.blocking_signals(load)
+        if not blocking:
+            admitted = min(self.limits.max_admitted_per_tick, self.limits.max_pending_ips - load.pending)
+        else:
+            admitted = max(0, self.limits.min_in_flight - load.pending)
+        admitted = min(admitted, waiting)
+        self.history.append((load, admitted))
+        logger.log(
+            level=log_levels.MODULE_DEBUG,
+            msg=f"Admitting {admitted}/{waiting} VMs, {load.pending} pending"
+            + (f", blocked by {', '.join(blocking)}" if blocking and not admitted else ""),
+        )
+        return admitted
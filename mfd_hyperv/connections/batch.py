@@ -0,0 +1,405 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: MIT
+"""Batching of host commands.
+
+Calls of methods decorated with `batchable` made within `BatchingConnection.batch()` scope are queued instead of
+executed. Queued call is run right away against connection capturing its commands, when batch is flushed all
+captured commands are executed on host in one script and every queued call is run again with results of its
+commands, so it raises exactly the same exceptions it would raise when executed without batching.
+
+Contents:
+-batchable
+    decorator of manager methods which can be queued in batch
+
+-BatchingConnection
+    connection queueing batchable calls and flushing them in host scripts
+
+-run_in_scripts, query_in_scripts
+    execution of commands in host scripts split by length
+"""
+
+import base64
+import functools
+import os
+import re
+import sys
+import threading
+import traceback
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple, TYPE_CHECKING
+
+from mfd_connect.base import ConnectionCompletedProcess
+from mfd_connect.exceptions import ConnectionCalledProcessError
+
+from mfd_hyperv.connections.proxy import ConnectionProxy
+from mfd_hyperv.connections.session import RESULT_MARKER, decode_result
+from mfd_hyperv.exceptions import HyperVException, HyperVExecutionException
+
+if TYPE_CHECKING:
+    from mfd_connect import Connection
+    from mfd_connect.process import RemoteProcess
+
+BATCH_SCRIPT_TAG = "<# mfd_hyperv batch #>"
+BATCH_SCRIPT = (
+    BATCH_SCRIPT_TAG + " & {{ "
+    "$ProgressPreference = 'SilentlyContinue'; "
+    "foreach ($item in @({items})) {{ "
+    "$id, $encoded = $item.Split(':', 2); "
+    "$command = [Text.Encoding]::UTF8.GetString([Convert]::FromBase64String($encoded)); "
+    "$global:LASTEXITCODE = 0; "
+    "$errors = New-Object System.Collections.ArrayList; "
+    "try {{ $stdout = Invoke-Expression $command 2>&1 | ForEach-Object {{ "
+    "if ($_ -is [System.Management.Automation.ErrorRecord]) {{ [void]$errors.Add($_) }} else {{ $_ }} "
+    "}} | Out-String -Width 4096 }} catch {{ $stdout = ''; [void]$errors.Add($_) }}; "
+    "$stderr = $errors | Out-String -Width 4096; "
+    "$code = 0; "
+    "if ($global:LASTEXITCODE) {{ $code = $global:LASTEXITCODE }} elseif ($errors.Count) {{ $code = 1 }}; "
+    "$out = [Convert]::ToBase64String([Text.Encoding]::UTF8.GetBytes([string]$stdout)); "
+    "$err = [Convert]::ToBase64String([Text.Encoding]::UTF8.GetBytes([string]$stderr)); "
+    "Write-Output ('" + RESULT_MARKER + " ' + $id + ' ' + $code + ' ' + $out + ' ' + $err); "
+    "if ($code -ne 0) {{ break }} "
+    "}} }}"
+)
+MAX_SCRIPT_LENGTH = 7000
+_ITEM_REGEX = re.compile(r"'(?P<id>\d+):(?P<command>[A-Za-z0-9+/=]*)'")
+_PACKAGE_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def build_script(commands: List[str]) -> str:
+    """Build host script executing commands one by one until first failure.
+
+    Script writes one result line per executed command, see session.decode_result.
+
+    :param commands: powershell commands
+    :return: script
+    """
+    items = ", ".join(
+        f"'{index}:{base64.b64encode(cmd.encode('utf-8')).decode('ascii')}'" for index, cmd in enumerate(commands)
+    )
+    return BATCH_SCRIPT.format(items=items)
+
+
+def decode_script(script: str) -> Optional[List[str]]:
+    """Get commands of script created by build_script.
+
+    :param script: executed command
+    :return: commands of batch script, None if command is not batch script
+    """
+    if not script.startswith(BATCH_SCRIPT_TAG):
+        return None
+    return [base64.b64decode(match.group("command")).decode("utf-8") for match in _ITEM_REGEX.finditer(script)]
+
+
+def parse_script_results(stdout: str) -> List[Tuple[int, str, str]]:
+    """Get results of commands executed by batch script.
+
+    :param stdout: output of script
+    :return: return code, stdout and stderr of executed commands in order of execution
+    """
+    results = [decode_result(line) for line in stdout.splitlines()]
+    return [result[1:] for result in sorted(result for result in results if result is not None)]
+
+
+def run_in_scripts(
+    connection: "Connection",
+    groups: List[List[str]],
+    max_script_length: int = MAX_SCRIPT_LENGTH,
+    on_script: Optional[Callable[[List[int]], None]] = None,
+) -> Iterator[Tuple[int, List[Tuple[int, str, str]]]]:
+    """Execute groups of commands in host scripts, one round trip per script.
+
+    Group is never split between scripts, commands are split into few scripts only when script would exceed
+    `max_script_length`. Single command is executed as is. Script stops at failing command, rest of its group is
+    skipped and following groups are executed in next script. Results are yielded as scripts are executed, so caller
+    stops execution of remaining groups by leaving iteration.
+
+    :param connection: connection executing scripts
+    :param groups: commands grouped by operation they belong to
+    :param max_script_length: maximal length of single host script
+    :param on_script: called with indexes of groups of every script before it is executed
+    :return: index of group and results (return code, stdout, stderr) of its executed commands, the last of them
+             failed when group has more commands
+    :raises HyperVException: when results of script cannot be read
+    """
+    pending = deque(enumerate(groups))
+    while pending:
+        chunk, length = deque(), len(BATCH_SCRIPT)
+        while pending:
+            group_length = sum(len(command) * 4 // 3 + 12 for command in pending[0][1])
+            if chunk and length + group_length > max_script_length:
+                break
+            chunk.append(pending.popleft())
+            length += group_length
+        commands = [command for _, group in chunk for command in group]
+        if on_script is not None and commands:
+            on_script([index for index, _ in chunk])
+        results = deque(_execute_script(connection, commands) if commands else [])
+        while chunk:
+            index, group = chunk.popleft()
+            group_results = [results.popleft() for _ in range(min(len(group), len(results)))]
+            if len(group_results) < len(group) and not (group_results and group_results[-1][0]):
+                raise HyperVException(f"Couldn't read result of command {group[len(group_results)]} of host script")
+            yield index, group_results
+            if len(group_results) < len(group) or (group_results and group_results[-1][0]):
+                # script stopped on failed command, groups following it are executed in next script
+                pending.extendleft(reversed(chunk))
+                break
+
+
+def query_in_scripts(
+    connection: "Connection",
+    commands: List[str],
+    max_script_length: int = MAX_SCRIPT_LENGTH,
+    tolerate_last_failure: bool = False,
+) -> List[Tuple[int, str, str]]:
+    """Execute queries in host scripts, see run_in_scripts, and check their return codes.
+
+    :param connection: connection executing scripts
+    :param commands: queries
+    :param max_script_length: maximal length of single host script
+    :param tolerate_last_failure: whether failure of the last query is returned instead of raised, e.g. when it reads
+                                  optional data
+    :return: return code, stdout and stderr of queries
+    :raises HyperVExecutionException: when query fails
+    :raises HyperVException: when results of script cannot be read
+    """
+    results = []
+    for index, ((return_code, stdout, stderr),) in run_in_scripts(
+        connection, [[command] for command in commands], max_script_length
+    ):
+        if return_code and not (tolerate_last_failure and index == len(commands) - 1):
+            raise HyperVExecutionException(returncode=return_code, cmd=commands[index], output=stdout, stderr=stderr)
+        results.append((return_code, stdout, stderr))
+    return results
+
+
+def _execute_script(connection: "Connection", commands: List[str]) -> List[Tuple[int, str, str]]:
+    if len(commands) == 1:
+        result = connection.execute_powershell(command=commands[0], expected_return_codes=None)
+        return [(result.return_code, result.stdout, result.stderr)]
+    result = connection.execute_powershell(command=build_script(commands), expected_return_codes=None)
+    results = parse_script_results(result.stdout)
+    if not results:
+        raise HyperVException(f"Couldn't read results of host script: {result.stderr.strip()}")
+    return results
+
+
+def batchable(method: Callable) -> Callable:
+    """Allow queueing method calls within batch scope of connection of manager.
+
+    Method must issue commands which don't depend on outputs of previous commands and must not have side effects other
+    than executed commands, as it is run once when queued and once when batch is flushed. Calls made by other methods
+    of mfd_hyperv (e.g. start of VM during its creation) are never queued.
+    """
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs) -> Any:
+        connection = getattr(self, "connection", None) or getattr(self, "_connection", None)
+        if isinstance(connection, BatchingConnection) and connection.queues_calls and not _called_by_package():
+            return connection.queue_call(method, self, args, kwargs)
+        return method(self, *args, **kwargs)
+
+    wrapper.batchable = True
+    return wrapper
+
+
+@dataclass
+class _BatchedCall:
+    """Queued call of batchable method with commands it issues."""
+
+    method: Callable
+    instance: Any
+    args: tuple
+    kwargs: dict
+    call_site: str
+    commands: List[Tuple[str, Dict[str, Any]]] = field(default_factory=list)
+
+    @property
+    def name(self) -> str:
+        return f"{type(self.instance).__name__}.{self.method.__name__}"
+
+
+@dataclass
+class CommandBatch:
+    """Calls queued within batch scope.
+
+    calls: queued calls not flushed yet
+    flushed_calls: number of calls flushed so far
+    scripts: number of scripts executed on host
+    """
+
+    calls: List[_BatchedCall] = field(default_factory=list)
+    flushed_calls: int = 0
+    scripts: int = 0
+
+
+class _FlushedCalls(threading.local):
+    names: Optional[List[str]] = None
+
+
+_flushed_calls = _FlushedCalls()
+
+
+def get_flushed_call_names() -> Optional[List[str]]:
+    """Get names of queued calls ('ClassName.method_name') which host script flushed in current thread belongs to.
+
+    :return: names of calls, None when no batch is flushed
+    """
+    return _flushed_calls.names
+
+
+class _ThreadState(threading.local):
+    batch: Optional[CommandBatch] = None
+    capturing: Optional[_BatchedCall] = None
+    replaying: Optional[Deque[Tuple[str, Tuple[int, str, str]]]] = None
+
+
+class BatchingConnection(ConnectionProxy):
+    """Connection queueing calls of batchable methods within batch scope and flushing them in host scripts.
+
+    Batch scope belongs to thread which opened it, commands executed by other threads are not affected.
+    Command which isn't issued by batchable method (e.g. query) flushes queued calls before it is executed.
+    """
+
+    def __init__(self, connection: "Connection", max_script_length: int = MAX_SCRIPT_LENGTH):
+        """Class constructor.
+
+        :param connection: connection instance of MFD connect class.
+        :param max_script_length: maximal length of single host script, longer batches are split into few scripts
+        """
+        super().__init__(connection)
+        self.max_script_length = max_script_length
+        self._state = _ThreadState()
+
+    @property
+    def queues_calls(self) -> bool:
+        """Whether calls of batchable methods are queued in current thread."""
+        return self._state.batch is not None and self._state.capturing is None and self._state.replaying is None
+
+    @contextmanager
+    def batch(self) -> Iterator[CommandBatch]:
+        """Queue calls of batchable methods and flush them on exit.
+
+        Nested scope joins outer one. Queued calls are flushed also when scope is left by exception.
+
+        :return: batch with queued calls
+        """
+        if self._state.batch is not None:
+            yield self._state.batch
+            return
+
+        self._state.batch = CommandBatch()
+        try:
+            yield self._state.batch
+        finally:
+            try:
+                self.flush()
+            finally:
+                self._state.batch = None
+
+    def queue_call(self, method: Callable, instance: Any, args: tuple, kwargs: dict) -> None:
+        """Queue call of batchable method, method is run right away to capture its commands.
+
+        :param method: undecorated method
+        :param instance: object method is called on
+        :param args: positional arguments of call
+        :param kwargs: keyword arguments of call
+        """
+        call = _BatchedCall(method, instance, args, kwargs, _get_call_site())
+        self._state.capturing = call
+        try:
+            method(instance, *args, **kwargs)
+        finally:
+            self._state.capturing = None
+        self._state.batch.calls.append(call)
+
+    def flush(self) -> None:
+        """Execute queued calls.
+
+        :raises: exception raised by first failing call, calls queued after it are dropped
+        """
+        batch = self._state.batch
+        if batch is None or not batch.calls:
+            return
+
+        calls, batch.calls = batch.calls, []
+
+        def start_script(indexes: List[int]) -> None:
+            batch.scripts += 1
+            _flushed_calls.names = list(dict.fromkeys(calls[index].name for index in indexes))
+
+        groups = [[command for command, _ in call.commands] for call in calls]
+        try:
+            for index, results in run_in_scripts(
+                self._wrapped_connection, groups, self.max_script_length, start_script
+            ):
+                call = calls[index]
+                try:
+                    self._replay(call, results)
+                except Exception as e:
+                    if hasattr(e, "add_note"):
+                        e.add_note(f"Raised by batched call {call.name} queued at {call.call_site}")
+                    raise
+                batch.flushed_calls += 1
+        finally:
+            _flushed_calls.names = None
+
+    def _replay(self, call: _BatchedCall, results: List[Tuple[int, str, str]]) -> None:
+        self._state.replaying = deque(zip((command for command, _ in call.commands), results))
+        try:
+            call.method(call.instance, *call.args, **call.kwargs)
+        finally:
+            self._state.replaying = None
+
+    def execute_powershell(self, command: str, **kwargs) -> ConnectionCompletedProcess:
+        """Execute powershell command, capture or replay it when batchable method is queued or flushed."""
+        if self._state.capturing is not None:
+            self._state.capturing.commands.append((command, kwargs))
+            return ConnectionCompletedProcess(args=command, stdout="", stderr="", return_code=0)
+
+        if self._state.replaying:
+            captured_command, (return_code, stdout, stderr) = self._state.replaying.popleft()
+            if captured_command != command:
+                raise HyperVException(
+                    f"Batched call issued command '{command}' instead of captured command '{captured_command}'"
+                )
+            expected_return_codes = kwargs.get("expected_return_codes", frozenset({0}))
+            if expected_return_codes and return_code not in expected_return_codes:
+                exception = kwargs.get("custom_exception") or ConnectionCalledProcessError
+                raise exception(returncode=return_code, cmd=command, output=stdout, stderr=stderr)
+            return ConnectionCompletedProcess(args=command, stdout=stdout, stderr=stderr, return_code=return_code)
+
+        self._flush_before_command()
+        return self._wrapped_connection.execute_powershell(command, **kwargs)
+
+    def execute_command(self, command: str, **kwargs) -> ConnectionCompletedProcess:
+        """Execute command after flushing queued calls."""
+        self._flush_before_command()
+        return self._wrapped_connection.execute_command(command, **kwargs)
+
+    def start_process(self, command: str, **kwargs) -> "RemoteProcess":
+        """Start process after flushing queued calls."""
+        self._flush_before_command()
+        return self._wrapped_connection.start_process(command, **kwargs)
+
+    def _flush_before_command(self) -> None:
+        if self._state.batch is not None and self._state.replaying is None:
+            self.flush()
+
+
+def _called_by_package() -> bool:
+    """Check if batchable method is called by other method of mfd_hyperv."""
+    frame = sys._getframe(2)
+    while frame is not None and frame.f_globals.get("__name__") in ("mfd_hyperv.tracing", __name__):
+        frame = frame.f_back
+    return frame is not None and frame.f_globals.get("__name__", "").startswith("mfd_hyperv.")
+
+
+def _get_call_site() -> str:
+    """Get location of innermost frame outside of mfd_hyperv package."""
+    for frame in reversed(traceback.extract_stack()):
+        if not os.path.abspath(frame.filename).startswith(_PACKAGE_DIRECTORY + os.sep):
+            return f"{frame.filename}:{frame.lineno}"
+    return "unknown"
@@ -0,0 +1,433 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: MIT
+"""Dry run of commands sent to host.
+
+Commands are recorded instead of being executed on host and answered by host emulator, so workflows with queries
+following changes (e.g. waiting for created vSwitch) run to the end. Recorded commands form dependency graph based
+on host objects they read and change (vSwitch before its vNICs, VHD before VM using it) and their duration is
+estimated from latencies measured on host in the past.
+
+Contents:
+-get_command_resources
+    host objects read and changed by command
+
+-DryRunConnection
+    connection recording commands and answering them with host emulator
+
+-DryRunReport
+    recorded commands with dependencies, estimated time and redundant queries
+"""
+
+import fnmatch
+import json
+import re
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple, Union, TYPE_CHECKING
+
+from mfd_connect.exceptions import ConnectionCalledProcessError
+
+from mfd_hyperv.connections.batch import decode_script
+from mfd_hyperv.connections.emulated import (
+    DEFAULT_COMMAND_LATENCY,
+    DEFAULT_LATENCY,
+    POWERSHELL_STARTUP_LATENCY,
+    EmulatedHyperVConnection,
+)
+from mfd_hyperv.connections.proxy import ConnectionProxy
+from mfd_hyperv.instrumentation import CommandMetrics, get_command_name, get_current_operation
+
+if TYPE_CHECKING:
+    from mfd_connect import Connection
+    from mfd_connect.base import ConnectionCompletedProcess
+    from mfd_connect.process import RemoteProcess
+
+MUTATING_VERBS = frozenset(
+    {"new", "set", "add", "remove", "rename", "connect", "disconnect", "start", "stop", "restart", "enable", "copy"}
+)
+MUTATING_COMMANDS = frozenset({"mkdir", "expand-archive", "shutdown", "restart-computer"})
+_POWERSHELL_PREFIX_REGEX = re.compile(r"^\s*powershell(?:\.exe)?\s+(?:-\w+\s+)*[\"']?", re.IGNORECASE)
+_TOKEN_REGEX = re.compile(r"'[^']*'|\"[^\"]*\"|\S+")
+_ASSIGNMENT_REGEX = re.compile(r"^\$\w+\s*=")
+_VFPCTRL_OPTION_REGEX = re.compile(r"/(?P<name>[\w-]+)(?:\s+(?P<value>'[^']*'|\"[^\"]*\"|[^\s/'\"][^\s]*))?")
+
+
+def _unquote(value: Optional[str]) -> Optional[str]:
+    return value.strip("'\"") if value is not None else None
+
+
+def _split_statements(command: str) -> List[str]:
+    """Split command into statements separated with ';' outside of quotes and braces."""
+    statements, current, quote, depth = [], "", None, 0
+    for char in command:
+        if quote:
+            quote = None if char == quote else quote
+        elif char in "'\"":
+            quote = char
+        elif char in "{(":
+            depth += 1
+        elif char in "})":
+            depth -= 1
+        elif char == ";" and depth == 0:
+            statements.append(current.strip())
+            current = ""
+            continue
+        current += char
+    statements.append(current.strip())
+    return [statement for statement in statements if statement]
+
+
+def _parse_arguments(command: str) -> Tuple[Dict[str, Optional[str]], List[str]]:
+    """Split cmdlet arguments into named parameters (lowercase names) and positional arguments."""
+    tokens = _TOKEN_REGEX.findall(command)[1:]
+    parameters, positional = {}, []
+    index = 0
+    while index < len(tokens):
+        token = tokens[index]
+        if token.startswith("-") and len(token) > 1 and token[1].isalpha():
+            value = tokens[index + 1] if index + 1 < len(tokens) and not tokens[index + 1].startswith("-") else None
+            parameters[token[1:].lower()] = _unquote(value)
+            index += 1 if value is None else 2
+            continue
+        positional.append(_unquote(token))
+        index += 1
+    return parameters, positional
+
+
+def get_command_resources(command: str) -> Tuple[bool, Set[str], Set[str]]:
+    """Get host objects read and changed by command.
+
+    Objects are named 'vswitch:<name>', 'vm:<name>', 'vnic:<vm name or host>/<name>', 'file:<path>',
+    'qos:<vswitch>' and 'port:<name>', names can contain wildcards.
+
+    :param command: command executed on host
+    :return: whether command changes host, objects read and objects changed by command
+    """
+    command = _POWERSHELL_PREFIX_REGEX.sub("", command).strip().rstrip("\"'")
+    statements = [statement for statement in _split_statements(command) if not _ASSIGNMENT_REGEX.match(statement)]
+    if len(statements) > 1:
+        mutating, reads, writes = False, set(), set()
+        for statement in statements:
+            statement_mutating, statement_reads, statement_writes = get_command_resources(statement)
+            mutating |= statement_mutating
+            reads |= statement_reads
+            writes |= statement_writes
+        return mutating, reads, writes
+
+    command = (statements or [""])[0].split(" | ", 1)[0]
+    name = get_command_name(command)
+    if name.startswith("vfpctrl"):
+        return _get_vfpctrl_resources(command, name)
+
+    parameters, positional_arguments = _parse_arguments(command)
+    positional = positional_arguments[0] if positional_arguments else None
+    verb, _, noun = name.partition("-")
+    mutating = verb in MUTATING_VERBS or name in MUTATING_COMMANDS
+    reads, writes = set(), set()
+    changed = writes if mutating else reads
+
+    if noun == "vmswitch":
+        changed.add(f"vswitch:{parameters.get('name') or positional or '*'}")
+        if parameters.get("newname"):
+            writes.add(f"vswitch:{parameters['newname']}")
+    if parameters.get("switchname"):
+        reads.add(f"vswitch:{parameters['switchname']}")
+
+    vm_name = parameters.get("vmname") or (positional if noun == "vm" else None)
+    if noun.startswith("vmnetworkadapter"):
+        owner = "host" if "managementos" in parameters else vm_name or "*"
+        adapter = parameters.get("vmnetworkadaptername") or parameters.get("name") or "*"
+        changed.add(f"vnic:{owner}/{adapter}")
+        if owner != "host":
+            reads.add(f"vm:{owner}")
+    elif noun.startswith("vm") and noun != "vmswitch":
+        changed.add(f"vm:{vm_name or parameters.get('name') or '*'}")
+
+    path = parameters.get("path") or (positional if verb in ("get", "remove", "test") and noun == "item" else None)
+    if noun == "vhd":
+        changed.add(f"file:{parameters.get('path') or positional}".lower())
+        if parameters.get("parentpath"):
+            reads.add(f"file:{parameters['parentpath']}".lower())
+    elif noun == "vmharddiskdrive" and path:
+        reads.add(f"file:{path}".lower())
+    elif noun == "item" or name in ("mkdir", "expand-archive"):
+        changed.add(f"file:{path or positional or '*'}".lower())
+    return mutating, reads, writes
+
+
+def _get_vfpctrl_resources(command: str, name: str) -> Tuple[bool, Set[str], Set[str]]:
+    options = {
+        match.group("name").lower(): _unquote(match.group("value"))
+        for match in _VFPCTRL_OPTION_REGEX.finditer(command)
+    }
+    operation = name.partition(" /")[2]
+    mutating = bool(operation) and not operation.startswith(("list", "get"))
+    reads, writes = set(), set()
+    changed = writes if mutating else reads
+    if options.get("switch"):
+        reads.add(f"vswitch:{options['switch']}")
+        changed.add(f"qos:{options['switch']}")
+    if options.get("port"):
+        changed.add(f"port:{options['port']}".lower())
+    if not options.get("switch") and not options.get("port"):
+        reads.add("qos:*")
+    return mutating, reads, writes
+
+
+def _resources_match(first: Set[str], second: Set[str]) -> bool:
+    return any(
+        fnmatch.fnmatchcase(one.lower(), other.lower()) or fnmatch.fnmatchcase(other.lower(), one.lower())
+        for one in first
+        for other in second
+    )
+
+
+@dataclass
+class PlannedCommand:
+    """Command recorded in dry run.
+
+    index: position of command in recorded order
+    command: command text
+    name: command name, see instrumentation.get_command_name
+    operation: mfd_hyperv method which issued command
+    mutating: whether command changes host
+    reads: host objects read by command
+    writes: host objects changed by command
+    depends_on: indexes of commands which changed objects used by command and must be executed before it
+    redundant: whether query was already issued and objects it reads didn't change since then
+    return_code: return code of command given by host emulator
+    """
+
+    index: int
+    command: str
+    name: str
+    operation: str
+    mutating: bool
+    reads: Set[str] = field(default_factory=set)
+    writes: Set[str] = field(default_factory=set)
+    depends_on: List[int] = field(default_factory=list)
+    redundant: bool = False
+    return_code: int = 0
+
+
+@dataclass
+class DryRunReport:
+    """Recorded commands with estimated duration.
+
+    commands: recorded commands in order
+    estimated_times: estimated duration of every command in seconds
+    """
+
+    commands: List[PlannedCommand]
+    estimated_times: List[float]
+
+    @property
+    def estimated_time(self) -> float:
+        """Estimated duration of all commands executed one by one."""
+        return sum(self.estimated_times)
+
+    @property
+    def critical_path_time(self) -> float:
+        """Estimated duration when independent commands are executed in parallel, i.e. length of longest chain."""
+        finish = []
+        for command, estimated_time in zip(self.commands, self.estimated_times):
+            finish.append(estimated_time + max((finish[index] for index in command.depends_on), default=0.0))
+        return max(finish, default=0.0)
+
+    @property
+    def edges(self) -> List[Tuple[int, int]]:
+        """Dependencies as (index of prerequisite, index of dependent command)."""
+        return [(dependency, command.index) for command in self.commands for dependency in command.depends_on]
+
+    @property
+    def redundant_queries(self) -> List[PlannedCommand]:
+        """Queries repeated while objects they read didn't change."""
+        return [command for command in self.commands if command.redundant]
+
+    def by_operation(self) -> Dict[str, Tuple[int, float]]:
+        """Get number of commands and their estimated duration per operation."""
+        result = {}
+        for command, estimated_time in zip(self.commands, self.estimated_times):
+            count, total = result.get(command.operation, (0, 0.0))
+            result[command.operation] = (count + 1, total + estimated_time)
+        return result
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Get report in JSON serializable form."""
+        return {
+            "estimated_time": self.estimated_time,
+            "critical_path_time": self.critical_path_time,
+            "commands": [
+                {
+                    "index": command.index,
+                    "command": command.command,
+                    "name": command.name,
+                    "operation": command.operation,
+                    "mutating": command.mutating,
+                    "depends_on": command.depends_on,
+                    "redundant": command.redundant,
+                    "estimated_time": estimated_time,
+                }
+                for command, estimated_time in zip(self.commands, self.estimated_times)
+            ],
+        }
+
+    def to_dot(self) -> str:
+        """Get dependency graph in Graphviz DOT format, changing commands are boxes, queries are ellipses."""
+        lines = ["digraph commands {"]
+        for command, estimated_time in zip(self.commands, self.estimated_times):
+            label = f"{command.index}: {command.name}\\n{command.operation}\\n{estimated_time:.2f}s"
+            shape = "box" if command.mutating else "ellipse"
+            style = ', style="dashed"' if command.redundant else ""
+            lines.append(f'  c{command.index} [label="{label}", shape={shape}{style}];')
+        lines.extend(f"  c{first} -> c{second};" for first, second in self.edges)
+        lines.append("}")
+        return "\n".join(lines)
+
+    def __str__(self) -> str:
+        lines = [
+            f"{len(self.commands)} commands, estimated time {self.estimated_time:.2f}s "
+            f"({self.critical_path_time:.2f}s with independent commands in parallel)"
+        ]
+        for command, estimated_time in zip(self.commands, self.estimated_times):
+            flags = f"{'change' if command.mutating else 'query'}{', redundant' if command.redundant else ''}"
+            depends = f" after {', '.join(map(str, command.depends_on))}" if command.depends_on else ""
+            lines.append(
+                f"{command.index:>4} {estimated_time:>7.2f}s [{flags}] {command.operation}: {command.command}{depends}"
+            )
+        return "\n".join(lines)
+
+    def export(self, file_path: Union[str, Path]) -> None:
+        """Export report to JSON file.
+
+        :param file_path: path of created file
+        """
+        Path(file_path).write_text(json.dumps(self.to_dict(), indent=2))
+
+
+class DryRunConnection(ConnectionProxy):
+    """Connection recording commands instead of executing them on host.
+
+    Commands are answered by host emulator, which can be prepared with objects existing on host beforehand.
+    """
+
+    def __init__(self, host: Optional["Connection"] = None):
+        """Class constructor.
+
+        :param host: connection answering recorded commands, new EmulatedHyperVConnection without latency by default,
+                     must not be connection to real host as commands are executed on it
+        """
+        super().__init__(host if host is not None else EmulatedHyperVConnection(time_scale=0))
+        self._lock = threading.Lock()
+        self._commands: List[PlannedCommand] = []
+
+    @property
+    def host(self) -> "Connection":
+        """Connection answering recorded commands."""
+        return self._wrapped_connection
+
+    @property
+    def commands(self) -> List[PlannedCommand]:
+        """Copy of recorded commands."""
+        with self._lock:
+            return list(self._commands)
+
+    def clear(self) -> None:
+        """Remove recorded commands."""
+        with self._lock:
+            self._commands.clear()
+
+    def report(self, latencies: Optional[Union[CommandMetrics, str, Path]] = None) -> DryRunReport:
+        """Create report of recorded commands.
+
+        :param latencies: metrics measured on host (or path of file exported by CommandMetrics.export) used to
+                          estimate duration of commands, mean time of command name is used; commands missing in
+                          metrics are estimated from DEFAULT_LATENCY of host emulator
+        :return: report
+        """
+        if isinstance(latencies, (str, Path)):
+            latencies = CommandMetrics.load(latencies)
+        measured = {name: stats.mean_time for name, stats in latencies.by_command().items()} if latencies else {}
+        commands = self.commands
+        return DryRunReport(commands, [self._estimate(command.command, measured) for command in commands])
+
+    @staticmethod
+    def _estimate(command: str, measured: Dict[str, float]) -> float:
+        def _single(cmd: str) -> float:
+            name = get_command_name(cmd)
+            if name in measured:
+                return measured[name]
+            return POWERSHELL_STARTUP_LATENCY + DEFAULT_LATENCY.get(name, DEFAULT_COMMAND_LATENCY)
+
+        batch_commands = decode_script(command)
+        if batch_commands is None:
+            return _single(command)
+        startup = measured.get("batch", POWERSHELL_STARTUP_LATENCY)
+        return startup + sum(max(_single(cmd) - POWERSHELL_STARTUP_LATENCY, 0.0) for cmd in batch_commands)
+
+    def _record(self, command: str) -> PlannedCommand:
+        mutating, reads, writes = False, set(), set()
+        for cmd in decode_script(command) or [command]:
+            cmd_mutating, cmd_reads, cmd_writes = get_command_resources(cmd)
+            mutating |= cmd_mutating
+            reads |= cmd_reads
+            writes |= cmd_writes
+        with self._lock:
+            planned = PlannedCommand(
+                index=len(self._commands),
+                command=command,
+                name=get_command_name(command),
+                operation=get_current_operation(),
+                mutating=mutating,
+                reads=reads,
+                writes=writes,
+            )
+            depends_on = []
+            for resource in reads | writes:
+                writer = next(
+                    (
+                        previous
+                        for previous in reversed(self._commands)
+                        if previous.mutating and _resources_match({resource}, previous.writes)
+                    ),
+                    None,
+                )
+                if writer is not None and writer.index not in depends_on:
+                    depends_on.append(writer.index)
+            planned.depends_on = sorted(depends_on)
+            if not mutating:
+                planned.redundant = any(
+                    not previous.mutating and previous.command == command and previous.depends_on == planned.depends_on
+                    for previous in self._commands
+                )
+            self._commands.append(planned)
+        return planned
+
+    def execute_command(self, command: str, **kwargs) -> "ConnectionCompletedProcess":
+        """Record command and answer it with host emulator."""
+        planned = self._record(command)
+        result = self._wrapped_connection.execute_command(command, **{**kwargs, "expected_return_codes": None})
+        return self._check(planned, result, kwargs)
+
+    def execute_powershell(self, command: str, **kwargs) -> "ConnectionCompletedProcess":
+        """Record powershell command and answer it with host emulator."""
+        planned = self._record(command)
+        result = self._wrapped_connection.execute_powershell(command, **{**kwargs, "expected_return_codes": None})
+        return self._check(planned, result, kwargs)
+
+    def start_process(self, command: str, **kwargs) -> "RemoteProcess":
+        """Record started process and answer it with host emulator."""
+        self._record(command)
+        return self._wrapped_connection.start_process(command, **kwargs)
+
+    @staticmethod
+    def _check(
+        planned: PlannedCommand, result: "ConnectionCompletedProcess", kwargs: Dict[str, Any]
+    ) -> "ConnectionCompletedProcess":
+        planned.return_code = result.return_code
+        expected_return_codes = kwargs.get("expected_return_codes", frozenset({0}))
+        if expected_return_codes and result.return_code not in expected_return_codes:
+            exception = kwargs.get("custom_exception") or ConnectionCalledProcessError
+            raise exception(returncode=result.return_code, cmd=result.args, output=result.stdout, stderr=result.stderr)
+        return result
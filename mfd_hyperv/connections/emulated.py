@@ -0,0 +1,1399 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: MIT
+"""Stateful in-memory emulator of Hyper-V host.
+
+Emulator answers subset of PowerShell cmdlets and vfpctrl commands emitted by mfd_hyperv, keeping consistent state
+of VMs, VM network adapters, vSwitches, VHDs and scheduler queues. Output is formatted like on real host and each
+command waits for simulated latency, so library behaviour can be profiled with hundreds of VMs without hardware.
+
+Module is part of runtime package because dry run (see dry_run.DryRunConnection) answers recorded commands with
+emulator. Supported surface is EmulatedHyperVConnection with its state attributes (vms, vm_adapters, vswitches,
+queues, ports, files, jobs, commands) and latency defaults (DEFAULT_LATENCY, DEFAULT_COMMAND_LATENCY,
+POWERSHELL_STARTUP_LATENCY, RECORD_LATENCY), other names are internal.
+
+Contents:
+-EmulatedHyperVConnection
+    connection executing commands against emulated host state
+
+-EmulatedPath, EmulatedProcess
+    path and process objects returned by emulator
+"""
+
+import base64
+import fnmatch
+import re
+import threading
+import time
+import uuid
+from pathlib import PureWindowsPath
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from mfd_connect import Connection
+from mfd_connect.base import ConnectionCompletedProcess
+from mfd_connect.exceptions import ConnectionCalledProcessError
+from mfd_typing import OSBitness, OSName, OSType
+from mfd_typing.cpu_values import CPUArchitecture
+
+from mfd_hyperv.connections.batch import decode_script
+from mfd_hyperv.connections.session import RESULT_MARKER
+from mfd_hyperv.instrumentation import get_command_name
+
+POWERSHELL_STARTUP_LATENCY = 0.25
+DEFAULT_COMMAND_LATENCY = 0.05
+DEFAULT_LATENCY = {
+    "new-vm": 2.0,
+    "remove-vm": 1.5,
+    "start-vm": 4.0,
+    "stop-vm": 3.0,
+    "restart-vm": 5.0,
+    "new-vhd": 1.0,
+    "add-vmharddiskdrive": 0.5,
+    "add-vmnetworkadapter": 1.0,
+    "remove-vmnetworkadapter": 0.8,
+    "set-vmnetworkadapter": 0.3,
+    "connect-vmnetworkadapter": 0.5,
+    "new-vmswitch": 5.0,
+    "remove-vmswitch": 3.0,
+    "set-vmswitch": 1.0,
+    "rename-vmswitch": 0.5,
+}
+RECORD_LATENCY = 0.002
+# load of host reported by Get-Counter per VM booting (started and waiting for DHCP)
+_BOOT_DISK_QUEUE_LENGTH = 1.0
+_BOOT_CPU_PERCENT = 10.0
+_IDLE_CPU_PERCENT = 5.0
+_HOST_NAME = "HYPERV-HOST"
+_MAC_ADDRESS_PREFIX = 0x00155D000000
+
+Record = Dict[str, Any]
+
+
+class _CommandError(Exception):
+    """Error of emulated command, reported with non-zero return code."""
+
+    def __init__(self, message: str, return_code: int = 1):
+        super().__init__(message)
+        self.return_code = return_code
+
+
+class EmulatedPath(PureWindowsPath):
+    """Path on emulated host, existence is checked in emulated file system of bound emulator."""
+
+    _emulator: Optional["EmulatedHyperVConnection"] = None
+
+    def exists(self) -> bool:
+        """Check if file or directory exists on emulated host."""
+        return self._emulator is not None and self._emulator.file_exists(str(self))
+
+    def read_text(self, *args, **kwargs) -> str:
+        """Read content of file on emulated host."""
+        return self._emulator.files[str(self).lower()] if self._emulator is not None else ""
+
+
+def _split_outside_quotes(text: str, separators: str) -> List[str]:
+    """Split text on separators which are not within quotes, braces or parentheses.
+
+    :param text: text to split
+    :param separators: characters that split text, whitespace is used when empty
+    :return: parts of text, empty parts are skipped
+    """
+    parts, current, quote, depth = [], "", None, 0
+    for char in text:
+        if quote:
+            current += char
+            if char == quote:
+                quote = None
+            continue
+        if char in "'\"":
+            quote = char
+        elif char in "{(":
+            depth += 1
+        elif char in "})":
+            depth -= 1
+        if depth == 0 and (char in separators if separators else char.isspace()):
+            if current.strip():
+                parts.append(current.strip())
+            current = ""
+            continue
+        current += char
+    if current.strip():
+        parts.append(current.strip())
+    return parts
+
+
+_SILENT_ERROR_ACTION_REGEX = re.compile(r"-ErrorAction\s+['\"]?(SilentlyContinue|Ignore)\b", re.IGNORECASE)
+_AS_JOB_REGEX = re.compile(r"-AsJob\b", re.IGNORECASE)
+_WAIT_LOOP_REGEX = re.compile(
+    r"^for \(\$(?P<var>\w+) = 0; \$(?P=var) -lt (?P<checks>\d+) -and -not \((?P<condition>.+)\); \$(?P=var)\+\+\)"
+    r" \{ Start-Sleep -Milliseconds (?P<milliseconds>\d+) \}$",
+    re.IGNORECASE | re.DOTALL,
+)
+
+
+def _unquote(value: str) -> Any:
+    value = value.strip()
+    if len(value) > 1 and value[0] == value[-1] and value[0] in "'\"":
+        return value[1:-1]
+    if value.lower() in ("$true", "$false"):
+        return value.lower() == "$true"
+    return value
+
+
+def _parse_arguments(tokens: List[str]) -> Tuple[Dict[str, Any], List[Any]]:
+    """Parse cmdlet arguments.
+
+    :param tokens: tokens of cmdlet call without cmdlet name
+    :return: named parameters with lowercase names (switches have True value, lists are returned for values
+             separated with commas) and positional arguments
+    """
+    parameters, positional = {}, []
+    index = 0
+    while index < len(tokens):
+        token = tokens[index]
+        index += 1
+        if not (token.startswith("-") and len(token) > 1 and not token[1].isdigit()):
+            positional.append(_unquote(token))
+            continue
+        name, separator, inline_value = token[1:].partition(":")
+        if separator:
+            parameters[name.lower()] = _unquote(inline_value)
+            continue
+        value_tokens = []
+        while index < len(tokens) and not (tokens[index].startswith("-") and len(tokens[index]) > 1):
+            value_tokens.append(tokens[index])
+            index += 1
+            if not value_tokens[-1].endswith(",") and not (index < len(tokens) and tokens[index].startswith(",")):
+                break
+        if not value_tokens:
+            parameters[name.lower()] = True
+            continue
+        values = [_unquote(value) for value in _split_outside_quotes(" ".join(value_tokens), ",")]
+        parameters[name.lower()] = values if len(values) > 1 else values[0]
+    return parameters, positional
+
+
+def _encode(text: str) -> str:
+    return base64.b64encode(text.encode("utf-8")).decode("ascii")
+
+
+def _as_list(value: Any) -> List[Any]:
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def _matches(name: str, patterns: List[str]) -> bool:
+    return any(fnmatch.fnmatchcase(name.lower(), str(pattern).lower()) for pattern in patterns)
+
+
+def _format_value(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return str(value)
+    if isinstance(value, (list, tuple)):
+        return "{" + ", ".join(_format_value(item) for item in value) + "}"
+    return str(value)
+
+
+def _visible(record: Record) -> Record:
+    return {key: value for key, value in record.items() if not key.startswith("_")}
+
+
+def _get_property(record: Record, name: str) -> Tuple[Optional[str], Any]:
+    for key, value in record.items():
+        if key.lower() == name.lower() and not key.startswith("_"):
+            return key, value
+    return None, None
+
+
+def _format_list(records: List[Record]) -> str:
+    """Format records like Format-List cmdlet.
+
+    :param records: records to format
+    :return: formatted output
+    """
+    blocks = []
+    for record in records:
+        record = _visible(record)
+        width = max((len(key) for key in record), default=0)
+        blocks.append("\n".join(f"{key:<{width}} : {_format_value(value)}".rstrip() for key, value in record.items()))
+    return "\n\n" + "\n\n".join(blocks) + "\n\n\n" if blocks else ""
+
+
+class EmulatedHyperVConnection(Connection):
+    """Connection executing commands against in-memory Hyper-V host.
+
+    Supported cmdlets: New/Get/Start/Stop/Restart/Remove-VM, Set-VMProcessor, Get-VMProcessor, Set-VMMemory,
+    Set-VMFirmware, Enable-VMIntegrationService, New-VHD, Add-VMHardDiskDrive, Add/Set/Get/Remove/Connect/
+    Disconnect-VMNetworkAdapter, Get/Set-VMNetworkAdapterVlan, Get/Set-VMNetworkAdapterRdma,
+    New/Get/Set/Rename/Remove-VMSwitch, Get-WindowsOptionalFeature, Get-Item, Remove-Item and vfpctrl queue, port
+    and QoS configuration commands, Get-NetAdapter for host vNICs of vSwitches. Start/Stop/Restart-VM with -AsJob
+    return job completed after latency of cmdlet, jobs are managed with Get/Receive/Remove-Job. Get-Counter reports
+    disk queue length and CPU usage growing with number of VMs booting (started within `dhcp_delay`). Pipelines with
+    select, Where-Object, Sort-Object and Format-List, statements separated with ';' (assignments of variables are
+    ignored) and for loops sleeping until command returns output are supported, errors of cmdlets called with
+    -ErrorAction SilentlyContinue aren't written to stderr. Unsupported commands fail like unknown PowerShell commands.
+    """
+
+    def __init__(
+        self,
+        latency: Optional[Dict[str, float]] = None,
+        powershell_startup: float = POWERSHELL_STARTUP_LATENCY,
+        record_latency: float = RECORD_LATENCY,
+        time_scale: float = 1.0,
+        dhcp_delay: float = 0.0,
+        host_adapter_delay: float = 0.0,
+        mng_network_prefix: str = "10",
+        host_ip: str = "10.10.10.10",
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        """Class constructor.
+
+        :param latency: latency of commands per command name (see instrumentation.get_command_name), overriding
+                        DEFAULT_LATENCY
+        :param powershell_startup: latency of starting powershell.exe added to every execute_powershell call
+        :param record_latency: latency added for every record returned by command
+        :param time_scale: multiplier of all latencies, 0 disables waiting
+        :param dhcp_delay: time after VM start after which management adapter gets IP address
+        :param host_adapter_delay: time after creation of host vNIC (vEthernet adapter of vSwitch) after which it is
+                                   visible in Get-NetAdapter
+        :param mng_network_prefix: first octet of IP address assigned to management adapters, remaining octets
+                                   are taken from MAC address (see HypervHypervisor.format_mac)
+        :param host_ip: IP address of emulated host
+        :param clock: function returning current time, used for DHCP emulation
+        :param sleep: function used to wait for latency of command
+        """
+        super().__init__()
+        self._ip = host_ip
+        self.latency = {**DEFAULT_LATENCY, **(latency or {})}
+        self.powershell_startup = powershell_startup
+        self.record_latency = record_latency
+        self.time_scale = time_scale
+        self.dhcp_delay = dhcp_delay
+        self.host_adapter_delay = host_adapter_delay
+        self.mng_network_prefix = mng_network_prefix
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.RLock()
+        self._path_class = type("EmulatedPath", (EmulatedPath,), {"_emulator": self})
+
+        self.vms: Dict[str, Record] = {}
+        self.processors: Dict[str, Record] = {}
+        self.vm_adapters: List[Record] = []
+        self.vswitches: Dict[str, Record] = {}
+        self.files: Dict[str, str] = {}
+        self.directories = set()
+        self.queues: Dict[str, Dict[str, Record]] = {}
+        self.qos_configs: Dict[str, Record] = {}
+        self.ports: Dict[str, Record] = {}
+        self.commands: List[str] = []
+        self.jobs: Dict[int, Record] = {}
+        self._mac_counter = 0
+        self._job_counter = 0
+        self._port_counter = 2
+
+        self._cmdlets = {
+            "new-vm": self._new_vm,
+            "get-vm": self._get_vm,
+            "start-vm": self._start_vm,
+            "stop-vm": self._stop_vm,
+            "restart-vm": self._restart_vm,
+            "remove-vm": self._remove_vm,
+            "get-job": self._get_job,
+            "receive-job": self._receive_job,
+            "remove-job": self._remove_job,
+            "set-vmprocessor": self._set_vm_processor,
+            "get-vmprocessor": self._get_vm_processor,
+            "set-vmmemory": self._set_vm_memory,
+            "set-vmfirmware": self._set_vm_firmware,
+            "enable-vmintegrationservice": self._enable_vm_integration_service,
+            "new-vhd": self._new_vhd,
+            "add-vmharddiskdrive": self._add_vm_hard_disk_drive,
+            "add-vmnetworkadapter": self._add_vm_network_adapter,
+            "get-vmnetworkadapter": self._get_vm_network_adapter,
+            "set-vmnetworkadapter": self._set_vm_network_adapter,
+            "remove-vmnetworkadapter": self._remove_vm_network_adapter,
+            "connect-vmnetworkadapter": self._connect_vm_network_adapter,
+            "disconnect-vmnetworkadapter": self._disconnect_vm_network_adapter,
+            "get-vmnetworkadaptervlan": self._get_vm_network_adapter_vlan,
+            "set-vmnetworkadaptervlan": self._set_vm_network_adapter_vlan,
+            "get-vmnetworkadapterrdma": self._get_vm_network_adapter_rdma,
+            "set-vmnetworkadapterrdma": self._set_vm_network_adapter_rdma,
+            "new-vmswitch": self._new_vm_switch,
+            "get-vmswitch": self._get_vm_switch,
+            "set-vmswitch": self._set_vm_switch,
+            "rename-vmswitch": self._rename_vm_switch,
+            "remove-vmswitch": self._remove_vm_switch,
+            "get-windowsoptionalfeature": self._get_windows_optional_feature,
+            "get-item": self._get_item,
+            "get-netadapter": self._get_net_adapter,
+            "remove-item": self._remove_item,
+            "mkdir": self._mkdir,
+        }
+
+    def __str__(self) -> str:
+        return f"EmulatedHyperVConnection({self._ip})"
+
+    @property
+    def round_trips(self) -> int:
+        """Number of executed commands."""
+        return len(self.commands)
+
+    def file_exists(self, path: str) -> bool:
+        """Check if file or directory exists on emulated host.
+
+        :param path: path of file or directory
+        """
+        path = path.lower().rstrip("\\")
+        return path in self.files or path in self.directories
+
+    def add_file(self, path: str, content: str = "") -> None:
+        """Create file on emulated host, e.g. base VM image.
+
+        :param path: path of file
+        :param content: content of file
+        """
+        self.files[str(path).lower()] = content
+
+    # connection interface
+
+    def execute_powershell(self, command: str, **kwargs) -> ConnectionCompletedProcess:
+        """Execute powershell command on emulated host.
+
+        :param command: command to execute
+        :param kwargs: execute_command arguments, e.g. expected_return_codes, custom_exception
+        :return: result of command
+        """
+        return self._run(command, kwargs, startup=self.powershell_startup)
+
+    def execute_command(self, command: str, **kwargs) -> ConnectionCompletedProcess:
+        """Execute command on emulated host.
+
+        :param command: command to execute
+        :param kwargs: execute_command arguments, e.g. expected_return_codes, custom_exception
+        :return: result of command
+        """
+        return self._run(command, kwargs, startup=0.0)
+
+    def start_process(self, command: str, **kwargs) -> "EmulatedProcess":
+        """Start process on emulated host, it is finished right after start.
+
+        :param command: command of process
+        :return: finished process
+        """
+        stdout, stderr, return_code, records = self._evaluate(command)
+        self._wait(command, records, startup=self.powershell_startup)
+        return EmulatedProcess(stdout, stderr, return_code)
+
+    def path(self, *args, **kwargs) -> EmulatedPath:
+        """Create path on emulated host."""
+        return self._path_class(*args)
+
+    def get_os_name(self) -> OSName:
+        """Get OS name of emulated host."""
+        return OSName.WINDOWS
+
+    def get_os_type(self) -> OSType:
+        """Get OS type of emulated host."""
+        return OSType.WINDOWS
+
+    def get_os_bitness(self) -> OSBitness:
+        """Get OS bitness of emulated host."""
+        return OSBitness.OS_64BIT
+
+    def get_cpu_architecture(self) -> CPUArchitecture:
+        """Get CPU architecture of emulated host."""
+        return CPUArchitecture.X86_64
+
+    def restart_platform(self) -> None:
+        """Do nothing, emulated host keeps its state."""
+
+    def shutdown_platform(self) -> None:
+        """Do nothing, emulated host keeps its state."""
+
+    def wait_for_host(self, *args, **kwargs) -> None:
+        """Do nothing, emulated host is always available."""
+
+    def disconnect(self, *args, **kwargs) -> None:
+        """Do nothing, emulated host is always available."""
+
+    # execution
+
+    def _run(self, command: str, kwargs: Dict[str, Any], startup: float) -> ConnectionCompletedProcess:
+        stdout, stderr, return_code, records = self._evaluate(command)
+        self._wait(command, records, startup)
+        expected_return_codes = kwargs.get("expected_return_codes", frozenset({0}))
+        if expected_return_codes and return_code not in expected_return_codes:
+            exception = kwargs.get("custom_exception") or ConnectionCalledProcessError
+            raise exception(returncode=return_code, cmd=command, output=stdout, stderr=stderr)
+        return ConnectionCompletedProcess(args=command, stdout=stdout, stderr=stderr, return_code=return_code)
+
+    def _wait(self, command: str, records: int, startup: float) -> None:
+        if not self.time_scale:
+            return
+        commands = decode_script(command) or [command]
+        latency = startup + sum(self._command_latency(cmd) for cmd in commands) + records * self.record_latency
+        self._sleep(latency * self.time_scale)
+
+    def _command_latency(self, command: str) -> float:
+        if _AS_JOB_REGEX.search(command):
+            return DEFAULT_COMMAND_LATENCY  # job is created immediately, its latency is emulated by job itself
+        name = get_command_name(command)
+        name = "vfpctrl" if name.startswith("vfpctrl") else name
+        return self.latency.get(name, DEFAULT_COMMAND_LATENCY)
+
+    def _evaluate(self, command: str) -> Tuple[str, str, int, int]:
+        """Evaluate command on emulated state.
+
+        :param command: command to evaluate
+        :return: stdout, stderr, return code and number of records returned by command
+        """
+        with self._lock:
+            self.commands.append(command)
+            self._complete_jobs()
+            batch_commands = decode_script(command)
+            if batch_commands is not None:
+                return self._evaluate_batch(batch_commands)
+            return self._evaluate_command(command)
+
+    def _evaluate_command(self, command: str) -> Tuple[str, str, int, int]:
+        command = self._strip_powershell_prefix(command.strip())
+        stdout, stderr, return_code, records = "", "", 0, 0
+        for statement in _split_outside_quotes(command, ";"):
+            try:
+                output = self._evaluate_expression(statement)
+            except _CommandError as e:
+                if not _SILENT_ERROR_ACTION_REGEX.search(statement):
+                    stderr += f"{e}\n"
+                return_code = e.return_code
+                continue
+            return_code = 0
+            if isinstance(output, str):
+                stdout, records = stdout + output, records + output.count("\n")
+            else:
+                stdout, records = stdout + self._to_text(output), records + len(output)
+        return stdout, stderr, return_code, records
+
+    def _evaluate_batch(self, commands: List[str]) -> Tuple[str, str, int, int]:
+        """Evaluate commands of batch script, see batch.build_script."""
+        lines, records = [], 0
+        for index, command in enumerate(commands):
+            stdout, stderr, return_code, command_records = self._evaluate_command(command)
+            records += command_records
+            lines.append(f"{RESULT_MARKER} {index} {return_code} {_encode(stdout)} {_encode(stderr)}\n")
+            if return_code:
+                break
+        return "".join(lines), "", 0, records
+
+    @staticmethod
+    def _strip_powershell_prefix(command: str) -> str:
+        match = re.match(r"^powershell(\.exe)?\s+(?P<command>.*)$", command, re.IGNORECASE | re.DOTALL)
+        if not match:
+            return command
+        command = match.group("command").strip()
+        if len(command) > 1 and command[0] == command[-1] == '"':
+            command = command[1:-1].replace('\\"', '"')
+        return command
+
+    def _evaluate_expression(self, command: str) -> Union[str, List[Any]]:
+        if re.match(r"^\$\w+\s*=", command):
+            return ""  # variable assignment, e.g. $FormatEnumerationLimit = -1
+
+        match = re.match(r"^\((?P<inner>.*)\)\.(?P<property>\w+)$", command, re.DOTALL)
+        if match:
+            output = self._evaluate_expression(match.group("inner"))
+            return [value for value in (_get_property(record, match.group("property"))[1] for record in output)]
+
+        if command.lower().startswith("vfpctrl"):
+            return self._vfpctrl(_split_outside_quotes(command, "")[1:])
+
+        if command.lower().startswith("(get-counter"):
+            return self._get_counter(command)
+
+        match = _WAIT_LOOP_REGEX.match(command)
+        if match:
+            return self._wait_loop(match)
+
+        stages = _split_outside_quotes(command, "|")
+        tokens = _split_outside_quotes(stages[0], "")
+        cmdlet = tokens[0].lower()
+        if cmdlet not in self._cmdlets:
+            raise _CommandError(
+                f"{tokens[0]} : The term '{tokens[0]}' is not recognized as the name of a cmdlet, function, "
+                "script file, or operable program."
+            )
+        parameters, positional = _parse_arguments(tokens[1:])
+        output = self._cmdlets[cmdlet](parameters, positional)
+        for stage in stages[1:]:
+            output = self._pipe(output, stage)
+        return output
+
+    def _wait_loop(self, match: re.Match) -> str:
+        """Emulate loop sleeping on host until condition returns any output, see VSwitchManager.is_vswitch_ready."""
+        for _ in range(int(match.group("checks"))):
+            try:
+                if self._evaluate_expression(match.group("condition")):
+                    break
+            except _CommandError:
+                pass
+            if not self.time_scale:
+                break
+            self._sleep(int(match.group("milliseconds")) / 1000 * self.time_scale)
+        return ""
+
+    def _to_text(self, output: List[Any]) -> str:
+        if output and isinstance(output[0], dict):
+            return _format_list(output)
+        return "".join(f"{_format_value(value)}\n" for value in output)
+
+    def _pipe(self, records: Union[str, List[Any]], stage: str) -> Union[str, List[Any]]:
+        tokens = _split_outside_quotes(stage, "")
+        name = tokens[0].lower()
+        parameters, positional = _parse_arguments(tokens[1:])
+        if name in ("fl", "format-list"):
+            return _format_list(records)
+        if name in ("select", "select-object"):
+            if "expandproperty" in parameters:
+                return [_get_property(record, parameters["expandproperty"])[1] for record in records]
+            properties = [prop for item in positional for prop in _as_list(item) if prop]
+            properties = [prop.rstrip(",") for prop in " ".join(map(str, properties)).replace(",", " ").split()]
+            if "property" in parameters:
+                properties = _as_list(parameters["property"])
+            if properties == ["*"]:
+                return records
+            selected = []
+            for record in records:
+                selected.append(
+                    {(_get_property(record, prop)[0] or prop): _get_property(record, prop)[1] for prop in properties}
+                )
+            return selected
+        if name in ("sort-object", "sort"):
+            prop = parameters.get("property") or positional[0]
+            return sorted(records, key=lambda record: str(_get_property(record, prop)[1]).lower())
+        if name in ("where-object", "?"):
+            return self._where(records, stage)
+        if name in self._cmdlets:
+            return self._cmdlets[name](parameters, positional, records)
+        raise _CommandError(f"{tokens[0]} : The term '{tokens[0]}' is not recognized as the name of a cmdlet.")
+
+    @staticmethod
+    def _where(records: List[Record], stage: str) -> List[Record]:
+        match = re.search(
+            r"\$_\.(?P<property>\w+)\s+-(?P<operator>eq|ne|like|notlike)\s+(?P<value>'[^']*'|\"[^\"]*\"|\S+)",
+            stage,
+            re.IGNORECASE,
+        )
+        if not match:
+            raise _CommandError(f"Where-Object : Unsupported filter {stage}")
+        operator, expected = match.group("operator").lower(), str(_unquote(match.group("value"))).lower()
+        filtered = []
+        for record in records:
+            value = _format_value(_get_property(record, match.group("property"))[1]).lower()
+            result = fnmatch.fnmatchcase(value, expected) if operator.endswith("like") else value == expected
+            if result != operator.startswith("n"):
+                filtered.append(record)
+        return filtered
+
+    # VMs
+
+    def _find_vms(self, cmdlet: str, names: List[str]) -> List[Record]:
+        found = []
+        for name in names:
+            vms = [vm for vm_name, vm in self.vms.items() if _matches(vm_name, [name])]
+            if not vms and "*" not in str(name):
+                raise _CommandError(f'{cmdlet} : Hyper-V was unable to find a virtual machine with name "{name}".')
+            found.extend(vm for vm in vms if vm not in found)
+        return found
+
+    def _vm_names(self, parameters: Dict[str, Any], positional: List[Any], key: str = "vmname") -> List[str]:
+        names = _as_list(parameters.get(key)) or _as_list(parameters.get("name")) or positional[:1]
+        return [name for item in names for name in _as_list(item)]
+
+    def _new_vm(self, parameters: Dict[str, Any], positional: List[Any]) -> List[Record]:
+        name = parameters.get("name") or positional[0]
+        if name in self.vms:
+            raise _CommandError(f"New-VM : Failed to create a new virtual machine. VM '{name}' already exists.")
+        path = parameters.get("path", "C:\\ProgramData\\Microsoft\\Windows\\Hyper-V")
+        vm = {
+            "Name": name,
+            "Id": str(uuid.uuid4()),
+            "State": "Off",
+            "CpuUsage": 0,
+            "MemoryAssigned": 0,
+            "MemoryStartup": 1073741824,
+            "ProcessorCount": 1,
+            "Uptime": "00:00:00",
+            "Status": "Operating normally",
+            "Generation": int(parameters.get("generation", 1)),
+            "Path": path,
+            "Version": "11.0",
+            "SecureBoot": "On",
+            "HardDrives": [],
+            "IntegrationServices": [],
+            "_started": None,
+        }
+        self.vms[name] = vm
+        self.processors[name] = {
+            "VMName": name,
+            "Count": 1,
+            "CompatibilityForMigrationEnabled": False,
+            "CompatibilityForOlderOperatingSystemsEnabled": False,
+            "HwThreadCountPerCore": 0,
+            "ExposeVirtualizationExtensions": False,
+            "Maximum": 100,
+            "Reserve": 0,
+            "RelativeWeight": 100,
+        }
+        self._create_adapter(name, "Network Adapter", None)
+        self.directories.add(f"{path}\\{name}".lower())
+        return []
+
+    def _get_vm(self, parameters: Dict[str, Any], positional: List[Any]) -> List[Record]:
+        names = self._vm_names(parameters, positional) or ["*"]
+        return [self._vm_view(vm) for vm in self._find_vms("Get-VM", names)]
+
+    def _vm_view(self, vm: Record) -> Record:
+        view = dict(vm)
+        if vm["State"] == "Running" and vm["_started"] is not None:
+            uptime = int(self._clock() - vm["_started"])
+            view["Uptime"] = f"{uptime // 3600:02}:{uptime % 3600 // 60:02}:{uptime % 60:02}"
+            view["MemoryAssigned"] = vm["MemoryStartup"]
+        return view
+
+    def _start_vm(self, parameters: Dict[str, Any], positional: List[Any], records: List[Record] = None) -> list:
+        vms = records or self._find_vms("Start-VM", self._vm_names(parameters, positional, "name"))
+
+        def start() -> None:
+            for vm in vms:
+                vm = self.vms[vm["Name"]]
+                if vm["State"] != "Running":
+                    vm["State"], vm["_started"] = "Running", self._clock()
+
+        return self._run_action("Start-VM", parameters, start)
+
+    def _stop_vm(self, parameters: Dict[str, Any], positional: List[Any], records: List[Record] = None) -> list:
+        vms = records or self._find_vms("Stop-VM", self._vm_names(parameters, positional, "name"))
+
+        def stop() -> None:
+            for vm in vms:
+                vm = self.vms[vm["Name"]]
+                vm["State"], vm["_started"] = "Off", None
+
+        return self._run_action("Stop-VM", parameters, stop)
+
+    def _restart_vm(self, parameters: Dict[str, Any], positional: List[Any]) -> list:
+        vms = self._find_vms("Restart-VM", self._vm_names(parameters, positional, "name"))
+
+        def restart() -> None:
+            for vm in vms:
+                vm = self.vms[vm["Name"]]
+                if vm["State"] != "Running":
+                    raise _CommandError(f"Restart-VM : The operation cannot be performed while '{vm['Name']}' is Off.")
+                vm["_started"] = self._clock()
+
+        return self._run_action("Restart-VM", parameters, restart)
+
+    def _run_action(self, cmdlet: str, parameters: Dict[str, Any], action: Callable[[], None]) -> list:
+        """Run action of cmdlet immediately or, with -AsJob, in job completed after latency of cmdlet."""
+        if not parameters.get("asjob"):
+            action()
+            return []
+        self._job_counter += 1
+        job = {
+            "Id": self._job_counter,
+            "Name": f"Job{self._job_counter}",
+            "PSJobTypeName": "VMJob",
+            "State": "Running",
+            "HasMoreData": False,
+            "Command": cmdlet,
+            "_completes": self._clock() + self.latency.get(cmdlet.lower(), DEFAULT_COMMAND_LATENCY) * self.time_scale,
+            "_action": action,
+            "_error": None,
+        }
+        self.jobs[job["Id"]] = job
+        return [_visible(job)]
+
+    # performance counters
+
+    def _get_counter(self, command: str) -> str:
+        """Report samples of counters in format of counters.COUNTER_COMMAND, unknown counters are skipped."""
+        now = self._clock()
+        booting = sum(
+            1
+            for vm in self.vms.values()
+            if vm["State"] == "Running" and vm["_started"] is not None and now - vm["_started"] < self.dhcp_delay
+        )
+        values = {
+            r"\physicaldisk(_total)\current disk queue length": booting * _BOOT_DISK_QUEUE_LENGTH,
+            r"\processor(_total)\% processor time": min(100.0, _IDLE_CPU_PERCENT + booting * _BOOT_CPU_PERCENT),
+        }
+        paths = re.findall(r"'([^']+)'", command.partition(").CounterSamples")[0])
+        return "".join(
+            f"\\\\{_HOST_NAME.lower()}{path.lower()}={values[path.lower()]}\n"
+            for path in paths
+            if path.lower() in values
+        )
+
+    # jobs
+
+    def _complete_jobs(self) -> None:
+        now = self._clock()
+        for job in self.jobs.values():
+            if job["State"] != "Running" or job["_completes"] > now:
+                continue
+            try:
+                job["_action"]()
+                job["State"] = "Completed"
+            except _CommandError as e:
+                job["State"], job["_error"] = "Failed", str(e)
+
+    def _find_jobs(self, cmdlet: str, parameters: Dict[str, Any], positional: List[Any]) -> List[Record]:
+        ids = [job_id for item in _as_list(parameters.get("id")) or positional for job_id in _as_list(item)]
+        if not ids:
+            return list(self.jobs.values())
+        found = []
+        for job_id in ids:
+            if int(job_id) not in self.jobs:
+                raise _CommandError(f"{cmdlet} : The command cannot find a job with the job ID {job_id}.")
+            found.append(self.jobs[int(job_id)])
+        return found
+
+    def _get_job(self, parameters: Dict[str, Any], positional: List[Any]) -> List[Record]:
+        return [_visible(job) for job in self._find_jobs("Get-Job", parameters, positional)]
+
+    def _receive_job(self, parameters: Dict[str, Any], positional: List[Any]) -> list:
+        errors = [job["_error"] for job in self._find_jobs("Receive-Job", parameters, positional) if job["_error"]]
+        if errors:
+            raise _CommandError("\n".join(errors))
+        return []
+
+    def _remove_job(self, parameters: Dict[str, Any], positional: List[Any]) -> list:
+        for job in self._find_jobs("Remove-Job", parameters, positional):
+            if job["State"] == "Running" and not parameters.get("force"):
+                raise _CommandError(
+                    f"Remove-Job : The command cannot remove the job with the job ID {job['Id']} "
+                    "because the job is not finished."
+                )
+            del self.jobs[job["Id"]]
+        return []
+
+    def _remove_vm(self, parameters: Dict[str, Any], positional: List[Any]) -> list:
+        for vm in self._find_vms("Remove-VM", self._vm_names(parameters, positional, "name")):
+            for adapter in [adapter for adapter in self.vm_adapters if adapter["VMName"] == vm["Name"]]:
+                self._delete_adapter(adapter)
+            del self.vms[vm["Name"]]
+            del self.processors[vm["Name"]]
+        return []
+
+    def _set_vm_processor(self, parameters: Dict[str, Any], positional: List[Any]) -> list:
+        for vm in self._find_vms("Set-VMProcessor", self._vm_names(parameters, positional)):
+            processor = self.processors[vm["Name"]]
+            for name, value in parameters.items():
+                if name == "vmname":
+                    continue
+                key = _get_property(processor, name)[0]
+                if key is None:
+                    raise _CommandError(f"Set-VMProcessor : A parameter cannot be found that matches '{name}'.")
+                processor[key] = int(value) if str(value).isdigit() else value
+            vm["ProcessorCount"] = processor["Count"]
+        return []
+
+    def _get_vm_processor(self, parameters: Dict[str, Any], positional: List[Any]) -> List[Record]:
+        return [
+            dict(self.processors[vm["Name"]])
+            for vm in self._find_vms("Get-VMProcessor", self._vm_names(parameters, positional))
+        ]
+
+    def _set_vm_memory(self, parameters: Dict[str, Any], positional: List[Any]) -> list:
+        match = re.match(r"^(?P<value>\d+)(?P<unit>[KMG]B)?$", str(parameters.get("startupbytes", "")), re.IGNORECASE)
+        if not match:
+            raise _CommandError("Set-VMMemory : Cannot bind parameter 'StartupBytes'.")
+        multiplier = {None: 1, "KB": 1024, "MB": 1024**2, "GB": 1024**3}[(match.group("unit") or "").upper() or None]
+        for vm in self._find_vms("Set-VMMemory", self._vm_names(parameters, positional)):
+            vm["MemoryStartup"] = int(match.group("value")) * multiplier
+        return []
+
+    def _set_vm_firmware(self, parameters: Dict[str, Any], positional: List[Any]) -> list:
+        for vm in self._find_vms("Set-VMFirmware", self._vm_names(parameters, positional)):
+            if vm["Generation"] != 2:
+                raise _CommandError("Set-VMFirmware : Firmware is only available for generation 2 virtual machines.")
+            if "enablesecureboot" in parameters:
+                vm["SecureBoot"] = parameters["enablesecureboot"]
+        return []
+
+    def _enable_vm_integration_service(self, parameters: Dict[str, Any], positional: List[Any]) -> list:
+        for vm in self._find_vms("Enable-VMIntegrationService", _as_list(parameters.get("vmname"))):
+            if parameters.get("name") not in vm["IntegrationServices"]:
+                vm["IntegrationServices"].append(parameters.get("name"))
+        return []
+
+    # disks and files
+
+    def _new_vhd(self, parameters: Dict[str, Any], positional: List[Any]) -> list:
+        path = str(parameters.get("path") or positional[0])
+        parent = parameters.get("parentpath")
+        if parent is not None and not self.file_exists(str(parent)):
+            raise _CommandError(f"New-VHD : The system cannot find the file specified: '{parent}'.")
+        if self.file_exists(path):
+            raise _CommandError(f"New-VHD : The file exists: '{path}'.")
+        self.add_file(path)
+        return []
+
+    def _add_vm_hard_disk_drive(self, parameters: Dict[str, Any], positional: List[Any]) -> list:
+        for vm in self._find_vms("Add-VMHardDiskDrive", self._vm_names(parameters, positional)):
+            vm["HardDrives"].append(parameters.get("path"))
+        return []
+
+    def _get_item(self, parameters: Dict[str, Any], positional: List[Any]) -> List[Record]:
+        path = str(parameters.get("path") or positional[0])
+        if not self.file_exists(path):
+            raise _CommandError(f"Get-Item : Cannot find path '{path}' because it does not exist.")
+        return [
+            {"Name": PureWindowsPath(path).name, "FullName": path, "Length": len(self.files.get(path.lower(), ""))}
+        ]
+
+    def _remove_item(self, parameters: Dict[str, Any], positional: List[Any]) -> list:
+        path = str(parameters.get("path") or positional[0]).lower()
+        if path.endswith("\\*"):
+            prefix = path[:-1]
+            for file_path in [file_path for file_path in self.files if file_path.startswith(prefix)]:
+                del self.files[file_path]
+            return []
+        if not self.file_exists(path):
+            raise _CommandError(f"Remove-Item : Cannot find path '{path}' because it does not exist.")
+        self.files.pop(path, None)
+        self.directories.discard(path)
+        return []
+
+    def _mkdir(self, parameters: Dict[str, Any], positional: List[Any]) -> list:
+        self.directories.add(str(positional[0]).lower())
+        return []
+
+    def _get_windows_optional_feature(self, parameters: Dict[str, Any], positional: List[Any]) -> List[Record]:
+        return [
+            {
+                "FeatureName": parameters.get("featurename", "Microsoft-Hyper-V"),
+                "DisplayName": "Hyper-V",
+                "Description": "Hyper-V",
+                "RestartRequired": "Possible",
+                "State": "Enabled",
+            }
+        ]
+
+    # VM network adapters
+
+    def _next_mac(self) -> str:
+        self._mac_counter += 1
+        return f"{_MAC_ADDRESS_PREFIX + self._mac_counter:012X}"
+
+    def _create_adapter(
+        self, vm_name: Optional[str], name: str, switch_name: Optional[str], mac: str = None
+    ) -> Record:
+        switch = self.vswitches.get(switch_name) if switch_name else None
+        adapter = {
+            "Name": name,
+            "Id": f"Microsoft:{uuid.uuid4()}".upper(),
+            "IsLegacy": False,
+            "IsManagementOs": vm_name is None,
+            "ComputerName": _HOST_NAME,
+            "VMName": vm_name,
+            "VMId": self.vms[vm_name]["Id"] if vm_name else "",
+            "SwitchName": switch_name or "",
+            "SwitchId": switch["Id"] if switch else "",
+            "Connected": switch is not None,
+            "PoolName": "",
+            "MacAddress": (mac or self._next_mac()).replace(":", "").replace("-", "").upper(),
+            "DynamicMacAddressEnabled": mac is None,
+            "AllowPacketDirect": False,
+            "MacAddressSpoofing": "Off",
+            "VmqWeight": 100,
+            "VmqUsage": 0,
+            "IovWeight": 0,
+            "IovUsage": 0,
+            "IovQueuePairsRequested": 1,
+            "IovQueuePairsAssigned": 0,
+            "VrssEnabled": True,
+            "VmmqEnabled": False,
+            "VFDataPathActive": False,
+            "Status": ["Ok"],
+            "IPAddresses": [],
+            "_vlan": {"OperationMode": "Untagged", "AccessVlanId": 0, "NativeVlanId": 0, "AllowedVlanIdList": ""},
+            "_rdma_weight": 0,
+            "_port": None,
+            "_created": self._clock(),
+        }
+        self.vm_adapters.append(adapter)
+        if switch is not None:
+            self._create_port(adapter)
+        return adapter
+
+    def _delete_adapter(self, adapter: Record) -> None:
+        self._delete_port(adapter)
+        self.vm_adapters.remove(adapter)
+
+    def _create_port(self, adapter: Record) -> None:
+        port_name = str(uuid.uuid4()).upper()
+        self._port_counter += 1
+        self.ports[port_name] = {
+            "name": port_name,
+            "id": self._port_counter,
+            "adapter": adapter,
+            "enabled": False,
+            "blocked": True,
+            "layers": [],
+            "queue": None,
+        }
+        adapter["_port"] = port_name
+
+    def _delete_port(self, adapter: Record) -> None:
+        if adapter["_port"] is not None:
+            del self.ports[adapter["_port"]]
+            adapter["_port"] = None
+
+    def _find_adapters(self, cmdlet: str, parameters: Dict[str, Any], positional: List[Any]) -> List[Record]:
+        names = _as_list(parameters.get("name") or parameters.get("vmnetworkadaptername") or positional[:1]) or ["*"]
+        if parameters.get("managementos"):
+            candidates = [adapter for adapter in self.vm_adapters if adapter["IsManagementOs"]]
+        elif parameters.get("all"):
+            candidates = list(self.vm_adapters)
+        else:
+            vm_names = [vm["Name"] for vm in self._find_vms(cmdlet, _as_list(parameters.get("vmname")) or ["*"])]
+            candidates = [adapter for adapter in self.vm_adapters if adapter["VMName"] in vm_names]
+        adapters = [adapter for adapter in candidates if _matches(adapter["Name"], names)]
+        if not adapters and not any("*" in str(name) for name in names):
+            raise _CommandError(f"{cmdlet} : No network adapter is found with the given input.")
+        return adapters
+
+    def _adapter_view(self, adapter: Record) -> Record:
+        view = dict(adapter)
+        vm = self.vms.get(adapter["VMName"]) if adapter["VMName"] else None
+        switch = self.vswitches.get(adapter["SwitchName"])
+        running = vm is None or vm["State"] == "Running"
+        iov = bool(switch and switch["IovEnabled"] and int(adapter["IovWeight"]) > 0 and running)
+        view["IovUsage"] = 1 if iov else 0
+        view["IovQueuePairsAssigned"] = adapter["IovQueuePairsRequested"] if iov else 0
+        view["VFDataPathActive"] = iov
+        view["VmqUsage"] = 1 if int(adapter["VmqWeight"]) > 0 and switch and running else 0
+        if vm is not None and running:
+            view["IPAddresses"] = self._adapter_ips(adapter, vm)
+        return view
+
+    def _adapter_ips(self, adapter: Record, vm: Record) -> List[str]:
+        mac = adapter["MacAddress"].lower()
+        link_local = f"fe80::{mac[6:10]}:{mac[10:]}ff:fe00:{int(mac[6:], 16) % 0xFFFF:x}"
+        if not mac.startswith("525a00"):
+            return [link_local]
+        if self._clock() - vm["_started"] < self.dhcp_delay:
+            return [f"169.254.{int(mac[8:10], 16)}.{int(mac[10:], 16)}", link_local]
+        octets = [str(int(octet, 16)) for octet in re.findall("..", mac[6:])]
+        return [".".join([self.mng_network_prefix, *octets]), link_local]
+
+    def _add_vm_network_adapter(self, parameters: Dict[str, Any], positional: List[Any]) -> list:
+        switch_name = parameters.get("switchname")
+        if switch_name and switch_name not in self.vswitches:
+            raise _CommandError(f"Add-VMNetworkAdapter : Unable to find a virtual switch with name '{switch_name}'.")
+        mac = parameters.get("staticmacaddress")
+        name = parameters.get("name", "Network Adapter")
+        if parameters.get("managementos"):
+            self._create_adapter(None, name, switch_name, mac)
+            return []
+        for vm in self._find_vms("Add-VMNetworkAdapter", _as_list(parameters.get("vmname"))):
+            self._create_adapter(vm["Name"], name, switch_name, mac)
+        return []
+
+    def _get_vm_network_adapter(self, parameters: Dict[str, Any], positional: List[Any]) -> List[Record]:
+        return [
+            self._adapter_view(adapter)
+            for adapter in self._find_adapters("Get-VMNetworkAdapter", parameters, positional)
+        ]
+
+    def _set_vm_network_adapter(self, parameters: Dict[str, Any], positional: List[Any]) -> list:
+        for adapter in self._find_adapters("Set-VMNetworkAdapter", parameters, positional):
+            for name, value in parameters.items():
+                if name in ("name", "vmname", "managementos"):
+                    continue
+                key = _get_property(adapter, name)[0]
+                if key is None:
+                    raise _CommandError(f"Set-VMNetworkAdapter : A parameter cannot be found that matches '{name}'.")
+                adapter[key] = int(value) if str(value).isdigit() else value
+        return []
+
+    def _remove_vm_network_adapter(self, parameters: Dict[str, Any], positional: List[Any]) -> list:
+        for adapter in self._find_adapters("Remove-VMNetworkAdapter", parameters, positional):
+            self._delete_adapter(adapter)
+        return []
+
+    def _connect_vm_network_adapter(self, parameters: Dict[str, Any], positional: List[Any]) -> list:
+        switches = [name for name in self.vswitches if _matches(name, _as_list(parameters.get("switchname")))]
+        if not switches:
+            raise _CommandError(
+                "Connect-VMNetworkAdapter : Unable to find a virtual switch with name "
+                f"'{parameters.get('switchname')}'."
+            )
+        for adapter in self._find_adapters("Connect-VMNetworkAdapter", parameters, positional):
+            self._delete_port(adapter)
+            adapter.update(SwitchName=switches[0], SwitchId=self.vswitches[switches[0]]["Id"], Connected=True)
+            self._create_port(adapter)
+        return []
+
+    def _disconnect_vm_network_adapter(self, parameters: Dict[str, Any], positional: List[Any]) -> list:
+        for adapter in self._find_adapters("Disconnect-VMNetworkAdapter", parameters, positional):
+            self._delete_port(adapter)
+            adapter.update(SwitchName="", SwitchId="", Connected=False)
+        return []
+
+    def _get_vm_network_adapter_vlan(self, parameters: Dict[str, Any], positional: List[Any]) -> List[Record]:
+        return [
+            {"VMName": adapter["VMName"] or "", "AdapterName": adapter["Name"], **adapter["_vlan"]}
+            for adapter in self._find_adapters("Get-VMNetworkAdapterVlan", parameters, positional)
+        ]
+
+    def _set_vm_network_adapter_vlan(self, parameters: Dict[str, Any], positional: List[Any]) -> list:
+        for adapter in self._find_adapters("Set-VMNetworkAdapterVlan", parameters, positional):
+            if parameters.get("untagged"):
+                adapter["_vlan"].update(OperationMode="Untagged", AccessVlanId=0)
+            elif parameters.get("access"):
+                adapter["_vlan"].update(OperationMode="Access", AccessVlanId=int(parameters.get("vlanid", 0)))
+            elif parameters.get("trunk"):
+                adapter["_vlan"].update(
+                    OperationMode="Trunk",
+                    NativeVlanId=int(parameters.get("nativevlanid", 0)),
+                    AllowedVlanIdList=parameters.get("allowedvlanidlist", ""),
+                )
+        return []
+
+    def _get_vm_network_adapter_rdma(self, parameters: Dict[str, Any], positional: List[Any]) -> List[Record]:
+        return [
+            {"VMName": adapter["VMName"] or "", "Name": adapter["Name"], "RdmaWeight": adapter["_rdma_weight"]}
+            for adapter in self._find_adapters("Get-VMNetworkAdapterRdma", parameters, positional)
+        ]
+
+    def _set_vm_network_adapter_rdma(self, parameters: Dict[str, Any], positional: List[Any]) -> list:
+        for adapter in self._find_adapters("Set-VMNetworkAdapterRdma", parameters, positional):
+            adapter["_rdma_weight"] = int(parameters.get("rdmaweight", 0))
+        return []
+
+    # vSwitches
+
+    def _find_switches(self, cmdlet: str, names: List[str]) -> List[Record]:
+        switches = [switch for name, switch in self.vswitches.items() if _matches(name, names)]
+        if not switches and not any("*" in str(name) for name in names):
+            raise _CommandError(f'{cmdlet} : Hyper-V was unable to find a virtual switch with name "{names[0]}".')
+        return switches
+
+    def _new_vm_switch(self, parameters: Dict[str, Any], positional: List[Any]) -> list:
+        name = parameters.get("name") or positional[0]
+        if name in self.vswitches:
+            raise _CommandError(f"New-VMSwitch : Virtual switch with name '{name}' already exists.")
+        net_adapters = _as_list(parameters.get("netadaptername"))
+        bound = {adapter for switch in self.vswitches.values() for adapter in switch["_net_adapters"]}
+        for net_adapter in net_adapters:
+            if net_adapter in bound:
+                raise _CommandError(
+                    f"New-VMSwitch : Failed while adding virtual Ethernet switch connections. "
+                    f"'{net_adapter}' is already bound to another virtual switch."
+                )
+        teaming = bool(parameters.get("enableembeddedteaming", False))
+        if len(net_adapters) > 1 and not teaming:
+            raise _CommandError("New-VMSwitch : Multiple network adapters require embedded teaming.")
+        descriptions = [f"Intel(R) Ethernet Adapter ({net_adapter})" for net_adapter in net_adapters]
+        self.vswitches[name] = {
+            "Name": name,
+            "Id": str(uuid.uuid4()),
+            "Notes": "",
+            "SwitchType": "External" if net_adapters else "Internal",
+            "AllowManagementOS": bool(parameters.get("allowmanagementos", False)),
+            "NetAdapterInterfaceDescription": "Teamed-Interface" if teaming else (descriptions or [""])[0],
+            "NetAdapterInterfaceDescriptions": descriptions,
+            "IovEnabled": bool(parameters.get("enableiov", False)),
+            "IovSupport": True,
+            "EmbeddedTeamingEnabled": teaming,
+            "BandwidthReservationMode": "Absolute",
+            "DefaultFlowMinimumBandwidthAbsolute": 0,
+            "PacketDirectEnabled": False,
+            "_net_adapters": net_adapters,
+        }
+        self.queues[name] = {}
+        self.qos_configs[name] = {"hw_caps": False, "hw_reserv": False, "sw_reserv": True, "flags": "0x0"}
+        if self.vswitches[name]["AllowManagementOS"]:
+            self._create_adapter(None, name, name)
+        return []
+
+    def _get_vm_switch(self, parameters: Dict[str, Any], positional: List[Any]) -> List[Record]:
+        names = _as_list(parameters.get("name")) or positional[:1] or ["*"]
+        return [dict(switch) for switch in self._find_switches("Get-VMSwitch", names)]
+
+    def _set_vm_switch(self, parameters: Dict[str, Any], positional: List[Any]) -> list:
+        for switch in self._find_switches("Set-VMSwitch", _as_list(parameters.get("name")) or positional[:1]):
+            for name, value in parameters.items():
+                if name == "name":
+                    continue
+                key = _get_property(switch, name)[0]
+                if key is None:
+                    raise _CommandError(f"Set-VMSwitch : A parameter cannot be found that matches '{name}'.")
+                switch[key] = int(value) if str(value).isdigit() else value
+        return []
+
+    def _rename_vm_switch(self, parameters: Dict[str, Any], positional: List[Any]) -> list:
+        switch = self._find_switches("Rename-VMSwitch", _as_list(parameters.get("name")) or positional[:1])[0]
+        new_name = parameters["newname"]
+        old_name = switch["Name"]
+        switch["Name"] = new_name
+        self.vswitches = {new_name if name == old_name else name: value for name, value in self.vswitches.items()}
+        self.queues[new_name] = self.queues.pop(old_name)
+        self.qos_configs[new_name] = self.qos_configs.pop(old_name)
+        for adapter in self.vm_adapters:
+            if adapter["SwitchName"] == old_name:
+                adapter["SwitchName"] = new_name
+        return []
+
+    def _remove_vm_switch(
+        self, parameters: Dict[str, Any], positional: List[Any], records: List[Record] = None
+    ) -> list:
+        if records is None:
+            records = self._find_switches("Remove-VMSwitch", _as_list(parameters.get("name")) or positional[:1])
+        for switch in records:
+            name = switch["Name"]
+            for adapter in [adapter for adapter in self.vm_adapters if adapter["SwitchName"] == name]:
+                if adapter["IsManagementOs"]:
+                    self._delete_adapter(adapter)
+                else:
+                    self._delete_port(adapter)
+                    adapter.update(SwitchName="", SwitchId="", Connected=False)
+            del self.vswitches[name]
+            del self.queues[name]
+            del self.qos_configs[name]
+        return []
+
+    def _get_net_adapter(self, parameters: Dict[str, Any], positional: List[Any]) -> List[Record]:
+        names = _as_list(parameters.get("name")) or positional[:1] or ["*"]
+        adapters = [
+            {
+                "Name": f"vEthernet ({adapter['Name']})",
+                "InterfaceDescription": f"Hyper-V Virtual Ethernet Adapter #{index}",
+                "Status": "Up",
+                "MacAddress": "-".join(re.findall("..", adapter["MacAddress"])),
+                "LinkSpeed": "10 Gbps",
+            }
+            for index, adapter in enumerate(self.vm_adapters, start=1)
+            if adapter["IsManagementOs"] and self._clock() - adapter["_created"] >= self.host_adapter_delay
+        ]
+        found = [adapter for adapter in adapters if _matches(adapter["Name"], names)]
+        if not found and not any("*" in str(name) for name in names):
+            raise _CommandError(
+                f"Get-NetAdapter : No MSFT_NetAdapter objects found with property 'Name' equal to '{names[0]}'."
+            )
+        return found
+
+    # vfpctrl
+
+    def _vfpctrl(self, tokens: List[str]) -> str:
+        options: Dict[str, Optional[str]] = {}
+        index = 0
+        while index < len(tokens):
+            option = tokens[index].lower()
+            value = None
+            if index + 1 < len(tokens) and not tokens[index + 1].startswith("/"):
+                value = _unquote(tokens[index + 1])
+                index += 1
+            options[option] = value
+            index += 1
+        operation = next((option for option in options if option not in ("/switch", "/port", "/queue")), None)
+        if operation == "/list-vmswitch-port":
+            return self._list_vmswitch_port()
+        switch = self._vfp_switch(options.get("/switch"), operation)
+        if "/port" in options:
+            return self._vfp_port(switch, options["/port"], operation, options[operation])
+        handlers = {
+            "/add-queue": self._add_queue,
+            "/set-queue-config": self._set_queue_config,
+            "/remove-queue": self._remove_queue,
+            "/list-queue": self._list_queue,
+            "/get-queue-info": self._get_queue_info,
+            "/get-qos-config": self._get_qos_config,
+            "/set-qos-config": self._set_qos_config,
+        }
+        if operation not in handlers:
+            raise _CommandError(f"ERROR: unknown command {operation}")
+        return handlers[operation](switch, options[operation], options.get("/queue"))
+
+    def _vfp_switch(self, name: Optional[str], operation: str) -> str:
+        for switch_name, switch in self.vswitches.items():
+            if name is not None and name.lower() in (switch_name.lower(), switch["Id"].lower()):
+                return switch_name
+        raise _CommandError(f"ERROR: failed to execute {operation.lstrip('/')}: switch {name} not found")
+
+    def _vfp_queue(self, switch: str, sq_id: Optional[str], operation: str) -> Record:
+        if sq_id not in self.queues[switch]:
+            raise _CommandError(f"ERROR: failed to execute {operation}: queue {sq_id} not found")
+        return self.queues[switch][sq_id]
+
+    @staticmethod
+    def _succeeded(operation: str, output: str = "") -> str:
+        return f"{output}Command {operation} succeeded!\n"
+
+    def _add_queue(self, switch: str, value: str, sq_id: Optional[str]) -> str:
+        sq_id, name, limit, tx_max, tx_reserve, rx_max = str(value).split()
+        if sq_id in self.queues[switch]:
+            raise _CommandError(f"ERROR: failed to execute add-queue: queue {sq_id} already exists")
+        self.queues[switch][sq_id] = {
+            "id": sq_id,
+            "name": name,
+            "limit": limit.lower() == "true",
+            "tx_max": tx_max,
+            "tx_reserve": tx_reserve,
+            "rx_max": rx_max,
+        }
+        return self._succeeded("add-queue")
+
+    def _set_queue_config(self, switch: str, value: str, sq_id: Optional[str]) -> str:
+        queue = self._vfp_queue(switch, sq_id, "set-queue-config")
+        limit, tx_max, tx_reserve, rx_max = str(value).split()
+        queue.update(limit=limit.lower() == "true", tx_max=tx_max, tx_reserve=tx_reserve, rx_max=rx_max)
+        return self._succeeded("set-queue-config")
+
+    def _remove_queue(self, switch: str, value: str, sq_id: Optional[str]) -> str:
+        self._vfp_queue(switch, sq_id, "remove-queue")
+        if any(port["queue"] == sq_id for port in self._switch_ports(switch)):
+            raise _CommandError(f"ERROR: failed to execute remove-queue: queue {sq_id} is in use")
+        del self.queues[switch][sq_id]
+        return self._succeeded("remove-queue")
+
+    @staticmethod
+    def _format_queue(queue: Record) -> str:
+        return (
+            f"  QOS QUEUE: {queue['id']}\n"
+            f"      Friendly name : {queue['name']}\n"
+            f"      Enforce intra-host limit: {str(queue['limit']).upper()}\n"
+            f"      Transmit Limit: {queue['tx_max']}\n"
+            f"      Transmit Reservation: {queue['tx_reserve']}\n"
+            f"      Receive Limit: {queue['rx_max']}\n"
+            "      Transmit Queue Depth: 200 packets\n"
+            "      Receive Queue Depth: 50 packets\n"
+            "      Transmit Burst Size: 50 ms\n"
+            "      Receive Burst Size: 50 ms\n"
+            "      Reservation UnderUtilized watermark: 85%\n"
+            "      Reservation OverUtilized watermark: 95%\n"
+            "      Reservation Headroom: 10%\n"
+            "      Reservation Rampup time: 500 ms\n"
+            "      Reservation Min rate: 10 Mbps\n\n"
+            "      Current Transmit Info:\n"
+            f"        Rate: {queue['tx_max']}\n"
+            "        Throttled Packets: 0\n"
+            "        Dropped Packets: 0\n"
+            "      Current Receive Info:\n"
+            f"        Rate: {queue['rx_max'] if queue['rx_max'] != '0' else 'DISABLED'}\n"
+            "        Throttled Packets: 0\n"
+            "        Dropped Packets: 0\n\n"
+        )
+
+    def _list_queue(self, switch: str, value: str, sq_id: Optional[str]) -> str:
+        queues = "\n".join(self._format_queue(queue) for queue in self.queues[switch].values())
+        return self._succeeded("list-queue", f"\n ITEM LIST\n===========\n\n\n{queues}")
+
+    def _get_queue_info(self, switch: str, value: str, sq_id: Optional[str]) -> str:
+        queues = [self._vfp_queue(switch, sq_id, "get-queue-info")] if sq_id else self.queues[switch].values()
+        return self._succeeded(
+            "get-queue-info", "\n ITEM LIST\n===========\n\n\n" + "\n".join(self._format_queue(q) for q in queues)
+        )
+
+    def _get_qos_config(self, switch: str, value: str, sq_id: Optional[str]) -> str:
+        config = self.qos_configs[switch]
+        return self._succeeded(
+            "get-qos-config",
+            "\n ITEM LIST\n===========\n\n  SWITCH QOS CONFIG\n"
+            f"    Enable Hardware Caps: {str(config['hw_caps']).upper()}\n"
+            f"    Enable Hardware Reservations: {str(config['hw_reserv']).upper()}\n"
+            f"    Enable Software Reservations: {str(config['sw_reserv']).upper()}\n"
+            f"    Flags: {config['flags']}\n",
+        )
+
+    def _set_qos_config(self, switch: str, value: str, sq_id: Optional[str]) -> str:
+        hw_caps, hw_reserv, sw_reserv, flags = str(value).split()
+        self.qos_configs[switch] = {
+            "hw_caps": hw_caps.lower() == "true",
+            "hw_reserv": hw_reserv.lower() == "true",
+            "sw_reserv": sw_reserv.lower() == "true",
+            "flags": flags,
+        }
+        return self._succeeded("set-qos-config")
+
+    def _switch_ports(self, switch: str) -> List[Record]:
+        return [port for port in self.ports.values() if port["adapter"]["SwitchName"] == switch]
+
+    def _vfp_port(self, switch: str, port_name: str, operation: str, value: Optional[str]) -> str:
+        port = self.ports.get(str(port_name).upper())
+        if port is None or port["adapter"]["SwitchName"] != switch:
+            raise _CommandError(f"ERROR: failed to execute {operation.lstrip('/')}: port {port_name} not found")
+        if operation == "/enable-port":
+            port["enabled"] = True
+        elif operation == "/unblock-port":
+            port["blocked"] = False
+        elif operation == "/add-layer":
+            port["layers"].append(str(value).split()[:2])
+        elif operation == "/set-port-queue":
+            self._vfp_queue(switch, value, "set-port-queue")
+            port["queue"] = value
+        elif operation == "/clear-port-queue":
+            port["queue"] = None
+        elif operation == "/get-port-queue":
+            queue = self.queues[switch].get(port["queue"]) if port["queue"] else None
+            return self._succeeded(
+                "get-port-queue", "\n ITEM LIST\n===========\n\n" + (self._format_queue(queue) if queue else "")
+            )
+        else:
+            raise _CommandError(f"ERROR: unknown command {operation}")
+        return self._succeeded(operation.lstrip("/"))
+
+    def _list_vmswitch_port(self) -> str:
+        blocks = []
+        for port in self.ports.values():
+            adapter = port["adapter"]
+            switch = self.vswitches[adapter["SwitchName"]]
+            mac = "-".join(re.findall("..", adapter["MacAddress"]))
+            blocks.append(
+                f"Port name             : {port['name']}\n"
+                "Port Friendly name    : Dynamic Ethernet Switch Port\n"
+                f"Switch name           : {switch['Id'].upper()}\n"
+                f"Switch Friendly name  : {switch['Name']}\n"
+                f"PortId                : {port['id']}\n"
+                f"VMQ Weight            : {adapter['VmqWeight']}\n"
+                f"SR-IOV Weight         : {adapter['IovWeight']}\n"
+                f"Port type:            : {'Internal' if adapter['IsManagementOs'] else 'Synthetic'}\n"
+                f" Port is {'Enabled' if port['enabled'] else 'Initialized'}.\n"
+                f"NIC name           : {adapter['Id'].split(':', 1)[-1]}--{adapter['Name']}\n"
+                f"NIC Friendly name  : {adapter['Name']}\n"
+                "MTU                : 1500\n"
+                f"MAC address        : {mac}\n"
+                f"VM name            : {adapter['VMName'] or _HOST_NAME}\n"
+            )
+        return self._succeeded("list-vmswitch-port", "\n ITEM LIST\n===========\n\n" + "\n".join(blocks))
+
+
+class EmulatedProcess:
+    """Process started on emulated host, it is finished right after start."""
+
+    def __init__(self, stdout: str, stderr: str, return_code: int):
+        """Class constructor.
+
+        :param stdout: output of process
+        :param stderr: error output of process
+        :param return_code: return code of process
+        """
+        self.running = False
+        self.stdout_text = stdout
+        self.stderr_text = stderr
+        self.return_code = return_code
+
+    def wait(self, timeout: Optional[int] = None) -> int:
+        """Return return code of finished process."""
+        return self.return_code
+
+    def kill(self, *args, **kwargs) -> None:
+        """Do nothing, process is finished."""
+
+    def get_stdout_iter(self) -> Any:
+        """Iterate over output lines."""
+        return iter(self.stdout_text.splitlines())
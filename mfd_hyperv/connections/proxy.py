@@ -0,0 +1,95 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: MIT
+"""ConnectionProxy class."""
+
+from typing import Any, TYPE_CHECKING
+
+from mfd_connect import Connection
+
+if TYPE_CHECKING:
+    from mfd_connect.base import ConnectionCompletedProcess
+    from mfd_connect.process import RemoteProcess
+    from mfd_typing.cpu_values import CPUArchitecture
+    from mfd_typing.os_values import OSName, OSType, OSBitness, SystemInfo
+
+
+class ConnectionProxy(Connection):
+    """Connection that delegates all operations to wrapped connection.
+
+    Base class for connections that add behaviour around commands executed on host,
+    it is still instance of Connection so it can be passed to Hyper-V managers.
+    """
+
+    def __init__(self, connection: "Connection"):
+        """Class constructor.
+
+        Connection constructor is not called on purpose, attributes not set on proxy are read from wrapped connection.
+
+        :param connection: connection instance of MFD connect class.
+        """
+        self._wrapped_connection = connection
+
+    def __getattr__(self, name: str) -> Any:
+        if name == "_wrapped_connection":
+            raise AttributeError(name)
+        return getattr(self._wrapped_connection, name)
+
+    def __str__(self) -> str:
+        return str(self._wrapped_connection)
+
+    @property
+    def wrapped_connection(self) -> "Connection":
+        """Connection wrapped by the proxy."""
+        return self._wrapped_connection
+
+    def execute_command(self, command: str, **kwargs) -> "ConnectionCompletedProcess":
+        """Execute command using wrapped connection."""
+        return self._wrapped_connection.execute_command(command, **kwargs)
+
+    def execute_powershell(self, command: str, **kwargs) -> "ConnectionCompletedProcess":
+        """Execute powershell command using wrapped connection."""
+        return self._wrapped_connection.execute_powershell(command, **kwargs)
+
+    def start_process(self, command: str, **kwargs) -> "RemoteProcess":
+        """Start process using wrapped connection."""
+        return self._wrapped_connection.start_process(command, **kwargs)
+
+    def path(self, *args, **kwargs) -> Any:
+        """Create path object using wrapped connection."""
+        return self._wrapped_connection.path(*args, **kwargs)
+
+    def get_os_name(self) -> "OSName":
+        """Get OS name using wrapped connection."""
+        return self._wrapped_connection.get_os_name()
+
+    def get_os_type(self) -> "OSType":
+        """Get OS type using wrapped connection."""
+        return self._wrapped_connection.get_os_type()
+
+    def get_os_bitness(self) -> "OSBitness":
+        """Get OS bitness using wrapped connection."""
+        return self._wrapped_connection.get_os_bitness()
+
+    def get_cpu_architecture(self) -> "CPUArchitecture":
+        """Get CPU architecture using wrapped connection."""
+        return self._wrapped_connection.get_cpu_architecture()
+
+    def get_system_info(self) -> "SystemInfo":
+        """Get system information using wrapped connection."""
+        return self._wrapped_connection.get_system_info()
+
+    def restart_platform(self) -> None:
+        """Restart platform using wrapped connection."""
+        self._wrapped_connection.restart_platform()
+
+    def shutdown_platform(self) -> None:
+        """Shutdown platform using wrapped connection."""
+        self._wrapped_connection.shutdown_platform()
+
+    def wait_for_host(self, *args, **kwargs) -> None:
+        """Wait for host using wrapped connection."""
+        self._wrapped_connection.wait_for_host(*args, **kwargs)
+
+    def disconnect(self, *args, **kwargs) -> None:
+        """Disconnect wrapped connection."""
+        self._wrapped_connection.disconnect(*args, **kwargs)
@@ -0,0 +1,448 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: MIT
+"""Recording of host sessions and their replay without host.
+
+Contents:
+-RecordingConnection
+    connection storing every executed command with its output, return code and duration
+
+-ReplayConnection
+    connection answering commands with outputs stored by RecordingConnection
+
+-ReplayWindowsPath, ReplayPosixPath
+    paths of replayed host, access to its file system is not supported in replay
+"""
+
+import json
+import re
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+from pathlib import Path, PurePosixPath, PureWindowsPath
+from subprocess import CalledProcessError
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple, Union, TYPE_CHECKING
+
+from mfd_connect import Connection
+from mfd_connect.base import ConnectionCompletedProcess
+from mfd_connect.exceptions import ConnectionCalledProcessError
+from mfd_typing import OSBitness, OSName, OSType
+from mfd_typing.cpu_values import CPUArchitecture
+
+from mfd_hyperv.connections.batch import decode_script
+from mfd_hyperv.connections.proxy import ConnectionProxy
+from mfd_hyperv.exceptions import HyperVReplayException
+
+if TYPE_CHECKING:
+    from mfd_connect.process import RemoteProcess
+
+RECORDING_FORMAT_VERSION = 1
+_GUID_PATTERN = re.compile(r"\b[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\b")
+_POWERSHELL_PREFIX_PATTERN = re.compile(r"^powershell(\.exe)?\s+(?P<command>.*)$", re.DOTALL)
+
+
+@dataclass
+class RecordedCommand:
+    """Command executed on host with its result.
+
+    method: connection method used to execute command, e.g. execute_powershell
+    command: executed command
+    stdout: standard output of command
+    stderr: standard error of command
+    return_code: return code of command, None if started process didn't finish before recording was saved
+    start: start time of command in seconds, relative to start of recording
+    duration: duration of command in seconds
+    """
+
+    method: str
+    command: str
+    stdout: str = ""
+    stderr: str = ""
+    return_code: Optional[int] = 0
+    start: float = 0.0
+    duration: float = 0.0
+
+
+def normalize_command(command: str) -> str:
+    """Normalize command, so it is matched regardless of formatting differences.
+
+    Case, quotation marks, whitespaces, powershell.exe prefix and GUIDs are not taken into account, commands of batch
+    script (see build_script) are normalized one by one.
+
+    :param command: command to normalize
+    :return: normalized command
+    """
+    commands = decode_script(command)
+    if commands is not None:
+        return "; ".join(normalize_command(inner_command) for inner_command in commands)
+    normalized = " ".join(command.lower().replace('"', "'").split())
+    match = _POWERSHELL_PREFIX_PATTERN.match(normalized)
+    if match:
+        normalized = match.group("command")
+        if len(normalized) > 1 and normalized[0] == normalized[-1] == "'":
+            normalized = normalized[1:-1]
+    return _GUID_PATTERN.sub("<guid>", normalized)
+
+
+def save_recording(file_path: Union[str, Path], records: List[RecordedCommand], os_name: Optional[OSName]) -> None:
+    """Save recorded commands to JSON file.
+
+    :param file_path: path of created file
+    :param records: recorded commands
+    :param os_name: OS name of recorded host
+    """
+    content = {
+        "version": RECORDING_FORMAT_VERSION,
+        "os_name": os_name.name if os_name is not None else None,
+        "records": [asdict(record) for record in records],
+    }
+    Path(file_path).write_text(json.dumps(content, indent=2))
+
+
+def load_recording(file_path: Union[str, Path]) -> Tuple[List[RecordedCommand], Optional[OSName]]:
+    """Load recorded commands from JSON file.
+
+    :param file_path: path of file created by save_recording
+    :raises HyperVReplayException: when file has unsupported format version
+    :return: recorded commands and OS name of recorded host
+    """
+    content = json.loads(Path(file_path).read_text())
+    if content.get("version") != RECORDING_FORMAT_VERSION:
+        raise HyperVReplayException(f"Unsupported recording format version: {content.get('version')}")
+    os_name = OSName[content["os_name"]] if content.get("os_name") else None
+    return [RecordedCommand(**record) for record in content["records"]], os_name
+
+
+class RecordingConnection(ConnectionProxy):
+    """Connection recording every command executed with wrapped connection.
+
+    Stdout, return code and duration of execute_command, execute_powershell and start_process calls are stored,
+    commands failed with unexpected return code are recorded as well.
+    """
+
+    def __init__(self, connection: "Connection"):
+        """Class constructor.
+
+        :param connection: connection instance of MFD connect class.
+        """
+        super().__init__(connection)
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+        self._records: List[RecordedCommand] = []
+        self._processes: List[Tuple[RecordedCommand, "RemoteProcess"]] = []
+
+    @property
+    def records(self) -> List[RecordedCommand]:
+        """Recorded commands in order of execution."""
+        with self._lock:
+            return list(self._records)
+
+    def _add_record(self, record: RecordedCommand) -> None:
+        with self._lock:
+            self._records.append(record)
+
+    def _execute(self, method: str, command: str, **kwargs) -> "ConnectionCompletedProcess":
+        start = time.perf_counter()
+        try:
+            result = getattr(self._wrapped_connection, method)(command, **kwargs)
+        except CalledProcessError as e:
+            self._add_record(
+                RecordedCommand(
+                    method=method,
+                    command=command,
+                    stdout=e.output or "",
+                    stderr=e.stderr or "",
+                    return_code=e.returncode,
+                    start=start - self._origin,
+                    duration=time.perf_counter() - start,
+                )
+            )
+            raise
+        self._add_record(
+            RecordedCommand(
+                method=method,
+                command=command,
+                stdout=result.stdout or "",
+                stderr=result.stderr or "",
+                return_code=result.return_code,
+                start=start - self._origin,
+                duration=time.perf_counter() - start,
+            )
+        )
+        return result
+
+    def execute_command(self, command: str, **kwargs) -> "ConnectionCompletedProcess":
+        """Execute command using wrapped connection and record its result."""
+        return self._execute("execute_command", command, **kwargs)
+
+    def execute_powershell(self, command: str, **kwargs) -> "ConnectionCompletedProcess":
+        """Execute powershell command using wrapped connection and record its result."""
+        return self._execute("execute_powershell", command, **kwargs)
+
+    def start_process(self, command: str, **kwargs) -> "RemoteProcess":
+        """Start process using wrapped connection and record it.
+
+        Output and return code of process are recorded when recording is saved, if process is finished by then.
+        """
+        start = time.perf_counter()
+        process = self._wrapped_connection.start_process(command, **kwargs)
+        record = RecordedCommand(
+            method="start_process",
+            command=command,
+            return_code=None,
+            start=start - self._origin,
+            duration=time.perf_counter() - start,
+        )
+        self._add_record(record)
+        with self._lock:
+            self._processes.append((record, process))
+        return process
+
+    def _collect_finished_processes(self) -> None:
+        with self._lock:
+            processes, self._processes = self._processes, []
+        for record, process in processes:
+            try:
+                if process.running:
+                    with self._lock:
+                        self._processes.append((record, process))
+                    continue
+                record.return_code = process.return_code
+                record.stdout = process.stdout_text or ""
+            except Exception:  # output of process may be already consumed or connection closed
+                continue
+
+    def save(self, file_path: Union[str, Path]) -> None:
+        """Save recorded session to JSON file.
+
+        :param file_path: path of created file
+        """
+        self._collect_finished_processes()
+        try:
+            os_name = self._wrapped_connection.get_os_name()
+        except Exception:
+            os_name = None
+        save_recording(file_path, self.records, os_name if isinstance(os_name, OSName) else None)
+
+
+class ReplayProcess:
+    """Process returned by ReplayConnection, finished with recorded output."""
+
+    def __init__(self, record: RecordedCommand):
+        """Class constructor.
+
+        :param record: recorded start of process
+        """
+        self.running = False
+        self.return_code = record.return_code if record.return_code is not None else 0
+        self.stdout_text = record.stdout
+        self.stderr_text = record.stderr
+
+    def wait(self, timeout: Optional[int] = None) -> int:
+        """Return recorded return code."""
+        return self.return_code
+
+    def kill(self, *args, **kwargs) -> None:
+        """Do nothing, process is finished."""
+
+    def get_stdout_iter(self) -> Any:
+        """Iterate over recorded output lines."""
+        return iter(self.stdout_text.splitlines())
+
+
+class _ReplayPath:
+    """Path of replayed host, file system of host isn't recorded so only pure path operations are supported."""
+
+    def _not_supported(self, *args, **kwargs) -> None:
+        raise HyperVReplayException(
+            f"Access to file system of host is not supported in replay, file system of host isn't recorded: {self}"
+        )
+
+    exists = is_file = is_dir = stat = iterdir = glob = _not_supported
+    read_text = read_bytes = write_text = write_bytes = touch = mkdir = unlink = rmdir = _not_supported
+
+
+class ReplayWindowsPath(_ReplayPath, PureWindowsPath):
+    """Windows path of replayed host."""
+
+
+class ReplayPosixPath(_ReplayPath, PurePosixPath):
+    """Posix path of replayed host."""
+
+
+class ReplayConnection(Connection):
+    """Connection answering commands with outputs of recorded session.
+
+    Command is matched with first not replayed record of same method and same normalized command
+    (see normalize_command). When command is executed more times than recorded (e.g. by polling loop),
+    last matching record is replayed again.
+    """
+
+    def __init__(
+        self,
+        recording: Union[str, Path, List[RecordedCommand]],
+        time_scale: float = 1.0,
+        os_name: OSName = OSName.WINDOWS,
+        strict: bool = False,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        """Class constructor.
+
+        :param recording: path of file saved by RecordingConnection or list of recorded commands
+        :param time_scale: multiplier of recorded command durations, 1.0 reproduces original timings, 0 replays
+                           without waiting
+        :param os_name: OS name of host, used when recording doesn't contain it
+        :param strict: whether commands have to match recorded ones exactly, without normalization
+        :param sleep: function used to wait for duration of replayed command
+        """
+        super().__init__()
+        if isinstance(recording, (str, Path)):
+            records, recorded_os_name = load_recording(recording)
+            os_name = recorded_os_name or os_name
+        else:
+            records = list(recording)
+        self._ip = "replay"
+        self._os_name = os_name
+        self.time_scale = time_scale
+        self.strict = strict
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._records = records
+        self._pending: Dict[Tuple[str, str], Deque[RecordedCommand]] = {}
+        self._last: Dict[Tuple[str, str], RecordedCommand] = {}
+        for record in records:
+            self._pending.setdefault(self._key(record.method, record.command), deque()).append(record)
+        self.replayed: List[RecordedCommand] = []
+
+    def __str__(self) -> str:
+        return "ReplayConnection"
+
+    def _key(self, method: str, command: str) -> Tuple[str, str]:
+        method = "execute" if method in ("execute_command", "execute_powershell") else method
+        return method, command if self.strict else normalize_command(command)
+
+    @property
+    def round_trips(self) -> int:
+        """Number of replayed commands."""
+        return len(self.replayed)
+
+    @property
+    def unused_records(self) -> List[RecordedCommand]:
+        """Recorded commands which were not replayed, in order of recording."""
+        with self._lock:
+            pending = {id(record) for queue in self._pending.values() for record in queue}
+        return [record for record in self._records if id(record) in pending]
+
+    def _replay(self, method: str, command: str) -> RecordedCommand:
+        key = self._key(method, command)
+        with self._lock:
+            queue = self._pending.get(key)
+            if queue:
+                record = queue.popleft()
+                self._last[key] = record
+            elif key in self._last:
+                record = self._last[key]
+            else:
+                raise HyperVReplayException(f"No recorded output for {method} of command: {command}")
+            self.replayed.append(record)
+        if self.time_scale:
+            self._sleep(record.duration * self.time_scale)
+        return record
+
+    def execute_command(
+        self,
+        command: str,
+        *,
+        expected_return_codes: Optional[frozenset] = frozenset({0}),
+        custom_exception: Optional[type] = None,
+        **kwargs,
+    ) -> ConnectionCompletedProcess:
+        """Replay command.
+
+        :param command: command to replay
+        :param expected_return_codes: return codes considered as success, any return code is accepted when empty
+        :param custom_exception: exception raised instead of ConnectionCalledProcessError on unexpected return code
+        :raises HyperVReplayException: when command was not recorded
+        :return: recorded result of command
+        """
+        return self._complete(
+            self._replay("execute_command", command), command, expected_return_codes, custom_exception
+        )
+
+    def execute_powershell(
+        self,
+        command: str,
+        *,
+        expected_return_codes: Optional[frozenset] = frozenset({0}),
+        custom_exception: Optional[type] = None,
+        **kwargs,
+    ) -> ConnectionCompletedProcess:
+        """Replay powershell command.
+
+        :param command: command to replay
+        :param expected_return_codes: return codes considered as success, any return code is accepted when empty
+        :param custom_exception: exception raised instead of ConnectionCalledProcessError on unexpected return code
+        :raises HyperVReplayException: when command was not recorded
+        :return: recorded result of command
+        """
+        record = self._replay("execute_powershell", command)
+        return self._complete(record, command, expected_return_codes, custom_exception)
+
+    @staticmethod
+    def _complete(
+        record: RecordedCommand,
+        command: str,
+        expected_return_codes: Optional[frozenset],
+        custom_exception: Optional[type],
+    ) -> ConnectionCompletedProcess:
+        if expected_return_codes and record.return_code not in expected_return_codes:
+            exception = custom_exception if custom_exception else ConnectionCalledProcessError
+            raise exception(returncode=record.return_code, cmd=command, output=record.stdout, stderr=record.stderr)
+        return ConnectionCompletedProcess(
+            args=command, stdout=record.stdout, stderr=record.stderr, return_code=record.return_code
+        )
+
+    def start_process(self, command: str, **kwargs) -> ReplayProcess:
+        """Replay start of process.
+
+        :param command: command of process
+        :raises HyperVReplayException: when command was not recorded
+        :return: finished process with recorded output
+        """
+        return ReplayProcess(self._replay("start_process", command))
+
+    def path(self, *args, **kwargs) -> Union[ReplayWindowsPath, ReplayPosixPath]:
+        """Create path of replayed host.
+
+        File system of host isn't recorded, so methods accessing it (e.g. `exists`, `read_text`) raise
+        HyperVReplayException.
+        """
+        return ReplayWindowsPath(*args) if self._os_name == OSName.WINDOWS else ReplayPosixPath(*args)
+
+    def get_os_name(self) -> OSName:
+        """Get OS name of recorded host."""
+        return self._os_name
+
+    def get_os_type(self) -> OSType:
+        """Get OS type of recorded host."""
+        return OSType.WINDOWS if self._os_name == OSName.WINDOWS else OSType.POSIX
+
+    def get_os_bitness(self) -> OSBitness:
+        """Get OS bitness of recorded host."""
+        return OSBitness.OS_64BIT
+
+    def get_cpu_architecture(self) -> CPUArchitecture:
+        """Get CPU architecture of recorded host."""
+        return CPUArchitecture.X86_64
+
+    def restart_platform(self) -> None:
+        """Do nothing, platform is not available during replay."""
+
+    def shutdown_platform(self) -> None:
+        """Do nothing, platform is not available during replay."""
+
+    def wait_for_host(self, *args, **kwargs) -> None:
+        """Do nothing, platform is not available during replay."""
+
+    def disconnect(self, *args, **kwargs) -> None:
+        """Do nothing, platform is not available during replay."""
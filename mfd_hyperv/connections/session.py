@@ -0,0 +1,329 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: MIT
+"""Persistent PowerShell session on host.
+
+Every execute_powershell call of regular connection starts new powershell.exe on host and loads Hyper-V module
+before command is run. Session keeps one PowerShell process alive and sends commands to it through its standard
+input, results (stdout, stderr and exit status) are returned in framed lines on its standard output.
+
+Contents:
+-PowerShellSessionConnection
+    connection executing powershell commands in persistent session
+"""
+
+import base64
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional, Tuple, TYPE_CHECKING
+
+from mfd_common_libs import add_logging_level, log_levels
+from mfd_connect.base import ConnectionCompletedProcess
+from mfd_connect.exceptions import ConnectionCalledProcessError
+
+from mfd_hyperv.connections.proxy import ConnectionProxy
+from mfd_hyperv.exceptions import HyperVSessionException
+
+if TYPE_CHECKING:
+    from mfd_connect import Connection
+    from mfd_connect.process import RemoteProcess
+
+logger = logging.getLogger(__name__)
+add_logging_level(level_name="MODULE_DEBUG", level_value=log_levels.MODULE_DEBUG)
+
+RESULT_MARKER = "MFD_HYPERV_SESSION"
+EXIT_REQUEST = "EXIT"
+SESSION_SCRIPT = f"""
+$ErrorActionPreference = 'Continue'
+$ProgressPreference = 'SilentlyContinue'
+Import-Module Hyper-V -ErrorAction SilentlyContinue
+[Console]::Out.WriteLine('{RESULT_MARKER} READY')
+[Console]::Out.Flush()
+while ($true) {{
+    $line = [Console]::In.ReadLine()
+    if ($line -eq $null -or $line -eq '{EXIT_REQUEST}') {{ break }}
+    $id, $encoded = $line.Split(' ', 2)
+    $command = [Text.Encoding]::UTF8.GetString([Convert]::FromBase64String($encoded))
+    $global:LASTEXITCODE = 0
+    $errors = New-Object System.Collections.ArrayList
+    try {{
+        $stdout = Invoke-Expression $command 2>&1 | ForEach-Object {{
+            if ($_ -is [System.Management.Automation.ErrorRecord]) {{ [void]$errors.Add($_) }} else {{ $_ }}
+        }} | Out-String -Width 4096
+    }} catch {{
+        $stdout = ''
+        [void]$errors.Add($_)
+    }}
+    $stderr = $errors | Out-String -Width 4096
+    $code = 0
+    if ($global:LASTEXITCODE) {{ $code = $global:LASTEXITCODE }} elseif ($errors.Count) {{ $code = 1 }}
+    $out = [Convert]::ToBase64String([Text.Encoding]::UTF8.GetBytes([string]$stdout))
+    $err = [Convert]::ToBase64String([Text.Encoding]::UTF8.GetBytes([string]$stderr))
+    [Console]::Out.WriteLine("{RESULT_MARKER} $id $code $out $err")
+    [Console]::Out.Flush()
+}}
+"""
+SESSION_COMMAND = "powershell.exe -NoLogo -NoProfile -NonInteractive -ExecutionPolicy Bypass -EncodedCommand {script}"
+SUPPORTED_ARGUMENTS = frozenset({"expected_return_codes", "custom_exception", "timeout", "shell", "skip_logging"})
+
+
+def encode_script(script: str) -> str:
+    """Encode script for -EncodedCommand parameter of powershell.exe.
+
+    :param script: PowerShell script
+    :return: base64 of UTF-16LE encoded script
+    """
+    return base64.b64encode(script.encode("utf-16-le")).decode("ascii")
+
+
+def encode_request(request_id: int, command: str) -> str:
+    """Create line sent to session for command.
+
+    :param request_id: ID of request, returned in result line
+    :param command: PowerShell command
+    :return: request line without line ending
+    """
+    return f"{request_id} {base64.b64encode(command.encode('utf-8')).decode('ascii')}"
+
+
+def decode_result(line: str) -> Optional[Tuple[int, int, str, str]]:
+    """Parse result line written by session.
+
+    :param line: line of session output
+    :return: request ID, return code, stdout and stderr, None if line is not result line
+    """
+    parts = line.strip().split(" ", 4)
+    if len(parts) < 3 or parts[0] != RESULT_MARKER or not parts[1].isdigit():
+        return None
+    parts += [""] * (5 - len(parts))
+    _, request_id, return_code, stdout, stderr = parts
+    return (
+        int(request_id),
+        int(return_code),
+        base64.b64decode(stdout).decode("utf-8"),
+        base64.b64decode(stderr).decode("utf-8"),
+    )
+
+
+@dataclass
+class SessionStatistics:
+    """Statistics of persistent session.
+
+    calls: commands executed in session
+    fallback_calls: commands executed by wrapped connection, e.g. when session couldn't be started
+    reconnects: sessions started after the first one
+    startup_time: duration of last session start, i.e. start of powershell.exe with Hyper-V module,
+                  that is saved on every command executed in session
+    call_time: total duration of commands executed in session
+    """
+
+    calls: int = 0
+    fallback_calls: int = 0
+    reconnects: int = 0
+    startup_time: float = 0.0
+    call_time: float = 0.0
+
+    @property
+    def saved_per_call(self) -> float:
+        """Time saved on single command by not starting powershell.exe."""
+        return self.startup_time
+
+    @property
+    def saved_time(self) -> float:
+        """Time saved on all commands executed in session."""
+        return self.calls * self.saved_per_call
+
+
+class _Session:
+    """Running PowerShell process with reader of its output."""
+
+    def __init__(self, process: "RemoteProcess"):
+        self.process = process
+        self.lines = queue.Queue()
+        self._reader = threading.Thread(target=self._read, daemon=True)
+        self._reader.start()
+
+    def _read(self) -> None:
+        try:
+            for line in iter(self.process.stdout_stream.readline, ""):
+                self.lines.put(line)
+        except (OSError, EOFError, ValueError):
+            pass
+        self.lines.put(None)
+
+    def send(self, line: str) -> None:
+        self.process.stdin_stream.write(f"{line}\n")
+        self.process.stdin_stream.flush()
+
+    def receive(self, request_id: Optional[int], timeout: float) -> Optional[Tuple[int, int, str, str]]:
+        """Wait for result of request, READY line is awaited when request_id is None."""
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                line = self.lines.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                raise TimeoutError(f"No response from PowerShell session within {timeout} seconds")
+            if line is None:
+                raise EOFError("PowerShell session terminated")
+            if request_id is None and line.strip() == f"{RESULT_MARKER} READY":
+                return None
+            result = decode_result(line)
+            if result is not None and result[0] == request_id:
+                return result
+
+    def close(self) -> None:
+        try:
+            if self.process.running:
+                self.send(EXIT_REQUEST)
+                self.process.wait(timeout=5)
+        except Exception:
+            pass
+        try:
+            if self.process.running:
+                self.process.kill()
+        except Exception:
+            pass
+
+
+class PowerShellSessionConnection(ConnectionProxy):
+    """Connection executing powershell commands in one PowerShell process kept alive on host.
+
+    Session is started on first command and restarted when it fails. Commands with arguments not supported by session
+    (e.g. cwd, env) and commands issued when session can't be started are executed by wrapped connection.
+    """
+
+    def __init__(
+        self,
+        connection: "Connection",
+        timeout: float = 120,
+        startup_timeout: float = 60,
+        max_start_attempts: int = 3,
+        clock: Callable[[], float] = time.perf_counter,
+    ):
+        """Class constructor.
+
+        :param connection: connection instance of MFD connect class.
+        :param timeout: default timeout of single command in seconds
+        :param startup_timeout: timeout of session start in seconds
+        :param max_start_attempts: consecutive failed session starts after which commands are only executed by
+                                   wrapped connection
+        :param clock: function returning current time, used for statistics
+        """
+        super().__init__(connection)
+        self.timeout = timeout
+        self.startup_timeout = startup_timeout
+        self.max_start_attempts = max_start_attempts
+        self.statistics = SessionStatistics()
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._session: Optional[_Session] = None
+        self._sessions_started = 0
+        self._failed_starts = 0
+        self._request_id = 0
+
+    @property
+    def active(self) -> bool:
+        """Whether session process is running."""
+        return self._session is not None and self._session.process.running
+
+    def execute_powershell(self, command: str, **kwargs) -> ConnectionCompletedProcess:
+        """Execute powershell command in persistent session.
+
+        :param command: command to execute
+        :param kwargs: execute_powershell arguments, e.g. expected_return_codes, custom_exception, timeout
+        :raises HyperVSessionException: when session terminated or timed out while command was executed,
+                                        result of command is unknown then
+        :return: result of command
+        """
+        if not SUPPORTED_ARGUMENTS.issuperset(kwargs) or self._failed_starts >= self.max_start_attempts:
+            return self._fallback(command, **kwargs)
+
+        with self._lock:
+            session = self._get_session()
+            if session is None:
+                return self._fallback(command, **kwargs)
+            self._request_id += 1
+            start = self._clock()
+            try:
+                session.send(encode_request(self._request_id, command))
+            except (OSError, EOFError, ValueError):
+                session = self._restart_session()
+                if session is None:
+                    return self._fallback(command, **kwargs)
+                session.send(encode_request(self._request_id, command))
+            try:
+                _, return_code, stdout, stderr = session.receive(
+                    self._request_id, kwargs.get("timeout") or self.timeout
+                )
+            except (TimeoutError, EOFError) as e:
+                self._close_session()
+                raise HyperVSessionException(f"{e}, result of command '{command}' is unknown") from e
+            duration = self._clock() - start
+            self.statistics.calls += 1
+            self.statistics.call_time += duration
+
+        logger.log(
+            level=log_levels.MODULE_DEBUG,
+            msg=f"Command executed in PowerShell session in {duration:.3f}s, "
+            f"saved ~{self.statistics.saved_per_call:.3f}s of powershell.exe startup",
+        )
+        expected_return_codes = kwargs.get("expected_return_codes", frozenset({0}))
+        if expected_return_codes and return_code not in expected_return_codes:
+            exception = kwargs.get("custom_exception") or ConnectionCalledProcessError
+            raise exception(returncode=return_code, cmd=command, output=stdout, stderr=stderr)
+        return ConnectionCompletedProcess(args=command, stdout=stdout, stderr=stderr, return_code=return_code)
+
+    def close(self) -> None:
+        """Stop session process."""
+        with self._lock:
+            self._close_session()
+
+    def disconnect(self, *args, **kwargs) -> None:
+        """Stop session process and disconnect wrapped connection."""
+        self.close()
+        super().disconnect(*args, **kwargs)
+
+    def _fallback(self, command: str, **kwargs) -> ConnectionCompletedProcess:
+        self.statistics.fallback_calls += 1
+        return self._wrapped_connection.execute_powershell(command, **kwargs)
+
+    def _get_session(self) -> Optional[_Session]:
+        if self.active:
+            return self._session
+        return self._restart_session()
+
+    def _restart_session(self) -> Optional[_Session]:
+        self._close_session()
+        start = self._clock()
+        session = None
+        try:
+            process = self._wrapped_connection.start_process(
+                SESSION_COMMAND.format(script=encode_script(SESSION_SCRIPT)), enable_input=True
+            )
+            session = _Session(process)
+            session.receive(None, self.startup_timeout)
+        except Exception as e:
+            self._failed_starts += 1
+            logger.log(level=log_levels.MODULE_DEBUG, msg=f"Couldn't start PowerShell session: {e}")
+            if session is not None:
+                session.close()
+            return None
+
+        self._failed_starts = 0
+        if self._sessions_started:
+            self.statistics.reconnects += 1
+        self._sessions_started += 1
+        self.statistics.startup_time = self._clock() - start
+        self._session = session
+        logger.log(
+            level=log_levels.MODULE_DEBUG,
+            msg=f"PowerShell session started in {self.statistics.startup_time:.3f}s",
+        )
+        return session
+
+    def _close_session(self) -> None:
+        if self._session is not None:
+            self._session.close()
+            self._session = None
@@ -0,0 +1,371 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: MIT
+"""Time series of vSwitch, vNIC and HW QoS queue counters sampled while traffic runs.
+
+Every tick collects Hyper-V performance counters and vfpctrl counters of scheduler queues in one host script and stores
+them in fixed-size ring buffer of float arrays, so long runs use constant memory.
+
+Contents:
+-DEFAULT_COUNTERS
+    performance counters of vSwitches, vNICs and VMQs sampled by default
+
+-CounterBuffer
+    ring buffer of samples with rates, percentiles and CSV export
+
+-CounterSampler
+    sampler collecting counters in background thread
+
+-parse_counter_samples, parse_queue_counters
+    parsers of sampled outputs
+
+-percentile
+    percentile with linear interpolation
+"""
+
+import csv
+import logging
+import math
+import threading
+import time
+from array import array
+from collections import deque
+from pathlib import Path
+from typing import Callable, Deque, Dict, Iterable, List, Optional, Sequence, Union, TYPE_CHECKING
+
+from mfd_common_libs import add_logging_level, log_levels
+
+from mfd_hyperv.connections.batch import query_in_scripts
+from mfd_hyperv.exceptions import HyperVException
+from mfd_hyperv.vfpctrl_parser import parse_line
+
+if TYPE_CHECKING:
+    from mfd_connect import Connection
+
+logger = logging.getLogger(__name__)
+add_logging_level(level_name="MODULE_DEBUG", level_value=log_levels.MODULE_DEBUG)
+
+DEFAULT_COUNTERS = (
+    r"\Hyper-V Virtual Switch(*)\Bytes/sec",
+    r"\Hyper-V Virtual Switch(*)\Packets/sec",
+    r"\Hyper-V Virtual Switch(*)\Dropped Packets Incoming/sec",
+    r"\Hyper-V Virtual Switch(*)\Dropped Packets Outgoing/sec",
+    r"\Hyper-V Virtual Network Adapter(*)\Bytes/sec",
+    r"\Hyper-V Virtual Network Adapter(*)\Packets/sec",
+    r"\Hyper-V Virtual Network Adapter(*)\Dropped Packets Incoming/sec",
+    r"\Hyper-V Virtual Network Adapter(*)\Dropped Packets Outgoing/sec",
+    r"\Hyper-V Virtual Switch Processor(*)\Number of VMQs",
+)
+COUNTER_COMMAND = (
+    "(Get-Counter -Counter {paths} -ErrorAction SilentlyContinue).CounterSamples | "
+    "ForEach-Object {{ $_.Path + '=' + $_.CookedValue.ToString([Globalization.CultureInfo]::InvariantCulture) }}"
+)
+QUEUE_COUNTER_COMMAND = 'vfpctrl /switch {vswitch_name} /get-queue-info "all"'
+_QUEUE_SECTIONS = {"current transmit info": "tx", "current receive info": "rx"}
+_QUEUE_COUNTERS = ("rate", "throttled packets", "dropped packets")
+
+
+def _to_float(value: str) -> Optional[float]:
+    number = value.split(maxsplit=1)[0] if value.strip() else ""
+    try:
+        return float(number)
+    except ValueError:
+        return None
+
+
+def parse_counter_samples(output: str) -> Dict[str, float]:
+    r"""Parse samples of performance counters written as 'path=value' lines.
+
+    Computer name is dropped from path, e.g. '\\host\hyper-v virtual switch(vs1)\bytes/sec=10' ->
+    {'hyper-v virtual switch(vs1)\bytes/sec': 10.0}.
+
+    :param output: output of COUNTER_COMMAND
+    :return: series name -> value
+    """
+    samples = {}
+    for line in output.splitlines():
+        path, separator, value = line.rpartition("=")
+        number = _to_float(value) if separator else None
+        if number is None:
+            continue
+        path = path.strip().lower()
+        if path.startswith("\\\\"):
+            path = path[2:].partition("\\")[2]
+        samples[path.lstrip("\\")] = number
+    return samples
+
+
+def parse_queue_counters(vswitch_name: str, output: str) -> Dict[str, float]:
+    r"""Parse transmit and receive counters of scheduler queues listed by vfpctrl /get-queue-info "all".
+
+    Series are named 'queue(<vSwitch>/<queue ID>)\<tx|rx> <counter>', e.g. 'queue(vs1/1)\tx dropped packets'.
+    Disabled rates are skipped.
+
+    :param vswitch_name: name of vSwitch
+    :param output: output of command
+    :return: series name -> value
+    """
+    samples = {}
+    sq_id, section = None, None
+    for line in output.splitlines():
+        parsed = parse_line(line)
+        if parsed is None:
+            continue
+        key, value = parsed
+        if key == "qos queue":
+            sq_id, section = value, None
+        elif key in _QUEUE_SECTIONS:
+            section = _QUEUE_SECTIONS[key]
+        elif sq_id is not None and section is not None and key in _QUEUE_COUNTERS:
+            number = _to_float(value)
+            if number is not None:
+                samples[f"queue({vswitch_name.lower()}/{sq_id})\\{section} {key}"] = number
+    return samples
+
+
+def percentile(values: Iterable[float], q: float) -> float:
+    """Get percentile of values with linear interpolation between closest ranks, NaN values are skipped.
+
+    :param values: values
+    :param q: percentile between 0 and 100
+    :return: percentile, NaN when there are no values
+    :raises HyperVException: when percentile is out of range
+    """
+    if not 0 <= q <= 100:
+        raise HyperVException(f"Percentile must be between 0 and 100, got {q}")
+    ordered = sorted(value for value in values if not math.isnan(value))
+    if not ordered:
+        return math.nan
+    rank = (len(ordered) - 1) * q / 100
+    lower = math.floor(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+class CounterBuffer:
+    """Ring buffer of samples, oldest samples are overwritten when buffer is full.
+
+    Every series is kept in float array of buffer capacity, missing values are NaN.
+    """
+
+    def __init__(self, capacity: int):
+        """Class constructor.
+
+        :param capacity: number of samples kept
+        :raises HyperVException: when capacity isn't positive
+        """
+        if capacity <= 0:
+            raise HyperVException(f"Capacity of counter buffer must be positive, got {capacity}")
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self._timestamps = array("d", [math.nan]) * capacity
+        self._series: Dict[str, array] = {}
+        self._count = 0
+
+    def __len__(self) -> int:
+        return min(self._count, self.capacity)
+
+    @property
+    def names(self) -> List[str]:
+        """Names of sampled series."""
+        with self._lock:
+            return sorted(self._series)
+
+    def append(self, timestamp: float, values: Dict[str, float]) -> None:
+        """Store sample.
+
+        :param timestamp: time of sample in seconds
+        :param values: series name -> value, series missing in sample get NaN
+        """
+        with self._lock:
+            slot = self._count % self.capacity
+            self._timestamps[slot] = timestamp
+            for name, series in self._series.items():
+                series[slot] = values.get(name, math.nan)
+            for name in values.keys() - self._series.keys():
+                series = self._series[name] = array("d", [math.nan]) * self.capacity
+                series[slot] = values[name]
+            self._count += 1
+
+    def clear(self) -> None:
+        """Drop all samples."""
+        with self._lock:
+            self._timestamps = array("d", [math.nan]) * self.capacity
+            self._series, self._count = {}, 0
+
+    def _ordered(self, data: array) -> List[float]:
+        if self._count <= self.capacity:
+            return data[: self._count].tolist()
+        slot = self._count % self.capacity
+        return (data[slot:] + data[:slot]).tolist()
+
+    def timestamps(self) -> List[float]:
+        """Get times of samples, oldest first."""
+        with self._lock:
+            return self._ordered(self._timestamps)
+
+    def values(self, name: str) -> List[float]:
+        """Get values of series, oldest first.
+
+        :param name: name of series
+        :return: values, NaN for samples without series
+        :raises HyperVException: when series wasn't sampled
+        """
+        return self._columns([name])[1]
+
+    def _columns(self, names: Sequence[str]) -> List[List[float]]:
+        """Get timestamps and values of series read at once, so sample appended meanwhile doesn't shift them."""
+        with self._lock:
+            missing = [name for name in names if name not in self._series]
+            if missing:
+                raise HyperVException(f"Series {missing} weren't sampled, sampled series: {sorted(self._series)}")
+            return [self._ordered(self._timestamps)] + [self._ordered(self._series[name]) for name in names]
+
+    def rates(self, name: str) -> List[float]:
+        """Get per-second rates of cumulative series, e.g. dropped packets of queue.
+
+        :param name: name of series
+        :return: rate between every two consecutive samples, NaN when value is missing or counter was reset
+        :raises HyperVException: when series wasn't sampled
+        """
+        timestamps, values = self._columns([name])
+        rates = []
+        for (t0, v0), (t1, v1) in zip(zip(timestamps, values), zip(timestamps[1:], values[1:])):
+            delta = v1 - v0
+            rates.append(delta / (t1 - t0) if t1 > t0 and delta >= 0 else math.nan)
+        return rates
+
+    def percentile(self, name: str, q: float, rate: bool = False) -> float:
+        """Get percentile of series.
+
+        :param name: name of series
+        :param q: percentile between 0 and 100
+        :param rate: whether to compute percentile of rates of cumulative series instead of values
+        :return: percentile, NaN when series has no values
+        :raises HyperVException: when series wasn't sampled or percentile is out of range
+        """
+        return percentile(self.rates(name) if rate else self.values(name), q)
+
+    def export_csv(self, file_path: Union[str, Path], names: Optional[Sequence[str]] = None) -> None:
+        """Write samples to CSV file, one row per sample with timestamp column first, missing values are empty.
+
+        :param file_path: path of file
+        :param names: series to export, all series when not given
+        :raises HyperVException: when series wasn't sampled
+        """
+        names = list(names) if names is not None else self.names
+        columns = self._columns(names)
+        with open(file_path, "w", newline="", encoding="utf-8") as file:
+            writer = csv.writer(file)
+            writer.writerow(["timestamp", *names])
+            for row in zip(*columns):
+                writer.writerow(["" if math.isnan(value) else repr(value) for value in row])
+
+
+class CounterSampler:
+    r"""Sampler of vSwitch, vNIC and HW QoS queue counters.
+
+    Usage:
+        with hyperv.create_counter_sampler(vswitch_names=["VS1"], interval=1.0) as sampler:
+            run_traffic()
+        sampler.buffer.percentile(r"hyper-v virtual switch(vs1)\bytes/sec", 99)
+        sampler.buffer.export_csv("counters.csv")
+    """
+
+    def __init__(
+        self,
+        connection: "Connection",
+        vswitch_names: Sequence[str] = (),
+        counters: Sequence[str] = DEFAULT_COUNTERS,
+        interval: float = 1.0,
+        capacity: int = 3600,
+        clock: Callable[[], float] = time.time,
+    ):
+        """Class constructor.
+
+        :param connection: connection instance of MFD connect class.
+        :param vswitch_names: vSwitches which scheduler queue counters are sampled
+        :param counters: paths of performance counters, wildcard instances are allowed
+        :param interval: seconds between starts of ticks of background sampling
+        :param capacity: number of samples kept in buffer
+        :param clock: source of timestamps of samples
+        """
+        self.connection = connection
+        self.vswitch_names = list(vswitch_names)
+        self.counters = list(counters)
+        self.interval = interval
+        self.clock = clock
+        self.buffer = CounterBuffer(capacity)
+        self.errors: Deque[Exception] = deque(maxlen=100)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def commands(self) -> List[str]:
+        """Commands executed in every tick."""
+        commands = []
+        if self.counters:
+            paths = ", ".join(f"'{path}'" for path in self.counters)
+            commands.append(COUNTER_COMMAND.format(paths=f"@({paths})"))
+        commands += [QUEUE_COUNTER_COMMAND.format(vswitch_name=name) for name in self.vswitch_names]
+        return commands
+
+    @property
+    def is_running(self) -> bool:
+        """Whether background sampling runs."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def sample(self) -> Dict[str, float]:
+        """Collect counters in one host call (split when script is too long) and store them in buffer.
+
+        :return: series name -> value
+        :raises HyperVExecutionException: when command execution fails
+        :raises HyperVException: when results of host script cannot be read
+        """
+        commands = self.commands
+        timestamp = self.clock()
+        results = query_in_scripts(self.connection, commands)
+        samples = parse_counter_samples(results[0][1]) if self.counters else {}
+        queue_results = results[1:] if self.counters else results
+        for vswitch_name, (_, stdout, _) in zip(self.vswitch_names, queue_results):
+            samples.update(parse_queue_counters(vswitch_name, stdout))
+        self.buffer.append(timestamp, samples)
+        return samples
+
+    def start(self) -> "CounterSampler":
+        """Start sampling in background thread, tick failures are logged and last 100 of them stored in `errors`.
+
+        :return: sampler
+        :raises HyperVException: when sampling already runs
+        """
+        if self.is_running:
+            raise HyperVException("Counter sampler is already running")
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="mfd_hyperv-counter-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop background sampling and wait for tick in progress.
+
+        :param timeout: seconds to wait for tick in progress, no limit when None
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def __enter__(self) -> "CounterSampler":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            started = time.monotonic()
+            try:
+                self.sample()
+            except Exception as e:
+                logger.log(level=log_levels.MODULE_DEBUG, msg=f"Counter sample failed: {e}")
+                self.errors.append(e)
+            self._stop.wait(max(0.0, self.interval - (time.monotonic() - started)))
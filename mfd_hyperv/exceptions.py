@@ -3,6 +3,11 @@
 """Module for exceptions."""
 
 import subprocess
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from mfd_hyperv.instances.vm import InterfaceMatchingDiagnostic
+    from mfd_hyperv.topology import ReconcileResult
 
 
 class HyperVException(Exception):
@@ -11,3 +16,37 @@ class HyperVException(Exception):
 
 class HyperVExecutionException(subprocess.CalledProcessError):
     """Handle execution exceptions."""
+
+
+class HyperVInterfaceMatchingException(HyperVException):
+    """Handle failures of matching VM interfaces seen from host with interfaces seen from guest."""
+
+    def __init__(self, message: str, diagnostic: "InterfaceMatchingDiagnostic"):
+        """Exception constructor.
+
+        :param message: exception message
+        :param diagnostic: items that couldn't be matched
+        """
+        super().__init__(message)
+        self.diagnostic = diagnostic
+
+
+class HyperVReplayException(HyperVException):
+    """Handle commands that cannot be answered from recorded session."""
+
+
+class HyperVSessionException(HyperVException):
+    """Handle failures of persistent PowerShell session."""
+
+
+class HyperVReconcileException(HyperVException):
+    """Handle failures of reconciliation of host topology."""
+
+    def __init__(self, message: str, result: "ReconcileResult"):
+        """Exception constructor.
+
+        :param message: exception message
+        :param result: outcome of reconciliation with errors of failed branches
+        """
+        super().__init__(message)
+        self.result = result
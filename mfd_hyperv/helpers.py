@@ -12,3 +12,8 @@ def standardise_value(value: Union[int, str, bool]) -> str:
     if value in ["true", "false"]:
         return f"${value}"
     return value
+
+
+def quote_powershell(value: str) -> str:
+    """Quote value as PowerShell single-quoted string literal."""
+    return "'" + str(value).replace("'", "''") + "'"
@@ -1,14 +1,35 @@
 # Copyright (C) 2025 Intel Corporation
 # SPDX-License-Identifier: MIT
-"""Main module."""
+"""Main module.
+
+Contents:
+-QoSOperation
+    queue or port operation executed within batch of HWQoS.execute_operations
+
+-QoSOperationResult
+    status of single operation of batch
+
+-QueueState
+    scheduler queues of vSwitch with offload status and associated ports, indexed for lookups
+
+-QoSLayout
+    desired scheduler queues, port associations and QoS config of vSwitch, see HWQoS.reconcile
+
+-HWQoS
+    Hyper-V Hardware QoS Offload functionality
+"""
 
 import logging
-import re
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Union, TYPE_CHECKING
 
-from typing import TYPE_CHECKING
 from mfd_common_libs import log_levels, add_logging_level
 
+from mfd_hyperv.connections.batch import MAX_SCRIPT_LENGTH, batchable, query_in_scripts, run_in_scripts
 from mfd_hyperv.exceptions import HyperVExecutionException, HyperVException
+from mfd_hyperv.tracing import traced
+from mfd_hyperv.vfpctrl_parser import QueueSpec, iter_records, parse_queues
+from mfd_hyperv.vmswitch_ports import VMSwitchPortDirectory
 
 if TYPE_CHECKING:
     from mfd_connect import Connection
@@ -16,18 +37,299 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 add_logging_level(level_name="MODULE_DEBUG", level_value=log_levels.MODULE_DEBUG)
 
+_QOS_CONFIG_KEYS = {
+    "hw_caps": "enable hardware caps",
+    "hw_reserv": "enable hardware reservations",
+    "sw_reserv": "enable software reservations",
+    "flags": "flags",
+}
+
+
+def _parse_queue_ids(output: str) -> List[str]:
+    return [record["qos queue"] for record in iter_records(output, "QOS QUEUE")]
+
+
+def _parse_qos_config(output: str) -> Dict[str, Union[str, bool]]:
+    parsed_config = {}
+    for record in iter_records(output, "Enable Hardware Caps"):
+        if not all(key in record for key in _QOS_CONFIG_KEYS.values()):
+            continue
+        for param, key in _QOS_CONFIG_KEYS.items():
+            parsed_config[param] = record[key] if param == "flags" else record[key] == "TRUE"
+    return parsed_config
+
+
+def _normalise_qos_config(qos_config: Dict[str, Union[str, bool]]) -> Dict[str, Union[int, str, bool]]:
+    """Convert QoS configuration to comparable values, flags to number and remaining keys to booleans."""
+    normalised = {}
+    for param, value in qos_config.items():
+        if param != "flags":
+            normalised[param] = value if isinstance(value, bool) else str(value).strip().lower() == "true"
+            continue
+        try:
+            normalised[param] = int(str(value), 16)
+        except ValueError:
+            normalised[param] = str(value).strip().lower()
+    return normalised
+
+
+def _create_scheduler_queue_commands(
+    vswitch_name: str, sq_id: str, sq_name: str, limit: bool, tx_max: str, tx_reserve: str, rx_max: str
+) -> List[str]:
+    limit = str(limit).lower()
+    return [f'vfpctrl /switch {vswitch_name} /add-queue "{sq_id} {sq_name} {limit} {tx_max} {tx_reserve} {rx_max}"']
+
+
+def _update_scheduler_queue_commands(
+    vswitch_name: str, limit: bool, tx_max: str, tx_reserve: str, rx_max: str, sq_id: str
+) -> List[str]:
+    limit = str(limit).lower()
+    return [
+        f'vfpctrl /switch {vswitch_name} /set-queue-config "{limit} {tx_max} {tx_reserve} {rx_max}" /queue "{sq_id}"'
+    ]
+
+
+def _delete_scheduler_queue_commands(vswitch_name: str, sq_id: str) -> List[str]:
+    return [f'vfpctrl /switch {vswitch_name} /remove-queue /queue "{sq_id}"']
+
+
+def _set_qos_config_commands(
+    vswitch_name: str, hw_caps: bool, hw_reserv: bool, sw_reserv: bool, flags: str
+) -> List[str]:
+    hw_caps, hw_reserv, sw_reserv = (str(value).lower() for value in (hw_caps, hw_reserv, sw_reserv))
+    return [f'vfpctrl /switch {vswitch_name} /set-qos-config "{hw_caps} {hw_reserv} {sw_reserv} {flags}"']
+
+
+def _disassociate_scheduler_queues_with_vport_commands(vswitch_name: str, vport: str) -> List[str]:
+    return [f"vfpctrl /switch {vswitch_name} /port {vport} /clear-port-queue"]
+
+
+def _associate_scheduler_queues_with_vport_commands(
+    vswitch_name: str, vport: str, sq_id: str, lid: int, lname: str
+) -> List[str]:
+    base_cmd = f"vfpctrl /switch {vswitch_name} /port {vport}"
+    params = [
+        "/enable-port",
+        "/unblock-port",
+        f"/add-layer '{lid} {lname} stateless 100 1'",
+        f"/set-port-queue {sq_id}",
+    ]
+    return [f"{base_cmd} {param}" for param in params]
+
+
+# operations which can be executed in batch, named after HWQoS methods issuing the same commands
+OPERATION_COMMANDS: Dict[str, Callable[..., List[str]]] = {
+    "create_scheduler_queue": _create_scheduler_queue_commands,
+    "update_scheduler_queue": _update_scheduler_queue_commands,
+    "delete_scheduler_queue": _delete_scheduler_queue_commands,
+    "set_qos_config": _set_qos_config_commands,
+    "associate_scheduler_queues_with_vport": _associate_scheduler_queues_with_vport_commands,
+    "disassociate_scheduler_queues_with_vport": _disassociate_scheduler_queues_with_vport_commands,
+}
+
 
+@dataclass
+class QoSOperation:
+    """Queue or port operation of batch.
+
+    Usage:
+        QoSOperation("associate_scheduler_queues_with_vport",
+                     {"vswitch_name": "VS1", "vport": port, "sq_id": "1", "lid": 10, "lname": "QOS"})
+
+    name: name of HWQoS method issuing the same commands, one of OPERATION_COMMANDS
+    kwargs: keyword arguments of method
+    """
+
+    name: str
+    kwargs: Dict[str, Any] = field(default_factory=dict)
+
+    def __str__(self) -> str:
+        arguments = ", ".join(f"{key}={value}" for key, value in self.kwargs.items())
+        return f"{self.name}({arguments})"
+
+    @property
+    def commands(self) -> List[str]:
+        """Commands issued by operation.
+
+        :raises HyperVException: when operation isn't supported or arguments don't match method
+        """
+        builder = OPERATION_COMMANDS.get(self.name)
+        if builder is None:
+            raise HyperVException(
+                f"Unsupported HWQoS batch operation {self.name}, supported ones: {', '.join(OPERATION_COMMANDS)}"
+            )
+        try:
+            return builder(**self.kwargs)
+        except TypeError as e:
+            raise HyperVException(f"Incorrect arguments of HWQoS batch operation {self}: {e}") from e
+
+
+@dataclass
+class QoSOperationResult:
+    """Status of operation of batch.
+
+    operation: executed operation
+    executed: whether commands of operation were executed, False when batch stopped before operation
+    error: exception of first failed command, None when operation succeeded or wasn't executed
+    outputs: stdout of executed commands of operation
+    """
+
+    operation: QoSOperation
+    executed: bool = False
+    error: Optional[HyperVExecutionException] = None
+    outputs: List[str] = field(default_factory=list)
+
+    @property
+    def succeeded(self) -> bool:
+        """Whether all commands of operation were executed successfully."""
+        return self.executed and self.error is None
+
+    @property
+    def status(self) -> str:
+        """Status of operation: succeeded, failed or skipped."""
+        if not self.executed:
+            return "skipped"
+        return "failed" if self.error is not None else "succeeded"
+
+
+@dataclass
+class QueueState:
+    """Scheduler queues of vSwitch read in one fetch, indexed by queue ID, queue name and port.
+
+    vswitch_name: name of vSwitch
+    queues: queue ID -> configuration of queue
+    offloaded: IDs of queues offloaded to hardware
+    port_queues: virtual port -> IDs of queues associated with port, empty when ports weren't fetched
+    qos_config: QoS configuration of vSwitch like returned by HWQoS.get_qos_config, empty when it wasn't fetched
+    """
+
+    vswitch_name: str
+    queues: Dict[str, QueueSpec] = field(default_factory=dict)
+    offloaded: FrozenSet[str] = frozenset()
+    port_queues: Dict[str, List[str]] = field(default_factory=dict)
+    qos_config: Dict[str, Union[str, bool]] = field(default_factory=dict)
+
+    def __post_init__(self):
+        self._by_name: Dict[str, List[QueueSpec]] = {}
+        for queue in self.queues.values():
+            self._by_name.setdefault(queue.name, []).append(queue)
+        self._ports: Dict[str, List[str]] = {}
+        for port, queue_ids in self.port_queues.items():
+            for sq_id in queue_ids:
+                self._ports.setdefault(sq_id, []).append(port)
+
+    def __contains__(self, sq_id: Union[str, int]) -> bool:
+        return str(sq_id) in self.queues
+
+    def __len__(self) -> int:
+        return len(self.queues)
+
+    def get_queue(self, sq_id: Union[str, int]) -> Optional[QueueSpec]:
+        """Get configuration of queue.
+
+        :param sq_id: ID of scheduler queue
+        :return: queue, None if queue doesn't exist
+        """
+        return self.queues.get(str(sq_id))
+
+    def get_queues_by_name(self, sq_name: str) -> List[QueueSpec]:
+        """Get queues with friendly name.
+
+        :param sq_name: friendly name of scheduler queue
+        :return: queues with given name, names aren't unique in vfpctrl
+        """
+        return list(self._by_name.get(sq_name, []))
+
+    def is_offloaded(self, sq_id: Union[str, int]) -> bool:
+        """Check if queue is offloaded to hardware.
+
+        :param sq_id: ID of scheduler queue
+        :return: True if queue is offloaded, False otherwise
+        """
+        return str(sq_id) in self.offloaded
+
+    def get_ports(self, sq_id: Union[str, int]) -> List[str]:
+        """Get virtual ports associated with queue.
+
+        :param sq_id: ID of scheduler queue
+        :return: ports associated with queue, empty when ports weren't fetched
+        """
+        return list(self._ports.get(str(sq_id), []))
+
+    def has_queue(
+        self,
+        sq_id: Union[str, int],
+        sq_name: Optional[str] = None,
+        tx_max: Optional[Union[str, int]] = None,
+        tx_reserve: Optional[Union[str, int]] = None,
+        rx_max: Optional[Union[str, int]] = None,
+        limit: Optional[bool] = None,
+    ) -> bool:
+        """Check if queue exists with given configuration, parameters which are None aren't compared.
+
+        :param sq_id: ID of scheduler queue
+        :param sq_name: friendly name of scheduler queue
+        :param tx_max: transmit limit
+        :param tx_reserve: transmit reservation
+        :param rx_max: receive limit
+        :param limit: whether infra-host limits are enforced
+        :return: True if queue exists and matches configuration, False otherwise
+        """
+        queue = self.get_queue(sq_id)
+        if queue is None:
+            return False
+        expected = {"name": sq_name, "tx_max": tx_max, "tx_reserve": tx_reserve, "rx_max": rx_max}
+        if any(value is not None and getattr(queue, key) != str(value) for key, value in expected.items()):
+            return False
+        return limit is None or queue.limit == limit
+
+
+@dataclass
+class QoSLayout:
+    """Desired scheduler queues of vSwitch, their port associations and QoS configuration.
+
+    Usage:
+        QoSLayout("VS1", queues=[QueueSpec("1", "SQ1", tx_max="1000")], port_queues={port: "1"},
+                  qos_config={"hw_caps": True, "hw_reserv": False, "sw_reserv": True, "flags": "0x0"})
+
+    vswitch_name: name of vSwitch
+    queues: scheduler queues, queues of vSwitch not listed are left untouched unless `prune` is set
+    port_queues: virtual port -> ID of queue associated with port, ports not listed are left untouched
+    qos_config: QoS configuration with keys of HWQoS.get_qos_config, left untouched when None
+    prune: whether to delete queues not listed, ports associated with them are cleared first
+    layer_id: ID of layer added to associated ports
+    layer_name: name of layer added to associated ports
+    """
+
+    vswitch_name: str
+    queues: List[QueueSpec] = field(default_factory=list)
+    port_queues: Dict[str, str] = field(default_factory=dict)
+    qos_config: Optional[Dict[str, Union[str, bool]]] = None
+    prune: bool = False
+    layer_id: int = 10
+    layer_name: str = "QOS"
+
+    def __post_init__(self):
+        self.port_queues = {vport: str(sq_id) for vport, sq_id in self.port_queues.items()}
+
+
+@traced()
 class HWQoS:
     """Class for Hyper-V Hardware QoS Offload functionality."""
 
-    def __init__(self, connection: "Connection") -> None:
+    max_script_length = MAX_SCRIPT_LENGTH
+
+    def __init__(self, connection: "Connection", port_directory: Optional[VMSwitchPortDirectory] = None) -> None:
         """
         Class constructor.
 
         :param connection: connection instance.
+        :param port_directory: cache of vmswitch ports shared with VMNetworkInterfaceManager, created when not given.
         """
         self._connection = connection
+        self.port_directory = port_directory or VMSwitchPortDirectory(connection)
 
+    @batchable
     def create_scheduler_queue(
         self, vswitch_name: str, sq_id: str, sq_name: str, limit: bool, tx_max: str, tx_reserve: str, rx_max: str
     ) -> None:
@@ -43,12 +345,10 @@ class HWQoS:
         :param rx_max: receive limit.
         :raises HyperVExecutionException: when command execution fails.
         """
-        limit = str(limit).lower()
-        cmd = (
-            f"vfpctrl /switch {vswitch_name} /add-queue " f'"{sq_id} {sq_name} {limit} {tx_max} {tx_reserve} {rx_max}"'
-        )
-        self._connection.execute_powershell(command=cmd, custom_exception=HyperVExecutionException)
+        for cmd in _create_scheduler_queue_commands(vswitch_name, sq_id, sq_name, limit, tx_max, tx_reserve, rx_max):
+            self._connection.execute_powershell(command=cmd, custom_exception=HyperVExecutionException)
 
+    @batchable
     def update_scheduler_queue(
         self, vswitch_name: str, limit: bool, tx_max: str, tx_reserve: str, rx_max: str, sq_id: str
     ) -> None:
@@ -63,13 +363,10 @@ class HWQoS:
         :param sq_id: ID of existing scheduler queue.
         :raises HyperVExecutionException: when command execution fails.
         """
-        limit = str(limit).lower()
-        cmd = (
-            f"vfpctrl /switch {vswitch_name} /set-queue-config "
-            f'"{limit} {tx_max} {tx_reserve} {rx_max}" /queue "{sq_id}"'
-        )
-        self._connection.execute_powershell(command=cmd, custom_exception=HyperVExecutionException)
+        for cmd in _update_scheduler_queue_commands(vswitch_name, limit, tx_max, tx_reserve, rx_max, sq_id):
+            self._connection.execute_powershell(command=cmd, custom_exception=HyperVExecutionException)
 
+    @batchable
     def delete_scheduler_queue(self, vswitch_name: str, sq_id: str) -> None:
         """
         Delete existing scheduler queue.
@@ -78,8 +375,38 @@ class HWQoS:
         :param sq_id: ID of existing scheduler queue.
         :raises HyperVExecutionException: when command execution fails.
         """
-        cmd = f'vfpctrl /switch {vswitch_name} /remove-queue /queue "{sq_id}"'
-        self._connection.execute_powershell(command=cmd, custom_exception=HyperVExecutionException)
+        for cmd in _delete_scheduler_queue_commands(vswitch_name, sq_id):
+            self._connection.execute_powershell(command=cmd, custom_exception=HyperVExecutionException)
+
+    def execute_operations(
+        self, operations: List[QoSOperation], stop_on_failure: bool = True
+    ) -> List[QoSOperationResult]:
+        """
+        Execute queue and port operations in host scripts instead of one round trip per command.
+
+        Commands of all operations are executed in one script, split into few scripts only when it would exceed
+        `max_script_length`. Script stops on first failed command, rest of failed operation is never executed.
+
+        :param operations: operations to execute in order
+        :param stop_on_failure: whether to skip operations following failed one, otherwise they are executed
+        :return: status of operations in order of operations
+        :raises HyperVException: when operation isn't supported or results of host script cannot be read
+        """
+        results = [QoSOperationResult(operation) for operation in operations]
+        groups = [result.operation.commands for result in results]
+        for index, script_results in run_in_scripts(self._connection, groups, self.max_script_length):
+            result = results[index]
+            for command, (return_code, stdout, stderr) in zip(result.operation.commands, script_results):
+                result.executed = True
+                result.outputs.append(stdout)
+                if return_code:
+                    result.error = HyperVExecutionException(
+                        returncode=return_code, cmd=command, output=stdout, stderr=stderr
+                    )
+            logger.log(level=log_levels.MODULE_DEBUG, msg=f"HWQoS batch operation {result.status}: {result.operation}")
+            if result.error is not None and stop_on_failure:
+                break
+        return results
 
     def get_qos_config(self, vswitch_name: str) -> dict[str, str | bool]:
         """
@@ -92,26 +419,9 @@ class HWQoS:
         """
         cmd = f"vfpctrl /switch {vswitch_name} /get-qos-config"
         result = self._connection.execute_powershell(command=cmd, custom_exception=HyperVExecutionException)
+        return _parse_qos_config(result.stdout)
 
-        pattern = (
-            r"Caps:+\s(?P<hw_caps>\S+)[\s\S]*?"
-            r"Hardware Reservations:+\s(?P<hw_reserv>\S+)[\s\S]*?"
-            r"Software Reservations:+\s(?P<sw_reserv>\S+)[\s\S]*?"
-            r"Flags:+\s(?P<flags>\S+)"
-        )
-        parsed_config = {}
-        matches = re.finditer(pattern, result.stdout)
-        params = ["hw_caps", "hw_reserv", "sw_reserv", "flags"]
-
-        for match in matches:
-            for param in params:
-                if param == "flags":
-                    parsed_config[param] = match.group(param)
-                else:
-                    parsed_config[param] = True if match.group(param) == "TRUE" else False
-
-        return parsed_config
-
+    @batchable
     def set_qos_config(self, vswitch_name: str, hw_caps: bool, hw_reserv: bool, sw_reserv: bool, flags: str) -> None:
         """
         Set QoS configuration on the vSwitch.
@@ -123,12 +433,10 @@ class HWQoS:
         :param flags: flags.
         :raises HyperVExecutionException: when command execution fails.
         """
-        hw_caps = str(hw_caps).lower()
-        hw_reserv = str(hw_reserv).lower()
-        sw_reserv = str(sw_reserv).lower()
-        cmd = f'vfpctrl /switch {vswitch_name} /set-qos-config "{hw_caps} {hw_reserv} {sw_reserv} {flags}"'
-        self._connection.execute_powershell(command=cmd, custom_exception=HyperVExecutionException)
+        for cmd in _set_qos_config_commands(vswitch_name, hw_caps, hw_reserv, sw_reserv, flags):
+            self._connection.execute_powershell(command=cmd, custom_exception=HyperVExecutionException)
 
+    @batchable
     def disassociate_scheduler_queues_with_vport(self, vswitch_name: str, vport: str) -> None:
         """
         Disassociate scheduler queues with virtual port.
@@ -137,8 +445,8 @@ class HWQoS:
         :param vport: virtual port.
         :raises HyperVExecutionException: when command execution fails.
         """
-        cmd = f"vfpctrl /switch {vswitch_name} /port {vport} /clear-port-queue"
-        self._connection.execute_powershell(command=cmd, custom_exception=HyperVExecutionException)
+        for cmd in _disassociate_scheduler_queues_with_vport_commands(vswitch_name, vport):
+            self._connection.execute_powershell(command=cmd, custom_exception=HyperVExecutionException)
 
     def list_scheduler_queues_with_vport(self, vswitch_name: str, vport: str) -> list[str]:
         """
@@ -151,9 +459,9 @@ class HWQoS:
         """
         cmd = f"vfpctrl /switch {vswitch_name} /port {vport} /get-port-queue"
         result = self._connection.execute_powershell(command=cmd, custom_exception=HyperVExecutionException)
-        pattern = r"(?<=QOS QUEUE: ).*"
-        return re.findall(pattern, result.stdout)
+        return _parse_queue_ids(result.stdout)
 
+    @batchable
     def associate_scheduler_queues_with_vport(
         self, vswitch_name: str, vport: str, sq_id: str, lid: int, lname: str
     ) -> None:
@@ -167,83 +475,239 @@ class HWQoS:
         :param lname: layer name
         :raises HyperVExecutionException: when any command execution fails.
         """
-        base_cmd = f"vfpctrl /switch {vswitch_name} /port {vport}"
-        params = [
-            "/enable-port",
-            "/unblock-port",
-            f"/add-layer '{lid} {lname} stateless 100 1'",
-            f"/set-port-queue {sq_id}",
-        ]
-        for param in params:
-            cmd = f"{base_cmd} {param}"
+        for cmd in _associate_scheduler_queues_with_vport_commands(vswitch_name, vport, sq_id, lid, lname):
             self._connection.execute_powershell(command=cmd, custom_exception=HyperVExecutionException)
 
     def get_vmswitch_port_name(self, switch_friendly_name: str, vm_name: str) -> str:
         """
         Get vmswitch port name.
 
+        Ports are listed once and cached in `port_directory`, see VMSwitchPortDirectory.
+
         :param switch_friendly_name: switch friendly name.
         :param vm_name: vm name.
-        :return: vmswitch port name.
+        :return: vmswitch port name, first one if VM has many ports on vSwitch.
         :raises HyperVExecutionException: when command execution fails.
         :raises HyperVException: when no vmswitch port name found.
         """
-        cmd = "vfpctrl /list-vmswitch-port"
-
-        result = self._connection.execute_powershell(command=cmd, custom_exception=HyperVExecutionException)
-
-        pattern = (
-            r"Port\sname\s+:+\s(?P<port_name>\S+)[\s\S]*?"
-            r"Switch\sFriendly\sname\s+:+\s(?P<friendly_name>\S+)[\s\S]*?"
-            r"VM\sname\s+:+\s(?P<vm_name>\S+)"
-        )
+        port_names = self.get_vmswitch_port_names(switch_friendly_name, vm_name)
+        if not port_names:
+            raise HyperVException(
+                f"Couldn't find VM Switch port name for Switch Friendly name: {switch_friendly_name} and "
+                f"VM name: {vm_name} in output: {self.port_directory.output}"
+            )
+        return port_names[0]
+
+    def get_vmswitch_port_names(self, switch_friendly_name: str, vm_name: str) -> List[str]:
+        """
+        Get names of all vmswitch ports of VM on vSwitch.
 
-        matches = re.finditer(pattern, result.stdout)
+        :param switch_friendly_name: switch friendly name.
+        :param vm_name: vm name.
+        :return: vmswitch port names, empty if VM has no ports on vSwitch.
+        :raises HyperVExecutionException: when command execution fails.
+        """
+        return [port.name for port in self.port_directory.get_ports(switch_friendly_name, vm_name)]
 
-        for match in matches:
-            if match.group("friendly_name") == switch_friendly_name and match.group("vm_name") == vm_name:
-                return match.group("port_name")
+    def resolve_vmswitch_port_names(self, switch_friendly_name: str, vm_names: List[str]) -> Dict[str, List[str]]:
+        """
+        Get names of vmswitch ports of many VMs on vSwitch from one listing of ports.
 
-        raise HyperVException(
-            f"Couldn't find VM Switch port name for Switch Friendly name: {switch_friendly_name} and "
-            f"VM name: {vm_name} in output: {result.stdout}"
-        )
+        :param switch_friendly_name: switch friendly name.
+        :param vm_names: vm names.
+        :return: vm name -> vmswitch port names, empty if VM has no ports on vSwitch.
+        :raises HyperVExecutionException: when command execution fails.
+        """
+        ports = self.port_directory.resolve(switch_friendly_name, vm_names)
+        return {vm_name: [port.name for port in vm_ports] for vm_name, vm_ports in ports.items()}
 
     def is_scheduler_queues_created(self, vswitch_name: str, sq_id: int, sq_name: str, tx_max: str) -> bool:
         """
         Verify that scheduler queues with provided name was created.
 
+        Verification of many queues should use `get_queue_state` once and `QueueState.has_queue` for every queue.
+
         :param vswitch_name: name of vswitch.
         :param sq_id: scheduler queues for verification.
         :param sq_name: name of scheduler queues.
         :param tx_max: transmit limit value
-        :return: True if SQ found, False otherwise.
+        :return: True if SQ found and offloaded to hardware, False otherwise.
+        :raises HyperVExecutionException: when command execution fails.
+        """
+        state = self.get_queue_state(vswitch_name=vswitch_name, with_ports=False)
+        return state.has_queue(sq_id, sq_name=sq_name, tx_max=tx_max) and state.is_offloaded(sq_id)
+
+    def get_queue_state(
+        self, vswitch_name: str, vports: Optional[List[str]] = None, with_ports: bool = True, with_config: bool = False
+    ) -> QueueState:
+        """
+        Read scheduler queues of vSwitch with their offload status and associated ports.
+
+        Queues, offload info and queues associated with ports are read in one host script. Ports of vSwitch are taken
+        from `port_directory`, which lists them when they aren't cached.
+
+        :param vswitch_name: name of vswitch.
+        :param vports: virtual ports to read associated queues of, all ports of vSwitch when not given.
+        :param with_ports: whether to read queues associated with ports.
+        :param with_config: whether to read QoS configuration of vSwitch within the same script.
+        :return: state of scheduler queues.
+        :raises HyperVExecutionException: when command execution fails.
+        """
+        if not with_ports:
+            vports = []
+        elif vports is None:
+            vports = [port.name for port in self.port_directory.get_switch_ports(vswitch_name)]
+        commands = [
+            f"vfpctrl /switch {vswitch_name} /list-queue",
+            f'vfpctrl /switch {vswitch_name} /get-queue-info "offload"',
+            *(f"vfpctrl /switch {vswitch_name} /port {vport} /get-port-queue" for vport in vports),
+        ]
+        if with_config:
+            commands.append(f"vfpctrl /switch {vswitch_name} /get-qos-config")
+        outputs = self._query(commands)
+        queues, offloaded = parse_queues(outputs[0]), frozenset(parse_queues(outputs[1]))
+        port_queues = {vport: _parse_queue_ids(output) for vport, output in zip(vports, outputs[2:])}
+        qos_config = _parse_qos_config(outputs[-1]) if with_config else {}
+        return QueueState(
+            vswitch_name=vswitch_name,
+            queues=queues,
+            offloaded=offloaded,
+            port_queues=port_queues,
+            qos_config=qos_config,
+        )
+
+    def plan_layout(self, layout: QoSLayout, state: Optional[QueueState] = None) -> List[QoSOperation]:
+        """
+        Compute operations bringing vSwitch to layout.
+
+        Only missing or different items are changed: QoS configuration is set when it differs (flags are compared as
+        numbers and switches as booleans), missing queues are created, queues with different limits are updated and
+        ports are associated when they aren't associated with their queue only. Port associated with other queue is
+        cleared first. Queue with different name is not renamed, vfpctrl cannot rename queues.
+
+        :param layout: desired layout.
+        :param state: state of vSwitch read by `read_layout_state`, read when not given.
+        :return: operations for `execute_operations`, empty when vSwitch matches layout.
+        :raises HyperVException: when layout associates port with queue it doesn't describe.
+        :raises HyperVExecutionException: when reading of state fails.
+        """
+        queues = {queue.sq_id: queue for queue in layout.queues}
+        unknown = {vport: sq_id for vport, sq_id in layout.port_queues.items() if sq_id not in queues}
+        if unknown:
+            raise HyperVException(f"Ports of layout are associated with queues not in layout: {unknown}")
+        if state is None:
+            state = self.read_layout_state(layout)
+
+        vswitch_name = layout.vswitch_name
+        configure, disassociate, delete, create, update, associate = [], [], [], [], [], []
+        desired_config = None if layout.qos_config is None else _normalise_qos_config(layout.qos_config)
+        if desired_config is not None and desired_config != _normalise_qos_config(state.qos_config):
+            configure.append(QoSOperation("set_qos_config", {"vswitch_name": vswitch_name, **layout.qos_config}))
+
+        stale = {sq_id for sq_id in state.queues if sq_id not in queues} if layout.prune else set()
+        for vport, current in state.port_queues.items():
+            sq_id = layout.port_queues.get(vport)
+            if current == [sq_id]:
+                continue
+            moved = sq_id is not None and current
+            if moved or stale.intersection(current):
+                disassociate.append(
+                    QoSOperation(
+                        "disassociate_scheduler_queues_with_vport", {"vswitch_name": vswitch_name, "vport": vport}
+                    )
+                )
+            if sq_id is not None:
+                associate.append(
+                    QoSOperation(
+                        "associate_scheduler_queues_with_vport",
+                        {
+                            "vswitch_name": vswitch_name,
+                            "vport": vport,
+                            "sq_id": sq_id,
+                            "lid": layout.layer_id,
+                            "lname": layout.layer_name,
+                        },
+                    )
+                )
+        delete += [
+            QoSOperation("delete_scheduler_queue", {"vswitch_name": vswitch_name, "sq_id": sq_id})
+            for sq_id in sorted(stale, key=lambda item: (len(item), item))
+        ]
+
+        for queue in layout.queues:
+            arguments = {
+                "limit": queue.limit,
+                "tx_max": queue.tx_max,
+                "tx_reserve": queue.tx_reserve,
+                "rx_max": queue.rx_max,
+            }
+            current_queue = state.get_queue(queue.sq_id)
+            if current_queue is None:
+                create.append(
+                    QoSOperation(
+                        "create_scheduler_queue",
+                        {"vswitch_name": vswitch_name, "sq_id": queue.sq_id, "sq_name": queue.name, **arguments},
+                    )
+                )
+                continue
+            if current_queue.name != queue.name:
+                logger.log(
+                    level=log_levels.MODULE_DEBUG,
+                    msg=f"Queue {queue.sq_id} on {vswitch_name} is named {current_queue.name}, name is not updated",
+                )
+            if not state.has_queue(queue.sq_id, **arguments):
+                update.append(
+                    QoSOperation(
+                        "update_scheduler_queue", {"vswitch_name": vswitch_name, "sq_id": queue.sq_id, **arguments}
+                    )
+                )
+        return configure + disassociate + delete + create + update + associate
+
+    def read_layout_state(self, layout: QoSLayout) -> QueueState:
+        """
+        Read state of vSwitch compared with layout in one host script.
+
+        Ports of layout are read, together with all ports of vSwitch from `port_directory` when layout prunes queues.
+
+        :param layout: desired layout.
+        :return: state of queues, ports and, when layout describes it, QoS configuration.
         :raises HyperVExecutionException: when command execution fails.
         """
-        pattern = (
-            r"(?<=QOS QUEUE: )(?P<sq_id>.*)\s+"
-            r"Friendly\sname\s+:+\s(?P<friendly_name>\S+)[\s\S]*?\s+.+"
-            r"Transmit\sLimit:+\s(?P<tx_max>\S+)"
+        vports = list(layout.port_queues)
+        if layout.prune:
+            switch_ports = [port.name for port in self.port_directory.get_switch_ports(layout.vswitch_name)]
+            vports += [vport for vport in switch_ports if vport not in layout.port_queues]
+        return self.get_queue_state(
+            vswitch_name=layout.vswitch_name, vports=vports, with_config=layout.qos_config is not None
         )
 
-        listed_queue = self.list_queue(vswitch_name=vswitch_name)
-        all_info = self.get_queue_all_info(vswitch_name=vswitch_name)
-        offload_info = self.get_queue_offload_info(vswitch_name=vswitch_name, sq_id=sq_id)
-
-        for result in [listed_queue, all_info, offload_info]:
-            matches = re.finditer(pattern, result)
-            for match in matches:
-                if (
-                    match.group("friendly_name") == sq_name
-                    and match.group("sq_id") == str(sq_id)
-                    and match.group("tx_max") == str(tx_max)
-                ):
-                    is_scheduler_queues_created = True
-                    break
-            else:
-                is_scheduler_queues_created = False
-
-        return is_scheduler_queues_created
+    def reconcile(self, layout: QoSLayout, stop_on_failure: bool = True) -> List[QoSOperationResult]:
+        """
+        Bring vSwitch to layout, issuing only operations which are needed.
+
+        State is read once and compared with layout, needed operations are executed in one host script, so applying
+        layout which is already in place costs one read.
+
+        :param layout: desired layout.
+        :param stop_on_failure: whether to skip operations following failed one.
+        :return: status of executed operations, empty when vSwitch matches layout.
+        :raises HyperVException: when layout is incorrect or results of host script cannot be read.
+        :raises HyperVExecutionException: when reading of state fails.
+        """
+        operations = self.plan_layout(layout)
+        logger.log(
+            level=log_levels.MODULE_DEBUG,
+            msg=f"HWQoS layout of {layout.vswitch_name}: {len(operations)} operations needed",
+        )
+        return self.execute_operations(operations, stop_on_failure=stop_on_failure)
+
+    def _query(self, commands: List[str]) -> List[str]:
+        """Execute queries in host scripts, split like operations when longer than `max_script_length`.
+
+        :raises HyperVExecutionException: when any command fails
+        :return: stdout of commands
+        """
+        return [stdout for _, stdout, _ in query_in_scripts(self._connection, commands, self.max_script_length)]
 
     def list_queue(self, vswitch_name: str) -> str:
         """
@@ -12,6 +12,12 @@ Contents:
 -VM
     representation of single Hyper-V Virtual Machine (guest) which manages operations executed on the guest
 
+-VMInterfacesMatchingResult
+    dataclass with outcome of matching interfaces of single Virtual Machine
+
+-VMLifecycleResult
+    dataclass with outcome of starting, stopping or restarting single Virtual Machine with host-side job
+
 -HypervHypervisor
     representation of Hypervisor containing API for Powershell cmdlets that manage Virtual Machines on the Host
 """
@@ -20,6 +26,8 @@ import logging
 import random
 import re
 import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, Union, List, Optional, TYPE_CHECKING
@@ -33,30 +41,124 @@ from mfd_ping import Ping
 from mfd_typing import OSName
 from netaddr.ip import IPAddress, IPNetwork
 
+from mfd_hyperv.attributes.vm_metering_report import METERING_PROPERTIES, VMMeteringReport
 from mfd_hyperv.attributes.vm_params import VMParams
 from mfd_hyperv.attributes.vm_processor_attributes import VMProcessorAttributes
+from mfd_hyperv.connections.batch import batchable, query_in_scripts, run_in_scripts
 from mfd_hyperv.exceptions import HyperVExecutionException, HyperVException
-from mfd_hyperv.helpers import standardise_value
+from mfd_hyperv.helpers import quote_powershell, standardise_value
 from mfd_hyperv.instances.vm_network_interface import VM
+from mfd_hyperv.tracing import traced, span
 
 if TYPE_CHECKING:
     from mfd_hyperv import HyperV
+    from mfd_hyperv.boot_admission import BootAdmission, HostLoad
+    from mfd_hyperv.instances.vm_network_interface import VMNetworkInterface
+    from mfd_hyperv.vmswitch_ports import VMSwitchPortDirectory
 
 
 logger = logging.getLogger(__name__)
 add_logging_level(level_name="MODULE_DEBUG", level_value=log_levels.MODULE_DEBUG)
 
-
+_NETWORK_TRAFFIC_PROPERTY = (
+    "@{{n='Network{direction}';e={{($_.NetworkMeteredTrafficReport | Where-Object {{ $_.Direction -eq '{direction}' }}"
+    " | Measure-Object -Property TotalTraffic -Sum).Sum}}}}"
+)
+# properties selected from Measure-VM, parsed into VMMeteringReport
+METERING_SELECT = ", ".join(
+    [
+        "VMName",
+        "@{n='MeteringMilliseconds';e={[long]$_.MeteringDuration.TotalMilliseconds}}",
+        *(
+            name
+            for name in METERING_PROPERTIES.values()
+            if name not in ("MeteringMilliseconds", "NetworkInbound", "NetworkOutbound")
+        ),
+        _NETWORK_TRAFFIC_PROPERTY.format(direction="Inbound"),
+        _NETWORK_TRAFFIC_PROPERTY.format(direction="Outbound"),
+    ]
+)
+
+
+@dataclass
+class VMInterfacesMatchingResult:
+    """Outcome of matching interfaces of single VM.
+
+    vm_name: name of VM
+    interfaces: VM interfaces matched with interfaces seen from guest
+    elapsed: duration of guest interfaces discovery and matching in seconds
+    error: exception raised during matching, None if matching succeeded
+    """
+
+    vm_name: str
+    interfaces: List["VMNetworkInterface"] = field(default_factory=list)
+    elapsed: float = 0.0
+    error: Optional[Exception] = None
+
+
+@dataclass
+class VMLifecycleResult:
+    """Outcome of starting, stopping or restarting single VM with host-side job.
+
+    vm_name: name of VM
+    action: start, stop or restart
+    state: last state of VM read from host
+    elapsed: time from launching job until VM reached expected state or failed, in seconds
+    error: exception describing failure, None if VM reached expected state
+    """
+
+    vm_name: str
+    action: str
+    state: str = ""
+    elapsed: float = 0.0
+    error: Optional[Exception] = None
+
+    @property
+    def succeeded(self) -> bool:
+        """Whether VM reached expected state."""
+        return self.error is None
+
+
+@dataclass
+class _VMJobRun:
+    """State of VM jobs waited by HypervHypervisor._run_vm_jobs.
+
+    expected_state: state of VM after successful action
+    results: VM name -> outcome
+    waiting: VMs which jobs weren't launched yet
+    running: job ID -> VM name of running jobs
+    pending_ip: running VMs waiting for management IP
+    started: VM name -> time of launching its job
+    launched_jobs: IDs of all launched jobs
+    """
+
+    expected_state: str
+    results: Dict[str, VMLifecycleResult]
+    waiting: List[str]
+    running: Dict[int, str] = field(default_factory=dict)
+    pending_ip: List[str] = field(default_factory=list)
+    started: Dict[str, float] = field(default_factory=dict)
+    launched_jobs: List[int] = field(default_factory=list)
+
+    @property
+    def in_progress(self) -> bool:
+        """Whether any VM isn't finished."""
+        return bool(self.waiting or self.running or self.pending_ip)
+
+
+@traced()
 class HypervHypervisor:
     """Module for HyperV."""
 
     @os_supported(OSName.WINDOWS)
-    def __init__(self, *, connection: "Connection"):
+    def __init__(self, *, connection: "Connection", port_directory: Optional["VMSwitchPortDirectory"] = None):
         """Class constructor.
 
         :param connection: connection instance of MFD connect class.
+        :param port_directory: cache of vmswitch ports invalidated whenever VMs are removed
         """
         self._connection = connection
+        self.port_directory = port_directory
         self.vms = []
 
     def is_hyperv_enabled(self) -> bool:
@@ -95,6 +197,32 @@ class HypervHypervisor:
         :param connection_timeout: timeout of RPyCConnection to VM
         :param dynamic_mng_ip: To enable or disable dynamic mng ip allocation
         """
+        self.define_vm(vm_params)
+
+        self.start_vm(vm_params.name)
+        try:
+            with span("wait_vm_mng_ip", vm_name=vm_params.name):
+                mng_ip = self._wait_vm_mng_ips(vm_params.name, timeout=180)
+        except HyperVException as e:
+            logger.error(f"Failed to get VM {vm_params.name} management IP: {e}")
+        if dynamic_mng_ip:
+            vm_params.mng_ip = mng_ip
+
+        with span("rpyc_connect", vm_name=vm_params.name):
+            vm_connection = RPyCConnection(ip=vm_params.mng_ip, connection_timeout=connection_timeout)
+        vm = VM(vm_connection, vm_params, owner, hyperv, connection_timeout)
+
+        self.vms.append(vm)
+        return vm
+
+    def define_vm(self, vm_params: VMParams) -> None:
+        """Create VM using the specified vm_params without starting it.
+
+        VM gets disk, processors, memory and management adapter connected to vm_params.vswitch_name.
+
+        :param vm_params: dictionary of VM parameters
+        :raises: HyperVExecutionException when any of configuration commands fails
+        """
         commands = [
             f'New-VM "{vm_params.name}" -Generation {vm_params.generation} -Path {vm_params.vm_dir_path}',
             f'Add-VMHardDiskDrive -VMName "{vm_params.name}" -Path {vm_params.diff_disk_path}',
@@ -110,22 +238,50 @@ class HypervHypervisor:
         ]
 
         logger.log(level=log_levels.MODULE_DEBUG, msg=f"Create VM {vm_params.name}")
-        for command in commands:
-            self._connection.execute_powershell(command=command, custom_exception=HyperVExecutionException)
+        with span("configure_vm", vm_name=vm_params.name):
+            for command in commands:
+                self._connection.execute_powershell(command=command, custom_exception=HyperVExecutionException)
 
-        self.start_vm(vm_params.name)
-        try:
-            mng_ip = self._wait_vm_mng_ips(vm_params.name, timeout=180)
-        except HyperVException as e:
-            logger.error(f"Failed to get VM {vm_params.name} management IP: {e}")
-        if dynamic_mng_ip:
-            vm_params.mng_ip = mng_ip
+    def match_all_interfaces(self, vms: List[VM], max_workers: int = 8) -> Dict[str, VMInterfacesMatchingResult]:
+        """Match interfaces of all given VMs with interfaces seen from their guests.
 
-        vm_connection = RPyCConnection(ip=vm_params.mng_ip, connection_timeout=connection_timeout)
-        vm = VM(vm_connection, vm_params, owner, hyperv, connection_timeout)
+        VM adapters of all VMs are retrieved from host in one query of VMNetworkInterfaceManager.get_vm_interfaces,
+        which caches them in `all_vnics_attributes`, guest interfaces discovery runs concurrently.
 
-        self.vms.append(vm)
-        return vm
+        :param vms: virtual machines which interfaces will be matched
+        :param max_workers: maximum number of VMs matched at the same time
+        :raises: HyperVException when information about VM adapters cannot be retrieved
+        :return: matching results keyed by VM name
+        """
+        if not vms:
+            return {}
+
+        vm_network_interface_manager = vms[0].hyperv.vm_network_interface_manager
+        vm_network_interface_manager.get_vm_interfaces([vm.name for vm in vms])
+
+        def _match(vm: VM) -> VMInterfacesMatchingResult:
+            matching_result = VMInterfacesMatchingResult(vm_name=vm.name)
+            start_time = time.perf_counter()
+            try:
+                matching_result.interfaces = vm.match_interfaces(
+                    from_host_vm_interfaces=vm_network_interface_manager.all_vnics_attributes[vm.name],
+                    from_vm_interfaces=vm.guest.get_interfaces(),
+                )
+            except Exception as e:
+                matching_result.error = e
+            matching_result.elapsed = time.perf_counter() - start_time
+            return matching_result
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = {matching_result.vm_name: matching_result for matching_result in executor.map(_match, vms)}
+
+        for matching_result in results.values():
+            logger.log(
+                level=log_levels.MODULE_DEBUG,
+                msg=f"VM {matching_result.vm_name} interfaces matching took {matching_result.elapsed:.2f}s"
+                f"{f' and failed: {matching_result.error}' if matching_result.error else ''}",
+            )
+        return results
 
     def remove_vm(self, vm_name: str = "*") -> None:
         """Remove specified VM or all VMs.
@@ -133,9 +289,13 @@ class HypervHypervisor:
         :param vm_name: Virtual Machine name
         """
         logger.log(level=log_levels.MODULE_DEBUG, msg=f"Removing {vm_name if vm_name != '*' else 'all'} VM")
-        self._connection.execute_powershell(
-            f"Remove-VM -name {vm_name} -force -Confirm:$false", custom_exception=HyperVExecutionException
-        )
+        try:
+            self._connection.execute_powershell(
+                f"Remove-VM -name {vm_name} -force -Confirm:$false", custom_exception=HyperVExecutionException
+            )
+        finally:
+            if self.port_directory is not None:
+                self.port_directory.invalidate()
         if vm_name == "*":
             self.vms.clear()
         else:
@@ -143,6 +303,7 @@ class HypervHypervisor:
             if vm is not None:
                 self.vms.remove(vm)
 
+    @batchable
     def start_vm(self, vm_name: str = "*") -> None:
         """Start VM with given name, if no name will be provided all VMs will be started.
 
@@ -153,6 +314,7 @@ class HypervHypervisor:
         if result.return_code:
             raise HyperVException(f"Cannot start VM{'s' if vm_name == '*' else f' {vm_name}'}")
 
+    @batchable
     def stop_vm(self, vm_name: str = "*", turnoff: bool = False) -> None:
         """Stop VM with given name, if no name will be provided all VMs will be stopped.
 
@@ -248,6 +410,258 @@ class HypervHypervisor:
         if result.return_code:
             raise HyperVException(f"Cannot restart VM{'s' if vm_name == '*' else f' {vm_name}'}")
 
+    def start_vms(
+        self,
+        vm_names: List[str],
+        max_concurrent: Optional[int] = None,
+        timeout: float = 300,
+        poll_interval: float = 1.0,
+        admission: Optional["BootAdmission"] = None,
+    ) -> Dict[str, VMLifecycleResult]:
+        """Start VMs with host-side jobs and wait until all of them are running, see `_run_vm_jobs`.
+
+        :param vm_names: names of VMs
+        :param max_concurrent: maximum number of VMs booting at once, next VMs are started when previous ones are
+                               running, all VMs are started at once when not given
+        :param timeout: maximum time waited for all VMs in seconds
+        :param poll_interval: time between polls of VM and job states in seconds
+        :param admission: controller admitting next VMs when load of host allows, see BootAdmission; load signals
+                          are read in the same host script as states of VMs and jobs
+        :raises: HyperVException when jobs cannot be launched or polled
+        :return: VM name -> outcome, failed VMs have `error` set
+        """
+        return self._run_vm_jobs(
+            "start",
+            vm_names,
+            "Start-VM -Name {vm_name} -AsJob",
+            "Running",
+            max_concurrent,
+            timeout,
+            poll_interval,
+            admission,
+        )
+
+    def stop_vms(
+        self,
+        vm_names: List[str],
+        turnoff: bool = False,
+        max_concurrent: Optional[int] = None,
+        timeout: float = 300,
+        poll_interval: float = 1.0,
+    ) -> Dict[str, VMLifecycleResult]:
+        """Stop VMs with host-side jobs and wait until all of them are off, see `_run_vm_jobs`.
+
+        :param vm_names: names of VMs
+        :param turnoff: whether let VMs shutdown or "disconnect power from VMs"
+        :param max_concurrent: maximum number of VMs stopping at once, all VMs are stopped at once when not given
+        :param timeout: maximum time waited for all VMs in seconds
+        :param poll_interval: time between polls of VM and job states in seconds
+        :raises: HyperVException when jobs cannot be launched or polled
+        :return: VM name -> outcome, failed VMs have `error` set
+        """
+        command = "Stop-VM -Name {vm_name}" + (" -Force -TurnOff -Confirm:$false" if turnoff else "") + " -AsJob"
+        return self._run_vm_jobs("stop", vm_names, command, "Off", max_concurrent, timeout, poll_interval)
+
+    def restart_vms(
+        self,
+        vm_names: List[str],
+        max_concurrent: Optional[int] = None,
+        timeout: float = 300,
+        poll_interval: float = 1.0,
+    ) -> Dict[str, VMLifecycleResult]:
+        """Restart VMs with host-side jobs and wait until all of them are running again, see `_run_vm_jobs`.
+
+        :param vm_names: names of VMs
+        :param max_concurrent: maximum number of VMs rebooting at once, all VMs are restarted at once when not given
+        :param timeout: maximum time waited for all VMs in seconds
+        :param poll_interval: time between polls of VM and job states in seconds
+        :raises: HyperVException when jobs cannot be launched or polled
+        :return: VM name -> outcome, failed VMs have `error` set
+        """
+        return self._run_vm_jobs(
+            "restart",
+            vm_names,
+            "Restart-VM -Name {vm_name} -Force -Confirm:$false -AsJob",
+            "Running",
+            max_concurrent,
+            timeout,
+            poll_interval,
+        )
+
+    def _run_vm_jobs(
+        self,
+        action: str,
+        vm_names: List[str],
+        command: str,
+        expected_state: str,
+        max_concurrent: Optional[int],
+        timeout: float,
+        poll_interval: float,
+        admission: Optional["BootAdmission"] = None,
+    ) -> Dict[str, VMLifecycleResult]:
+        """Run cmdlet of every VM as host-side job and wait for all of them with shared polls.
+
+        Jobs of VMs are launched in one host script, every poll reads states of all VMs and their jobs (and load of
+        host when admission is used) in one host script, so number of round trips doesn't grow with number of VMs.
+        VM is done when its job is completed and VM reached expected state, with admission waiting for IP also when
+        its management adapter got IP. Jobs are removed when waiting ends, jobs of VMs which timed out are stopped.
+
+        :param action: name of action reported in results
+        :param vm_names: names of VMs
+        :param command: cmdlet call with {vm_name} placeholder, must create job (-AsJob)
+        :param expected_state: state of VM after successful action
+        :param max_concurrent: maximum number of running jobs, None for no limit
+        :param timeout: maximum time waited for all VMs in seconds
+        :param poll_interval: time between polls in seconds
+        :param admission: controller deciding how many VMs are launched in every poll
+        :raises: HyperVException when parameters are incorrect or jobs cannot be launched or polled
+        :return: VM name -> outcome
+        """
+        if max_concurrent is not None and max_concurrent < 1:
+            raise HyperVException(f"Maximum number of concurrent VM jobs must be positive, got {max_concurrent}")
+        results = {vm_name: VMLifecycleResult(vm_name=vm_name, action=action) for vm_name in vm_names}
+        run = _VMJobRun(expected_state=expected_state, results=results, waiting=list(results))
+        deadline = time.monotonic() + timeout
+        try:
+            while True:
+                load = None
+                if run.running or run.pending_ip or (admission is not None and run.waiting):
+                    load = self._poll_vm_jobs(run, admission)
+                if not run.in_progress:
+                    break
+                if time.monotonic() >= deadline:
+                    self._fail_timed_out_vms(run, action, timeout)
+                    break
+                slots = len(run.waiting) if max_concurrent is None else max_concurrent - len(run.running)
+                if admission is not None:
+                    slots = min(slots, admission.admit(load, len(run.waiting)))
+                if slots > 0 and run.waiting:
+                    self._launch_vm_jobs(command, run, slots)
+                time.sleep(poll_interval)
+        finally:
+            if run.launched_jobs:
+                self._connection.execute_powershell(
+                    f"Remove-Job -Id {', '.join(map(str, run.launched_jobs))} -Force", expected_return_codes=None
+                )
+        failed = [vm_name for vm_name, result in results.items() if not result.succeeded]
+        logger.log(
+            level=log_levels.MODULE_DEBUG,
+            msg=f"VM {action} finished for {len(results) - len(failed)}/{len(results)} VMs"
+            + (f", failed: {', '.join(failed)}" if failed else ""),
+        )
+        return results
+
+    def _launch_vm_jobs(self, command: str, run: "_VMJobRun", count: int) -> None:
+        """Launch jobs of next waiting VMs in host scripts split by length.
+
+        Script stops at failing command so remaining ones are launched again, VMs which jobs couldn't be launched have
+        error set.
+        """
+        pending = run.waiting[:count]
+        del run.waiting[:count]
+        commands = [[f"({command.format(vm_name=quote_powershell(vm_name))}).Id"] for vm_name in pending]
+        for index, ((return_code, stdout, stderr),) in run_in_scripts(self._connection, commands):
+            vm_name = pending[index]
+            run.started[vm_name] = time.monotonic()
+            if return_code or not stdout.strip().isdigit():
+                run.results[vm_name].error = HyperVExecutionException(
+                    returncode=return_code, cmd=commands[index][0], output=stdout, stderr=stderr
+                )
+            else:
+                run.running[int(stdout.strip())] = vm_name
+                run.launched_jobs.append(int(stdout.strip()))
+
+    def _poll_vm_jobs(self, run: "_VMJobRun", admission: Optional["BootAdmission"]) -> Optional["HostLoad"]:
+        """Read states of VMs and their jobs and load of host in one host script, finished VMs are removed from run.
+
+        :return: load of host when admission is used
+        """
+        tracked = [*run.running.values(), *run.pending_ip]
+        queries = {}
+        if tracked:
+            queries["vms"] = f"Get-VM -Name {self._vm_names_argument(tracked)} | Select-Object Name, State | fl"
+        if run.running:
+            queries["jobs"] = f"Get-Job -Id {', '.join(map(str, run.running))} | Select-Object Id, State | fl"
+        if admission is not None:
+            queries.update(admission.queries(run.pending_ip))
+        outputs = self._query_vm_jobs(queries)
+        now = time.monotonic()
+
+        vm_states = {record["Name"]: record.get("State", "") for record in self._parse_records(outputs.get("vms"))}
+        for vm_name in tracked:
+            run.results[vm_name].state = vm_states.get(vm_name, "")
+        with_ip = admission.read_ips(outputs) if admission is not None else set()
+        for vm_name in list(run.pending_ip):
+            result = run.results[vm_name]
+            if vm_name not in with_ip and result.state == run.expected_state:
+                continue
+            if vm_name not in with_ip:
+                result.error = HyperVException(f"VM {vm_name} is {result.state or 'gone'} while waiting for IP")
+            result.elapsed = now - run.started[vm_name]
+            run.pending_ip.remove(vm_name)
+
+        job_states = {
+            int(record["Id"]): record.get("State", "") for record in self._parse_records(outputs.get("jobs"))
+        }
+        for job_id, vm_name in list(run.running.items()):
+            result, job_state = run.results[vm_name], job_states.get(job_id, "")
+            if job_state in ("Failed", "Stopped"):
+                error = self._get_job_error(job_id)
+                result.error = HyperVException(f"Job {job_id} of VM {vm_name} {job_state.lower()}: {error}")
+            elif not (job_state == "Completed" and result.state == run.expected_state):
+                continue
+            del run.running[job_id]
+            if result.succeeded and admission is not None and admission.wait_for_ip:
+                run.pending_ip.append(vm_name)
+            else:
+                result.elapsed = now - run.started[vm_name]
+
+        if admission is None:
+            return None
+        return admission.read_load(outputs, booting=len(run.running), waiting_for_ip=len(run.pending_ip))
+
+    def _query_vm_jobs(self, queries: Dict[str, str]) -> Dict[str, str]:
+        """Execute queries in host scripts, failure of optional counters query (the last one) is tolerated.
+
+        :return: query name -> output
+        """
+        try:
+            results = query_in_scripts(
+                self._connection, list(queries.values()), tolerate_last_failure="counters" in queries
+            )
+        except HyperVExecutionException as e:
+            raise HyperVException(f"Couldn't read states of VMs and jobs: {e.stderr.strip()}") from e
+        outputs = {}
+        for name, (return_code, stdout, stderr) in zip(queries, results):
+            if return_code:
+                logger.log(level=log_levels.MODULE_DEBUG, msg=f"Couldn't read host load counters: {stderr.strip()}")
+            outputs[name] = "" if return_code else stdout
+        return outputs
+
+    @staticmethod
+    def _parse_records(output: Optional[str]) -> List[Dict[str, str]]:
+        return parse_powershell_list(output) if output and output.strip() else []
+
+    def _get_job_error(self, job_id: int) -> str:
+        """Get error written by failed job."""
+        result = self._connection.execute_powershell(f"Receive-Job -Id {job_id}", expected_return_codes=None)
+        return result.stderr.strip() or result.stdout.strip() or "no error reported"
+
+    @staticmethod
+    def _fail_timed_out_vms(run: "_VMJobRun", action: str, timeout: float) -> None:
+        now = time.monotonic()
+        for vm_name in run.running.values():
+            run.results[vm_name].elapsed = now - run.started[vm_name]
+            run.results[vm_name].error = HyperVException(
+                f"VM {vm_name} didn't reach '{run.expected_state}' state within {timeout}s, "
+                f"last state: {run.results[vm_name].state or 'unknown'}"
+            )
+        for vm_name in run.pending_ip:
+            run.results[vm_name].elapsed = now - run.started[vm_name]
+            run.results[vm_name].error = HyperVException(f"VM {vm_name} didn't get management IP within {timeout}s")
+        for vm_name in run.waiting:
+            run.results[vm_name].error = HyperVException(f"VM {action} wasn't launched within {timeout}s")
+
     def clear_vm_locations(self) -> None:
         """Clear all possible VMs locations."""
         logger.log(level=log_levels.MODULE_DEBUG, msg="Clean all possible VMs locations.")
@@ -292,6 +706,7 @@ class HypervHypervisor:
 
         return parse_powershell_list(result.stdout.lower())[0]
 
+    @batchable
     def set_vm_processor_attribute(
         self, vm_name: str, attribute: Union[VMProcessorAttributes, str], value: Union[str, int, bool]
     ) -> None:
@@ -313,6 +728,83 @@ class HypervHypervisor:
         if result.return_code:
             raise HyperVException(f"Couldn't set VMProcessor attribute {attribute} value {value} of VM {vm_name}")
 
+    @staticmethod
+    def _vm_names_argument(vm_names: List[str]) -> str:
+        return ", ".join(quote_powershell(vm_name) for vm_name in vm_names)
+
+    @batchable
+    def enable_resource_metering(self, vm_names: List[str]) -> None:
+        """Enable resource metering of VMs in one call.
+
+        :param vm_names: names of VMs
+        :raises: HyperVExecutionException when metering cannot be enabled
+        """
+        if vm_names:
+            self._connection.execute_powershell(
+                f"Enable-VMResourceMetering -VMName {self._vm_names_argument(vm_names)}",
+                custom_exception=HyperVExecutionException,
+            )
+
+    @batchable
+    def disable_resource_metering(self, vm_names: List[str]) -> None:
+        """Disable resource metering of VMs in one call.
+
+        :param vm_names: names of VMs
+        :raises: HyperVExecutionException when metering cannot be disabled
+        """
+        if vm_names:
+            self._connection.execute_powershell(
+                f"Disable-VMResourceMetering -VMName {self._vm_names_argument(vm_names)}",
+                custom_exception=HyperVExecutionException,
+            )
+
+    @batchable
+    def reset_resource_metering(self, vm_names: List[str]) -> None:
+        """Reset resource metering of VMs in one call, reports start from zero.
+
+        :param vm_names: names of VMs
+        :raises: HyperVExecutionException when metering cannot be reset
+        """
+        if vm_names:
+            self._connection.execute_powershell(
+                f"Reset-VMResourceMetering -VMName {self._vm_names_argument(vm_names)}",
+                custom_exception=HyperVExecutionException,
+            )
+
+    def measure_vms(self, vm_names: List[str]) -> Dict[str, VMMeteringReport]:
+        """Collect resource metering reports of VMs in one call.
+
+        Reports are cumulative since metering was enabled or reset, use `diff_metering` to get usage between two
+        collections.
+
+        :param vm_names: names of VMs with metering enabled
+        :raises: HyperVExecutionException when reports cannot be collected, e.g. metering of VM isn't enabled
+        :return: VM name -> report
+        """
+        if not vm_names:
+            return {}
+        result = self._connection.execute_powershell(
+            f"Measure-VM -VMName {self._vm_names_argument(vm_names)} | Select-Object {METERING_SELECT} | fl",
+            custom_exception=HyperVExecutionException,
+        )
+        reports = [VMMeteringReport.from_record(record) for record in parse_powershell_list(result.stdout)]
+        return {report.vm_name: report for report in reports}
+
+    @staticmethod
+    def diff_metering(
+        before: Dict[str, VMMeteringReport], after: Dict[str, VMMeteringReport]
+    ) -> Dict[str, VMMeteringReport]:
+        """Get resource usage of VMs between two collections of reports, see VMMeteringReport.since.
+
+        :param before: reports collected earlier
+        :param after: reports collected later
+        :return: VM name -> usage in interval, for VMs present in later collection
+        """
+        return {
+            vm_name: report.since(before[vm_name]) if vm_name in before else report
+            for vm_name, report in after.items()
+        }
+
     def _get_disks_free_space(self) -> Dict[str, Dict[str, str]]:
         """Get each disk free space.
 
@@ -712,7 +1204,9 @@ class HypervHypervisor:
 
         :param: dir_path: path to directory which has to be emptied
         """
-        logger.log(level=log_levels.MODULE_DEBUG, msg=f"Remove all folders and files from {dir_path} after VMs cleanup")
+        logger.log(
+            level=log_levels.MODULE_DEBUG, msg=f"Remove all folders and files from {dir_path} after VMs cleanup"
+        )
         self._connection.execute_powershell(
             "get-childitem -Recurse | remove-item -recurse -confirm:$false", cwd=dir_path
         )
@@ -3,15 +3,17 @@
 """Vm class."""
 
 import logging
-from dataclasses import asdict
+from dataclasses import asdict, dataclass, field
 from time import sleep
-from typing import Dict, Union, List, TYPE_CHECKING
+from typing import Dict, Union, List, Optional, TYPE_CHECKING
 
 from mfd_common_libs import add_logging_level, log_levels
 from mfd_connect import RPyCConnection, Connection
+from mfd_hyperv.attributes.vm_metering_report import VMMeteringReport
 from mfd_hyperv.attributes.vm_params import VMParams
-from mfd_hyperv.exceptions import HyperVException
+from mfd_hyperv.exceptions import HyperVException, HyperVInterfaceMatchingException
 from mfd_hyperv.hypervisor import VMProcessorAttributes
+from mfd_hyperv.tracing import traced, span
 from mfd_network_adapter import NetworkAdapterOwner
 from mfd_typing import MACAddress
 from mfd_typing.network_interface import InterfaceType
@@ -19,12 +21,31 @@ from mfd_typing.network_interface import InterfaceType
 if TYPE_CHECKING:
     from mfd_hyperv import HyperV
     from mfd_hyperv.instances.vm_network_interface import VMNetworkInterface
+    from mfd_network_adapter import NetworkInterface
 
 
 logger = logging.getLogger(__name__)
 add_logging_level(level_name="MODULE_DEBUG", level_value=log_levels.MODULE_DEBUG)
 
 
+@dataclass
+class InterfaceMatchingDiagnostic:
+    """Items left unpaired after matching VM interfaces.
+
+    unmatched_vnics: VM interfaces without host record or without VMBus/VMNIC interface in guest
+    unmatched_sriov_vnics: SRIOV VM interfaces without Virtual Function in guest
+    unmatched_guest_interfaces: VMBus/VMNIC guest interfaces not paired with any created VM interface
+    duplicate_mac_guest_interfaces: guest interfaces with MAC address of earlier interface of the same kind
+                                    (VMBus/VMNIC or VF), which make pairing ambiguous
+    """
+
+    unmatched_vnics: List["VMNetworkInterface"] = field(default_factory=list)
+    unmatched_sriov_vnics: List["VMNetworkInterface"] = field(default_factory=list)
+    unmatched_guest_interfaces: List["NetworkInterface"] = field(default_factory=list)
+    duplicate_mac_guest_interfaces: List["NetworkInterface"] = field(default_factory=list)
+
+
+@traced(vm_name="name")
 class VM:
     """VM class."""
 
@@ -89,6 +110,24 @@ class VM:
         self.attributes = self.hyperv.hypervisor.get_vm_attributes(self.name)
         return self.attributes
 
+    def enable_resource_metering(self) -> None:
+        """Enable resource metering of VM on host (hypervisor)."""
+        self.hyperv.hypervisor.enable_resource_metering([self.name])
+
+    def disable_resource_metering(self) -> None:
+        """Disable resource metering of VM on host (hypervisor)."""
+        self.hyperv.hypervisor.disable_resource_metering([self.name])
+
+    def measure(self) -> VMMeteringReport:
+        """Get resource usage of VM since metering was enabled or reset.
+
+        :raises: HyperVException when report of VM is missing
+        """
+        report = self.hyperv.hypervisor.measure_vms([self.name]).get(self.name)
+        if report is None:
+            raise HyperVException(f"Couldn't get resource metering report of VM {self.name}")
+        return report
+
     def start(self, timeout: int = 300) -> None:
         """Start VM from host (hypervisor) and wait for it to be functional.
 
@@ -96,9 +135,10 @@ class VM:
         """
         self.hyperv.hypervisor.start_vm(self.name)
         self.hyperv.hypervisor.wait_vm_functional(self.name, self.mng_ip, timeout)
-        self.connection = RPyCConnection(
-            self.mng_ip, connection_timeout=self.connection_timeout, retry_timeout=timeout, retry_time=10
-        )
+        with span("rpyc_connect", vm_name=self.name):
+            self.connection = RPyCConnection(
+                self.mng_ip, connection_timeout=self.connection_timeout, retry_timeout=timeout, retry_time=10
+            )
 
     def stop(self, timeout: int = 300) -> None:
         """Stop VM from host (hypervisor).
@@ -171,60 +211,112 @@ class VM:
             logger.log(level=log_levels.MODULE_DEBUG, msg="Retrieving Vm interfaces seen from Hypervisor")
             return self.get_vm_interfaces()
 
-    def _check_vnic_correct_matching(self, created_vm_interfaces: List["VMNetworkInterface"]) -> None:
-        """Check if matching was successful, if not raise Exception.
-
-        :param created_vm_interfaces: list of vnics after matching VM interfaces witt VM Guest OS interfaces
-        """
-        all_have_iface = all(hasattr(vnic, "interface") for vnic in created_vm_interfaces)
-        if not all_have_iface:
-            raise Exception(f"VM {self} nics couldn't be matched with interfaces on VM guest os")
-        sriov_have_vf = all(hasattr(vnic.interface, "vf") for vnic in created_vm_interfaces if vnic.sriov)
-        if not sriov_have_vf:
-            logger.warning("VM interfaces that were not matched with Virtual Function interface")
-            for iface in [nic.interface for nic in created_vm_interfaces if nic.sriov]:
-                logger.log(level=log_levels.MODULE_DEBUG, msg=iface.name)
-            raise Exception(f"VM {self} SRIOV nics couldn't be matched with Virtual Functions nics on VM guest os.")
+    def pair_interfaces(
+        self,
+        from_host_vm_interfaces: List[Dict[str, str]],
+        from_vm_interfaces: List["NetworkInterface"],
+    ) -> "InterfaceMatchingDiagnostic":
+        """Pair VM network interfaces created on host with VMBus/VMNIC and VF interfaces seen from guest.
 
-    def match_interfaces(self) -> List["VMNetworkInterface"]:
-        """Match vm interfaces with interfaces seen from host.
+        Pairing is done with MAC address indexes, so it takes linear time in number of interfaces. Guest interface
+        with MAC address of earlier interface of the same kind isn't paired and is reported in diagnostic.
 
-        In addition, match virtual functions with normal adapters.
+        :param from_host_vm_interfaces: VM adapters records retrieved from host
+        :param from_vm_interfaces: interfaces retrieved from VM guest OS
+        :return: items that couldn't be paired
         """
-        logger.log(level=log_levels.MODULE_DEBUG, msg="Get VM interfaces seen from Hypervisor")
-        from_host_vm_interfaces = self._get_ifaces_from_vm()
-        logger.log(level=log_levels.MODULE_DEBUG, msg="Get interfaces seen from VM guest")
-        from_vm_interfaces = self.guest.get_interfaces()
         created_vm_interfaces = [
             iface for iface in self.hyperv.vm_network_interface_manager.vm_interfaces if iface.vm == self
         ]
-
-        # matching will be performed using macaddress
+        host_macs = {info["name"]: info["macaddress"] for info in from_host_vm_interfaces}
+
+        diagnostic = InterfaceMatchingDiagnostic()
+        guest_vmbus_by_mac = {}
+        guest_vf_by_mac = {}
+        for vm_iface in from_vm_interfaces:
+            if vm_iface.interface_type in [InterfaceType.VMNIC, InterfaceType.VMBUS]:
+                guest_by_mac = guest_vmbus_by_mac
+            elif vm_iface.interface_type == InterfaceType.VF:
+                guest_by_mac = guest_vf_by_mac
+            else:
+                continue
+            if vm_iface.mac_address in guest_by_mac:
+                diagnostic.duplicate_mac_guest_interfaces.append(vm_iface)
+                continue
+            guest_by_mac[vm_iface.mac_address] = vm_iface
+
+        # match Vfs
+        for mac, vm_iface in guest_vmbus_by_mac.items():
+            vf = guest_vf_by_mac.get(mac)
+            if vf is not None:
+                vm_iface.vf = vf
+                vf.owner = self.guest
+
+        matched_macs = set()
         for iface in created_vm_interfaces:
-            for vm_iface_info in from_host_vm_interfaces:
-                if iface.interface_name.lower() == vm_iface_info["name"]:
-                    iface.mac = MACAddress(vm_iface_info["macaddress"])
+            host_mac = host_macs.get(iface.interface_name.lower())
+            if host_mac is None:
+                diagnostic.unmatched_vnics.append(iface)
+                continue
+            iface.mac = MACAddress(host_mac)
+
+            # match from-host and from-vm interfaces
+            vm_iface = guest_vmbus_by_mac.get(iface.mac)
+            if vm_iface is None:
+                diagnostic.unmatched_vnics.append(iface)
+                continue
+            iface.interface = vm_iface
+            vm_iface.owner = self.guest
+            matched_macs.add(iface.mac)
+
+            if iface.sriov and guest_vf_by_mac.get(iface.mac) is None:
+                diagnostic.unmatched_sriov_vnics.append(iface)
+
+        diagnostic.unmatched_guest_interfaces = [
+            vm_iface for mac, vm_iface in guest_vmbus_by_mac.items() if mac not in matched_macs
+        ]
+        return diagnostic
 
-        for iface in created_vm_interfaces:
-            for vm_iface in from_vm_interfaces:
-                # match from-host and from-vm interfaces
-                if iface.mac == vm_iface.mac_address and vm_iface.interface_type in [
-                    InterfaceType.VMNIC,
-                    InterfaceType.VMBUS,
-                ]:
-                    iface.interface = vm_iface
-                    vm_iface.owner = iface.vm.guest
-
-                # match Vfs
-                for other_vm_iface in from_vm_interfaces:
-                    if vm_iface == other_vm_iface:
-                        continue
-                    if (
-                        vm_iface.mac_address == other_vm_iface.mac_address
-                        and other_vm_iface.interface_type == InterfaceType.VF
-                    ):
-                        vm_iface.vf = other_vm_iface
-                        vm_iface.vf.owner = iface.vm.guest
-
-        self._check_vnic_correct_matching(created_vm_interfaces)
-        return created_vm_interfaces
+    def match_interfaces(
+        self,
+        from_host_vm_interfaces: Optional[List[Dict[str, str]]] = None,
+        from_vm_interfaces: Optional[List["NetworkInterface"]] = None,
+    ) -> List["VMNetworkInterface"]:
+        """Match vm interfaces with interfaces seen from host.
+
+        In addition, match virtual functions with normal adapters.
+
+        :param from_host_vm_interfaces: VM adapters records retrieved from host, retrieved when not given
+        :param from_vm_interfaces: interfaces retrieved from VM guest OS, retrieved when not given
+        :raises: HyperVInterfaceMatchingException when not all VM interfaces could be matched or guest interfaces
+                 have duplicated MAC addresses
+        :return: VM interfaces matched with interfaces seen from guest
+        """
+        if from_host_vm_interfaces is None:
+            logger.log(level=log_levels.MODULE_DEBUG, msg="Get VM interfaces seen from Hypervisor")
+            from_host_vm_interfaces = self._get_ifaces_from_vm()
+        if from_vm_interfaces is None:
+            logger.log(level=log_levels.MODULE_DEBUG, msg="Get interfaces seen from VM guest")
+            from_vm_interfaces = self.guest.get_interfaces()
+
+        diagnostic = self.pair_interfaces(from_host_vm_interfaces, from_vm_interfaces)
+        if diagnostic.duplicate_mac_guest_interfaces:
+            raise HyperVInterfaceMatchingException(
+                f"VM {self} guest os has interfaces with duplicated MAC addresses: "
+                f"{[str(iface.mac_address) for iface in diagnostic.duplicate_mac_guest_interfaces]}",
+                diagnostic,
+            )
+        if diagnostic.unmatched_vnics:
+            raise HyperVInterfaceMatchingException(
+                f"VM {self} nics couldn't be matched with interfaces on VM guest os: "
+                f"{[vnic.interface_name for vnic in diagnostic.unmatched_vnics]}",
+                diagnostic,
+            )
+        if diagnostic.unmatched_sriov_vnics:
+            logger.warning("VM interfaces that were not matched with Virtual Function interface")
+            for vnic in diagnostic.unmatched_sriov_vnics:
+                logger.log(level=log_levels.MODULE_DEBUG, msg=vnic.interface.name)
+            raise HyperVInterfaceMatchingException(
+                f"VM {self} SRIOV nics couldn't be matched with Virtual Functions nics on VM guest os.", diagnostic
+            )
+        return [iface for iface in self.hyperv.vm_network_interface_manager.vm_interfaces if iface.vm == self]
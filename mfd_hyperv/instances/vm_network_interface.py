@@ -12,8 +12,10 @@ from mfd_hyperv.exceptions import HyperVException
 from mfd_hyperv.helpers import standardise_value
 from mfd_hyperv.instances.vm import VM
 from mfd_hyperv.instances.vswitch import VSwitch
+from mfd_hyperv.tracing import traced
 
 
+@traced(vm_name="vm_name", interface_name="interface_name")
 class VMNetworkInterface:
     """VMNetworkInterface class."""
 
@@ -5,6 +5,7 @@
 import time
 from typing import Union, Dict, List, Optional
 
+from mfd_common_libs import TimeoutCounter
 from mfd_connect import Connection
 from mfd_network_adapter import NetworkInterface
 from mfd_network_adapter.network_adapter_owner.exceptions import NetworkAdapterIncorrectData
@@ -13,8 +14,10 @@ from mfd_network_adapter.network_interface.windows import WindowsNetworkInterfac
 from mfd_hyperv.attributes.vswitchattributes import VSwitchAttributes
 from mfd_hyperv.exceptions import HyperVException
 from mfd_hyperv.helpers import standardise_value
+from mfd_hyperv.tracing import traced, span
 
 
+@traced(include=("__init__",), vswitch_name="interface_name")
 class VSwitch:
     """VSwitch class.
 
@@ -24,6 +27,10 @@ class VSwitch:
     name - name of adapter seen by OS
     """
 
+    adapter_discovery_timeout = 60
+    adapter_discovery_interval = 0.2
+    adapter_discovery_max_interval = 2
+
     def __init__(
         self,
         interface_name: str,
@@ -32,6 +39,7 @@ class VSwitch:
         enable_teaming: bool = False,
         connection: Optional["Connection"] = None,
         host_adapters: Optional[List[NetworkInterface]] = None,
+        lazy_interface: bool = False,
     ):
         """Class constructor.
 
@@ -41,6 +49,8 @@ class VSwitch:
         :param enable_teaming: is teaming enabled (in case of multiple ports)
         :param connection: connection instance of MFD connect class.
         :params host_adapters: adapters from config that vswitch is attached to.
+        :param lazy_interface: find adapter of vswitch seen by OS on first access of `interface` instead of in
+                               constructor
         """
         self.interface_name = interface_name
         self.host_adapter_names = host_adapter_names
@@ -54,18 +64,57 @@ class VSwitch:
         self.interfaces = host_adapters  # list of interfaces seen from host that vswitch is created on
         self.interface = None  # vswitch seen as interface from host
         self.owner = None
+        self.discovery_attempts = 0
 
         if host_adapters:
             self.interfaces_binding()
-            time.sleep(3)
+            if not lazy_interface:
+                self.discover_interface()
+
+    @property
+    def interface(self) -> Optional[NetworkInterface]:
+        """Adapter of vswitch seen by OS, found on first access when it wasn't found yet and interfaces are bound.
+
+        :raises: HyperVException when adapter cannot be found
+        """
+        if self._interface is None and self.owner is not None:
+            self.discover_interface()
+        return self._interface
 
-            adapter_absent = True
-            while adapter_absent:
+    @interface.setter
+    def interface(self, value: Optional[NetworkInterface]) -> None:
+        """Interface property setter."""
+        self._interface = value
+
+    def discover_interface(self, timeout: Optional[float] = None) -> NetworkInterface:
+        """Find adapter of vswitch seen by OS.
+
+        Adapter is looked up right away and then with interval growing from `adapter_discovery_interval` up to
+        `adapter_discovery_max_interval` until timeout expires.
+
+        :param timeout: maximum time of looking for adapter, `adapter_discovery_timeout` by default
+        :raises: HyperVException when adapter cannot be found within timeout
+        :return: found adapter
+        """
+        timeout = self.adapter_discovery_timeout if timeout is None else timeout
+        delay = self.adapter_discovery_interval
+        attempts = 0
+        with span("wait_vswitch_adapter", vswitch_name=self.interface_name):
+            timeout_reached = TimeoutCounter(timeout)
+            while True:
+                attempts += 1
+                self.discovery_attempts += 1
                 try:
-                    self.interface = self.owner.get_interface(interface_name=self.name)
-                    adapter_absent = False
+                    self._interface = self.owner.get_interface(interface_name=self.name)
+                    return self._interface
                 except NetworkAdapterIncorrectData:
-                    pass
+                    if timeout_reached:
+                        break
+                time.sleep(delay)
+                delay = min(delay * 2, self.adapter_discovery_max_interval)
+        raise HyperVException(
+            f"Cannot find adapter {self.name} of vSwitch {self.interface_name} after {attempts} attempts in {timeout}s"
+        )
 
     def __str__(self):
         return f"{self.interface_name} ({[iface.name for iface in self.interfaces]})"
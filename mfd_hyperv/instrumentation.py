@@ -0,0 +1,295 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: MIT
+"""Module for instrumentation of commands executed on Hyper-V host.
+
+Contents:
+-CommandStats
+    dataclass with call count, latency histogram, stdout size and failures of single command
+
+-CommandMetrics
+    thread-safe registry of CommandStats keyed by logical operation and command name
+
+-InstrumentedConnection
+    connection that records every command executed on host in CommandMetrics
+"""
+
+import json
+import re
+import sys
+import threading
+import time
+from bisect import bisect_left
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union, TYPE_CHECKING
+
+from mfd_hyperv.connections.batch import BATCH_SCRIPT_TAG, get_flushed_call_names
+from mfd_hyperv.connections.proxy import ConnectionProxy
+from mfd_hyperv.tracing import span
+
+if TYPE_CHECKING:
+    from mfd_connect import Connection
+    from mfd_connect.base import ConnectionCompletedProcess
+    from mfd_connect.process import RemoteProcess
+
+LATENCY_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+UNKNOWN_OPERATION = "<unknown>"
+
+_POWERSHELL_PREFIX_REGEX = re.compile(r"^\s*powershell(?:\.exe)?\s+(?:-\w+\s+)*[\"']?", re.IGNORECASE)
+_COMMAND_NAME_REGEX = re.compile(r"[\w.-]+")
+_ASSIGNMENT_REGEX = re.compile(r"^\s*(?:\$\w+\s*=[^;]*;\s*)+")
+_VFPCTRL_TARGET_OPTIONS = {"switch", "port", "layer", "group", "rule", "queue"}
+
+
+def get_command_name(command: str) -> str:
+    """Get name of cmdlet or tool executed by command.
+
+    For vfpctrl its first action option is added, e.g. 'vfpctrl /add-queue', batch scripts are named 'batch'.
+    Leading assignments of variables (e.g. '$FormatEnumerationLimit = -1;') are skipped.
+
+    :param command: command executed on host
+    :return: lowercase command name
+    """
+    if command.startswith(BATCH_SCRIPT_TAG):
+        return "batch"
+    command = _ASSIGNMENT_REGEX.sub("", _POWERSHELL_PREFIX_REGEX.sub("", command))
+    match = _COMMAND_NAME_REGEX.search(command)
+    if not match:
+        return command.strip().lower()
+
+    name = match.group().lower()
+    if name == "vfpctrl":
+        for option in re.findall(r"\s/([\w-]+)", command):
+            if option.lower() not in _VFPCTRL_TARGET_OPTIONS:
+                return f"{name} /{option.lower()}"
+    return name
+
+
+def get_current_operation() -> str:
+    """Get name of innermost mfd_hyperv method which is currently executing a command.
+
+    Commands flushed by batch are attributed to queued calls they belong to, names of different calls flushed in one
+    host script are joined with '+'.
+
+    :return: operation name in form of 'ClassName.method_name'
+    """
+    flushed_call_names = get_flushed_call_names()
+    if flushed_call_names:
+        return "+".join(flushed_call_names)
+    frame = sys._getframe(1)
+    while frame is not None:
+        module_name = frame.f_globals.get("__name__", "")
+        if module_name.startswith("mfd_hyperv.") and not module_name.startswith(
+            ("mfd_hyperv.connections", "mfd_hyperv.instrumentation", "mfd_hyperv.tracing")
+        ):
+            self_object = frame.f_locals.get("self")
+            method_name = frame.f_code.co_name
+            return f"{type(self_object).__name__}.{method_name}" if self_object is not None else method_name
+        frame = frame.f_back
+    return UNKNOWN_OPERATION
+
+
+@dataclass
+class CommandStats:
+    """Statistics of single command executed on host.
+
+    count: number of calls
+    failures: number of calls that raised exception or returned non-zero return code
+    total_time: total latency in seconds
+    min_time: minimal latency in seconds
+    max_time: maximal latency in seconds
+    stdout_size: total size of stdout in characters
+    histogram: number of calls per latency bucket, last bucket counts calls slower than LATENCY_BUCKETS[-1]
+    """
+
+    count: int = 0
+    failures: int = 0
+    total_time: float = 0.0
+    min_time: Optional[float] = None
+    max_time: float = 0.0
+    stdout_size: int = 0
+    histogram: List[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS) + 1))
+
+    @property
+    def mean_time(self) -> float:
+        """Mean latency in seconds."""
+        return self.total_time / self.count if self.count else 0.0
+
+    def add(self, elapsed: float, stdout_size: int, failed: bool) -> None:
+        """Add single call to statistics.
+
+        :param elapsed: latency of call in seconds
+        :param stdout_size: size of stdout in characters
+        :param failed: whether call failed
+        """
+        self.count += 1
+        self.failures += int(failed)
+        self.total_time += elapsed
+        self.min_time = elapsed if self.min_time is None else min(self.min_time, elapsed)
+        self.max_time = max(self.max_time, elapsed)
+        self.stdout_size += stdout_size
+        self.histogram[bisect_left(LATENCY_BUCKETS, elapsed)] += 1
+
+    def merge(self, other: "CommandStats") -> None:
+        """Add statistics of other command to this one.
+
+        :param other: statistics to add
+        """
+        self.count += other.count
+        self.failures += other.failures
+        self.total_time += other.total_time
+        if other.min_time is not None:
+            self.min_time = other.min_time if self.min_time is None else min(self.min_time, other.min_time)
+        self.max_time = max(self.max_time, other.max_time)
+        self.stdout_size += other.stdout_size
+        self.histogram = [mine + theirs for mine, theirs in zip(self.histogram, other.histogram)]
+
+
+class CommandMetrics:
+    """Registry of statistics of commands executed on host, keyed by logical operation and command name."""
+
+    def __init__(self):
+        """Class constructor."""
+        self._lock = threading.Lock()
+        self._stats: Dict[Tuple[str, str], CommandStats] = {}
+
+    def record(self, operation: str, command_name: str, elapsed: float, stdout_size: int, failed: bool) -> None:
+        """Record single command call.
+
+        :param operation: logical operation which executed command
+        :param command_name: name of executed cmdlet or tool
+        :param elapsed: latency of call in seconds
+        :param stdout_size: size of stdout in characters
+        :param failed: whether call failed
+        """
+        with self._lock:
+            self._stats.setdefault((operation, command_name), CommandStats()).add(elapsed, stdout_size, failed)
+
+    def reset(self) -> None:
+        """Remove all recorded statistics."""
+        with self._lock:
+            self._stats.clear()
+
+    @property
+    def round_trips(self) -> int:
+        """Total number of commands executed on host."""
+        with self._lock:
+            return sum(stats.count for stats in self._stats.values())
+
+    def get_stats(self) -> Dict[Tuple[str, str], CommandStats]:
+        """Get copy of statistics keyed by (operation, command name)."""
+        with self._lock:
+            return {key: CommandStats(**asdict(stats)) for key, stats in self._stats.items()}
+
+    def _group_by(self, index: int) -> Dict[str, CommandStats]:
+        grouped = {}
+        for key, stats in self.get_stats().items():
+            grouped.setdefault(key[index], CommandStats()).merge(stats)
+        return grouped
+
+    def by_operation(self) -> Dict[str, CommandStats]:
+        """Get statistics aggregated per logical operation."""
+        return self._group_by(0)
+
+    def by_command(self) -> Dict[str, CommandStats]:
+        """Get statistics aggregated per command name."""
+        return self._group_by(1)
+
+    def most_expensive(self, limit: int = 10) -> List[Tuple[Tuple[str, str], CommandStats]]:
+        """Get (operation, command name) pairs that took most time in total.
+
+        :param limit: number of returned entries
+        :return: list of ((operation, command name), statistics) sorted by total time descending
+        """
+        return sorted(self.get_stats().items(), key=lambda item: item[1].total_time, reverse=True)[:limit]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Get statistics in JSON serializable form."""
+        return {
+            "latency_buckets": list(LATENCY_BUCKETS),
+            "commands": [
+                {"operation": operation, "command": command_name, **asdict(stats)}
+                for (operation, command_name), stats in sorted(self.get_stats().items())
+            ],
+        }
+
+    def export(self, file_path: Union[str, Path]) -> None:
+        """Export statistics to JSON file.
+
+        :param file_path: path of created file
+        """
+        Path(file_path).write_text(json.dumps(self.to_dict(), indent=2))
+
+    @classmethod
+    def load(cls, file_path: Union[str, Path]) -> "CommandMetrics":
+        """Load statistics exported to JSON file.
+
+        :param file_path: path of file created by export
+        :return: metrics with loaded statistics
+        """
+        metrics = cls()
+        for entry in json.loads(Path(file_path).read_text())["commands"]:
+            key = (entry.pop("operation"), entry.pop("command"))
+            metrics._stats[key] = CommandStats(**entry)
+        return metrics
+
+    def compare(self, baseline: "CommandMetrics") -> Dict[Tuple[str, str], Dict[str, float]]:
+        """Compare statistics with statistics of other run.
+
+        :param baseline: statistics of reference run
+        :return: differences of call count and total time keyed by (operation, command name)
+        """
+        current_stats = self.get_stats()
+        baseline_stats = baseline.get_stats()
+        comparison = {}
+        for key in sorted(current_stats.keys() | baseline_stats.keys()):
+            current = current_stats.get(key, CommandStats())
+            reference = baseline_stats.get(key, CommandStats())
+            comparison[key] = {
+                "count_delta": current.count - reference.count,
+                "total_time_delta": current.total_time - reference.total_time,
+            }
+        return comparison
+
+
+class InstrumentedConnection(ConnectionProxy):
+    """Connection recording latency, stdout size and failures of every command executed on host."""
+
+    def __init__(self, connection: "Connection", metrics: CommandMetrics):
+        """Class constructor.
+
+        :param connection: connection instance of MFD connect class.
+        :param metrics: registry where statistics are recorded
+        """
+        super().__init__(connection)
+        self.metrics = metrics
+
+    def _call(self, method_name: str, command: str, *args, **kwargs) -> Any:
+        operation = get_current_operation()
+        command_name = get_command_name(command)
+        failed = True
+        stdout_size = 0
+        start_time = time.perf_counter()
+        try:
+            with span(command_name, category="host_command", operation=operation):
+                result = getattr(self._wrapped_connection, method_name)(command, *args, **kwargs)
+            failed = False
+            if method_name != "start_process":
+                stdout = getattr(result, "stdout", None)
+                stdout_size = len(stdout) if isinstance(stdout, str) else 0
+                failed = bool(getattr(result, "return_code", 0))
+            return result
+        finally:
+            self.metrics.record(operation, command_name, time.perf_counter() - start_time, stdout_size, failed)
+
+    def execute_command(self, command: str, **kwargs) -> "ConnectionCompletedProcess":
+        """Execute command and record its statistics."""
+        return self._call("execute_command", command, **kwargs)
+
+    def execute_powershell(self, command: str, **kwargs) -> "ConnectionCompletedProcess":
+        """Execute powershell command and record its statistics."""
+        return self._call("execute_powershell", command, **kwargs)
+
+    def start_process(self, command: str, **kwargs) -> "RemoteProcess":
+        """Start process and record latency of its start."""
+        return self._call("start_process", command, **kwargs)
@@ -0,0 +1,308 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: MIT
+"""Planner of HW QoS scheduler queues sharing uplink of vSwitch.
+
+Every VM gets own scheduler queue associated with its ports on vSwitch. Reservations are weighted max-min fair shares
+of reservable part of link speed among VM demands, caps are weighted max-min fair shares of whole link speed among VM
+bursts (not lower than reservation), so reservations never exceed link speed and VM which asks for less than its
+fair share leaves the rest to others.
+
+Contents:
+-VMDemand
+    bandwidth requested by VM
+
+-QueueAllocation
+    scheduler queue planned for VM
+
+-QoSPlan
+    allocations with problems found during validation and operations applying them
+
+-max_min_fair_share
+    weighted max-min fair allocation of capacity
+
+-QoSPlanner
+    creates plans for vSwitches and applies them with HWQoS
+"""
+
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, Hashable, List, Optional, TYPE_CHECKING
+
+from mfd_common_libs import add_logging_level, log_levels
+
+from mfd_hyperv.exceptions import HyperVException
+from mfd_hyperv.hw_qos import QoSLayout, QoSOperation, QoSOperationResult
+from mfd_hyperv.tracing import traced
+from mfd_hyperv.vfpctrl_parser import QueueSpec
+
+if TYPE_CHECKING:
+    from mfd_hyperv.hw_qos import HWQoS
+
+logger = logging.getLogger(__name__)
+add_logging_level(level_name="MODULE_DEBUG", level_value=log_levels.MODULE_DEBUG)
+
+
+@dataclass
+class VMDemand:
+    """Bandwidth requested by VM, in Mbps.
+
+    vm_name: name of VM
+    demand: bandwidth VM should be guaranteed, base of reservation
+    weight: share of VM when link cannot satisfy all VMs
+    burst: bandwidth VM may use when link is free, base of cap, `demand` when not given
+    """
+
+    vm_name: str
+    demand: int
+    weight: float = 1.0
+    burst: Optional[int] = None
+
+    @property
+    def max_rate(self) -> int:
+        """Bandwidth VM may use when link is free."""
+        return self.demand if self.burst is None else self.burst
+
+
+@dataclass
+class QueueAllocation:
+    """Scheduler queue planned for VM.
+
+    vm_name: name of VM
+    sq_id: ID of scheduler queue
+    sq_name: name of scheduler queue
+    tx_reserve: transmit reservation in Mbps
+    tx_max: transmit limit in Mbps
+    ports: vmswitch ports of VM associated with queue
+    """
+
+    vm_name: str
+    sq_id: str
+    sq_name: str
+    tx_reserve: int
+    tx_max: int
+    ports: List[str] = field(default_factory=list)
+
+
+@dataclass
+class QoSPlan:
+    """Scheduler queues planned for vSwitch.
+
+    vswitch_name: name of vSwitch
+    link_speed: speed of uplink in Mbps
+    allocations: queues planned for VMs in order of demands
+    problems: reasons why plan cannot be applied, e.g. capabilities of vSwitch not enabled
+    limit: whether infra-host limits are enforced by queues
+    layer_id: ID of layer added to ports
+    layer_name: name of layer added to ports
+    """
+
+    vswitch_name: str
+    link_speed: int
+    allocations: List[QueueAllocation] = field(default_factory=list)
+    problems: List[str] = field(default_factory=list)
+    limit: bool = True
+    layer_id: int = 10
+    layer_name: str = "QOS"
+
+    def __str__(self) -> str:
+        lines = [f"vSwitch {self.vswitch_name} ({self.link_speed} Mbps):"]
+        lines += [
+            f"  {allocation.vm_name}: queue {allocation.sq_id} reserve {allocation.tx_reserve} Mbps, "
+            f"max {allocation.tx_max} Mbps, ports {', '.join(allocation.ports) or '-'}"
+            for allocation in self.allocations
+        ]
+        lines += [f"  problem: {problem}" for problem in self.problems]
+        return "\n".join(lines)
+
+    @property
+    def is_valid(self) -> bool:
+        """Whether plan can be applied."""
+        return not self.problems
+
+    @property
+    def reserved(self) -> int:
+        """Sum of reservations in Mbps."""
+        return sum(allocation.tx_reserve for allocation in self.allocations)
+
+    @property
+    def operations(self) -> List[QoSOperation]:
+        """Operations creating queues and associating them with ports, see HWQoS.execute_operations."""
+        operations = [
+            QoSOperation(
+                "create_scheduler_queue",
+                {
+                    "vswitch_name": self.vswitch_name,
+                    "sq_id": allocation.sq_id,
+                    "sq_name": allocation.sq_name,
+                    "limit": self.limit,
+                    "tx_max": str(allocation.tx_max),
+                    "tx_reserve": str(allocation.tx_reserve),
+                    "rx_max": "0",
+                },
+            )
+            for allocation in self.allocations
+        ]
+        operations += [
+            QoSOperation(
+                "associate_scheduler_queues_with_vport",
+                {
+                    "vswitch_name": self.vswitch_name,
+                    "vport": port,
+                    "sq_id": allocation.sq_id,
+                    "lid": self.layer_id,
+                    "lname": self.layer_name,
+                },
+            )
+            for allocation in self.allocations
+            for port in allocation.ports
+        ]
+        return operations
+
+    @property
+    def layout(self) -> QoSLayout:
+        """Layout of queues and ports of plan, see HWQoS.reconcile."""
+        return QoSLayout(
+            vswitch_name=self.vswitch_name,
+            queues=[
+                QueueSpec(
+                    sq_id=allocation.sq_id,
+                    name=allocation.sq_name,
+                    tx_max=str(allocation.tx_max),
+                    limit=self.limit,
+                    tx_reserve=str(allocation.tx_reserve),
+                )
+                for allocation in self.allocations
+            ],
+            port_queues={port: allocation.sq_id for allocation in self.allocations for port in allocation.ports},
+            layer_id=self.layer_id,
+            layer_name=self.layer_name,
+        )
+
+
+def max_min_fair_share(
+    capacity: float, demands: Dict[Hashable, float], weights: Optional[Dict[Hashable, float]] = None
+) -> Dict[Hashable, float]:
+    """Divide capacity in weighted max-min fair way.
+
+    No demand gets more than it asks for, demands which cannot be satisfied get shares proportional to their weights
+    and none of them can be increased without decreasing share of demand with not greater share per weight.
+
+    :param capacity: capacity to divide
+    :param demands: key -> demand
+    :param weights: key -> positive weight, 1 when not given
+    :return: key -> allocation, sum of allocations doesn't exceed capacity
+    """
+    weights = weights or {}
+    allocations = {}
+    remaining, total_weight = capacity, sum(weights.get(key, 1.0) for key in demands)
+    # progressive filling, demands with the lowest demand per weight are satisfied first
+    for key in sorted(demands, key=lambda item: demands[item] / weights.get(item, 1.0)):
+        weight = weights.get(key, 1.0)
+        allocations[key] = min(demands[key], remaining * weight / total_weight)
+        remaining -= allocations[key]
+        total_weight -= weight
+    return {key: allocations[key] for key in demands}
+
+
+@traced()
+class QoSPlanner:
+    """Planner of scheduler queues dividing uplink of vSwitch among VMs."""
+
+    def __init__(self, hw_qos: "HWQoS"):
+        """Class constructor.
+
+        :param hw_qos: HWQoS used to read capabilities and ports of vSwitch and to apply plans
+        """
+        self.hw_qos = hw_qos
+
+    def plan(
+        self,
+        vswitch_name: str,
+        link_speed: int,
+        demands: List[VMDemand],
+        reservation_ratio: float = 1.0,
+        first_sq_id: int = 1,
+        limit: bool = True,
+    ) -> QoSPlan:
+        """Plan scheduler queues of VMs and validate them against QoS configuration of vSwitch.
+
+        Configuration of vSwitch and ports of all VMs are read in two round trips.
+
+        :param vswitch_name: name of vSwitch
+        :param link_speed: speed of uplink in Mbps
+        :param demands: bandwidth requested by VMs
+        :param reservation_ratio: part of link speed which can be reserved, rest is left for unreserved traffic
+        :param first_sq_id: ID of queue of first VM, next VMs get consecutive IDs
+        :param limit: whether infra-host limits are enforced by queues
+        :raises HyperVException: when demands or parameters are incorrect
+        :return: plan, check `problems` before applying it
+        """
+        self._check_demands(link_speed, demands, reservation_ratio)
+        weights = {demand.vm_name: demand.weight for demand in demands}
+        reservations = max_min_fair_share(
+            link_speed * reservation_ratio, {demand.vm_name: demand.demand for demand in demands}, weights
+        )
+        caps = max_min_fair_share(link_speed, {demand.vm_name: demand.max_rate for demand in demands}, weights)
+        ports = self.hw_qos.resolve_vmswitch_port_names(vswitch_name, [demand.vm_name for demand in demands])
+
+        plan = QoSPlan(vswitch_name=vswitch_name, link_speed=link_speed, limit=limit)
+        for index, demand in enumerate(demands):
+            sq_id = str(first_sq_id + index)
+            plan.allocations.append(
+                QueueAllocation(
+                    vm_name=demand.vm_name,
+                    sq_id=sq_id,
+                    sq_name=f"SQ{sq_id}",
+                    tx_reserve=int(reservations[demand.vm_name]),
+                    # fair share of bursts may be lower than reservation when other VMs burst more
+                    tx_max=int(max(caps[demand.vm_name], reservations[demand.vm_name])),
+                    ports=ports[demand.vm_name],
+                )
+            )
+        plan.problems = self._validate(plan, self.hw_qos.get_qos_config(vswitch_name))
+        logger.log(level=log_levels.MODULE_DEBUG, msg=f"QoS plan:\n{plan}")
+        return plan
+
+    def apply(self, plan: QoSPlan, stop_on_failure: bool = True) -> List[QoSOperationResult]:
+        """Create queues of plan and associate them with ports in one host script.
+
+        :param plan: plan to apply
+        :param stop_on_failure: whether to skip operations following failed one
+        :raises HyperVException: when plan has problems
+        :return: status of operations, see HWQoS.execute_operations
+        """
+        if not plan.is_valid:
+            raise HyperVException(f"QoS plan of vSwitch {plan.vswitch_name} cannot be applied: {plan.problems}")
+        return self.hw_qos.execute_operations(plan.operations, stop_on_failure=stop_on_failure)
+
+    @staticmethod
+    def _check_demands(link_speed: int, demands: List[VMDemand], reservation_ratio: float) -> None:
+        if link_speed <= 0:
+            raise HyperVException(f"Link speed must be positive, got {link_speed}")
+        if not 0 <= reservation_ratio <= 1:
+            raise HyperVException(f"Reservation ratio must be between 0 and 1, got {reservation_ratio}")
+        vm_names = [demand.vm_name for demand in demands]
+        if len(set(vm_names)) != len(vm_names):
+            raise HyperVException(f"VMs have to be unique, got {vm_names}")
+        for demand in demands:
+            if demand.demand < 0 or demand.weight <= 0 or demand.max_rate < demand.demand:
+                raise HyperVException(
+                    f"Incorrect demand of VM {demand.vm_name}: demand must not be negative, weight must be positive "
+                    f"and burst must not be lower than demand"
+                )
+
+    @staticmethod
+    def _validate(plan: QoSPlan, qos_config: Dict[str, str | bool]) -> List[str]:
+        problems = []
+        if plan.reserved > plan.link_speed:
+            problems.append(f"Reservations ({plan.reserved} Mbps) exceed link speed ({plan.link_speed} Mbps)")
+        if plan.reserved and not (qos_config.get("hw_reserv") or qos_config.get("sw_reserv")):
+            problems.append(f"Neither hardware nor software reservations are enabled on vSwitch {plan.vswitch_name}")
+        if any(allocation.tx_max for allocation in plan.allocations) and not qos_config.get("hw_caps"):
+            problems.append(f"Hardware caps are not enabled on vSwitch {plan.vswitch_name}")
+        problems += [
+            f"VM {allocation.vm_name} has no ports on vSwitch {plan.vswitch_name}"
+            for allocation in plan.allocations
+            if not allocation.ports
+        ]
+        return problems
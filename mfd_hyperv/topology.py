@@ -0,0 +1,531 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: MIT
+"""Declarative topology of Hyper-V host.
+
+Topology (vSwitches with HW QoS scheduler queues, VMs and their network interfaces with VLAN and RDMA settings) is
+described by TopologySpec. TopologyReconciler reads state of host in one round trip, compares it with spec and
+executes only operations needed to reach it, independent vSwitches and VMs are configured in parallel.
+
+Contents:
+-VSwitchSpec, VNicSpec, VMSpec, TopologySpec
+    dataclasses describing expected topology, queues are described by vfpctrl_parser.QueueSpec
+
+-HostSnapshot
+    state of host topology read in one round trip
+
+-TopologyPlan
+    operations needed to reach expected topology, grouped in independent branches
+
+-TopologyReconciler
+    creates plans and executes them
+"""
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple, TYPE_CHECKING
+
+from mfd_common_libs import add_logging_level, log_levels
+from mfd_connect.util.powershell_utils import parse_powershell_list
+
+from mfd_hyperv.attributes.vm_network_interface_attributes import VMNetworkInterfaceAttributes
+from mfd_hyperv.attributes.vm_params import VMParams
+from mfd_hyperv.connections.batch import run_in_scripts
+from mfd_hyperv.exceptions import HyperVException, HyperVReconcileException
+from mfd_hyperv.tracing import span, traced
+from mfd_hyperv.vfpctrl_parser import QueueSpec, parse_queues
+
+if TYPE_CHECKING:
+    from mfd_hyperv import HyperV
+
+logger = logging.getLogger(__name__)
+add_logging_level(level_name="MODULE_DEBUG", level_value=log_levels.MODULE_DEBUG)
+
+SNAPSHOT_COMMANDS = {
+    "vswitches": "Get-VMSwitch | select Name, IovEnabled, EmbeddedTeamingEnabled | fl",
+    "vms": "Get-VM | select Name, State | fl",
+    "vnics": "Get-VMNetworkAdapter -VMName * | select VMName, Name, SwitchName, IovWeight, VmqWeight | fl",
+    "vlans": "Get-VMNetworkAdapterVlan -VMName * | fl",
+    "rdma": "Get-VMNetworkAdapterRdma -VMName * | fl",
+}
+QUEUE_QUERY = "vfpctrl /switch {vswitch_name} /list-queue"
+
+
+@dataclass
+class VSwitchSpec:
+    """vSwitch created on host adapters.
+
+    name: name of vSwitch, used as is
+    interface_names: names of host adapters vSwitch is created on
+    enable_iov: whether SRIOV is enabled
+    enable_teaming: whether embedded teaming is enabled
+    queues: HW QoS scheduler queues of vSwitch
+    """
+
+    name: str
+    interface_names: List[str]
+    enable_iov: bool = False
+    enable_teaming: bool = False
+    queues: List[QueueSpec] = field(default_factory=list)
+
+
+@dataclass
+class VNicSpec:
+    """Network interface of VM.
+
+    name: name of VM network adapter
+    vswitch: name of vSwitch adapter is connected to, None for disconnected adapter
+    sriov: whether adapter uses SRIOV (IovWeight 100)
+    vmq: whether adapter uses VMQ (VmqWeight 100)
+    vlan_id: access VLAN ID, None for untagged adapter
+    rdma: whether RDMA is enabled (RdmaWeight 100)
+    """
+
+    name: str
+    vswitch: Optional[str] = None
+    sriov: bool = False
+    vmq: bool = True
+    vlan_id: Optional[int] = None
+    rdma: bool = False
+
+
+@dataclass
+class VMSpec:
+    """Virtual Machine with its network interfaces.
+
+    name: name of VM
+    vnics: network interfaces of VM, other interfaces of VM are left untouched
+    params: parameters used to create VM when it doesn't exist (see HypervHypervisor.define_vm)
+    running: expected state of VM, None when state doesn't matter
+    """
+
+    name: str
+    vnics: List[VNicSpec] = field(default_factory=list)
+    params: Optional[VMParams] = None
+    running: Optional[bool] = None
+
+
+@dataclass
+class TopologySpec:
+    """Expected topology of host, vSwitches and VMs which are not described are left untouched."""
+
+    vswitches: List[VSwitchSpec] = field(default_factory=list)
+    vms: List[VMSpec] = field(default_factory=list)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "TopologySpec":
+        """Create spec from dictionary, e.g. loaded from YAML or JSON file.
+
+        Usage:
+            TopologySpec.from_dict({
+                "vswitches": [
+                    {"name": "VS1", "interface_names": ["SLOT 1 Port 1"], "queues": [
+                        {"sq_id": 1, "name": "SQ1", "tx_max": 1000}
+                    ]},
+                ],
+                "vms": [
+                    {"name": "VM1", "running": True, "vnics": [{"name": "vnic1", "vswitch": "VS1", "vlan_id": 10}]},
+                ],
+            })
+
+        :param data: dictionary with lists of vswitches and vms, keys match fields of spec dataclasses
+        :return: topology spec
+        """
+        vswitches = [
+            VSwitchSpec(**{**item, "queues": [QueueSpec(**queue) for queue in item.get("queues", [])]})
+            for item in data.get("vswitches", [])
+        ]
+        vms = []
+        for item in data.get("vms", []):
+            params = item.get("params")
+            vms.append(
+                VMSpec(
+                    **{
+                        **item,
+                        "vnics": [VNicSpec(**vnic) for vnic in item.get("vnics", [])],
+                        "params": VMParams(**params) if isinstance(params, dict) else params,
+                    }
+                )
+            )
+        return cls(vswitches=vswitches, vms=vms)
+
+
+@dataclass
+class VNicState:
+    """State of VM network interface read from host."""
+
+    vswitch: Optional[str]
+    sriov: bool
+    vmq: bool
+    vlan_id: Optional[int]
+    rdma: bool
+
+
+@dataclass
+class HostSnapshot:
+    """State of host topology.
+
+    vswitches: vSwitch name -> (IOV enabled, teaming enabled)
+    vms: VM name -> state
+    vnics: (VM name, adapter name) -> state of adapter
+    queues: vSwitch name -> scheduler queues, only for vSwitches with queues in spec
+    """
+
+    vswitches: Dict[str, Tuple[bool, bool]] = field(default_factory=dict)
+    vms: Dict[str, str] = field(default_factory=dict)
+    vnics: Dict[Tuple[str, str], VNicState] = field(default_factory=dict)
+    queues: Dict[str, Dict[str, QueueSpec]] = field(default_factory=dict)
+
+
+@dataclass
+class TopologyOperation:
+    """Single manager call of plan."""
+
+    description: str
+    function: Callable
+    args: tuple = ()
+    kwargs: Dict[str, Any] = field(default_factory=dict)
+
+    def __str__(self) -> str:
+        return self.description
+
+    def run(self) -> Any:
+        """Execute operation."""
+        return self.function(*self.args, **self.kwargs)
+
+
+@dataclass
+class TopologyPlan:
+    """Operations needed to reach expected topology.
+
+    Operations of single branch are executed in order. vSwitch branches are independent of each other and are
+    executed before VM branches, which are independent of each other too.
+
+    vswitch_branches: vSwitch name -> operations
+    vm_branches: VM name -> operations
+    """
+
+    vswitch_branches: Dict[str, List[TopologyOperation]] = field(default_factory=dict)
+    vm_branches: Dict[str, List[TopologyOperation]] = field(default_factory=dict)
+
+    def __str__(self) -> str:
+        lines = []
+        for kind, branches in (("vSwitch", self.vswitch_branches), ("VM", self.vm_branches)):
+            for name, operations in branches.items():
+                lines.append(f"{kind} {name}:")
+                lines.extend(f"  {operation}" for operation in operations)
+        return "\n".join(lines) if lines else "Topology is up to date"
+
+    @property
+    def operations(self) -> List[TopologyOperation]:
+        """All operations of plan."""
+        branches = [*self.vswitch_branches.values(), *self.vm_branches.values()]
+        return [operation for operations in branches for operation in operations]
+
+    @property
+    def is_empty(self) -> bool:
+        """Whether host already has expected topology."""
+        return not self.operations
+
+
+@dataclass
+class ReconcileResult:
+    """Outcome of plan execution.
+
+    plan: executed plan
+    errors: branch name (vSwitch or VM name) -> exception which stopped branch
+    elapsed: duration of snapshot and plan execution in seconds
+    """
+
+    plan: TopologyPlan
+    errors: Dict[str, Exception] = field(default_factory=dict)
+    elapsed: float = 0.0
+
+
+@traced()
+class TopologyReconciler:
+    """Reconciler of declarative host topology."""
+
+    def __init__(self, hyperv: "HyperV", max_workers: int = 8):
+        """Class constructor.
+
+        :param hyperv: HyperV object which managers are used to change topology
+        :param max_workers: maximal number of branches executed in parallel
+        """
+        self.hyperv = hyperv
+        self.max_workers = max_workers
+
+    def snapshot(self, spec: TopologySpec) -> HostSnapshot:
+        """Read state of host topology.
+
+        All queries are executed in one host script, queues of vSwitches which don't exist yet need one more
+        round trip.
+
+        :param spec: expected topology, queues are read only for vSwitches with queues in spec
+        :return: state of host
+        """
+        queries = list(SNAPSHOT_COMMANDS.values())
+        queue_switches = [vswitch.name for vswitch in spec.vswitches if vswitch.queues]
+        queries += [QUEUE_QUERY.format(vswitch_name=name) for name in queue_switches]
+        results = self._query(queries)
+        outputs = dict(zip(SNAPSHOT_COMMANDS, results))
+        for name, (return_code, _, stderr) in outputs.items():
+            if return_code:
+                raise HyperVException(f"Couldn't read {name} of host: {stderr.strip()}")
+
+        snapshot = HostSnapshot()
+        for item in self._parse(outputs["vswitches"]):
+            snapshot.vswitches[item["Name"]] = (item["IovEnabled"] == "True", item["EmbeddedTeamingEnabled"] == "True")
+        snapshot.vms = {item["Name"]: item["State"] for item in self._parse(outputs["vms"])}
+        vlans = {
+            (item["VMName"], item["AdapterName"]): item for item in self._parse(outputs["vlans"]) if item.get("VMName")
+        }
+        rdma = {(item["VMName"], item["Name"]): item for item in self._parse(outputs["rdma"]) if item.get("VMName")}
+        for item in self._parse(outputs["vnics"]):
+            key = (item["VMName"], item["Name"])
+            vlan = vlans.get(key, {})
+            snapshot.vnics[key] = VNicState(
+                vswitch=item["SwitchName"] or None,
+                sriov=int(item["IovWeight"] or 0) > 0,
+                vmq=int(item["VmqWeight"] or 0) > 0,
+                vlan_id=int(vlan["AccessVlanId"]) if vlan.get("OperationMode") == "Access" else None,
+                rdma=int(rdma.get(key, {}).get("RdmaWeight") or 0) > 0,
+            )
+        first_queue_result = len(SNAPSHOT_COMMANDS)
+        for name, (return_code, stdout, _) in zip(queue_switches, results[first_queue_result:]):
+            if not return_code:
+                snapshot.queues[name] = parse_queues(stdout)
+        return snapshot
+
+    def plan(self, spec: TopologySpec, snapshot: Optional[HostSnapshot] = None) -> TopologyPlan:
+        """Compute operations needed to reach expected topology.
+
+        :param spec: expected topology
+        :param snapshot: state of host, read from host when not given
+        :raises: HyperVException when VM is missing and spec has no parameters to create it
+        :return: plan
+        """
+        if snapshot is None:
+            snapshot = self.snapshot(spec)
+        plan = TopologyPlan()
+        recreated = set()
+        for vswitch in spec.vswitches:
+            operations, was_recreated = self._plan_vswitch(vswitch, snapshot)
+            if operations:
+                plan.vswitch_branches[vswitch.name] = operations
+            if was_recreated:
+                recreated.add(vswitch.name)
+        for vm in spec.vms:
+            operations = self._plan_vm(vm, snapshot, recreated)
+            if operations:
+                plan.vm_branches[vm.name] = operations
+        return plan
+
+    def apply(self, plan: TopologyPlan) -> ReconcileResult:
+        """Execute plan, independent branches are executed in parallel.
+
+        Failure stops only its branch, VMs are not configured when any vSwitch branch failed.
+
+        :param plan: plan to execute
+        :raises: HyperVReconcileException when any branch failed
+        :return: outcome of plan execution
+        """
+        start = time.perf_counter()
+        result = ReconcileResult(plan)
+        result.errors.update(self._run_branches(plan.vswitch_branches))
+        if result.errors:
+            failed = ", ".join(result.errors)
+            for name in plan.vm_branches:
+                result.errors[name] = HyperVException(f"Skipped, vSwitches failed: {failed}")
+        else:
+            result.errors.update(self._run_branches(plan.vm_branches))
+        result.elapsed = time.perf_counter() - start
+        if result.errors:
+            details = "; ".join(f"{name}: {error}" for name, error in result.errors.items())
+            raise HyperVReconcileException(f"Couldn't reconcile topology: {details}", result)
+        return result
+
+    def reconcile(self, spec: TopologySpec) -> ReconcileResult:
+        """Bring host to expected topology, unchanged topology is verified in one round trip.
+
+        :param spec: expected topology
+        :raises: HyperVReconcileException when any branch failed
+        :return: outcome of reconciliation
+        """
+        start = time.perf_counter()
+        plan = self.plan(spec)
+        logger.log(level=log_levels.MODULE_DEBUG, msg=f"Topology plan:\n{plan}")
+        result = self.apply(plan)
+        result.elapsed = time.perf_counter() - start
+        return result
+
+    def _query(self, commands: List[str]) -> List[Tuple[int, str, str]]:
+        """Execute commands in host scripts, failing command doesn't stop remaining ones."""
+        results = []
+        for _, group_results in run_in_scripts(self.hyperv.connection, [[command] for command in commands]):
+            results += group_results
+        return results
+
+    @staticmethod
+    def _parse(result: Tuple[int, str, str]) -> List[Dict[str, str]]:
+        return parse_powershell_list(result[1]) if result[1].strip() else []
+
+    def _plan_vswitch(self, spec: VSwitchSpec, snapshot: HostSnapshot) -> Tuple[List[TopologyOperation], bool]:
+        manager = self.hyperv.vswitch_manager
+        operations = []
+        current = snapshot.vswitches.get(spec.name)
+        recreated = current is not None and current != (spec.enable_iov, spec.enable_teaming)
+        if recreated:
+            operations.append(TopologyOperation(f"remove vSwitch {spec.name}", manager.remove_vswitch, (spec.name,)))
+        if current is None or recreated:
+            operations.append(
+                TopologyOperation(
+                    f"create vSwitch {spec.name} on {', '.join(spec.interface_names)}",
+                    manager.create_vswitch,
+                    (spec.interface_names, spec.name),
+                    dict(enable_iov=spec.enable_iov, enable_teaming=spec.enable_teaming, generate_name=False),
+                )
+            )
+            queues = {}
+        else:
+            queues = snapshot.queues.get(spec.name, {})
+
+        hw_qos = self.hyperv.hw_qos
+        for queue in spec.queues:
+            arguments = (queue.limit, queue.tx_max, queue.tx_reserve, queue.rx_max)
+            current_queue = queues.get(queue.sq_id)
+            if current_queue is None:
+                operations.append(
+                    TopologyOperation(
+                        f"create queue {queue.sq_id} on {spec.name}",
+                        hw_qos.create_scheduler_queue,
+                        (spec.name, queue.sq_id, queue.name, *arguments),
+                    )
+                )
+            elif current_queue != queue:
+                if current_queue.name != queue.name:
+                    logger.log(
+                        level=log_levels.MODULE_DEBUG,
+                        msg=f"Queue {queue.sq_id} on {spec.name} is named {current_queue.name}, name is not updated",
+                    )
+                if (current_queue.limit, current_queue.tx_max, current_queue.tx_reserve, current_queue.rx_max) != (
+                    arguments
+                ):
+                    operations.append(
+                        TopologyOperation(
+                            f"update queue {queue.sq_id} on {spec.name}",
+                            hw_qos.update_scheduler_queue,
+                            (spec.name, *arguments, queue.sq_id),
+                        )
+                    )
+        return operations, recreated
+
+    def _plan_vm(self, spec: VMSpec, snapshot: HostSnapshot, recreated_vswitches: set) -> List[TopologyOperation]:
+        hypervisor = self.hyperv.hypervisor
+        manager = self.hyperv.vm_network_interface_manager
+        operations = []
+        state = snapshot.vms.get(spec.name)
+        if state is None:
+            if spec.params is None:
+                raise HyperVException(f"VM {spec.name} doesn't exist and spec has no parameters to create it")
+            operations.append(TopologyOperation(f"create VM {spec.name}", hypervisor.define_vm, (spec.params,)))
+            state = "Off"
+
+        for vnic in spec.vnics:
+            current = snapshot.vnics.get((spec.name, vnic.name))
+            if current is None:
+                operations.append(
+                    TopologyOperation(
+                        f"add vNIC {vnic.name} to VM {spec.name}",
+                        manager.create_vm_network_interface,
+                        kwargs=dict(
+                            vm_name=spec.name,
+                            vswitch_name=vnic.vswitch,
+                            sriov=vnic.sriov,
+                            vmq=vnic.vmq,
+                            interface_name=vnic.name,
+                        ),
+                    )
+                )
+                current = VNicState(vnic.vswitch, vnic.sriov, vnic.vmq, None, False)
+            operations += self._plan_vnic(spec.name, vnic, current, recreated_vswitches)
+
+        if spec.running is True and state != "Running":
+            operations.append(TopologyOperation(f"start VM {spec.name}", hypervisor.start_vm, (spec.name,)))
+        elif spec.running is False and state == "Running":
+            operations.append(TopologyOperation(f"stop VM {spec.name}", hypervisor.stop_vm, (spec.name,)))
+        return operations
+
+    def _plan_vnic(
+        self, vm_name: str, spec: VNicSpec, current: VNicState, recreated_vswitches: set
+    ) -> List[TopologyOperation]:
+        manager = self.hyperv.vm_network_interface_manager
+        prefix = f"vNIC {spec.name} of VM {vm_name}:"
+        operations = []
+        if spec.vswitch != current.vswitch or spec.vswitch in recreated_vswitches:
+            if spec.vswitch is None:
+                operations.append(
+                    TopologyOperation(f"{prefix} disconnect", manager.disconnect_vm_interface, (spec.name, vm_name))
+                )
+            else:
+                operations.append(
+                    TopologyOperation(
+                        f"{prefix} connect to {spec.vswitch}",
+                        manager.connect_vm_interface,
+                        (spec.name, vm_name, spec.vswitch),
+                    )
+                )
+        for attribute, expected, actual in (
+            (VMNetworkInterfaceAttributes.IovWeight, spec.sriov, current.sriov),
+            (VMNetworkInterfaceAttributes.VmqWeight, spec.vmq, current.vmq),
+        ):
+            if expected != actual:
+                value = 100 if expected else 0
+                operations.append(
+                    TopologyOperation(
+                        f"{prefix} set {attribute.value} to {value}",
+                        manager.set_vm_interface_attribute,
+                        (spec.name, vm_name, attribute, value),
+                    )
+                )
+        if spec.vlan_id != current.vlan_id:
+            if spec.vlan_id is None:
+                operations.append(
+                    TopologyOperation(
+                        f"{prefix} set untagged", manager.set_vm_interface_vlan, ("untagged", vm_name, spec.name)
+                    )
+                )
+            else:
+                operations.append(
+                    TopologyOperation(
+                        f"{prefix} set access VLAN {spec.vlan_id}",
+                        manager.set_vm_interface_vlan,
+                        ("access", vm_name, spec.name, "vlanid", spec.vlan_id),
+                    )
+                )
+        if spec.rdma != current.rdma:
+            operations.append(
+                TopologyOperation(
+                    f"{prefix} set RDMA to {spec.rdma}", manager.set_vm_interface_rdma, (vm_name, spec.name, spec.rdma)
+                )
+            )
+        return operations
+
+    def _run_branches(self, branches: Dict[str, List[TopologyOperation]]) -> Dict[str, Exception]:
+        def _run(name: str, operations: List[TopologyOperation]) -> Optional[Exception]:
+            with span("reconcile_branch", branch=name):
+                for operation in operations:
+                    logger.log(level=log_levels.MODULE_DEBUG, msg=f"Reconciling topology: {operation}")
+                    try:
+                        operation.run()
+                    except Exception as e:
+                        logger.error(f"Operation '{operation}' failed: {e}")
+                        return e
+            return None
+
+        if not branches:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(branches))) as executor:
+            futures = {name: executor.submit(_run, name, operations) for name, operations in branches.items()}
+        return {name: future.result() for name, future in futures.items() if future.result() is not None}
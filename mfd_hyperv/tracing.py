@@ -0,0 +1,269 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: MIT
+"""Module for span tracing of Hyper-V workflows.
+
+Spans are exported in Chrome Trace Event Format, which can be opened in chrome://tracing or Perfetto UI.
+When tracing is disabled, traced methods only check one module variable before being called.
+
+Contents:
+-Tracer
+    collector of finished spans
+
+-span
+    context manager opening span in currently enabled tracer
+
+-traced
+    class decorator opening span for every public method of class
+"""
+
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+DEFAULT_CATEGORY = "mfd_hyperv"
+TRACED_ARGUMENTS = (
+    "vm_name",
+    "vswitch_name",
+    "interface_name",
+    "vm_interface_name",
+    "switch_friendly_name",
+    "vport",
+    "sq_id",
+)
+
+_tracer: Optional["Tracer"] = None
+
+
+class _Span:
+    """Span measuring duration of code block."""
+
+    __slots__ = ("_tracer", "_name", "_category", "_attributes", "_start")
+
+    def __init__(self, tracer: "Tracer", name: str, category: str, attributes: Dict[str, Any]):
+        self._tracer = tracer
+        self._name = name
+        self._category = category
+        self._attributes = attributes
+        self._start = None
+
+    def __enter__(self) -> "_Span":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type: Optional[type], exc_value: Optional[BaseException], traceback: Any) -> None:
+        if exc_value is not None:
+            self._attributes["error"] = repr(exc_value)
+        self._tracer.add_span(self._name, self._category, self._start, time.perf_counter(), self._attributes)
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Add attribute to span.
+
+        :param key: attribute name
+        :param value: attribute value
+        """
+        self._attributes[key] = value
+
+
+class _NoOpSpan:
+    """Span used when tracing is disabled."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> "_NoOpSpan":
+        return self
+
+    def __exit__(self, exc_type: Optional[type], exc_value: Optional[BaseException], traceback: Any) -> None:
+        pass
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Ignore attribute."""
+
+
+_NO_OP_SPAN = _NoOpSpan()
+
+
+class Tracer:
+    """Collector of finished spans."""
+
+    def __init__(self):
+        """Class constructor."""
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+        self._events: List[Dict[str, Any]] = []
+        self._thread_names: Dict[int, str] = {}
+
+    def span(self, name: str, category: str = DEFAULT_CATEGORY, **attributes) -> _Span:
+        """Create span that is recorded when its context is exited.
+
+        :param name: span name
+        :param category: span category
+        :param attributes: additional information attached to span, e.g. VM name
+        """
+        return _Span(self, name, category, attributes)
+
+    def add_span(self, name: str, category: str, start: float, end: float, attributes: Dict[str, Any]) -> None:
+        """Record finished span.
+
+        :param name: span name
+        :param category: span category
+        :param start: start time from time.perf_counter
+        :param end: end time from time.perf_counter
+        :param attributes: additional information attached to span
+        """
+        thread = threading.current_thread()
+        event = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": (start - self._origin) * 1_000_000,
+            "dur": (end - start) * 1_000_000,
+            "pid": os.getpid(),
+            "tid": thread.ident,
+            "args": {key: str(value) for key, value in attributes.items()},
+        }
+        with self._lock:
+            self._events.append(event)
+            self._thread_names.setdefault(thread.ident, thread.name)
+
+    @property
+    def spans(self) -> List[Dict[str, Any]]:
+        """Finished spans in Chrome Trace Event Format, sorted by start time."""
+        with self._lock:
+            return sorted(self._events, key=lambda event: event["ts"])
+
+    def clear(self) -> None:
+        """Remove all recorded spans."""
+        with self._lock:
+            self._events.clear()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Get trace in Chrome Trace Event Format."""
+        with self._lock:
+            thread_names = dict(self._thread_names)
+        metadata = [
+            {"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": tid, "args": {"name": thread_name}}
+            for tid, thread_name in thread_names.items()
+        ]
+        return {"traceEvents": metadata + self.spans, "displayTimeUnit": "ms"}
+
+    def export(self, file_path: Union[str, Path]) -> None:
+        """Export trace to JSON file.
+
+        :param file_path: path of created file
+        """
+        Path(file_path).write_text(json.dumps(self.to_dict()))
+
+
+def enable_tracing(tracer: Optional[Tracer] = None) -> Tracer:
+    """Enable tracing of mfd_hyperv workflows.
+
+    :param tracer: tracer collecting spans, new one is created if not given
+    :return: enabled tracer
+    """
+    global _tracer
+    _tracer = tracer if tracer is not None else Tracer()
+    return _tracer
+
+
+def disable_tracing() -> Optional[Tracer]:
+    """Disable tracing of mfd_hyperv workflows.
+
+    :return: tracer that was enabled, None if tracing was disabled already
+    """
+    global _tracer
+    tracer, _tracer = _tracer, None
+    return tracer
+
+
+def get_tracer() -> Optional[Tracer]:
+    """Get enabled tracer, None if tracing is disabled."""
+    return _tracer
+
+
+@contextmanager
+def tracing(file_path: Optional[Union[str, Path]] = None) -> Iterator[Tracer]:
+    """Enable tracing within context and export trace to file when context is exited.
+
+    :param file_path: path of created trace file, trace is not exported if not given
+    """
+    tracer = enable_tracing()
+    try:
+        yield tracer
+    finally:
+        disable_tracing()
+        if file_path is not None:
+            tracer.export(file_path)
+
+
+def span(name: str, category: str = DEFAULT_CATEGORY, **attributes) -> Union[_Span, _NoOpSpan]:
+    """Open span in enabled tracer.
+
+    :param name: span name
+    :param category: span category
+    :param attributes: additional information attached to span, e.g. VM name
+    :return: span context manager, it does nothing when tracing is disabled
+    """
+    tracer = _tracer
+    if tracer is None:
+        return _NO_OP_SPAN
+    return tracer.span(name, category, **attributes)
+
+
+def _trace_method(method: Callable, span_name: str, instance_attributes: Dict[str, str]) -> Callable:
+    """Wrap method to open span each time it is called when tracing is enabled.
+
+    :param method: method to wrap
+    :param span_name: name of opened spans
+    :param instance_attributes: span attributes read from instance
+    """
+    signature = inspect.signature(method)
+    traced_arguments: Tuple[str, ...] = tuple(name for name in TRACED_ARGUMENTS if name in signature.parameters)
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs) -> Any:
+        tracer = _tracer
+        if tracer is None:
+            return method(self, *args, **kwargs)
+
+        attributes = {}
+        for attribute, instance_attribute in instance_attributes.items():
+            value = getattr(self, instance_attribute, None)
+            if value is not None:
+                attributes[attribute] = value
+        if traced_arguments:
+            try:
+                bound_arguments = signature.bind_partial(self, *args, **kwargs).arguments
+            except TypeError:
+                bound_arguments = {}
+            for name in traced_arguments:
+                if bound_arguments.get(name) is not None:
+                    attributes[name] = bound_arguments[name]
+        with tracer.span(span_name, **attributes):
+            return method(self, *args, **kwargs)
+
+    return wrapper
+
+
+def traced(include: Tuple[str, ...] = (), **instance_attributes: str) -> Callable[[type], type]:
+    """Open span for every public method of decorated class.
+
+    Arguments listed in TRACED_ARGUMENTS are added as span attributes.
+
+    :param include: names of non-public methods that are also traced, e.g. "__init__"
+    :param instance_attributes: span attributes read from instance, e.g. vm="name"
+    """
+
+    def decorate(cls: type) -> type:
+        for name, attribute in list(vars(cls).items()):
+            if not inspect.isfunction(attribute) or (name.startswith("_") and name not in include):
+                continue
+            setattr(cls, name, _trace_method(attribute, f"{cls.__name__}.{name}", instance_attributes))
+        return cls
+
+    return decorate
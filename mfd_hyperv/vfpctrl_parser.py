@@ -0,0 +1,133 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: MIT
+"""Line-oriented parser of vfpctrl outputs.
+
+vfpctrl lists items (ports, scheduler queues, QoS config) as blocks of 'key : value' lines. Output is read line by line
+and record of block is yielded as soon as next block starts, so listings with thousands of items are parsed in linear
+time, without regular expressions spanning whole output.
+
+Contents:
+-iter_records
+    generator of records of blocks starting with given key
+
+-parse_line
+    split single line into normalized key and value
+
+-QueueSpec
+    dataclass of HW QoS scheduler queue
+
+-parse_queues, iter_queues
+    parsers of scheduler queues listed by vfpctrl
+"""
+
+import io
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, Optional, Tuple, Union
+
+_QUEUE_KEYS = (
+    "friendly name",
+    "enforce intra-host limit",
+    "transmit limit",
+    "transmit reservation",
+    "receive limit",
+)
+
+
+def parse_line(line: str) -> Optional[Tuple[str, str]]:
+    """Split line of vfpctrl output into key and value.
+
+    Key is lowercased with whitespaces collapsed, e.g. 'Switch Friendly name  : vSwitch00' -> ('switch friendly name',
+    'vSwitch00'). Doubled separator is skipped, e.g. 'Port type:   : Synthetic' -> ('port type', 'Synthetic').
+
+    :param line: line of output
+    :return: key and value, None when line has no key
+    """
+    key, separator, value = line.partition(":")
+    if not separator:
+        return None
+    key = " ".join(key.split()).lower()
+    if not key:
+        return None
+    return key, value.strip().lstrip(":").strip()
+
+
+def iter_records(output: Union[str, Iterable[str]], start_key: str) -> Iterator[Dict[str, str]]:
+    """Yield records of blocks of vfpctrl output.
+
+    Block starts with line with `start_key` and ends before next one, lines before first block are skipped. Record
+    holds first value of every key of block, so values of nested sections (e.g. 'Rate' of 'Current Receive Info' of
+    scheduler queue) don't override earlier ones.
+
+    :param output: output of command or iterable of its lines
+    :param start_key: key of first line of block, e.g. 'Port name' or 'QOS QUEUE', compared case-insensitively
+    :return: generator of records, keys are normalized like in parse_line
+    """
+    start_key = " ".join(start_key.split()).lower()
+    lines = io.StringIO(output) if isinstance(output, str) else output
+    record = None
+    for line in lines:
+        parsed = parse_line(line)
+        if parsed is None:
+            continue
+        key, value = parsed
+        if key == start_key:
+            if record is not None:
+                yield record
+            record = {key: value}
+        elif record is not None and key not in record:
+            record[key] = value
+    if record is not None:
+        yield record
+
+
+@dataclass
+class QueueSpec:
+    """HW QoS scheduler queue of vSwitch.
+
+    sq_id: ID of scheduler queue
+    name: friendly name of scheduler queue
+    tx_max: transmit limit
+    limit: whether infra-host limits are enforced
+    tx_reserve: transmit reservation
+    rx_max: receive limit
+    """
+
+    sq_id: str
+    name: str
+    tx_max: str
+    limit: bool = True
+    tx_reserve: str = "0"
+    rx_max: str = "0"
+
+    def __post_init__(self):
+        self.sq_id, self.tx_max, self.tx_reserve, self.rx_max = map(
+            str, (self.sq_id, self.tx_max, self.tx_reserve, self.rx_max)
+        )
+
+
+def parse_queues(output: str) -> Dict[str, QueueSpec]:
+    """Parse scheduler queues listed by vfpctrl /list-queue.
+
+    :param output: output of command
+    :return: queue ID -> queue
+    """
+    return {queue.sq_id: queue for queue in iter_queues(output)}
+
+
+def iter_queues(output: Union[str, Iterable[str]]) -> Iterator[QueueSpec]:
+    """Yield scheduler queues listed by vfpctrl /list-queue or /get-queue-info as soon as they are parsed.
+
+    :param output: output of command or iterable of its lines
+    :return: generator of queues, incomplete records are skipped
+    """
+    for record in iter_records(output, "QOS QUEUE"):
+        if not all(key in record for key in _QUEUE_KEYS):
+            continue
+        yield QueueSpec(
+            sq_id=record["qos queue"],
+            name=record["friendly name"],
+            tx_max=record["transmit limit"],
+            limit=record["enforce intra-host limit"].upper() == "TRUE",
+            tx_reserve=record["transmit reservation"],
+            rx_max=record["receive limit"],
+        )
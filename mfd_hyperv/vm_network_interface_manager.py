@@ -10,13 +10,17 @@ from mfd_connect.util.powershell_utils import parse_powershell_list
 from mfd_typing import OSName
 
 from mfd_hyperv.attributes.vm_network_interface_attributes import VMNetworkInterfaceAttributes
+from mfd_hyperv.connections.batch import batchable
 from mfd_hyperv.exceptions import HyperVException, HyperVExecutionException
+from mfd_hyperv.helpers import quote_powershell
 from mfd_hyperv.instances.vm import VM
 from mfd_hyperv.instances.vm_network_interface import VMNetworkInterface
 from mfd_hyperv.instances.vswitch import VSwitch
+from mfd_hyperv.tracing import traced
 
 if TYPE_CHECKING:
     from mfd_connect import Connection
+    from mfd_hyperv.vmswitch_ports import VMSwitchPortDirectory
 
 logger = logging.getLogger(__name__)
 add_logging_level(level_name="MODULE_DEBUG", level_value=log_levels.MODULE_DEBUG)
@@ -24,6 +28,7 @@ add_logging_level(level_name="MODULE_DEBUG", level_value=log_levels.MODULE_DEBUG
 UNTAGGED_VLAN = 0
 
 
+@traced()
 class VMNetworkInterfaceManager:
     """Module for VMNetworkInterfaceManager.
 
@@ -31,12 +36,14 @@ class VMNetworkInterfaceManager:
     """
 
     @os_supported(OSName.WINDOWS)
-    def __init__(self, connection: "Connection"):
+    def __init__(self, connection: "Connection", port_directory: Optional["VMSwitchPortDirectory"] = None):
         """Class constructor.
 
         :param connection: connection instance of MFD connect class.
+        :param port_directory: cache of vmswitch ports invalidated whenever VM adapters are changed by manager
         """
         self.connection = connection
+        self.port_directory = port_directory
         self.vm_interfaces = []
         self.vm_adapter_name_counter = 1
 
@@ -51,6 +58,7 @@ class VMNetworkInterfaceManager:
         get_attributes: bool = False,
         vm: VM | None = None,
         vswitch: VSwitch | None = None,
+        interface_name: str | None = None,
     ) -> VMNetworkInterface:
         """Add network interface to VM or Host OS.
 
@@ -61,9 +69,10 @@ class VMNetworkInterfaceManager:
         :param get_attributes: retrieve VM interface attributes right after creating it
         :param vm: Virtual machine that VM network interface will be connected to
         :param vswitch: Virtual switch that VM network interface will be connected to
+        :param interface_name: name of adapter, unified name is generated when not given
         :raises: HyperVException when VM adapter cannot be added to specified VM or Host OS
         """
-        vnic_name = self._generate_name(vm_name if vm_name else "host")
+        vnic_name = interface_name or self._generate_name(vm_name if vm_name else "host")
         logger.log(
             level=log_levels.MODULE_DEBUG,
             msg=(
@@ -76,7 +85,10 @@ class VMNetworkInterfaceManager:
         cmd = "-ManagementOS" if vm_name is None else f'-VMName "{vm_name}"'
         command = f'Add-VMNetworkAdapter {vswitch_info} {cmd} -Name "{vnic_name}"'
 
-        result = self.connection.execute_powershell(command=command, expected_return_codes={})
+        try:
+            result = self.connection.execute_powershell(command=command, expected_return_codes={})
+        finally:
+            self._invalidate_ports()
 
         if result.return_code:
             raise HyperVException(
@@ -109,7 +121,10 @@ class VMNetworkInterfaceManager:
         logger.log(level=log_levels.MODULE_DEBUG, msg=f"Remove VMNetworkAdapter {vm_interface_name} of VM {vm_name}")
 
         command = f'Remove-VMNetworkAdapter -VMName {vm_name} -Name "{vm_interface_name}"'
-        result = self.connection.execute_powershell(command=command, expected_return_codes={})
+        try:
+            result = self.connection.execute_powershell(command=command, expected_return_codes={})
+        finally:
+            self._invalidate_ports()
         if result.return_code:
             raise HyperVException(f"Couldn't remove VM {vm_name} adapter {vm_interface_name}")
 
@@ -117,6 +132,7 @@ class VMNetworkInterfaceManager:
         if vm_interface:
             self.vm_interfaces.remove(vm_interface[0])
 
+    @batchable
     def connect_vm_interface(
         self,
         vm_interface_name: str,
@@ -142,12 +158,16 @@ class VMNetworkInterfaceManager:
             f' -SwitchName "*{vswitch_name}*"'
         )
 
-        result = self.connection.execute_powershell(command=command, expected_return_codes={})
+        try:
+            result = self.connection.execute_powershell(command=command, expected_return_codes={})
+        finally:
+            self._invalidate_ports()
         if result.return_code:
             raise HyperVException(
                 f"Couldn't connect VM {vm_name} adapter {vm_interface_name} to VMSwitch {vswitch_name}"
             )
 
+    @batchable
     def disconnect_vm_interface(self, vm_interface_name: str, vm_name: str) -> None:
         """Disconnect VM Network Interface from vswitch.
 
@@ -158,7 +178,10 @@ class VMNetworkInterfaceManager:
         logger.log(level=log_levels.MODULE_DEBUG, msg=f"Disconnecting VM {vm_name} adapter {vm_interface_name}")
 
         command = f"Disconnect-VMNetworkAdapter -VMName {vm_name} -Name {vm_interface_name}"
-        result = self.connection.execute_powershell(command=command, expected_return_codes={})
+        try:
+            result = self.connection.execute_powershell(command=command, expected_return_codes={})
+        finally:
+            self._invalidate_ports()
         if result.return_code:
             raise HyperVException(f"Couldn't disconnect VM {vm_name} adapter {vm_interface_name}")
 
@@ -176,6 +199,7 @@ class VMNetworkInterfaceManager:
 
         return parse_powershell_list(result.stdout)[0]
 
+    @batchable
     def set_vm_interface_vlan(
         self,
         state: str,
@@ -232,6 +256,7 @@ class VMNetworkInterfaceManager:
 
         return parse_powershell_list(result.stdout)[0]
 
+    @batchable
     def set_vm_interface_rdma(self, vm_name: str, interface_name: str, state: bool) -> None:
         """Set RDMA on VM nic.
 
@@ -250,6 +275,7 @@ class VMNetworkInterfaceManager:
         if result.return_code:
             raise HyperVException(f"Couldn't set RDMA state to {state} on vnic {interface_name} of VM {vm_name}")
 
+    @batchable
     def set_vm_interface_attribute(
         self,
         vm_interface_name: str,
@@ -279,6 +305,10 @@ class VMNetworkInterfaceManager:
         if result.return_code:
             raise HyperVException(f"Couldn't set VM: '{vm_name}' adapter attribute: '{attribute}' to '{value}'.")
 
+    def _invalidate_ports(self) -> None:
+        if self.port_directory is not None:
+            self.port_directory.invalidate()
+
     def clear_vm_interface_attributes_cache(self, vm_name: str = None) -> None:
         """Clear cached VM nics attributes information of specified VM.
 
@@ -305,22 +335,35 @@ class VMNetworkInterfaceManager:
         self.all_vnics_attributes[vm_name] = parse_powershell_list(result.stdout.lower())
         return self.all_vnics_attributes[vm_name]
 
-    def get_vm_interfaces(self, vm_name: str) -> List[Dict[str, str]]:
+    def get_vm_interfaces(self, vm_name: Union[str, List[str]]) -> List[Dict[str, str]]:
         """Return dictionary of VM Network interfaces.
 
-        :params vm_name: Name of VM
+        Retrieved adapters are stored in `all_vnics_attributes` cache of their VMs.
+
+        :params vm_name: Name of VM, or names of VMs which adapters are retrieved in one query
         :raises: HyperVException when information about VM adapters cannot be retrieved
         :return: list of dictionaries with information about each VM adapter
         """
-        logger.log(level=log_levels.MODULE_DEBUG, msg=f"Get VM adapters of VM {vm_name}")
+        if isinstance(vm_name, str):
+            vm_names, names_argument = [vm_name], vm_name
+        else:
+            vm_names = list(vm_name)
+            names_argument = ", ".join(quote_powershell(name) for name in vm_names)
+        logger.log(level=log_levels.MODULE_DEBUG, msg=f"Get VM adapters of VM {names_argument}")
 
-        command = f"Get-VMNetworkAdapter -VMName {vm_name} | select * | fl"
+        command = f"Get-VMNetworkAdapter -VMName {names_argument} | select * | fl"
 
         result = self.connection.execute_powershell(command=command, expected_return_codes={})
         if result.return_code:
-            raise HyperVException(f"Couldn't get information about VM adapters of VM {vm_name}")
-
-        return parse_powershell_list(result.stdout.lower())
+            raise HyperVException(f"Couldn't get information about VM adapters of VM {names_argument}")
+
+        vm_interfaces = parse_powershell_list(result.stdout.lower())
+        cached_names = {name.lower(): name for name in vm_names if "*" not in name}
+        self.all_vnics_attributes.update({name: [] for name in cached_names.values()})
+        for vm_interface in vm_interfaces:
+            if vm_interface.get("vmname") in cached_names:
+                self.all_vnics_attributes[cached_names[vm_interface["vmname"]]].append(vm_interface)
+        return vm_interfaces
 
     def _generate_name(self, vm_name: str) -> str:
         """Create unified vn adapter interface name.
@@ -0,0 +1,156 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: MIT
+"""Cached directory of vmswitch ports listed by vfpctrl.
+
+Contents:
+-VMSwitchPort
+    dataclass with vmswitch port of VM or host network adapter
+
+-VMSwitchPortDirectory
+    cache of vmswitch ports indexed by (switch friendly name, VM name)
+"""
+
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union, TYPE_CHECKING
+
+from mfd_common_libs import add_logging_level, log_levels
+
+from mfd_hyperv.exceptions import HyperVExecutionException
+from mfd_hyperv.vfpctrl_parser import iter_records
+
+if TYPE_CHECKING:
+    from mfd_connect import Connection
+
+logger = logging.getLogger(__name__)
+add_logging_level(level_name="MODULE_DEBUG", level_value=log_levels.MODULE_DEBUG)
+
+VMSWITCH_PORTS_COMMAND = "vfpctrl /list-vmswitch-port"
+
+
+@dataclass(frozen=True)
+class VMSwitchPort:
+    """Port of vmswitch.
+
+    name: name of port, e.g. '924950C2-4D3F-47E2-A7BA-C0E322C51C66'
+    switch_name: friendly name of vSwitch port belongs to
+    vm_name: name of VM which network adapter is connected to port, name of host for host adapters
+    """
+
+    name: str
+    switch_name: str
+    vm_name: str
+
+
+def parse_vmswitch_ports(output: str) -> List[VMSwitchPort]:
+    """Parse ports listed by vfpctrl /list-vmswitch-port.
+
+    :param output: output of command
+    :return: ports in order of listing
+    """
+    return list(iter_vmswitch_ports(output))
+
+
+def iter_vmswitch_ports(output: Union[str, Iterable[str]]) -> Iterator[VMSwitchPort]:
+    """Yield ports listed by vfpctrl /list-vmswitch-port as soon as they are parsed.
+
+    :param output: output of command or iterable of its lines
+    :return: generator of ports, VM name is empty for ports listed without it
+    """
+    for record in iter_records(output, "Port name"):
+        yield VMSwitchPort(record["port name"], record.get("switch friendly name", ""), record.get("vm name", ""))
+
+
+class VMSwitchPortDirectory:
+    """Cache of vmswitch ports.
+
+    Ports are listed on first use after creation or invalidation and indexed by (switch friendly name, VM name), so any
+    number of VMs is resolved from one listing. VMNetworkInterfaceManager invalidates directory whenever it adds,
+    removes, connects or disconnects VM network adapters, HypervHypervisor when it removes VMs and VSwitchManager when
+    it creates, renames or removes vSwitches; lookup of VM without ports lists ports again. Changes made outside of
+    these managers require `refresh()`.
+    """
+
+    def __init__(self, connection: "Connection"):
+        """Class constructor.
+
+        :param connection: connection instance of MFD connect class.
+        """
+        self.connection = connection
+        self._lock = threading.Lock()
+        self._ports: Optional[List[VMSwitchPort]] = None
+        self._index: Dict[Tuple[str, str], List[VMSwitchPort]] = {}
+        self.output = ""
+
+    @property
+    def is_cached(self) -> bool:
+        """Whether ports are cached."""
+        return self._ports is not None
+
+    def invalidate(self) -> None:
+        """Drop cached ports, host is queried on next use."""
+        with self._lock:
+            self._ports, self._index = None, {}
+
+    def refresh(self) -> List[VMSwitchPort]:
+        """List ports on host and cache them.
+
+        :raises HyperVExecutionException: when command execution fails
+        :return: ports in order of listing
+        """
+        with self._lock:
+            return list(self._refresh())
+
+    def _refresh(self) -> List[VMSwitchPort]:
+        result = self.connection.execute_powershell(
+            command=VMSWITCH_PORTS_COMMAND, custom_exception=HyperVExecutionException
+        )
+        self.output = result.stdout
+        self._ports = parse_vmswitch_ports(result.stdout)
+        self._index = {}
+        for port in self._ports:
+            self._index.setdefault((port.switch_name, port.vm_name), []).append(port)
+        logger.log(level=log_levels.MODULE_DEBUG, msg=f"Listed {len(self._ports)} vmswitch ports")
+        return self._ports
+
+    @property
+    def ports(self) -> List[VMSwitchPort]:
+        """All ports, host is queried when ports aren't cached."""
+        with self._lock:
+            if self._ports is None:
+                self._refresh()
+            return list(self._ports)
+
+    def get_switch_ports(self, switch_name: str) -> List[VMSwitchPort]:
+        """Get ports of vSwitch.
+
+        :param switch_name: friendly name of vSwitch
+        :return: ports of vSwitch in order of listing
+        """
+        return [port for port in self.ports if port.switch_name == switch_name]
+
+    def get_ports(self, switch_name: str, vm_name: str) -> List[VMSwitchPort]:
+        """Get ports of VM on vSwitch, ports are listed again when cached listing has none.
+
+        :param switch_name: friendly name of vSwitch
+        :param vm_name: name of VM
+        :return: ports in order of listing, empty when VM has no ports on vSwitch
+        """
+        return self.resolve(switch_name, [vm_name])[vm_name]
+
+    def resolve(self, switch_name: str, vm_names: Iterable[str]) -> Dict[str, List[VMSwitchPort]]:
+        """Get ports of many VMs on vSwitch, ports are listed at most once more when cached listing misses any VM.
+
+        :param switch_name: friendly name of vSwitch
+        :param vm_names: names of VMs
+        :return: VM name -> ports in order of listing, empty when VM has no ports on vSwitch
+        """
+        vm_names = list(vm_names)
+        with self._lock:
+            cached = self._ports is not None
+            if not cached:
+                self._refresh()
+            if cached and any((switch_name, vm_name) not in self._index for vm_name in vm_names):
+                self._refresh()
+            return {vm_name: list(self._index.get((switch_name, vm_name), [])) for vm_name in vm_names}
@@ -3,8 +3,11 @@
 """Main module."""
 
 import logging
-import re
+import math
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from typing import TYPE_CHECKING, Union, Dict, List, Optional
 
 from mfd_common_libs import os_supported, add_logging_level, log_levels, TimeoutCounter
@@ -14,32 +17,82 @@ from mfd_network_adapter.network_interface.windows import WindowsNetworkInterfac
 from mfd_typing import OSName
 
 from mfd_hyperv.attributes.vswitchattributes import VSwitchAttributes
+from mfd_hyperv.connections.batch import batchable
 from mfd_hyperv.exceptions import HyperVExecutionException, HyperVException
-from mfd_hyperv.helpers import standardise_value
+from mfd_hyperv.helpers import quote_powershell, standardise_value
 from mfd_hyperv.instances.vswitch import VSwitch
+from mfd_hyperv.tracing import traced
+from mfd_hyperv.vswitch_mapping import VSwitchMapping
 
 if TYPE_CHECKING:
     from mfd_connect import Connection
+    from mfd_hyperv.vmswitch_ports import VMSwitchPortDirectory
 
 logger = logging.getLogger(__name__)
 add_logging_level(level_name="MODULE_DEBUG", level_value=log_levels.MODULE_DEBUG)
 
 
+@dataclass
+class VSwitchCreationSpec:
+    """Parameters of vSwitch created by VSwitchManager.create_vswitches, see VSwitchManager.create_vswitch.
+
+    interface_names: names of network interfaces vSwitch is created on
+    vswitch_name: name of vSwitch, used as prefix of generated name when generate_name is set
+    enable_iov: whether vSwitch is SRIOV enabled
+    enable_teaming: whether teaming is enabled (in case of multiple ports)
+    interfaces: interfaces objects that vSwitch is connected to
+    generate_name: whether unified name with counter suffix is created from vswitch_name
+    lazy_interface: find adapter of vSwitch seen by OS on first access of `interface` of created vSwitch
+    """
+
+    interface_names: List[str]
+    vswitch_name: str = "VSWITCH"
+    enable_iov: bool = False
+    enable_teaming: bool = False
+    interfaces: Optional[List[WindowsNetworkInterface]] = None
+    generate_name: bool = True
+    lazy_interface: bool = False
+
+
+@dataclass
+class VSwitchCreationResult:
+    """Outcome of creation of single vSwitch by VSwitchManager.create_vswitches.
+
+    vswitch_name: final name of vSwitch
+    spec: parameters of vSwitch
+    vswitch: created vSwitch, None if creation failed
+    elapsed: duration of creation in seconds
+    error: exception raised during creation, None if creation succeeded
+    """
+
+    vswitch_name: str
+    spec: VSwitchCreationSpec
+    vswitch: Optional[VSwitch] = None
+    elapsed: float = 0.0
+    error: Optional[Exception] = None
+
+
+@traced()
 class VSwitchManager:
     """Module for VSwitch Manager."""
 
     mng_vswitch_name = "managementvSwitch"
     vswitch_name_prefix = "VSWITCH"
     vswitch_name_counter = 1
+    vswitch_poll_interval = 0.25
 
     @os_supported(OSName.WINDOWS)
-    def __init__(self, *, connection: "Connection"):
+    def __init__(self, *, connection: "Connection", port_directory: Optional["VMSwitchPortDirectory"] = None):
         """Class constructor.
 
         :param connection: connection instance of MFD connect class.
+        :param port_directory: cache of vmswitch ports invalidated whenever vSwitches are changed by manager
         """
         self.connection = connection
+        self.port_directory = port_directory
         self.vswitches = []
+        self.mapping = VSwitchMapping(connection)
+        self._lock = threading.Lock()
 
     def create_vswitch(
         self,
@@ -49,6 +102,8 @@ class VSwitchManager:
         enable_teaming: bool = False,
         mng: bool = False,
         interfaces: Optional[List[WindowsNetworkInterface]] = None,
+        generate_name: bool = True,
+        lazy_interface: bool = False,
     ) -> VSwitch:
         """Create vSwitch.
 
@@ -58,10 +113,17 @@ class VSwitchManager:
         :param enable_teaming: is teaming enabled (in case of multiple ports)
         :param mng: whether this vswitch is mng or not
         :param interfaces:interfaces objects that vswitch is connected to
+        :param generate_name: whether unified name with counter suffix is created from vswitch_name,
+                              vswitch_name is used as is otherwise
+        :param lazy_interface: find adapter of vswitch seen by OS on first access of `interface` of created vswitch,
+                               creation doesn't wait for host vNIC then
         :return: created vswitch
         """
         interface_names = ", ".join([f"'{item}'" for item in interface_names])
-        final_vswitch_name = vswitch_name if mng else self._generate_name(vswitch_name, enable_teaming)
+        if mng or not generate_name:
+            final_vswitch_name = vswitch_name
+        else:
+            final_vswitch_name = self._generate_name(vswitch_name, enable_teaming)
 
         logger.log(level=MODULE_DEBUG, msg=f"Creating vSwitch {vswitch_name} on adapter {interface_names}")
         cmd = (
@@ -73,24 +135,98 @@ class VSwitchManager:
             cmd = cmd[:-1]
             cmd += ' -EnableEmbeddedTeaming $true"'
 
-        self.connection.start_process(cmd, shell=True)
-        self.wait_vswitch_present(final_vswitch_name, timeout=120, interval=2)
-
-        vs = VSwitch(final_vswitch_name, interface_names, enable_iov, enable_teaming, self.connection, interfaces)
+        try:
+            self.connection.start_process(cmd, shell=True)
+            self.wait_vswitch_present(
+                final_vswitch_name, timeout=120, interval=2, host_adapter=not lazy_interface, host_wait=30
+            )
+        finally:
+            self._invalidate_caches()
+
+        vs = VSwitch(
+            final_vswitch_name,
+            interface_names,
+            enable_iov,
+            enable_teaming,
+            self.connection,
+            interfaces,
+            lazy_interface=lazy_interface,
+        )
 
         if not mng:
-            self.vswitches.append(vs)
+            with self._lock:
+                self.vswitches.append(vs)
         return vs
 
+    def create_vswitches(
+        self, specs: List[VSwitchCreationSpec], max_workers: int = 4
+    ) -> Dict[str, VSwitchCreationResult]:
+        """Create vSwitches concurrently, e.g. one per port of multi-port adapter.
+
+        Names are generated up front in order of specs, failure of one vSwitch doesn't stop creation of others.
+
+        :param specs: parameters of created vSwitches
+        :param max_workers: maximum number of vSwitches created at the same time
+        :return: creation results keyed by final vSwitch name, in order of specs
+        """
+        results = [
+            VSwitchCreationResult(
+                vswitch_name=(
+                    self._generate_name(spec.vswitch_name, spec.enable_teaming)
+                    if spec.generate_name
+                    else spec.vswitch_name
+                ),
+                spec=spec,
+            )
+            for spec in specs
+        ]
+
+        def _create(creation_result: VSwitchCreationResult) -> None:
+            spec = creation_result.spec
+            start_time = time.perf_counter()
+            try:
+                creation_result.vswitch = self.create_vswitch(
+                    spec.interface_names,
+                    creation_result.vswitch_name,
+                    enable_iov=spec.enable_iov,
+                    enable_teaming=spec.enable_teaming,
+                    interfaces=spec.interfaces,
+                    generate_name=False,
+                    lazy_interface=spec.lazy_interface,
+                )
+            except Exception as e:
+                creation_result.error = e
+            creation_result.elapsed = time.perf_counter() - start_time
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            list(executor.map(_create, results))
+
+        for creation_result in results:
+            logger.log(
+                level=MODULE_DEBUG,
+                msg=f"Creation of vSwitch {creation_result.vswitch_name} took {creation_result.elapsed:.2f}s"
+                f"{f' and failed: {creation_result.error}' if creation_result.error else ''}",
+            )
+        return {creation_result.vswitch_name: creation_result for creation_result in results}
+
+    def _invalidate_caches(self) -> None:
+        self.mapping.invalidate()
+        if self.port_directory is not None:
+            self.port_directory.invalidate()
+
     def _generate_name(self, vswitch_name: str, enable_teaming: bool) -> str:
         """Create unified vswitch name.
 
         :param vswitch_name: name of Virtual Machine adapter belongs to
         :param enable_teaming: if temaming is enabled
         """
-        name = f"{vswitch_name}_{self.vswitch_name_counter:02}{'_T' if enable_teaming else ''}"
-        self.vswitch_name_counter += 1
-        return name
+        with self._lock:
+            used_names = {vs.interface_name for vs in self.vswitches}
+            while True:
+                name = f"{vswitch_name}_{self.vswitch_name_counter:02}{'_T' if enable_teaming else ''}"
+                self.vswitch_name_counter += 1
+                if name not in used_names:
+                    return name
 
     def create_mng_vswitch(self) -> VSwitch:
         """Create management vSwitch."""
@@ -114,9 +250,12 @@ class VSwitchManager:
         :param interface_name: Virtual Switch interface name
         """
         logger.log(level=MODULE_DEBUG, msg=f"Removing {interface_name}...")
-        self.connection.execute_powershell(
-            f"Remove-VMSwitch {interface_name} -Force", custom_exception=HyperVExecutionException
-        )
+        try:
+            self.connection.execute_powershell(
+                f"Remove-VMSwitch {interface_name} -Force", custom_exception=HyperVExecutionException
+            )
+        finally:
+            self._invalidate_caches()
         logger.log(level=MODULE_DEBUG, msg=f"Successfully removed {interface_name}")
 
         # cleanup bindings
@@ -127,25 +266,33 @@ class VSwitchManager:
         vswitch = vswitch[0]
         self.vswitches.remove(vswitch)
 
-    def get_vswitch_mapping(self) -> dict[str, str]:
+    def get_vswitch_mapping(self, refresh: bool = False) -> dict[str, str]:
         """Get a list of Hyper-V vSwitches and the adapters they are mapped to.
 
+        Mapping is cached in `mapping` until vSwitches are created, removed or renamed by manager.
+
+        :param refresh: query host even if mapping is cached, e.g. after vSwitches were changed outside of manager
         return: Dictionary where key are names of vswitches, values are Friendly names of an interfaces connect to
-                (NetAdapterInterfaceDescription field from powershell output)
+                (NetAdapterInterfaceDescription field from powershell output, 1st member of team for SET vSwitch)
         """
-        outcome = self.connection.execute_powershell("Get-VMSwitch | fl", expected_return_codes=None)
-        if outcome.return_code:
-            return {}
-        output = parse_powershell_list(outcome.stdout)
-        # SET vSwitch adapter, has NetAdapterInterfaceDescription = Teamed-Interface.
-        # But for mapping, there is a needed, that description have to be 1st pf member of the team, that is why,
-        # there is [0] element used.
-        for line in output:
-            if line["EmbeddedTeamingEnabled"] == "True":
-                line["NetAdapterInterfaceDescription"] = (
-                    line["NetAdapterInterfaceDescriptions"].replace("{", "").replace("}", "").split(",")[0]
-                )
-        return dict((line["Name"], line["NetAdapterInterfaceDescription"]) for line in output)
+        vswitches = self.mapping.refresh() if refresh else self.mapping.vswitches
+        return {name: vswitch.description for name, vswitch in vswitches.items()}
+
+    def get_vswitch_adapters(self, vswitch_name: str) -> List[str]:
+        """Get interface descriptions of all adapters vSwitch is created on, all team members for SET vSwitch.
+
+        :param vswitch_name: name of vSwitch
+        :return: interface descriptions, empty if vSwitch doesn't exist
+        """
+        return self.mapping.get_adapters(vswitch_name)
+
+    def get_vswitch_by_adapter(self, adapter_description: str) -> Optional[str]:
+        """Get name of vSwitch created on adapter, also when adapter is member of SET team.
+
+        :param adapter_description: interface description of adapter, e.g. 'Intel(R) Ethernet Controller X550'
+        :return: name of vSwitch, None if no vSwitch is created on adapter
+        """
+        return self.mapping.get_vswitch(adapter_description)
 
     def get_vswitch_attributes(self, interface_name: str) -> Dict[str, str]:
         """Return vSwitch attributes in form of dictionary.
@@ -163,6 +310,7 @@ class VSwitchManager:
 
         return parse_powershell_list(result.stdout.lower())[0]
 
+    @batchable
     def set_vswitch_attribute(
         self, interface_name: str, attribute: Union[VSwitchAttributes, str], value: Union[str, int, bool]
     ) -> None:
@@ -186,12 +334,15 @@ class VSwitchManager:
         """Remove all tested vswitches."""
         logger.log(level=MODULE_DEBUG, msg=f"Removing all tested (non-{self.mng_vswitch_name}) vSwitches...")
 
-        self.connection.execute_powershell(
-            "Get-VMSwitch | Where-Object {$_.Name -ne "
-            f'"{self.mng_vswitch_name}"'
-            "} | Remove-VMSwitch -force -Confirm:$false",
-            custom_exception=HyperVExecutionException,
-        )
+        try:
+            self.connection.execute_powershell(
+                "Get-VMSwitch | Where-Object {$_.Name -ne "
+                f'"{self.mng_vswitch_name}"'
+                "} | Remove-VMSwitch -force -Confirm:$false",
+                custom_exception=HyperVExecutionException,
+            )
+        finally:
+            self._invalidate_caches()
 
         logger.log(level=MODULE_DEBUG, msg="Successfully removed all tested vSwitches")
 
@@ -211,25 +362,80 @@ class VSwitchManager:
         """
         logger.log(level=MODULE_DEBUG, msg=f"Checking if {interface_name} exists...")
         out = self.connection.execute_powershell(
-            "Get-VMSwitch | select -expandproperty Name", custom_exception=HyperVExecutionException
+            f"Get-VMSwitch -Name {quote_powershell(interface_name)} -ErrorAction SilentlyContinue"
+            " | select -expandproperty Name",
+            expected_return_codes=None,
         )
+        if out.return_code and out.stderr.strip():
+            raise HyperVExecutionException(
+                returncode=out.return_code, cmd=out.args, output=out.stdout, stderr=out.stderr
+            )
+        return interface_name in (line.strip() for line in out.stdout.splitlines())
+
+    def is_vswitch_ready(self, vswitch_name: str, host_adapter: bool = True, wait: float = 0) -> bool:
+        """Check if given virtual switch exists and its host vNIC 'vEthernet (<vswitch_name>)' is up.
 
-        result = re.findall(rf"\b{interface_name}\b", out.stdout)
-        return interface_name in result
+        Only given vSwitch and its host vNIC are queried, both in one command.
 
-    def wait_vswitch_present(self, vswitch_name: str, timeout: int = 60, interval: int = 10) -> None:
+        :param vswitch_name: Name of vSwitch
+        :param host_adapter: whether host vNIC of vSwitch has to be up, vSwitch created without access of management
+                             OS has no host vNIC
+        :param wait: maximal time in seconds host waits for vSwitch to become ready before it is queried, readiness is
+                     checked on host every `vswitch_poll_interval`
+        :return: whether vswitch is ready or not
+        """
+        host_adapter_name = f"vEthernet ({vswitch_name})"
+        cmd = f"Get-VMSwitch -Name {quote_powershell(vswitch_name)} -ErrorAction SilentlyContinue | select Name | fl"
+        if host_adapter:
+            cmd += (
+                f"; Get-NetAdapter -Name {quote_powershell(host_adapter_name)} -ErrorAction SilentlyContinue"
+                " | select Name, Status | fl"
+            )
+        if wait:
+            if host_adapter:
+                ready = (
+                    f"Get-NetAdapter -Name {quote_powershell(host_adapter_name)} -ErrorAction SilentlyContinue"
+                    " | Where-Object { $_.Status -eq 'Up' }"
+                )
+            else:
+                ready = f"Get-VMSwitch -Name {quote_powershell(vswitch_name)} -ErrorAction SilentlyContinue"
+            checks = math.ceil(wait / self.vswitch_poll_interval)
+            cmd = (
+                f"for ($i = 0; $i -lt {checks} -and -not ({ready}); $i++)"
+                f" {{ Start-Sleep -Milliseconds {round(self.vswitch_poll_interval * 1000)} }}; {cmd}"
+            )
+        out = self.connection.execute_powershell(cmd, expected_return_codes=None)
+        records = {record.get("Name"): record for record in parse_powershell_list(out.stdout)}
+        if vswitch_name not in records:
+            return False
+        return not host_adapter or records.get(host_adapter_name, {}).get("Status") == "Up"
+
+    def wait_vswitch_present(
+        self,
+        vswitch_name: str,
+        timeout: int = 60,
+        interval: int = 10,
+        host_adapter: bool = False,
+        host_wait: float = 0,
+    ) -> None:
         """Wait for timeout duration for vswitch to appear present.
 
+        With `host_wait` host itself checks readiness every `vswitch_poll_interval` for up to `host_wait` seconds
+        within single call, see `is_vswitch_ready`, so wait ends shortly after vSwitch appears without querying host
+        at short interval.
+
         :param vswitch_name: Name of vSwitch
         :param interval: sleep duration between retries
         :param timeout: maximum time of waiting for vswitch to appear
+        :param host_adapter: wait also for host vNIC 'vEthernet (<vswitch_name>)' to be up
+        :param host_wait: maximal duration of wait on host within single retry, host is only queried when 0
         :raises: HyperVException when specified vswitch is not present among other vswitches
         :return: whether vswitch is present or not
         """
         timeout_reached = TimeoutCounter(timeout)
         while not timeout_reached:
             try:
-                if self.is_vswitch_present(vswitch_name):
+                if self.is_vswitch_ready(vswitch_name, host_adapter=host_adapter, wait=host_wait):
                     logger.log(level=MODULE_DEBUG, msg=f"Successfully created vSwitch {vswitch_name}")
                     return
             except (EOFError, OSError):
@@ -246,10 +452,13 @@ class VSwitchManager:
         """
         logger.log(level=MODULE_DEBUG, msg=f"Renaming vSwitch {interface_name} to {new_name}...")
 
-        self.connection.execute_powershell(
-            f'Rename-VMSwitch "{interface_name}" -NewName "{new_name}"',
-            custom_exception=HyperVExecutionException,
-        )
+        try:
+            self.connection.execute_powershell(
+                f'Rename-VMSwitch "{interface_name}" -NewName "{new_name}"',
+                custom_exception=HyperVExecutionException,
+            )
+        finally:
+            self._invalidate_caches()
 
         out = self.get_vswitch_attributes(interface_name=new_name)
 
@@ -0,0 +1,141 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: MIT
+"""Cached mapping between vSwitches and host adapters they are created on.
+
+Contents:
+-VSwitchAdapters
+    dataclass with adapters of single vSwitch
+
+-VSwitchMapping
+    cache of vSwitches with forward (vSwitch -> adapters) and reverse (adapter -> vSwitch) indexes
+"""
+
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
+
+from mfd_common_libs import add_logging_level, log_levels
+from mfd_connect.util.powershell_utils import parse_powershell_list
+
+if TYPE_CHECKING:
+    from mfd_connect import Connection
+
+logger = logging.getLogger(__name__)
+add_logging_level(level_name="MODULE_DEBUG", level_value=log_levels.MODULE_DEBUG)
+
+# collections are truncated to 4 items in Format-List output by default, SET team can have up to 8 members
+VSWITCH_MAPPING_COMMAND = "$FormatEnumerationLimit = -1; Get-VMSwitch | fl"
+
+
+@dataclass(frozen=True)
+class VSwitchAdapters:
+    """Adapters of single vSwitch.
+
+    name: name of vSwitch
+    adapters: interface descriptions of adapters vSwitch is created on, all members of team in case of SET vSwitch
+    teaming: whether embedded teaming is enabled
+    """
+
+    name: str
+    adapters: Tuple[str, ...] = ()
+    teaming: bool = False
+
+    @property
+    def description(self) -> str:
+        """Interface description of adapter vSwitch is created on, first member of team in case of SET vSwitch."""
+        return self.adapters[0] if self.adapters else ""
+
+
+def _split_descriptions(value: str) -> Tuple[str, ...]:
+    value = value.strip()
+    if value.startswith("{") and value.endswith("}"):
+        value = value[1:-1]
+    return tuple(item.strip() for item in value.split(",") if item.strip())
+
+
+class VSwitchMapping:
+    """Cache of vSwitches and adapters they are created on.
+
+    Host is queried on first use after creation or invalidation, VSwitchManager invalidates cache whenever it creates,
+    removes or renames vSwitches. Changes made outside of VSwitchManager require `refresh()`.
+    """
+
+    def __init__(self, connection: "Connection"):
+        """Class constructor.
+
+        :param connection: connection instance of MFD connect class.
+        """
+        self.connection = connection
+        self._lock = threading.Lock()
+        self._vswitches: Optional[Dict[str, VSwitchAdapters]] = None
+        self._by_adapter: Dict[str, str] = {}
+
+    @property
+    def is_cached(self) -> bool:
+        """Whether mapping is cached."""
+        return self._vswitches is not None
+
+    def invalidate(self) -> None:
+        """Drop cached mapping, host is queried on next use."""
+        with self._lock:
+            self._vswitches = None
+            self._by_adapter = {}
+
+    def refresh(self) -> Dict[str, VSwitchAdapters]:
+        """Query vSwitches on host and cache them.
+
+        :return: adapters keyed by vSwitch name, empty when vSwitches cannot be retrieved (not cached)
+        """
+        with self._lock:
+            return self._refresh()
+
+    def _refresh(self) -> Dict[str, VSwitchAdapters]:
+        outcome = self.connection.execute_powershell(VSWITCH_MAPPING_COMMAND, expected_return_codes=None)
+        if outcome.return_code:
+            logger.log(level=log_levels.MODULE_DEBUG, msg="Couldn't get vSwitches, mapping is not cached")
+            self._vswitches, self._by_adapter = None, {}
+            return {}
+
+        vswitches = {}
+        for line in parse_powershell_list(outcome.stdout):
+            teaming = line.get("EmbeddedTeamingEnabled") == "True"
+            if teaming:
+                adapters = _split_descriptions(line.get("NetAdapterInterfaceDescriptions", ""))
+            else:
+                description = line.get("NetAdapterInterfaceDescription", "").strip()
+                adapters = (description,) if description else ()
+            vswitches[line["Name"]] = VSwitchAdapters(name=line["Name"], adapters=adapters, teaming=teaming)
+        self._vswitches = vswitches
+        self._by_adapter = {
+            adapter.lower(): vswitch.name for vswitch in vswitches.values() for adapter in vswitch.adapters
+        }
+        return dict(vswitches)
+
+    @property
+    def vswitches(self) -> Dict[str, VSwitchAdapters]:
+        """Adapters keyed by vSwitch name, host is queried when mapping isn't cached."""
+        with self._lock:
+            if self._vswitches is None:
+                return self._refresh()
+            return dict(self._vswitches)
+
+    def get_adapters(self, vswitch_name: str) -> List[str]:
+        """Get interface descriptions of adapters vSwitch is created on.
+
+        :param vswitch_name: name of vSwitch
+        :return: interface descriptions, all members of team in case of SET vSwitch, empty if vSwitch doesn't exist
+        """
+        vswitch = self.vswitches.get(vswitch_name)
+        return list(vswitch.adapters) if vswitch else []
+
+    def get_vswitch(self, adapter_description: str) -> Optional[str]:
+        """Get name of vSwitch created on adapter.
+
+        :param adapter_description: interface description of adapter, e.g. 'Intel(R) Ethernet Controller X550'
+        :return: name of vSwitch, None if no vSwitch is created on adapter
+        """
+        with self._lock:
+            if self._vswitches is None:
+                self._refresh()
+            return self._by_adapter.get(adapter_description.lower())
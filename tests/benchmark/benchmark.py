@@ -0,0 +1,85 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: MIT
+"""Measurement of workflows and comparison with stored baseline."""
+
+import json
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from .fake_connection import FakeConnection, SimulatedClock
+
+BASELINE_PATH = Path(__file__).parent / "baseline.json"
+UPDATE_BASELINE_VARIABLE = "MFD_HYPERV_UPDATE_BENCHMARK_BASELINE"
+SIMULATED_TIME_TOLERANCE = 0.05
+
+
+@dataclass
+class BenchmarkResult:
+    """Result of benchmarked workflow.
+
+    round_trips: number of commands sent to host
+    simulated_time: wall time of workflow on host with simulated latency and sleeps in seconds
+    cpu_time: time spent by library code in seconds, informational only
+    """
+
+    name: str
+    round_trips: int
+    simulated_time: float
+    cpu_time: float
+
+
+results: List[BenchmarkResult] = []
+
+
+def load_baseline() -> Dict[str, Dict[str, float]]:
+    """Load stored baseline of benchmarks."""
+    return json.loads(BASELINE_PATH.read_text()) if BASELINE_PATH.exists() else {}
+
+
+def update_baseline() -> None:
+    """Store results of this session as new baseline."""
+    baseline = load_baseline()
+    for result in results:
+        baseline[result.name] = {"round_trips": result.round_trips, "simulated_time": round(result.simulated_time, 3)}
+    BASELINE_PATH.write_text(json.dumps(baseline, indent=4, sort_keys=True) + "\n")
+
+
+def is_baseline_update() -> bool:
+    """Check if baseline is being updated instead of verified."""
+    return bool(os.environ.get(UPDATE_BASELINE_VARIABLE))
+
+
+def measure(name: str, connection: FakeConnection, clock: SimulatedClock, workflow: Callable[[], None]) -> None:
+    """Run workflow, record its result and compare it against baseline.
+
+    Only commands and simulated time spent within workflow are counted, setup done before is excluded.
+
+    :param name: name of benchmark
+    :param connection: fake connection used by workflow
+    :param clock: simulated clock used by connection
+    :param workflow: benchmarked function
+    :raises AssertionError: when round trips or simulated time exceed baseline
+    """
+    round_trips, simulated_start, cpu_start = connection.round_trips, clock.now, time.process_time()
+    workflow()
+    result = BenchmarkResult(
+        name=name,
+        round_trips=connection.round_trips - round_trips,
+        simulated_time=clock.now - simulated_start,
+        cpu_time=time.process_time() - cpu_start,
+    )
+    results.append(result)
+    if is_baseline_update():
+        return
+
+    baseline = load_baseline().get(name)
+    assert baseline is not None, f"No baseline for {name}, set {UPDATE_BASELINE_VARIABLE}=1 to create it"
+    assert (
+        result.round_trips <= baseline["round_trips"]
+    ), f"{name}: round trips regressed from {baseline['round_trips']} to {result.round_trips}"
+    assert result.simulated_time <= baseline["simulated_time"] * (
+        1 + SIMULATED_TIME_TOLERANCE
+    ), f"{name}: simulated time regressed from {baseline['simulated_time']}s to {result.simulated_time:.3f}s"
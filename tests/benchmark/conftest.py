@@ -0,0 +1,39 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: MIT
+"""Fixtures and report of offline benchmarks."""
+
+import pytest
+
+from .benchmark import is_baseline_update, load_baseline, results, update_baseline
+from .fake_connection import SimulatedClock
+
+
+@pytest.fixture
+def clock(mocker) -> SimulatedClock:
+    """Simulated clock advanced by sleeps instead of sleeping."""
+    clock = SimulatedClock()
+    mocker.patch("time.sleep", side_effect=clock.sleep)
+    mocker.patch("mfd_hyperv.instances.vm.sleep", side_effect=clock.sleep)
+    return clock
+
+
+def pytest_sessionfinish(session, exitstatus) -> None:
+    if is_baseline_update() and results:
+        update_baseline()
+
+
+def pytest_terminal_summary(terminalreporter) -> None:
+    if not results:
+        return
+    baseline = load_baseline()
+    terminalreporter.section("mfd_hyperv benchmarks")
+    terminalreporter.write_line(
+        f"{'workflow':<28}{'round trips':>12}{'baseline':>10}{'simulated [s]':>15}{'baseline':>10}{'cpu [ms]':>10}"
+    )
+    for result in results:
+        expected = baseline.get(result.name, {})
+        terminalreporter.write_line(
+            f"{result.name:<28}{result.round_trips:>12}{expected.get('round_trips', '-'):>10}"
+            f"{result.simulated_time:>15.2f}{expected.get('simulated_time', '-'):>10}"
+            f"{result.cpu_time * 1000:>10.1f}"
+        )
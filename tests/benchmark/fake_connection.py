@@ -0,0 +1,152 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: MIT
+"""Fake connection simulating latency of Hyper-V host."""
+
+import base64
+import re
+from pathlib import PureWindowsPath
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from mfd_connect import Connection
+from mfd_connect.base import ConnectionCompletedProcess
+from mfd_connect.exceptions import ConnectionCalledProcessError
+from mfd_typing import OSName, OSType, OSBitness
+from mfd_typing.cpu_values import CPUArchitecture
+
+from mfd_hyperv.connections.batch import decode_script
+from mfd_hyperv.connections.session import RESULT_MARKER
+from mfd_hyperv.instrumentation import get_command_name
+
+Response = Union[str, Tuple[str, int], Callable[[str], Union[str, Tuple[str, int]]]]
+
+
+class SimulatedClock:
+    """Clock advanced by simulated command latency and sleeps instead of real time."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+class FakeProcess:
+    """Process started by FakeConnection, it is finished right after start."""
+
+    running = False
+    return_code = 0
+    stdout_text = ""
+    stderr_text = ""
+
+    def wait(self, timeout: Optional[int] = None) -> int:
+        return self.return_code
+
+
+class FakePath(PureWindowsPath):
+    """Path on fake host, every path exists."""
+
+    def exists(self) -> bool:
+        return True
+
+
+class FakeConnection(Connection):
+    """Connection returning recorded Hyper-V outputs with simulated per-call latency.
+
+    Responses are matched with regular expressions in order, first matching one is used.
+    Response is stdout, (stdout, return code) tuple or callable returning one of them for given command.
+    Commands of batch script are answered one by one within single call until first failure.
+    """
+
+    def __init__(
+        self,
+        responses: List[Tuple[str, Response]],
+        clock: SimulatedClock,
+        latency: float = 0.3,
+        command_latency: Optional[Dict[str, float]] = None,
+    ):
+        """Class constructor.
+
+        :param responses: list of (command regex, response)
+        :param clock: clock advanced by latency of every call
+        :param latency: default latency of call in seconds
+        :param command_latency: latency of call per command name, e.g. {"new-vm": 2.0}
+        """
+        super().__init__()
+        self._ip = "10.10.10.10"
+        self._responses = [(re.compile(pattern, re.IGNORECASE), response) for pattern, response in responses]
+        self.clock = clock
+        self.latency = latency
+        self.command_latency = command_latency or {}
+        self.commands: List[str] = []
+
+    @property
+    def round_trips(self) -> int:
+        return len(self.commands)
+
+    def _respond(self, command: str) -> Tuple[str, int]:
+        self.commands.append(command)
+        self.clock.sleep(self.command_latency.get(get_command_name(command), self.latency))
+        batch_commands = decode_script(command)
+        if batch_commands is not None:
+            return self._respond_batch(batch_commands), 0
+        return self._match(command)
+
+    def _respond_batch(self, commands: List[str]) -> str:
+        lines = []
+        for index, command in enumerate(commands):
+            stdout, return_code = self._match(command)
+            stdout = base64.b64encode(stdout.encode("utf-8")).decode("ascii")
+            lines.append(f"{RESULT_MARKER} {index} {return_code} {stdout}")
+            if return_code:
+                break
+        return "\n".join(lines)
+
+    def _match(self, command: str) -> Tuple[str, int]:
+        for pattern, response in self._responses:
+            if pattern.search(command):
+                response = response(command) if callable(response) else response
+                return response if isinstance(response, tuple) else (response, 0)
+        return "", 0
+
+    def execute_command(
+        self, command: str, *, expected_return_codes=frozenset({0}), custom_exception=None, **kwargs
+    ) -> ConnectionCompletedProcess:
+        stdout, return_code = self._respond(command)
+        if expected_return_codes and return_code not in expected_return_codes:
+            exception = custom_exception if custom_exception else ConnectionCalledProcessError
+            raise exception(returncode=return_code, cmd=command, output=stdout, stderr="")
+        return ConnectionCompletedProcess(args=command, stdout=stdout, stderr="", return_code=return_code)
+
+    def execute_powershell(self, command: str, **kwargs) -> ConnectionCompletedProcess:
+        return self.execute_command(command, **kwargs)
+
+    def start_process(self, command: str, **kwargs) -> FakeProcess:
+        self._respond(command)
+        return FakeProcess()
+
+    def path(self, *args, **kwargs) -> FakePath:
+        return FakePath(*args)
+
+    def get_os_name(self) -> OSName:
+        return OSName.WINDOWS
+
+    def get_os_type(self) -> OSType:
+        return OSType.WINDOWS
+
+    def get_os_bitness(self) -> OSBitness:
+        return OSBitness.OS_64BIT
+
+    def get_cpu_architecture(self) -> CPUArchitecture:
+        return CPUArchitecture.X86_64
+
+    def restart_platform(self) -> None:
+        pass
+
+    def shutdown_platform(self) -> None:
+        pass
+
+    def wait_for_host(self, timeout: int = 60) -> None:
+        pass
+
+    def disconnect(self) -> None:
+        pass
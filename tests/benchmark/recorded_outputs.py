@@ -0,0 +1,128 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: MIT
+"""Outputs of Hyper-V cmdlets and vfpctrl recorded on host, parametrized for benchmark scenarios."""
+
+from textwrap import dedent
+from typing import List, Tuple
+
+VSWITCH_NAMES = dedent("""\
+    managementvSwitch
+    VSWITCH_01
+    """)
+
+QOS_CONFIG = dedent("""
+     ITEM LIST
+    ===========
+
+    SWITCH QOS CONFIG
+    Enable Hardware Caps: TRUE
+    Enable Hardware Reservations: TRUE
+    Enable Software Reservations: FALSE
+    Flags: 0x00
+    Command get-qos-config succeeded!
+    """)
+
+
+def vm_mng_ip(vm_name: str, ip: str, mac: str) -> str:
+    """Output of 'Get-VMNetworkAdapter -VMName <vm> | select vmname, ipaddresses, macaddress | fl'."""
+    return dedent(f"""
+        VMName      : {vm_name}
+        IPAddresses : {{{ip}, fe80::6994:9bd4:d0aa:ff4d}}
+        MacAddress  : {mac}
+        """)
+
+
+def vm_network_adapters(vm_name: str, adapters: List[Tuple[str, str]]) -> str:
+    """Output of 'Get-VMNetworkAdapter -VMName <vm> | select * | fl' for (adapter name, MAC address) pairs."""
+    records = []
+    for name, mac in adapters:
+        records.append(dedent(f"""\
+                Name                             : {name}
+                Id                               : Microsoft:00000000-0000-0000-0000-000000000000\\{mac}
+                IsLegacy                         : False
+                IsManagementOs                   : False
+                ComputerName                     : HOST
+                VMName                           : {vm_name}
+                VMId                             : 11223344-1122-4455-6655-abcdef123456
+                SwitchName                       : VSWITCH_01
+                SwitchId                         : 5d81e4bb-3056-4ba3-a7a5-469aeafb366d
+                Connected                        : True
+                PoolName                         :
+                MacAddress                       : {mac}
+                DynamicMacAddressEnabled         : True
+                AllowPacketDirect                : False
+                MacAddressSpoofing               : Off
+                VmqWeight                        : 100
+                VmqUsage                         : 1
+                IovWeight                        : 100
+                IovUsage                         : 1
+                IovQueuePairsRequested           : 1
+                IovQueuePairsAssigned            : 1
+                VrssEnabled                      : True
+                VmmqEnabled                      : False
+                VFDataPathActive                 : True
+                Status                           : {{Ok}}
+                IPAddresses                      : {{}}
+                """))
+    return "\n" + "\n".join(records)
+
+
+def vmswitch_ports(switch_friendly_name: str, ports: List[Tuple[str, str]]) -> str:
+    """Output of 'vfpctrl /list-vmswitch-port' for (port name, VM name) pairs."""
+    records = []
+    for index, (port_name, vm_name) in enumerate(ports):
+        records.append(dedent(f"""\
+                Port name             : {port_name}
+                Port Friendly name    : Dynamic Ethernet Switch Port
+                Switch name           : 5D81E4BB-3056-4BA3-A7A5-469AEAFB366D
+                Switch Friendly name  : {switch_friendly_name}
+                PortId                : {index + 3}
+                VMQ Weight            : 100
+                VMQ Usage             : 1
+                SR-IOV Weight         : 100
+                SR-IOV Usage          : 1
+                Port type:            : Synthetic
+                 Port is Initialized.
+                 MAC Learning is Disabled.
+                NIC name           : 33E0CC89-3DB0-4A5A-7845-123456789ABC--{port_name}
+                NIC Friendly name  : Network Adapter
+                MTU                : 1500
+                MAC address        : 00-15-5D-00-00-{index:02X}
+                VM name            : {vm_name}
+                VM ID              : 11223344-1122-4455-6655-ABCDEF123456
+                """))
+    return "".join(records)
+
+
+def scheduler_queues(queues: List[Tuple[str, str, str]]) -> str:
+    """Output of 'vfpctrl /switch <vswitch> /list-queue' for (queue id, queue name, transmit limit) triples."""
+    records = []
+    for sq_id, sq_name, tx_max in queues:
+        records.append(f"""
+  QOS QUEUE: {sq_id}
+      Friendly name : {sq_name}
+      Enforce intra-host limit: TRUE
+      Transmit Limit: {tx_max}
+      Transmit Reservation: 0
+      Receive Limit: 0
+      Transmit Queue Depth: 200 packets
+      Receive Queue Depth: 50 packets
+      Transmit Burst Size: 50 ms
+      Receive Burst Size: 50 ms
+      Reservation UnderUtilized watermark: 85%
+      Reservation OverUtilized watermark: 95%
+      Reservation Headroom: 10%
+      Reservation Rampup time: 500 ms
+      Reservation Min rate: 10 Mbps
+
+      Current Transmit Info:
+        Rate: {tx_max}
+        Throttled Packets: 0
+        Dropped Packets: 0
+      Current Receive Info:
+        Rate: DISABLED
+        Throttled Packets: 0
+        Dropped Packets: 0
+
+""")
+    return "\n ITEM LIST\n===========\n\n" + "".join(records) + "\nCommand list-queue succeeded!"
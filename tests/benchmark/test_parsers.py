@@ -0,0 +1,43 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: MIT
+"""Micro-benchmarks of parsing of large vfpctrl outputs.
+
+Synthetic listings are parsed by HWQoS methods; CPU time is reported next to round trips and simulated time.
+"""
+
+import pytest
+
+from mfd_hyperv.hw_qos import HWQoS
+
+from . import recorded_outputs
+from .benchmark import measure
+from .fake_connection import FakeConnection
+
+PORT_COUNT = 10000
+VSWITCH = "VSWITCH_01"
+VM_NAMES = [f"VM{index:05}" for index in range(PORT_COUNT)]
+
+
+def port_name(index: int) -> str:
+    return f"{index:08X}-4D3F-47E2-A7BA-C0E322C51C66"
+
+
+@pytest.fixture(scope="module")
+def ports_listing() -> str:
+    return recorded_outputs.vmswitch_ports(VSWITCH, [(port_name(index), vm) for index, vm in enumerate(VM_NAMES)])
+
+
+class TestParsers:
+    def test_resolve_10k_ports(self, clock, ports_listing):
+        connection = FakeConnection(responses=[(r"/list-vmswitch-port", ports_listing)], clock=clock)
+        hw_qos = HWQoS(connection)
+        resolved = {}
+
+        def workflow():
+            resolved.update(hw_qos.resolve_vmswitch_port_names(VSWITCH, VM_NAMES))
+            resolved["last"] = hw_qos.get_vmswitch_port_name(VSWITCH, VM_NAMES[-1])
+
+        measure("resolve_10k_ports", connection, clock, workflow)
+        assert len(resolved) == PORT_COUNT + 1
+        assert resolved[VM_NAMES[1234]] == [port_name(1234)]
+        assert resolved["last"] == port_name(PORT_COUNT - 1)
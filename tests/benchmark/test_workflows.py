@@ -0,0 +1,264 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: MIT
+"""Offline benchmarks of Hyper-V workflows.
+
+Workflows run against FakeConnection replaying recorded host outputs with simulated latency, so round trips and
+simulated wall time are deterministic and can be compared against stored baseline.
+"""
+
+import re
+from types import SimpleNamespace
+from typing import List
+
+import pytest
+from mfd_network_adapter.network_adapter_owner.exceptions import NetworkAdapterIncorrectData
+from mfd_typing import MACAddress
+from mfd_typing.network_interface import InterfaceType
+
+from mfd_hyperv import HyperV
+from mfd_hyperv.attributes.vm_params import VMParams
+from mfd_hyperv.instances.vm import VM
+
+from . import recorded_outputs
+from .benchmark import measure
+from .fake_connection import FakeConnection, SimulatedClock
+
+VM_NAMES = [f"Base_R91_VM{index:03}" for index in range(1, 5)]
+VNICS_PER_VM = 8
+QUEUES = [(str(index), f"SQ{index}", str(index * 1000)) for index in range(1, 9)]
+MNG_VSWITCH = "managementvSwitch"
+TESTED_VSWITCH = "VSWITCH_01"
+COMMAND_LATENCY = {
+    "new-vm": 3.0,
+    "add-vmharddiskdrive": 1.0,
+    "start-vm": 8.0,
+    "add-vmnetworkadapter": 1.5,
+    "set-vmnetworkadapter": 0.5,
+    "new-vmswitch": 0.5,
+}
+DHCP_TIME = 20.0
+VSWITCH_CREATION_TIME = 6.0
+VSWITCH_ADAPTER_TIME = 4.0
+
+
+def vm_mng_mac(vm_index: int) -> str:
+    return f"52:5a:00:0a:0a:{20 + vm_index:02x}"
+
+
+def vnic_mac(vm_index: int, vnic_index: int) -> str:
+    return f"00:15:5d:00:{vm_index:02x}:{vnic_index:02x}"
+
+
+class FakeHost:
+    """Hyper-V host state needed to answer commands of benchmarked workflows."""
+
+    def __init__(self, clock: SimulatedClock):
+        self.clock = clock
+        self.vm_started = {}
+        self.vswitch_created = None
+        self.vm_adapters = {vm_name: [] for vm_name in VM_NAMES}
+        self.connection = FakeConnection(
+            responses=[
+                (r"^Start-VM", self._start_vm),
+                (r"^Add-VMNetworkAdapter .*-VMName", self._add_vm_adapter),
+                (r"select vmname, ipaddresses, macaddress", self._mng_ip),
+                (r"Get-VMNetworkAdapter -VMName .+ \| select \* \| fl", self._vm_adapters),
+                (r"New-VMSwitch", self._new_vswitch),
+                (r"Get-VMSwitch \| select -expandproperty Name", self._vswitch_names),
+                (r"Get-VMSwitch -Name .+ \| select Name \| fl", self._vswitch_readiness),
+                (r"Get-NetAdapter", self._net_adapter),
+                (r"/get-qos-config", recorded_outputs.QOS_CONFIG),
+                (r"/list-vmswitch-port", self._vmswitch_ports),
+                (r"/list-queue|/get-queue-info", recorded_outputs.scheduler_queues(QUEUES)),
+            ],
+            clock=clock,
+            command_latency=COMMAND_LATENCY,
+        )
+
+    def _start_vm(self, command: str) -> str:
+        self.vm_started[command.split()[-1]] = self.clock.now
+        return ""
+
+    def _add_vm_adapter(self, command: str) -> str:
+        vm_name, adapter_name = re.search(r"-VMName [\"'](\S+)[\"'] -Name [\"'](\S+)[\"']", command).groups()
+        self.vm_adapters[vm_name].append(adapter_name)
+        return ""
+
+    def _mng_ip(self, command: str) -> str:
+        vm_name = command.split()[2]
+        vm_index = VM_NAMES.index(vm_name) + 1
+        ready = self.clock.now - self.vm_started.get(vm_name, self.clock.now) >= DHCP_TIME
+        ip = f"10.10.10.{20 + vm_index}" if ready else f"169.254.1.{vm_index}"
+        return recorded_outputs.vm_mng_ip(vm_name, ip, vm_mng_mac(vm_index).replace(":", ""))
+
+    def _vm_adapters(self, command: str) -> str:
+        vm_names = re.findall(r"'([^']+)'", command) or [command.split()[2]]
+        outputs = []
+        for vm_name in vm_names:
+            vm_index = VM_NAMES.index(vm_name) + 1
+            adapters = [
+                (adapter_name, vnic_mac(vm_index, adapter_index) if adapter_index else vm_mng_mac(vm_index))
+                for adapter_index, adapter_name in enumerate(self.vm_adapters[vm_name])
+            ]
+            outputs.append(recorded_outputs.vm_network_adapters(vm_name, adapters))
+        return "".join(outputs)
+
+    def _new_vswitch(self, command: str) -> str:
+        self.vswitch_created = self.clock.now
+        return ""
+
+    def _vswitch_names(self, command: str) -> str:
+        if self.vswitch_created is not None and self.clock.now - self.vswitch_created >= VSWITCH_CREATION_TIME:
+            return recorded_outputs.VSWITCH_NAMES
+        return f"{MNG_VSWITCH}\n"
+
+    def _vswitch_readiness(self, command: str) -> str:
+        wait = re.match(r"for \(\$i = 0; \$i -lt (?P<checks>\d+) .+ Start-Sleep -Milliseconds (?P<ms>\d+) }", command)
+        if wait:
+            for _ in range(int(wait.group("checks"))):
+                if self.clock.now - self.vswitch_created >= VSWITCH_CREATION_TIME + VSWITCH_ADAPTER_TIME:
+                    break
+                self.clock.sleep(int(wait.group("ms")) / 1000)
+        elapsed = self.clock.now - self.vswitch_created
+        output = f"\nName : {TESTED_VSWITCH}\n\n" if elapsed >= VSWITCH_CREATION_TIME else ""
+        if elapsed >= VSWITCH_CREATION_TIME + VSWITCH_ADAPTER_TIME:
+            output += f"\nName   : vEthernet ({TESTED_VSWITCH})\nStatus : Up\n\n"
+        return output
+
+    def _net_adapter(self, command: str) -> str:
+        elapsed = self.clock.now - self.vswitch_created
+        return f"vEthernet ({TESTED_VSWITCH})" if elapsed >= VSWITCH_CREATION_TIME + VSWITCH_ADAPTER_TIME else ""
+
+    def _vmswitch_ports(self, command: str) -> str:
+        ports = [(f"{index:08X}-PORT", vm_name) for index, vm_name in enumerate(VM_NAMES, start=1)]
+        return recorded_outputs.vmswitch_ports(TESTED_VSWITCH, ports)
+
+
+@pytest.fixture
+def host(clock) -> FakeHost:
+    return FakeHost(clock)
+
+
+@pytest.fixture
+def hyperv(host, mocker) -> HyperV:
+    mocker.patch("mfd_hyperv.hypervisor.RPyCConnection")
+    mocker.patch("mfd_hyperv.instances.vm.NetworkAdapterOwner")
+    return HyperV(connection=host.connection)
+
+
+def vm_params(vm_index: int) -> VMParams:
+    return VMParams(
+        name=VM_NAMES[vm_index - 1],
+        vm_dir_path="C:\\VMs",
+        diff_disk_path=f"C:\\VMs\\{VM_NAMES[vm_index - 1]}.vhdx",
+        mng_mac_address=vm_mng_mac(vm_index),
+        mng_ip=f"10.10.10.{20 + vm_index}",
+        vswitch_name=MNG_VSWITCH,
+    )
+
+
+def create_vm_with_vnics(hyperv: HyperV, vm_index: int) -> VM:
+    vm = hyperv.hypervisor.create_vm(vm_params(vm_index), hyperv=hyperv)
+    for _ in range(VNICS_PER_VM):
+        hyperv.vm_network_interface_manager.create_vm_network_interface(
+            vm_name=vm.name, vswitch_name=TESTED_VSWITCH, sriov=True, vm=vm
+        )
+    return vm
+
+
+def guest_interfaces(vm_index: int) -> List[SimpleNamespace]:
+    interfaces = []
+    for vnic_index in range(1, VNICS_PER_VM + 1):
+        mac = MACAddress(vnic_mac(vm_index, vnic_index))
+        interfaces.append(
+            SimpleNamespace(name=f"eth{vnic_index}", mac_address=mac, interface_type=InterfaceType.VMNIC)
+        )
+        interfaces.append(SimpleNamespace(name=f"vf{vnic_index}", mac_address=mac, interface_type=InterfaceType.VF))
+    return interfaces
+
+
+class TestWorkflows:
+    def test_create_vm(self, host, hyperv, clock):
+        measure("create_vm", host.connection, clock, lambda: hyperv.hypervisor.create_vm(vm_params(1), hyperv=hyperv))
+
+    def test_create_vnics(self, host, hyperv, clock):
+        vm = hyperv.hypervisor.create_vm(vm_params(1), hyperv=hyperv)
+
+        def workflow():
+            for _ in range(VNICS_PER_VM):
+                hyperv.vm_network_interface_manager.create_vm_network_interface(
+                    vm_name=vm.name, vswitch_name=TESTED_VSWITCH, sriov=True, vm=vm
+                )
+
+        measure("create_vnics", host.connection, clock, workflow)
+
+    def test_match_interfaces(self, host, hyperv, clock):
+        vm = create_vm_with_vnics(hyperv, 1)
+        vm.guest = SimpleNamespace(get_interfaces=lambda: guest_interfaces(1))
+
+        measure("match_interfaces", host.connection, clock, vm.match_interfaces)
+        assert all(vnic.interface is not None for vnic in vm.interfaces)
+
+    def test_match_all_interfaces(self, host, hyperv, clock):
+        vms = [create_vm_with_vnics(hyperv, vm_index) for vm_index in range(1, len(VM_NAMES) + 1)]
+        for vm_index, vm in enumerate(vms, start=1):
+            vm.guest = SimpleNamespace(get_interfaces=lambda vm_index=vm_index: guest_interfaces(vm_index))
+
+        results = {}
+        measure(
+            "match_all_interfaces",
+            host.connection,
+            clock,
+            lambda: results.update(hyperv.hypervisor.match_all_interfaces(vms)),
+        )
+        assert all(result.error is None for result in results.values())
+
+    def test_create_vswitch(self, host, hyperv, clock):
+        def get_interface(interface_name: str) -> SimpleNamespace:
+            output = host.connection.execute_powershell(f"Get-NetAdapter -Name '{interface_name}'").stdout
+            if not output:
+                raise NetworkAdapterIncorrectData(f"Interface {interface_name} not found")
+            return SimpleNamespace(name=output)
+
+        owner = SimpleNamespace(get_interface=get_interface)
+        interface = SimpleNamespace(name="SLOT 1 Port 1", owner=owner)
+
+        vswitch = {}
+        measure(
+            "create_vswitch",
+            host.connection,
+            clock,
+            lambda: vswitch.update(
+                created=hyperv.vswitch_manager.create_vswitch(
+                    ["SLOT 1 Port 1"], enable_iov=True, interfaces=[interface]
+                )
+            ),
+        )
+        assert vswitch["created"].interface.name == f"vEthernet ({TESTED_VSWITCH})"
+
+    def test_hw_qos_setup(self, host, hyperv, clock):
+        hw_qos = hyperv.hw_qos
+
+        def workflow():
+            hw_qos.set_qos_config(TESTED_VSWITCH, True, True, False, "0x00")
+            for sq_id, sq_name, tx_max in QUEUES:
+                hw_qos.create_scheduler_queue(TESTED_VSWITCH, sq_id, sq_name, True, tx_max, "0", "0")
+            for index, vm_name in enumerate(VM_NAMES):
+                vport = hw_qos.get_vmswitch_port_name(TESTED_VSWITCH, vm_name)
+                hw_qos.associate_scheduler_queues_with_vport(TESTED_VSWITCH, vport, QUEUES[index][0], 10, "QOS")
+            for sq_id, sq_name, tx_max in QUEUES:
+                assert hw_qos.is_scheduler_queues_created(TESTED_VSWITCH, int(sq_id), sq_name, tx_max)
+
+        measure("hw_qos_setup", host.connection, clock, workflow)
+
+    def test_hw_qos_teardown(self, host, hyperv, clock):
+        hw_qos = hyperv.hw_qos
+
+        def workflow():
+            for vm_name in VM_NAMES:
+                vport = hw_qos.get_vmswitch_port_name(TESTED_VSWITCH, vm_name)
+                hw_qos.disassociate_scheduler_queues_with_vport(TESTED_VSWITCH, vport)
+            for sq_id, _, _ in QUEUES:
+                hw_qos.delete_scheduler_queue(TESTED_VSWITCH, sq_id)
+
+        measure("hw_qos_teardown", host.connection, clock, workflow)
@@ -0,0 +1,22 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: MIT
+"""Fixtures shared by `mfd_hyperv` unit tests."""
+
+import base64
+
+import pytest
+
+from mfd_hyperv.connections.session import RESULT_MARKER
+
+
+@pytest.fixture()
+def script_output():
+    """Build stdout of host script from (return code, stdout) results of its commands."""
+
+    def _script_output(*results):
+        return "\n".join(
+            f"{RESULT_MARKER} {index} {code} {base64.b64encode(stdout.encode()).decode()}"
+            for index, (code, stdout) in enumerate(results)
+        )
+
+    return _script_output
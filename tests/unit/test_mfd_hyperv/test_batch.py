@@ -0,0 +1,195 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: MIT
+"""Tests for `mfd_hyperv` batching of host commands."""
+
+import sys
+
+import pytest
+
+from mfd_hyperv import HyperV
+from mfd_hyperv.connections.batch import (
+    batchable,
+    build_script,
+    decode_script,
+    parse_script_results,
+    query_in_scripts,
+    run_in_scripts,
+)
+from mfd_hyperv.connections.emulated import EmulatedHyperVConnection
+from mfd_hyperv.exceptions import HyperVException, HyperVExecutionException
+
+VM_NAME = "VM001"
+VSWITCH_NAME = "VSWITCH_01"
+
+
+class Tool:
+    """Batchable methods tolerating failures of commands."""
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    @batchable
+    def run(self, *commands: str) -> None:
+        for command in commands:
+            self.connection.execute_powershell(command, expected_return_codes=None)
+
+
+class TestBatch:
+    @pytest.fixture()
+    def host(self):
+        host = EmulatedHyperVConnection(time_scale=0)
+        host.execute_powershell(f"New-VMSwitch -Name '{VSWITCH_NAME}' -NetAdapterName 'SLOT 1 Port 1'")
+        host.execute_powershell(f"New-VM '{VM_NAME}' -Generation 2 -Path C:\\VMs")
+        for index in range(5):
+            host.execute_powershell(
+                f"Add-VMNetworkAdapter -VMName '{VM_NAME}' -Name 'vnic{index}' -SwitchName 'VSWITCH_01'"
+            )
+        host.commands.clear()
+        return host
+
+    @pytest.fixture()
+    def hyperv(self, host):
+        return HyperV(connection=host)
+
+    def vlan(self, host, adapter):
+        command = f"Get-VMNetworkAdapterVlan -VMName {VM_NAME} -VMNetworkAdapterName {adapter}"
+        return host.execute_powershell(f"{command} | select -expandproperty AccessVlanId").stdout.strip()
+
+    def test_script_round_trip(self):
+        commands = ["Get-VM 'a' | fl", 'vfpctrl /switch sw /add-queue "1 SQ1 true 100 0 0"']
+        script = build_script(commands)
+
+        assert decode_script(script) == commands
+        assert decode_script("Get-VM") is None
+        result = EmulatedHyperVConnection(time_scale=0).execute_powershell(script, expected_return_codes=None)
+        assert [code for code, _, _ in parse_script_results(result.stdout)] == [1]
+
+    def test_calls_executed_in_one_script(self, host, hyperv):
+        manager = hyperv.vm_network_interface_manager
+        with hyperv.batch() as batch:
+            for index in range(5):
+                assert manager.set_vm_interface_vlan("access", VM_NAME, f"vnic{index}", "vlanid", 10 + index) is None
+            assert host.commands == []
+
+        assert (batch.flushed_calls, batch.scripts) == (5, 1)
+        assert hyperv.metrics.round_trips == 1
+        assert [self.vlan(host, f"vnic{index}") for index in range(5)] == ["10", "11", "12", "13", "14"]
+
+    def test_query_flushes_queued_calls(self, host, hyperv):
+        manager = hyperv.vm_network_interface_manager
+        with hyperv.batch():
+            manager.set_vm_interface_attribute("vnic0", VM_NAME, "IovWeight", 100)
+            manager.set_vm_interface_attribute("vnic1", VM_NAME, "IovWeight", 100)
+            attributes = manager.get_vm_interface_attributes(VM_NAME)
+
+        assert {a["name"]: a["iovweight"] for a in attributes if a["name"] in ("vnic0", "vnic1", "vnic2")} == {
+            "vnic0": "100",
+            "vnic1": "100",
+            "vnic2": "0",
+        }
+        assert hyperv.metrics.round_trips == 2
+        assert set(hyperv.metrics.get_stats()) == {
+            ("VMNetworkInterfaceManager.set_vm_interface_attribute", "batch"),
+            ("VMNetworkInterfaceManager.get_vm_interface_attributes", "get-vmnetworkadapter"),
+        }
+
+    def test_metrics_of_flushed_calls(self, host, hyperv):
+        with hyperv.batch():
+            hyperv.vm_network_interface_manager.set_vm_interface_vlan("access", VM_NAME, "vnic0", "vlanid", 10)
+            hyperv.vswitch_manager.set_vswitch_attribute(VSWITCH_NAME, "Notes", "first")
+        with hyperv.batch():
+            hyperv.vswitch_manager.set_vswitch_attribute(VSWITCH_NAME, "Notes", "second")
+
+        assert set(hyperv.metrics.get_stats()) == {
+            ("VMNetworkInterfaceManager.set_vm_interface_vlan+VSwitchManager.set_vswitch_attribute", "batch"),
+            ("VSwitchManager.set_vswitch_attribute", "set-vmswitch"),
+        }
+
+    def test_failed_call_raises_on_exit(self, host, hyperv):
+        manager = hyperv.vm_network_interface_manager
+        with pytest.raises(HyperVException, match="Couldn't set VMNetworkAdapterVlan") as e:
+            with hyperv.batch():
+                manager.set_vm_interface_vlan("access", VM_NAME, "vnic0", "vlanid", 10)
+                manager.set_vm_interface_vlan("access", VM_NAME, "missing", "vlanid", 10)
+                manager.set_vm_interface_vlan("access", VM_NAME, "vnic1", "vlanid", 10)
+
+        assert (self.vlan(host, "vnic0"), self.vlan(host, "vnic1")) == ("10", "0")
+        if sys.version_info >= (3, 11):
+            assert f"set_vm_interface_vlan queued at {__file__}" in e.value.__notes__[0]
+
+    def test_custom_exception_of_call(self, hyperv):
+        with pytest.raises(HyperVExecutionException) as e:
+            with hyperv.batch():
+                hyperv.hw_qos.create_scheduler_queue(VSWITCH_NAME, "1", "SQ1", True, "100", "0", "0")
+                hyperv.hw_qos.create_scheduler_queue(VSWITCH_NAME, "1", "SQ1", True, "100", "0", "0")
+
+        assert "already exists" in e.value.stderr
+        assert "QOS QUEUE: 1" in hyperv.hw_qos.list_queue(VSWITCH_NAME)
+
+    def test_tolerated_failure_continues(self, host, hyperv):
+        tool = Tool(hyperv._batching_connection)
+        with hyperv.batch() as batch:
+            tool.run("Start-VM missing", f"Start-VM {VM_NAME}")
+            tool.run(f"Set-VMNetworkAdapter -Name vnic0 -VMName {VM_NAME} -VmqWeight 0")
+
+        assert host.vms[VM_NAME]["State"] == "Running"
+        assert host.vm_adapters[1]["VmqWeight"] == 0
+        assert (batch.flushed_calls, batch.scripts) == (2, 2)
+        assert hyperv.metrics.round_trips == 3
+
+    def test_long_batch_split_into_scripts(self, host, hyperv):
+        hyperv._batching_connection.max_script_length = 1300
+        with hyperv.batch() as batch:
+            for index in range(5):
+                hyperv.vm_network_interface_manager.set_vm_interface_rdma(VM_NAME, f"vnic{index}", True)
+
+        assert batch.scripts > 1
+        adapters = [adapter for adapter in host.vm_adapters if adapter["Name"].startswith("vnic")]
+        assert all(adapter["_rdma_weight"] == 100 for adapter in adapters)
+
+    def test_calls_outside_batch_and_nested_batch(self, host, hyperv):
+        hyperv.hypervisor.start_vm(VM_NAME)
+        assert host.commands == [f"Start-VM {VM_NAME}"]
+
+        with hyperv.batch() as outer:
+            with hyperv.batch() as inner:
+                hyperv.vswitch_manager.set_vswitch_attribute(VSWITCH_NAME, "DefaultFlowMinimumBandwidthAbsolute", 10)
+            assert inner is outer
+            assert len(host.commands) == 1
+        assert host.vswitches[VSWITCH_NAME]["DefaultFlowMinimumBandwidthAbsolute"] == 10
+
+
+class TestRunInScripts:
+    @pytest.fixture()
+    def host(self):
+        host = EmulatedHyperVConnection(time_scale=0)
+        host.execute_powershell(f"New-VMSwitch -Name '{VSWITCH_NAME}' -NetAdapterName 'SLOT 1 Port 1'")
+        host.commands.clear()
+        return host
+
+    def test_failed_command_skips_rest_of_group(self, host):
+        groups = [["Get-VMSwitch | select -expandproperty Name", "Get-VM 'missing'", "Get-VM"], ["Get-VM"]]
+
+        results = dict(run_in_scripts(host, groups))
+
+        assert [code for code, _, _ in results[0]] == [0, 1]
+        assert [code for code, _, _ in results[1]] == [0]
+        assert len(host.commands) == 2
+
+    def test_groups_split_by_length(self, host):
+        scripts = []
+        groups = [["Get-VMSwitch | select -expandproperty Name"] * 3 for _ in range(10)]
+
+        results = list(run_in_scripts(host, groups, max_script_length=1500, on_script=scripts.append))
+
+        assert [index for index, _ in results] == list(range(10))
+        assert len(scripts) == len(host.commands) > 1
+        assert [index for indexes in scripts for index in indexes] == list(range(10))
+        assert all(len(command) <= 1500 for command in host.commands)
+
+    def test_query_in_scripts(self, host):
+        commands = ["Get-VMSwitch | select -expandproperty Name", "Get-VM 'missing'"]
+
+        assert query_in_scripts(host, commands, tolerate_last_failure=True)[1][0] == 1
+        with pytest.raises(HyperVExecutionException):
+            query_in_scripts(host, commands)
@@ -0,0 +1,169 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: MIT
+"""Tests for `mfd_hyperv` boot admission."""
+
+import math
+
+import pytest
+
+from mfd_connect import LocalConnection
+from mfd_connect.base import ConnectionCompletedProcess
+from mfd_typing import OSName
+
+from mfd_hyperv.boot_admission import AdmissionLimits, BootAdmission, HostLoad, has_mng_ip
+from mfd_hyperv.connections.batch import decode_script
+from mfd_hyperv.connections.emulated import EmulatedHyperVConnection
+from mfd_hyperv.exceptions import HyperVException
+from mfd_hyperv.hypervisor import HypervHypervisor
+
+
+@pytest.mark.parametrize(
+    "ip_addresses, expected",
+    [
+        ("{10.10.0.1, fe80::1}", True),
+        ("{169.254.0.1, fe80::1}", False),
+        ("{fe80::1}", False),
+        ("{}", False),
+        ("{169.254.0.1, 10.10.0.1}", True),
+    ],
+)
+def test_has_mng_ip(ip_addresses, expected):
+    assert has_mng_ip(ip_addresses) is expected
+
+
+class TestBootAdmission:
+    @pytest.fixture()
+    def admission(self):
+        return BootAdmission(AdmissionLimits(max_disk_queue_length=2, max_cpu_percent=80, max_pending_ips=4))
+
+    @pytest.mark.parametrize(
+        "load, waiting, expected",
+        [
+            (HostLoad(0.0, 10.0), 5, 2),
+            (HostLoad(), 5, 2),
+            (HostLoad(0.0, 10.0, booting=1, waiting_for_ip=2), 5, 1),
+            (HostLoad(0.0, 10.0), 1, 1),
+            (HostLoad(0.0, 10.0), 0, 0),
+            (HostLoad(3.0, 10.0, booting=1), 5, 0),
+            (HostLoad(0.0, 90.0, waiting_for_ip=1), 5, 0),
+            (HostLoad(0.0, 10.0, waiting_for_ip=4), 5, 0),
+            # load not caused by started VMs doesn't stall admission
+            (HostLoad(3.0, 90.0), 5, 1),
+        ],
+    )
+    def test_admit(self, admission, load, waiting, expected):
+        assert admission.admit(load, waiting) == expected
+
+    def test_blocking_signals(self, admission):
+        assert admission.blocking_signals(HostLoad(3.0, 90.5, booting=2, waiting_for_ip=2)) == [
+            "disk queue length 3 > 2",
+            "CPU 90.5% > 80%",
+            "4 VMs pending >= 4",
+        ]
+
+    def test_read(self):
+        outputs = {
+            "ips": "VMName      : vm1\nIPAddresses : {10.10.0.1, fe80::1}\n\n"
+            "VMName      : vm2\nIPAddresses : {169.254.0.2}\n",
+            "counters": "\\\\host\\physicaldisk(_total)\\current disk queue length=2.5\n",
+        }
+
+        assert BootAdmission.read_ips(outputs) == {"vm1"}
+        load = BootAdmission.read_load(outputs, booting=1, waiting_for_ip=1)
+        assert load.disk_queue_length == 2.5 and math.isnan(load.cpu_percent) and load.pending == 2
+
+    @pytest.mark.parametrize("limits", [{"max_pending_ips": 0}, {"max_admitted_per_tick": 0}, {"min_in_flight": -1}])
+    def test_incorrect_limits(self, limits):
+        with pytest.raises(HyperVException):
+            AdmissionLimits(**limits)
+
+
+class TestStartVMsWithAdmission:
+    @pytest.fixture()
+    def clock(self):
+        class Clock:
+            now = 0.0
+
+            def __call__(self):
+                return self.now
+
+        return Clock()
+
+    @pytest.fixture()
+    def host(self, clock, mocker):
+        host = EmulatedHyperVConnection(time_scale=0, dhcp_delay=3, clock=clock)
+        for index in range(1, 5):
+            host.execute_powershell(f"New-VM 'vm{index}' -Generation 2 -Path C:\\VMs")
+            host.execute_powershell(
+                f"Add-VMNetworkAdapter -VMName 'vm{index}' -Name 'mng' -StaticMacAddress 525a000a000{index}"
+            )
+        host.commands.clear()
+
+        def sleep(seconds):
+            clock.now += seconds
+
+        mocker.patch("mfd_hyperv.hypervisor.time", monotonic=clock, sleep=sleep)
+        return host
+
+    def test_start_vms(self, host):
+        admission = BootAdmission(AdmissionLimits(max_disk_queue_length=1.5, max_pending_ips=3))
+
+        results = HypervHypervisor(connection=host).start_vms(
+            ["vm1", "vm2", "vm3", "vm4"], poll_interval=1, admission=admission
+        )
+
+        assert all(result.succeeded and result.state == "Running" for result in results.values())
+        assert [result.elapsed for result in results.values()] == [4.0] * 4
+        assert max(load.pending for load, _ in admission.history) <= 3
+        # vm3 waits for disk queue of vm1 and vm2 booting to drain
+        assert [admitted for _, admitted in admission.history] == [2, 0, 0, 0, 2]
+        assert [load.disk_queue_length for load, _ in admission.history] == [0.0, 2.0, 2.0, 2.0, 0.0]
+        scripts = [decode_script(command) or [command] for command in host.commands]
+        polls = [commands for commands in scripts if commands[-1].startswith("(Get-Counter")]
+        # one host script per tick, besides two launches and removal of jobs
+        assert len(polls) == 9 and len(host.commands) == len(polls) + 3
+        assert "Get-VMNetworkAdapter -VMName 'vm1', 'vm2' | Select-Object VMName, IPAddresses | fl" in polls[2]
+        assert host.commands[-1] == "Remove-Job -Id 1, 2, 3, 4 -Force"
+
+    def test_start_vms_without_waiting_for_ip(self, host):
+        admission = BootAdmission(AdmissionLimits(max_pending_ips=1), wait_for_ip=False)
+
+        results = HypervHypervisor(connection=host).start_vms(["vm1", "vm2"], poll_interval=1, admission=admission)
+
+        assert all(result.succeeded for result in results.values())
+        assert [admitted for _, admitted in admission.history] == [1, 1]
+        assert not any("Get-VMNetworkAdapter" in command for command in host.commands)
+
+    def test_vm_without_mng_ip_times_out(self, host):
+        host.execute_powershell("New-VM 'no_mng' -Generation 2 -Path C:\\VMs")
+
+        result = HypervHypervisor(connection=host).start_vms(
+            ["no_mng"], timeout=5, poll_interval=1, admission=BootAdmission()
+        )["no_mng"]
+
+        assert str(result.error) == "VM no_mng didn't get management IP within 5s"
+        assert result.state == "Running"
+
+    def test_counters_failure_tolerated(self, mocker, script_output):
+        connection = mocker.create_autospec(LocalConnection)
+        connection.execute_powershell.side_effect = [
+            ConnectionCompletedProcess(return_code=1, args="", stdout="", stderr=""),
+            ConnectionCompletedProcess(return_code=0, args="", stdout="7", stderr=""),
+            ConnectionCompletedProcess(
+                return_code=0,
+                args="",
+                stdout=script_output(
+                    (0, "Name  : vm1\nState : Running\n"), (0, "Id    : 7\nState : Completed\n"), (1, "")
+                ),
+                stderr="",
+            ),
+            ConnectionCompletedProcess(return_code=0, args="", stdout="", stderr=""),
+        ]
+        connection.get_os_name.return_value = OSName.WINDOWS
+        mocker.patch("mfd_hyperv.hypervisor.time.sleep")
+
+        hypervisor = HypervHypervisor(connection=connection)
+        result = hypervisor.start_vms(["vm1"], admission=BootAdmission(wait_for_ip=False))["vm1"]
+
+        assert result.succeeded
+        assert connection.execute_powershell.call_args.args[0] == "Remove-Job -Id 7 -Force"
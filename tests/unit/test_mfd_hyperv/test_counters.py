@@ -0,0 +1,160 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: MIT
+"""Tests for `mfd_hyperv` counter sampler."""
+
+import csv
+import math
+import time
+
+import pytest
+
+from mfd_connect.base import ConnectionCompletedProcess
+
+from mfd_hyperv import HyperV
+from mfd_hyperv.connections.batch import decode_script
+from mfd_hyperv.connections.emulated import EmulatedHyperVConnection
+from mfd_hyperv.counters import (
+    CounterBuffer,
+    CounterSampler,
+    parse_counter_samples,
+    parse_queue_counters,
+    percentile,
+)
+from mfd_hyperv.exceptions import HyperVException, HyperVExecutionException
+
+COUNTER_OUTPUT = (
+    "\\\\host\\hyper-v virtual switch(vs1)\\bytes/sec=1250.5\n"
+    "\\\\host\\hyper-v virtual network adapter(vm1_network adapter_1)\\packets/sec=10\n"
+    "garbage line\n"
+)
+
+
+@pytest.fixture()
+def queue_output():
+    host = EmulatedHyperVConnection(time_scale=0)
+    host.execute_powershell("New-VMSwitch -Name 'VS1' -NetAdapterName 'SLOT 1 Port 1'")
+    host.execute_powershell('vfpctrl /switch VS1 /add-queue "1 SQ1 true 500 0 300"')
+    host.execute_powershell('vfpctrl /switch VS1 /add-queue "2 SQ2 true 700 0 0"')
+    return host.execute_powershell('vfpctrl /switch VS1 /get-queue-info "all"').stdout
+
+
+def test_parse_counter_samples():
+    assert parse_counter_samples(COUNTER_OUTPUT) == {
+        "hyper-v virtual switch(vs1)\\bytes/sec": 1250.5,
+        "hyper-v virtual network adapter(vm1_network adapter_1)\\packets/sec": 10.0,
+    }
+
+
+def test_parse_queue_counters(queue_output):
+    assert parse_queue_counters("VS1", queue_output) == {
+        "queue(vs1/1)\\tx rate": 500.0,
+        "queue(vs1/1)\\tx throttled packets": 0.0,
+        "queue(vs1/1)\\tx dropped packets": 0.0,
+        "queue(vs1/1)\\rx rate": 300.0,
+        "queue(vs1/1)\\rx throttled packets": 0.0,
+        "queue(vs1/1)\\rx dropped packets": 0.0,
+        "queue(vs1/2)\\tx rate": 700.0,
+        "queue(vs1/2)\\tx throttled packets": 0.0,
+        "queue(vs1/2)\\tx dropped packets": 0.0,
+        "queue(vs1/2)\\rx throttled packets": 0.0,
+        "queue(vs1/2)\\rx dropped packets": 0.0,
+    }
+
+
+@pytest.mark.parametrize("q, expected", [(0, 1), (50, 2.5), (90, 3.7), (100, 4)])
+def test_percentile(q, expected):
+    assert percentile([4, math.nan, 1, 3, 2], q) == pytest.approx(expected)
+
+
+class TestCounterBuffer:
+    def test_ring(self):
+        buffer = CounterBuffer(3)
+        for second in range(5):
+            buffer.append(float(second), {"a": second * 10.0} if second != 3 else {"b": 1.0})
+
+        assert len(buffer) == 3
+        assert buffer.names == ["a", "b"]
+        assert buffer.timestamps() == [2.0, 3.0, 4.0]
+        assert buffer.values("a")[::2] == [20.0, 40.0] and math.isnan(buffer.values("a")[1])
+        assert math.isnan(buffer.values("b")[0]) and buffer.values("b")[1] == 1.0
+        with pytest.raises(HyperVException, match="wasn't sampled|weren't sampled"):
+            buffer.values("c")
+
+    def test_rates_and_percentiles(self):
+        buffer = CounterBuffer(10)
+        for timestamp, value in [(0.0, 0), (2.0, 100), (3.0, 300), (4.0, 50), (6.0, 250)]:
+            buffer.append(timestamp, {"drops": value})
+
+        rates = buffer.rates("drops")
+        assert rates[:2] == [50.0, 200.0] and math.isnan(rates[2]) and rates[3] == 100.0
+        assert buffer.percentile("drops", 50, rate=True) == 100.0
+        assert buffer.percentile("drops", 100) == 300
+        with pytest.raises(HyperVException):
+            buffer.percentile("drops", 101)
+
+    def test_export_csv(self, tmp_path):
+        buffer = CounterBuffer(10)
+        buffer.append(1.0, {"a": 1.5})
+        buffer.append(2.0, {"b": 2.0})
+
+        buffer.export_csv(tmp_path / "counters.csv")
+
+        with open(tmp_path / "counters.csv", newline="") as file:
+            assert list(csv.reader(file)) == [["timestamp", "a", "b"], ["1.0", "1.5", ""], ["2.0", "", "2.0"]]
+
+    def test_incorrect_capacity(self):
+        with pytest.raises(HyperVException):
+            CounterBuffer(0)
+
+
+class TestCounterSampler:
+    @pytest.fixture()
+    def connection(self, mocker, queue_output, script_output):
+        connection = mocker.Mock()
+        connection.execute_powershell.return_value = ConnectionCompletedProcess(
+            return_code=0, args="", stdout=script_output((0, COUNTER_OUTPUT), (0, queue_output)), stderr=""
+        )
+        return connection
+
+    def test_sample_in_one_call(self, connection):
+        sampler = CounterSampler(connection, vswitch_names=["VS1"], clock=lambda: 5.0)
+
+        samples = sampler.sample()
+
+        connection.execute_powershell.assert_called_once()
+        commands = decode_script(connection.execute_powershell.call_args.kwargs["command"])
+        assert commands[0].startswith("(Get-Counter -Counter @('\\Hyper-V Virtual Switch(*)\\Bytes/sec', ")
+        assert commands[1:] == ['vfpctrl /switch VS1 /get-queue-info "all"']
+        assert samples["hyper-v virtual switch(vs1)\\bytes/sec"] == 1250.5
+        assert samples["queue(vs1/2)\\tx rate"] == 700.0
+        assert sampler.buffer.timestamps() == [5.0]
+        assert len(sampler.buffer.names) == 13
+
+    def test_sample_failure(self, connection, script_output):
+        connection.execute_powershell.return_value = ConnectionCompletedProcess(
+            return_code=0, args="", stdout=script_output((0, COUNTER_OUTPUT), (1, "switch not found")), stderr=""
+        )
+        sampler = CounterSampler(connection, vswitch_names=["VS1"])
+
+        with pytest.raises(HyperVExecutionException):
+            sampler.sample()
+        assert len(sampler.buffer) == 0
+
+    def test_background(self, connection):
+        with CounterSampler(connection, vswitch_names=["VS1"], interval=0.001, capacity=5) as sampler:
+            assert sampler.is_running
+            deadline = time.monotonic() + 10
+            while connection.execute_powershell.call_count < 7 and time.monotonic() < deadline:
+                time.sleep(0.001)
+
+        assert not sampler.is_running
+        assert len(sampler.buffer) == 5
+        assert not sampler.errors
+
+    def test_created_by_hyperv(self):
+        host = EmulatedHyperVConnection(time_scale=0)
+        host.execute_powershell("New-VMSwitch -Name 'VS1' -NetAdapterName 'SLOT 1 Port 1'")
+        host.execute_powershell('vfpctrl /switch VS1 /add-queue "1 SQ1 true 500 0 0"')
+        sampler = HyperV(connection=host).create_counter_sampler(vswitch_names=["VS1"], counters=[])
+
+        assert sampler.sample()["queue(vs1/1)\\tx rate"] == 500.0
@@ -0,0 +1,141 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: MIT
+"""Tests for `mfd_hyperv` dry run of host commands."""
+
+import json
+
+import pytest
+from mfd_connect import LocalConnection
+from mfd_typing import OSName
+
+from mfd_hyperv import HyperV
+from mfd_hyperv.attributes.vm_params import VMParams
+from mfd_hyperv.connections.dry_run import DryRunConnection, get_command_resources
+from mfd_hyperv.connections.emulated import EmulatedHyperVConnection
+from mfd_hyperv.exceptions import HyperVException
+from mfd_hyperv.instrumentation import CommandMetrics
+
+VSWITCH_NAME = "VSWITCH_01"
+
+
+class TestDryRun:
+    @pytest.fixture()
+    def host(self):
+        return EmulatedHyperVConnection(time_scale=0)
+
+    @pytest.fixture()
+    def hyperv(self, host):
+        return HyperV(connection=host, dry_run=True)
+
+    def test_commands_answered_by_emulator(self, host, hyperv):
+        hyperv.vswitch_manager.create_vswitch(["SLOT 1 Port 1"], VSWITCH_NAME, generate_name=False)
+
+        assert hyperv.dry_run.host is host
+        assert VSWITCH_NAME in host.vswitches
+        commands = hyperv.dry_run.commands
+        assert commands[0].name == "new-vmswitch"
+        assert commands[0].operation == "VSwitchManager.create_vswitch"
+        assert commands[0].mutating
+
+    def test_connection_to_host_rejected(self, mocker):
+        connection = mocker.create_autospec(LocalConnection)
+        connection.get_os_name.return_value = OSName.WINDOWS
+
+        with pytest.raises(HyperVException, match="would execute them"):
+            HyperV(connection=connection, dry_run=True)
+        connection.execute_powershell.assert_not_called()
+
+    def test_vnic_depends_on_vswitch(self, hyperv):
+        hyperv.dry_run.host.execute_powershell("New-VM 'VM001' -Generation 2 -Path C:\\VMs")
+        hyperv.vswitch_manager.create_vswitch(["SLOT 1 Port 1"], VSWITCH_NAME, generate_name=False)
+        hyperv.vm_network_interface_manager.create_vm_network_interface("VM001", VSWITCH_NAME, interface_name="vnic1")
+
+        report = hyperv.dry_run.report()
+
+        new_vswitch = next(c for c in report.commands if c.name == "new-vmswitch")
+        add_adapter = next(c for c in report.commands if c.name == "add-vmnetworkadapter")
+        assert new_vswitch.index in add_adapter.depends_on
+        assert (new_vswitch.index, add_adapter.index) in report.edges
+        assert f"c{new_vswitch.index} -> c{add_adapter.index};" in report.to_dot()
+
+    def test_vhd_before_vm(self, hyperv):
+        vm_params = VMParams(
+            name="VM001",
+            vm_dir_path="C:\\VMs",
+            diff_disk_path="C:\\VMs\\VM001.vhdx",
+            mng_mac_address="52:5a:00:0a:00:01",
+            vswitch_name=VSWITCH_NAME,
+        )
+        hyperv.dry_run.host.execute_powershell(f"New-VMSwitch -Name '{VSWITCH_NAME}' -NetAdapterName 'MNG'")
+        hyperv.dry_run.host.add_file("C:\\base.vhdx")
+        hyperv.hypervisor.create_differencing_disk("C:\\base.vhdx", "C:\\VMs", "VM001.vhdx")
+        hyperv.hypervisor.define_vm(vm_params)
+
+        commands = hyperv.dry_run.report().commands
+
+        new_vhd = next(c for c in commands if c.name == "new-vhd")
+        new_vm = next(c for c in commands if c.name == "new-vm")
+        add_disk = next(c for c in commands if c.name == "add-vmharddiskdrive")
+        assert new_vm.index in add_disk.depends_on
+        assert new_vhd.index in add_disk.depends_on
+        assert new_vhd.index not in new_vm.depends_on
+
+    def test_estimate_from_measured_latencies(self, hyperv, tmp_path):
+        measured = CommandMetrics()
+        measured.record("VSwitchManager.get_vswitch_mapping", "get-vmswitch", 2.0, 0, False)
+        measured.record("VSwitchManager.get_vswitch_attributes", "get-vmswitch", 4.0, 0, False)
+        measured.export(tmp_path / "metrics.json")
+        hyperv.dry_run.host.execute_powershell(f"New-VMSwitch -Name '{VSWITCH_NAME}' -NetAdapterName 'MNG'")
+
+        hyperv.vswitch_manager.get_vswitch_mapping()
+        hyperv.vswitch_manager.set_vswitch_attribute(VSWITCH_NAME, "DefaultFlowMinimumBandwidthAbsolute", 10)
+        report = hyperv.dry_run.report(tmp_path / "metrics.json")
+
+        assert report.estimated_times[0] == pytest.approx(3.0)
+        assert report.estimated_time > 3.0
+        assert report.critical_path_time == pytest.approx(max(report.estimated_times))
+        assert json.loads(json.dumps(report.to_dict()))["commands"][0]["estimated_time"] == pytest.approx(3.0)
+
+    def test_redundant_queries(self, hyperv):
+        hyperv.dry_run.host.execute_powershell(f"New-VMSwitch -Name '{VSWITCH_NAME}' -NetAdapterName 'MNG'")
+
+        hyperv.vswitch_manager.get_vswitch_attributes(VSWITCH_NAME)
+        hyperv.vswitch_manager.get_vswitch_attributes(VSWITCH_NAME)
+        hyperv.vswitch_manager.set_vswitch_attribute(VSWITCH_NAME, "DefaultFlowMinimumBandwidthAbsolute", 10)
+        hyperv.vswitch_manager.get_vswitch_attributes(VSWITCH_NAME)
+        report = hyperv.dry_run.report()
+
+        assert [command.index for command in report.redundant_queries] == [1]
+        assert "redundant" in str(report)
+
+    def test_batch_recorded_as_one_command(self, hyperv):
+        hyperv.dry_run.host.execute_powershell(f"New-VMSwitch -Name '{VSWITCH_NAME}' -NetAdapterName 'MNG'")
+        with hyperv.batch():
+            for value in (10, 20):
+                hyperv.vswitch_manager.set_vswitch_attribute(
+                    VSWITCH_NAME, "DefaultFlowMinimumBandwidthAbsolute", value
+                )
+
+        report = hyperv.dry_run.report()
+
+        assert [command.name for command in report.commands] == ["batch"]
+        assert report.commands[0].writes == {f"vswitch:{VSWITCH_NAME}"}
+        assert report.estimated_time < 2 * DryRunConnection._estimate("Set-VMSwitch x", {})
+
+    def test_get_command_resources(self):
+        assert get_command_resources("Remove-VMSwitch 'VS1' -Force") == (True, set(), {"vswitch:VS1"})
+        assert get_command_resources('vfpctrl /switch VS1 /add-queue "1 SQ1 true 100 0 0"') == (
+            True,
+            {"vswitch:VS1"},
+            {"qos:VS1"},
+        )
+        assert get_command_resources("$FormatEnumerationLimit = -1; Get-VMSwitch | fl") == (
+            False,
+            {"vswitch:*"},
+            set(),
+        )
+        assert get_command_resources("Get-VMNetworkAdapter -ManagementOS -Name 'mng' | fl") == (
+            False,
+            {"vnic:host/mng"},
+            set(),
+        )
@@ -0,0 +1,253 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: MIT
+"""Tests for `mfd_hyperv` emulated host connection."""
+
+import pytest
+from mfd_connect.exceptions import ConnectionCalledProcessError
+from mfd_connect.util.powershell_utils import parse_powershell_list
+
+from mfd_hyperv import HyperV
+from mfd_hyperv.attributes.vm_params import VMParams
+from mfd_hyperv.connections.emulated import EmulatedHyperVConnection
+from mfd_hyperv.exceptions import HyperVExecutionException
+
+BASE_IMAGE = "C:\\Images\\Base_R91.vhdx"
+
+
+class TestEmulatedHyperVConnection:
+    @pytest.fixture()
+    def clock(self):
+        class Clock:
+            now = 0.0
+
+            def __call__(self):
+                return self.now
+
+        return Clock()
+
+    @pytest.fixture()
+    def host(self, clock):
+        host = EmulatedHyperVConnection(time_scale=0, clock=clock)
+        host.add_file(BASE_IMAGE)
+        return host
+
+    @pytest.fixture()
+    def hyperv(self, host, mocker):
+        mocker.patch("mfd_hyperv.hypervisor.RPyCConnection")
+        mocker.patch("mfd_hyperv.instances.vm.NetworkAdapterOwner")
+        mocker.patch("mfd_hyperv.instances.vm.sleep")
+        return HyperV(connection=host)
+
+    @pytest.fixture()
+    def vswitch(self, host):
+        host.execute_powershell(
+            "New-VMSwitch -Name 'managementvSwitch' -NetAdapterName 'Ethernet' -AllowManagementOS $true"
+        )
+        host.start_process(
+            "powershell.exe \"New-VMSwitch -Name 'VSWITCH_01' -NetAdapterName 'SLOT 1 Port 1' -AllowManagementOS $true"
+            ' -EnableIov $True"',
+            shell=True,
+        )
+        return "VSWITCH_01"
+
+    def create_vm(self, hyperv, index):
+        name = f"Base_R91_VM{index:03}"
+        disk = hyperv.hypervisor.create_differencing_disk(BASE_IMAGE, "C:\\VMs", f"{name}.vhdx")
+        params = VMParams(
+            name=name,
+            vm_dir_path="C:\\VMs",
+            diff_disk_path=disk,
+            mng_mac_address=hyperv.hypervisor.format_mac(f"10.10.{index // 256}.{index % 256}"),
+            mng_ip=f"10.10.{index // 256}.{index % 256}",
+            vswitch_name="managementvSwitch",
+        )
+        return hyperv.hypervisor.create_vm(params, hyperv=hyperv)
+
+    def test_create_vm(self, host, hyperv, vswitch):
+        vm = self.create_vm(hyperv, 1)
+
+        assert hyperv.hypervisor.get_vm_state(vm.name) == "Running"
+        assert hyperv.hypervisor.get_vm_attributes(vm.name)["ProcessorCount"] == "2"
+        assert host.file_exists("C:\\VMs\\Base_R91_VM001.vhdx")
+        adapters = hyperv.vm_network_interface_manager.get_vm_interfaces(vm.name)
+        assert [(a["name"], a["macaddress"], a["vmqweight"]) for a in adapters] == [("mng", "525a000a0001", "0")]
+
+    def test_mng_ip_assigned_after_dhcp_delay(self, host, hyperv, vswitch, clock):
+        host.dhcp_delay = 10
+        host.execute_powershell("New-VM 'vm' -Generation 2 -Path C:\\VMs")
+        host.execute_powershell("Add-VMNetworkAdapter -VMName 'vm' -Name 'mng' -StaticMacAddress 525a000a0a15")
+        host.execute_powershell("Start-VM vm")
+        command = "Get-VMNetworkAdapter -VMName vm | select vmname, ipaddresses, macaddress | fl"
+
+        assert "169.254.10.21" in host.execute_powershell(command).stdout
+        clock.now = 10
+        assert parse_powershell_list(host.execute_powershell(command).stdout)[1]["IPAddresses"].startswith(
+            "{10.10.10.21,"
+        )
+
+    def test_vm_network_interfaces(self, host, hyperv, vswitch):
+        vm = self.create_vm(hyperv, 1)
+        manager = hyperv.vm_network_interface_manager
+        vnics = [
+            manager.create_vm_network_interface(vm_name=vm.name, vswitch_name=vswitch, sriov=True, vm=vm)
+            for _ in range(3)
+        ]
+
+        attributes = manager.get_vm_interface_attributes(vm.name)
+        assert [a["name"] for a in attributes] == ["mng", *[vnic.interface_name.lower() for vnic in vnics]]
+        assert all(a["vfdatapathactive"] == "true" for a in attributes[1:])
+        assert len({a["macaddress"] for a in attributes}) == 4
+
+        manager.disconnect_vm_interface(vnics[0].interface_name, vm.name)
+        manager.set_vm_interface_vlan("access", vm.name, vnics[1].interface_name, "vlanid", 10)
+        assert manager.get_vm_interface_vlan(vm.name, vnics[1].interface_name)["AccessVlanId"] == "10"
+        manager.remove_vm_interface(vnics[2].interface_name, vm.name)
+        attributes = manager.get_vm_interface_attributes(vm.name)
+        assert [(a["name"], a["switchname"]) for a in attributes[1:]] == [
+            (vnics[0].interface_name.lower(), ""),
+            (vnics[1].interface_name.lower(), vswitch.lower()),
+        ]
+
+    def test_vswitches(self, host, hyperv, vswitch):
+        manager = hyperv.vswitch_manager
+
+        assert manager.is_vswitch_present(vswitch)
+        assert manager.get_vswitch_mapping() == {
+            "managementvSwitch": "Intel(R) Ethernet Adapter (Ethernet)",
+            vswitch: "Intel(R) Ethernet Adapter (SLOT 1 Port 1)",
+        }
+        manager.set_vswitch_attribute(vswitch, "DefaultFlowMinimumBandwidthAbsolute", 100)
+        manager.rename_vswitch(vswitch, "renamed")
+        assert manager.get_vswitch_attributes("renamed")["defaultflowminimumbandwidthabsolute"] == "100"
+        assert hyperv.vm_network_interface_manager.get_vm_interface_attached_to_vswitch("renamed") == vswitch
+
+        manager.remove_tested_vswitches()
+        assert host.execute_powershell("Get-VMSwitch | select -expandproperty Name").stdout == "managementvSwitch\n"
+        assert [a["SwitchName"] for a in host.vm_adapters] == ["managementvSwitch"]
+
+    def test_vswitch_ready_after_host_adapter_delay(self, host, hyperv, clock):
+        host.host_adapter_delay = 5
+        host.execute_powershell("New-VMSwitch -Name 'VS1' -NetAdapterName 'SLOT 1 Port 1' -AllowManagementOS $true")
+        manager = hyperv.vswitch_manager
+
+        assert manager.is_vswitch_present("VS1")
+        assert not manager.is_vswitch_present("VS")
+        assert not manager.is_vswitch_ready("VS1")
+        assert manager.is_vswitch_ready("VS1", host_adapter=False)
+        clock.now = 5
+        assert manager.is_vswitch_ready("VS1")
+        assert not manager.is_vswitch_ready("VS2")
+        assert host.execute_powershell("Get-NetAdapter -Name 'missing'", expected_return_codes=None).return_code == 1
+
+    def test_vswitch_ready_after_wait_on_host(self, clock):
+        def sleep(seconds):
+            clock.now += seconds
+
+        host = EmulatedHyperVConnection(
+            latency={"new-vmswitch": 0}, powershell_startup=0, host_adapter_delay=5, clock=clock, sleep=sleep
+        )
+        host.execute_powershell("New-VMSwitch -Name 'VS1' -NetAdapterName 'SLOT 1 Port 1' -AllowManagementOS $true")
+        manager = HyperV(connection=host).vswitch_manager
+
+        assert not manager.is_vswitch_ready("VS1", wait=2)
+        assert manager.is_vswitch_ready("VS1", wait=10)
+        assert 5 <= clock.now < 5.5
+
+    def test_new_vswitch_on_bound_adapter_fails(self, host, vswitch):
+        with pytest.raises(ConnectionCalledProcessError, match="already bound to another virtual switch"):
+            host.execute_powershell("New-VMSwitch -Name 'other' -NetAdapterName 'SLOT 1 Port 1'")
+
+    def test_hw_qos(self, host, hyperv, vswitch):
+        vm = self.create_vm(hyperv, 1)
+        hyperv.vm_network_interface_manager.create_vm_network_interface(vm_name=vm.name, vswitch_name=vswitch, vm=vm)
+        hw_qos = hyperv.hw_qos
+
+        hw_qos.set_qos_config(vswitch, True, True, False, "0x00")
+        assert hw_qos.get_qos_config(vswitch) == {
+            "hw_caps": True,
+            "hw_reserv": True,
+            "sw_reserv": False,
+            "flags": "0x00",
+        }
+        hw_qos.create_scheduler_queue(vswitch, "5", "SQ5", True, "500", "0", "0")
+        hw_qos.update_scheduler_queue(vswitch, True, "700", "0", "0", "5")
+        assert hw_qos.is_scheduler_queues_created(vswitch, 5, "SQ5", "700")
+
+        vport = hw_qos.get_vmswitch_port_name(vswitch, vm.name)
+        hw_qos.associate_scheduler_queues_with_vport(vswitch, vport, "5", 10, "QOS")
+        assert hw_qos.list_scheduler_queues_with_vport(vswitch, vport) == ["5"]
+        with pytest.raises(HyperVExecutionException):
+            hw_qos.delete_scheduler_queue(vswitch, "5")
+
+        hw_qos.disassociate_scheduler_queues_with_vport(vswitch, vport)
+        hw_qos.delete_scheduler_queue(vswitch, "5")
+        assert "QOS QUEUE" not in hw_qos.list_queue(vswitch)
+
+    def test_remove_vm(self, host, hyperv, vswitch):
+        vm = self.create_vm(hyperv, 1)
+        hyperv.hypervisor.stop_vm(vm.name)
+        hyperv.hypervisor.remove_vm(vm.name)
+        hyperv.hypervisor.remove_differencing_disk("C:\\VMs\\Base_R91_VM001.vhdx")
+
+        assert host.vms == {}
+        assert not host.file_exists("C:\\VMs\\Base_R91_VM001.vhdx")
+        assert [a["Name"] for a in host.vm_adapters] == ["managementvSwitch", vswitch]
+        with pytest.raises(ConnectionCalledProcessError, match="unable to find a virtual machine"):
+            hyperv.hypervisor.get_vm_state(vm.name)
+
+    def test_vm_jobs(self, clock):
+        host = EmulatedHyperVConnection(time_scale=1, clock=clock, sleep=lambda _: None)
+        for vm_name in ("vm", "vm2"):
+            host.execute_powershell(f"New-VM '{vm_name}' -Generation 2 -Path C:\\VMs")
+        job_id = host.execute_powershell("(Start-VM -Name 'vm' -AsJob).Id").stdout.strip()
+        restart_id = host.execute_powershell("(Restart-VM -Name 'vm2' -Force -AsJob).Id").stdout.strip()
+
+        assert host.execute_powershell(f"Get-Job -Id {job_id} | Select-Object State | fl").stdout.split() == [
+            "State",
+            ":",
+            "Running",
+        ]
+        assert host.vms["vm"]["State"] == "Off"
+        with pytest.raises(ConnectionCalledProcessError, match="not finished"):
+            host.execute_powershell(f"Remove-Job -Id {job_id}")
+
+        clock.now = 5.0
+        records = parse_powershell_list(host.execute_powershell("Get-Job | Select-Object Id, State | fl").stdout)
+        assert [(record["Id"], record["State"]) for record in records] == [
+            (job_id, "Completed"),
+            (restart_id, "Failed"),
+        ]
+        assert host.vms["vm"]["State"] == "Running"
+        result = host.execute_powershell(f"Receive-Job -Id {restart_id}", expected_return_codes=None)
+        assert "cannot be performed while 'vm2' is Off" in result.stderr
+
+        host.execute_powershell(f"Remove-Job -Id {job_id}, {restart_id}")
+        assert host.jobs == {}
+
+    def test_unknown_command(self, host):
+        result = host.execute_powershell("Get-Unknown -Name x", expected_return_codes=None)
+        assert result.return_code == 1
+        assert "is not recognized as the name of a cmdlet" in result.stderr
+
+    def test_latency(self, mocker):
+        sleep = mocker.Mock()
+        host = EmulatedHyperVConnection(latency={"start-vm": 3.0}, time_scale=0.5, sleep=sleep)
+        host.execute_powershell("New-VM 'vm' -Generation 2 -Path C:\\VMs")
+        host.execute_command("Start-VM vm")
+
+        assert [call.args[0] for call in sleep.call_args_list] == [pytest.approx(1.125), pytest.approx(1.5)]
+        assert host.round_trips == 2
+
+    def test_scale(self, host, hyperv, vswitch):
+        vms = [self.create_vm(hyperv, index) for index in range(1, 51)]
+        for vm in vms:
+            for _ in range(4):
+                hyperv.vm_network_interface_manager.create_vm_network_interface(
+                    vm_name=vm.name, vswitch_name=vswitch, sriov=True, vm=vm
+                )
+
+        output = host.execute_powershell(
+            "Get-VMNetworkAdapter -VMName " + ", ".join(f"'{vm.name}'" for vm in vms) + " | select * | fl"
+        ).stdout
+        assert len(parse_powershell_list(output)) == 250
+        assert len(host.ports) == 252
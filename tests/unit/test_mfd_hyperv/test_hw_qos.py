@@ -10,9 +10,14 @@ from mfd_connect import LocalConnection
 from mfd_connect.base import ConnectionCompletedProcess
 from mfd_typing import OSName
 
-from mfd_hyperv.hw_qos import HWQoS
+from mfd_hyperv import HyperV
+from mfd_hyperv.connections.batch import MAX_SCRIPT_LENGTH, decode_script
+from mfd_hyperv.connections.emulated import EmulatedHyperVConnection
+from mfd_hyperv.connections.session import RESULT_MARKER
+from mfd_hyperv.hw_qos import HWQoS, QoSLayout, QoSOperation
+from mfd_hyperv.vfpctrl_parser import QueueSpec
 from mfd_hyperv.exceptions import HyperVExecutionException, HyperVException
-from tests.unit.test_mfd_hyperv.const import out_list_queue, out_queue_offload, out_get_all_info
+from tests.unit.test_mfd_hyperv.const import out_list_queue, out_queue_offload
 
 
 class TestMfdHypervHWQos:
@@ -218,8 +223,7 @@ Command get-port-queue succeeded!
             hyperv_qos.get_vmswitch_port_name("vSwitch00", "vm00-2019")
 
     def test_get_vmswitch_port_name(self, hyperv_qos):
-        output = dedent(
-            """\
+        output = dedent("""\
         Port name             : 924950C2-4D3F-47E2-A7BA-C0E322C51C66
         Port Friendly name    : Dynamic Ethernet Switch Port
         Switch name           : 5D81E4BB-3056-4BA3-A7A5-469AEAFB366D
@@ -238,16 +242,14 @@ Command get-port-queue succeeded!
         MAC address        : AA-BB-CC-DD-EE-FF
         VM name            : vm00-2019
         VM ID              : 11223344-1122-4455-6655-ABCDEF123456
-            """
-        )
+            """)
         hyperv_qos._connection.execute_powershell.return_value = ConnectionCompletedProcess(
             return_code=0, args="command", stdout=output, stderr="stderr"
         )
         assert hyperv_qos.get_vmswitch_port_name("vSwitch00", "vm00-2019") == "924950C2-4D3F-47E2-A7BA-C0E322C51C66"
 
     def test_get_vmswitch_port_name_multiple_vm(self, hyperv_qos):
-        output = dedent(
-            """\
+        output = dedent("""\
         Port name             : 88888888-4D3F-47E2-A7BA-000000000000
         Port Friendly name    : Dynamic Ethernet Switch Port
         Switch name           : 5D81E4BB-3056-4BA3-A7A5-469AEAFB366D
@@ -284,30 +286,42 @@ Command get-port-queue succeeded!
         MAC address        : AA-BB-CC-DD-EE-FF
         VM name            : vm00-2019
         VM ID              : 11223344-1122-4455-6655-ABCDEF123456
-            """
-        )
+            """)
         hyperv_qos._connection.execute_powershell.return_value = ConnectionCompletedProcess(
             return_code=0, args="command", stdout=output, stderr="stderr"
         )
         assert hyperv_qos.get_vmswitch_port_name("vSwitch00", "vm00-2019") == "924950C2-4D3F-47E2-A7BA-C0E322C51C66"
 
-    def test_is_scheduler_queues_created_true(self, mocker, hyperv_qos):
-        hyperv_qos.list_queue = mocker.Mock(return_value=out_list_queue)
-        hyperv_qos.get_queue_all_info = mocker.Mock(return_value=out_get_all_info)
-        hyperv_qos.get_queue_offload_info = mocker.Mock(return_value=out_queue_offload)
+    @pytest.mark.parametrize(
+        "listed_queues, offloaded_queues, expected",
+        [
+            (out_list_queue, out_queue_offload, True),
+            ("output", "offload_result", False),
+            # configured queue which isn't offloaded doesn't count
+            (out_list_queue, "offload_result", False),
+            ("output", out_queue_offload, False),
+        ],
+    )
+    def test_is_scheduler_queues_created(self, hyperv_qos, script_output, listed_queues, offloaded_queues, expected):
+        hyperv_qos._connection.execute_powershell.return_value = ConnectionCompletedProcess(
+            return_code=0, args="command", stdout=script_output((0, listed_queues), (0, offloaded_queues)), stderr=""
+        )
         out = hyperv_qos.is_scheduler_queues_created(
             vswitch_name="sample_vswitch", sq_id=2, sq_name="SQ2", tx_max="10000"
         )
-        assert out
+        assert out is expected
+        hyperv_qos._connection.execute_powershell.assert_called_once()
+        assert decode_script(hyperv_qos._connection.execute_powershell.call_args.kwargs["command"]) == [
+            "vfpctrl /switch sample_vswitch /list-queue",
+            'vfpctrl /switch sample_vswitch /get-queue-info "offload"',
+        ]
 
-    def test_is_scheduler_queues_created_false(self, mocker, hyperv_qos):
-        hyperv_qos.list_queue = mocker.Mock(return_value="output")
-        hyperv_qos.get_queue_all_info = mocker.Mock(return_value="out_get_all_info")
-        hyperv_qos.get_queue_offload_info = mocker.Mock(return_value="offload_result")
-        out = hyperv_qos.is_scheduler_queues_created(
-            vswitch_name="sample_vswitch", sq_id=2, sq_name="SQ2", tx_max="10000"
+    def test_get_queue_state_failure(self, hyperv_qos):
+        hyperv_qos._connection.execute_powershell.return_value = ConnectionCompletedProcess(
+            return_code=0, args="command", stdout=f"{RESULT_MARKER} 0 1", stderr=""
         )
-        assert not out
+        with pytest.raises(HyperVExecutionException):
+            hyperv_qos.get_queue_state("sample_vswitch", with_ports=False)
 
     def test_list_queue(self, hyperv_qos):
         expected_output = "list queue output"
@@ -341,3 +355,224 @@ Command get-port-queue succeeded!
         hyperv_qos._connection.execute_powershell.assert_called_once_with(
             'vfpctrl /switch sw0 /get-queue-info "offload" /queue "2"', custom_exception=HyperVExecutionException
         )
+
+
+VSWITCH = "VS1"
+
+
+@pytest.fixture()
+def host():
+    host = EmulatedHyperVConnection(time_scale=0)
+    host.execute_powershell(f"New-VMSwitch -Name '{VSWITCH}' -NetAdapterName 'SLOT 1 Port 1'")
+    host.execute_powershell("New-VMSwitch -Name 'other' -NetAdapterName 'SLOT 2 Port 1'")
+    for vm_name in ("vm1", "vm2"):
+        host.execute_powershell(f"New-VM '{vm_name}' -Generation 2 -Path C:\\VMs")
+        host.execute_powershell(f"Add-VMNetworkAdapter -VMName '{vm_name}' -Name 'vnic' -SwitchName '{VSWITCH}'")
+    host.execute_powershell("Add-VMNetworkAdapter -VMName 'vm1' -Name 'other' -SwitchName 'other'")
+    return host
+
+
+@pytest.fixture()
+def hw_qos(host):
+    return HyperV(connection=host).hw_qos
+
+
+def test_queue_state_of_many_ports_read_in_few_scripts(host, hw_qos):
+    for index in range(150):
+        host.execute_powershell(f"Add-VMNetworkAdapter -VMName 'vm1' -Name 'vnic{index}' -SwitchName '{VSWITCH}'")
+    host.commands.clear()
+
+    state = hw_qos.get_queue_state(VSWITCH)
+
+    assert len(state.port_queues) == 152
+    assert 1 < len(host.commands) < 10
+    assert all(len(command) <= MAX_SCRIPT_LENGTH for command in host.commands)
+
+
+class TestExecuteOperations:
+    def queue(self, sq_id):
+        return QoSOperation(
+            "create_scheduler_queue",
+            {
+                "vswitch_name": VSWITCH,
+                "sq_id": sq_id,
+                "sq_name": f"SQ{sq_id}",
+                "limit": True,
+                "tx_max": "1000",
+                "tx_reserve": "0",
+                "rx_max": "0",
+            },
+        )
+
+    def associate(self, vport, sq_id):
+        return QoSOperation(
+            "associate_scheduler_queues_with_vport",
+            {"vswitch_name": VSWITCH, "vport": vport, "sq_id": sq_id, "lid": 10, "lname": "QOS"},
+        )
+
+    def test_operations_executed_in_one_script(self, host, hw_qos):
+        vports = [hw_qos.get_vmswitch_port_name(VSWITCH, vm_name) for vm_name in ("vm1", "vm2")]
+        host.commands.clear()
+        operations = [self.queue("1"), self.queue("2"), self.associate(vports[0], "1"), self.associate(vports[1], "2")]
+
+        results = hw_qos.execute_operations(operations)
+
+        assert [result.status for result in results] == ["succeeded"] * 4
+        assert len(host.commands) == 1
+        assert decode_script(host.commands[0]) == [cmd for operation in operations for cmd in operation.commands]
+        assert [hw_qos.list_scheduler_queues_with_vport(VSWITCH, vport) for vport in vports] == [["1"], ["2"]]
+
+    @pytest.mark.parametrize(
+        "stop_on_failure, statuses, round_trips",
+        [
+            (True, ["succeeded", "failed", "skipped", "skipped"], 1),
+            (False, ["succeeded", "failed", "succeeded", "failed"], 2),
+        ],
+    )
+    def test_failure_policy(self, host, hw_qos, stop_on_failure, statuses, round_trips):
+        vport = hw_qos.get_vmswitch_port_name(VSWITCH, "vm1")
+        host.commands.clear()
+        operations = [self.queue("1"), self.associate(vport, "5"), self.queue("2"), self.queue("1")]
+
+        results = hw_qos.execute_operations(operations, stop_on_failure=stop_on_failure)
+
+        assert [result.status for result in results] == statuses
+        assert len(host.commands) == round_trips
+        assert isinstance(results[1].error, HyperVExecutionException)
+        assert "/set-port-queue 5" in results[1].error.cmd
+        assert len(results[1].outputs) == 4
+
+    def test_split_into_scripts(self, host, hw_qos):
+        hw_qos.max_script_length = 1500
+        host.commands.clear()
+
+        results = hw_qos.execute_operations([self.queue(str(sq_id)) for sq_id in range(1, 21)])
+
+        assert all(result.succeeded for result in results)
+        assert 1 < len(host.commands) < 20
+        assert len(hw_qos.get_queue_all_info(VSWITCH).split("QOS QUEUE:")) == 21
+
+    @pytest.mark.parametrize(
+        "operation, message",
+        [
+            (QoSOperation("remove_vswitch", {}), "Unsupported HWQoS batch operation remove_vswitch"),
+            (QoSOperation("delete_scheduler_queue", {"vswitch_name": "VS1"}), "Incorrect arguments"),
+        ],
+    )
+    def test_invalid_operation(self, host, hw_qos, operation, message):
+        host.commands.clear()
+        with pytest.raises(HyperVException, match=message):
+            hw_qos.execute_operations([self.queue("1"), operation])
+        assert host.commands == []
+
+
+class TestQueueState:
+    def test_get_queue_state(self, host, hw_qos):
+        vports = [hw_qos.get_vmswitch_port_name(VSWITCH, vm_name) for vm_name in ("vm1", "vm2")]
+        hw_qos.create_scheduler_queue(VSWITCH, "1", "SQ", True, "1000", "100", "0")
+        hw_qos.create_scheduler_queue(VSWITCH, "2", "SQ", False, "2000", "0", "500")
+        hw_qos.create_scheduler_queue(VSWITCH, "3", "SQ3", True, "3000", "0", "0")
+        for vport in vports:
+            hw_qos.associate_scheduler_queues_with_vport(VSWITCH, vport, "1", 10, "QOS")
+        host.commands.clear()
+
+        state = hw_qos.get_queue_state(VSWITCH)
+
+        assert len(host.commands) == 1
+        assert len(state) == 3 and "2" in state and 4 not in state
+        assert state.get_queue(2) == QueueSpec("2", "SQ", "2000", limit=False, rx_max="500")
+        assert [queue.sq_id for queue in state.get_queues_by_name("SQ")] == ["1", "2"]
+        assert state.is_offloaded("3") and not state.is_offloaded("4")
+        assert state.get_ports("1") == vports
+        assert state.get_ports("2") == []
+        assert state.port_queues == {vports[0]: ["1"], vports[1]: ["1"]}
+        assert state.has_queue(1, sq_name="SQ", tx_max=1000, tx_reserve=100, limit=True)
+        assert not state.has_queue(1, tx_max=2000)
+        assert not state.has_queue(2, limit=True)
+        assert not state.has_queue(4)
+
+    def test_given_ports_read_in_one_script(self, host, hw_qos):
+        vport = hw_qos.get_vmswitch_port_name(VSWITCH, "vm2")
+        host.commands.clear()
+
+        assert hw_qos.get_queue_state(VSWITCH, vports=[vport]).port_queues == {vport: []}
+        assert hw_qos.get_queue_state(VSWITCH, with_ports=False).port_queues == {}
+        assert len(host.commands) == 2
+
+
+class TestReconcile:
+    CONFIG = {"hw_caps": True, "hw_reserv": False, "sw_reserv": True, "flags": "0x0"}
+
+    @pytest.fixture()
+    def vports(self, hw_qos):
+        return [hw_qos.get_vmswitch_port_name(VSWITCH, vm_name) for vm_name in ("vm1", "vm2")]
+
+    def layout(self, vports, **kwargs):
+        return QoSLayout(
+            VSWITCH,
+            queues=[QueueSpec("1", "SQ1", "1000"), QueueSpec("2", "SQ2", "2000", tx_reserve="500")],
+            port_queues={vports[0]: "1", vports[1]: 2},
+            qos_config=self.CONFIG,
+            **kwargs,
+        )
+
+    def test_reconcile(self, host, hw_qos, vports):
+        results = hw_qos.reconcile(self.layout(vports))
+
+        assert [result.operation.name for result in results] == [
+            "set_qos_config",
+            "create_scheduler_queue",
+            "create_scheduler_queue",
+            "associate_scheduler_queues_with_vport",
+            "associate_scheduler_queues_with_vport",
+        ]
+        assert all(result.succeeded for result in results)
+        host.commands.clear()
+
+        assert hw_qos.reconcile(self.layout(vports)) == []
+        assert len(host.commands) == 1
+        state = hw_qos.get_queue_state(VSWITCH, with_config=True)
+        assert state.qos_config == self.CONFIG
+        assert state.port_queues == {vports[0]: ["1"], vports[1]: ["2"]}
+
+    def test_only_differences_changed(self, host, hw_qos, vports):
+        hw_qos.reconcile(self.layout(vports))
+        hw_qos.create_scheduler_queue(VSWITCH, "3", "SQ3", True, "3000", "0", "0")
+        hw_qos.associate_scheduler_queues_with_vport(VSWITCH, vports[1], "3", 10, "QOS")
+        hw_qos.update_scheduler_queue(VSWITCH, True, "1500", "0", "0", "1")
+        layout = self.layout(vports, prune=True)
+
+        operations = hw_qos.plan_layout(layout)
+
+        assert [str(operation) for operation in operations] == [
+            f"disassociate_scheduler_queues_with_vport(vswitch_name={VSWITCH}, vport={vports[1]})",
+            f"delete_scheduler_queue(vswitch_name={VSWITCH}, sq_id=3)",
+            f"update_scheduler_queue(vswitch_name={VSWITCH}, sq_id=1, limit=True, tx_max=1000, tx_reserve=0, "
+            "rx_max=0)",
+            f"associate_scheduler_queues_with_vport(vswitch_name={VSWITCH}, vport={vports[1]}, sq_id=2, lid=10, "
+            "lname=QOS)",
+        ]
+        assert all(result.succeeded for result in hw_qos.reconcile(layout))
+        assert hw_qos.plan_layout(layout) == []
+
+    def test_equivalent_qos_config_not_set(self, host, hw_qos, vports):
+        hw_qos.set_qos_config(VSWITCH, True, False, True, "0x00")
+        layout = self.layout(vports)
+        layout.qos_config = {"hw_caps": "true", "hw_reserv": False, "sw_reserv": "True", "flags": "0x0"}
+
+        assert "set_qos_config" not in [operation.name for operation in hw_qos.plan_layout(layout)]
+        layout.qos_config["flags"] = "0x1"
+        assert hw_qos.plan_layout(layout)[0].name == "set_qos_config"
+
+    def test_queues_not_in_layout_kept(self, host, hw_qos, vports):
+        hw_qos.create_scheduler_queue(VSWITCH, "3", "SQ3", True, "3000", "0", "0")
+        hw_qos.reconcile(self.layout(vports))
+
+        assert "3" in hw_qos.get_queue_state(VSWITCH, with_ports=False)
+
+    def test_port_of_unknown_queue(self, host, hw_qos, vports):
+        host.commands.clear()
+
+        with pytest.raises(HyperVException, match="not in layout"):
+            hw_qos.plan_layout(QoSLayout(VSWITCH, port_queues={vports[0]: "7"}))
+        assert host.commands == []
@@ -11,9 +11,13 @@ from mfd_ping import PingResult
 from mfd_typing import OSName, MACAddress
 from netaddr import IPAddress
 
+from mfd_hyperv.attributes.vm_metering_report import VMMeteringReport
 from mfd_hyperv.attributes.vm_params import VMParams
+from mfd_hyperv.connections.batch import MAX_SCRIPT_LENGTH, decode_script
+from mfd_hyperv.connections.emulated import EmulatedHyperVConnection
 from mfd_hyperv.exceptions import HyperVException, HyperVExecutionException
-from mfd_hyperv.hypervisor import HypervHypervisor
+from mfd_hyperv.hypervisor import METERING_SELECT, HypervHypervisor
+from mfd_hyperv.vm_network_interface_manager import VMNetworkInterfaceManager
 
 
 class TestHypervisor:
@@ -152,6 +156,55 @@ class TestHypervisor:
         assert len(hypervisor.vms) == 1
         assert vm_params.mng_ip == "1.1.1.1"
 
+    def test_match_all_interfaces(self, hypervisor, mocker):
+        output = """
+            VMName     : vm_1
+            Name       : vm_1_vnic_001
+            MacAddress : 00155D000001
+
+            VMName     : vm_2
+            Name       : vm_2_vnic_001
+            MacAddress : 00155D000002
+        """
+        hypervisor._connection.execute_powershell.return_value = ConnectionCompletedProcess(
+            return_code=0, args="command", stdout=output, stderr="stderr"
+        )
+        manager = VMNetworkInterfaceManager(connection=hypervisor._connection)
+        vm_1 = mocker.Mock()
+        vm_1.name = "vm_1"
+        vm_1.hyperv.vm_network_interface_manager = manager
+        vm_1.match_interfaces.return_value = ["vnic_1"]
+        vm_2 = mocker.Mock()
+        vm_2.name = "vm_2"
+        vm_2.hyperv.vm_network_interface_manager = manager
+        vm_2.match_interfaces.side_effect = HyperVException("not matched")
+
+        results = hypervisor.match_all_interfaces([vm_1, vm_2], max_workers=2)
+
+        hypervisor._connection.execute_powershell.assert_called_once_with(
+            command="Get-VMNetworkAdapter -VMName 'vm_1', 'vm_2' | select * | fl", expected_return_codes={}
+        )
+        assert set(manager.all_vnics_attributes) == {"vm_1", "vm_2"}
+        vm_1.match_interfaces.assert_called_once_with(
+            from_host_vm_interfaces=[{"vmname": "vm_1", "name": "vm_1_vnic_001", "macaddress": "00155d000001"}],
+            from_vm_interfaces=vm_1.guest.get_interfaces.return_value,
+        )
+        assert results["vm_1"].interfaces == ["vnic_1"]
+        assert results["vm_1"].error is None
+        assert isinstance(results["vm_2"].error, HyperVException)
+        assert all(result.elapsed >= 0 for result in results.values())
+
+    def test_match_all_interfaces_failed(self, hypervisor, mocker):
+        hypervisor._connection.execute_powershell.return_value = ConnectionCompletedProcess(
+            return_code=1, args="command", stdout="", stderr="stderr"
+        )
+        vm = mocker.Mock()
+        vm.name = "vm_1"
+        vm.hyperv.vm_network_interface_manager = VMNetworkInterfaceManager(connection=hypervisor._connection)
+        with pytest.raises(HyperVException):
+            hypervisor.match_all_interfaces([vm])
+        vm.guest.get_interfaces.assert_not_called()
+
     def test_remove_vm_all(self, hypervisor_with_2_vms):
         hypervisor_with_2_vms._connection.execute_powershell.return_value = ConnectionCompletedProcess(
             return_code=0, args="command", stdout="stdout", stderr="stderr"
@@ -853,3 +906,165 @@ class TestHypervisor:
         hypervisor._connection.execute_powershell.assert_called_once_with(
             f"(Get-Item -Path {path}).Length", custom_exception=HyperVExecutionException
         )
+
+    @pytest.mark.parametrize(
+        "method, cmdlet",
+        [
+            ("enable_resource_metering", "Enable-VMResourceMetering"),
+            ("disable_resource_metering", "Disable-VMResourceMetering"),
+            ("reset_resource_metering", "Reset-VMResourceMetering"),
+        ],
+    )
+    def test_resource_metering_of_many_vms(self, hypervisor, method, cmdlet):
+        getattr(hypervisor, method)(["vm1", "vm'2"])
+        getattr(hypervisor, method)([])
+
+        hypervisor._connection.execute_powershell.assert_called_once_with(
+            f"{cmdlet} -VMName 'vm1', 'vm''2'", custom_exception=HyperVExecutionException
+        )
+
+    def test_measure_vms(self, hypervisor):
+        output = """
+            VMName                          : vm1
+            MeteringMilliseconds            : 60000
+            AverageProcessorUsage           : 120
+            AverageMemoryUsage              : 2048
+            MinimumMemoryUsage              : 2048
+            MaximumMemoryUsage              : 4096
+            TotalDiskAllocation             : 40960
+            AggregatedAverageNormalizedIOPS : 15
+            AggregatedDiskDataRead          : 300
+            AggregatedDiskDataWritten       : 100
+            NetworkInbound                  : 50
+            NetworkOutbound                 : 20
+
+            VMName                          : vm2
+            MeteringMilliseconds            : 500
+            AverageProcessorUsage           : 0
+            AverageMemoryUsage              : 1024
+            MinimumMemoryUsage              : 1024
+            MaximumMemoryUsage              : 1024
+            TotalDiskAllocation             : 40960
+            AggregatedAverageNormalizedIOPS :
+            AggregatedDiskDataRead          :
+            AggregatedDiskDataWritten       :
+            NetworkInbound                  :
+            NetworkOutbound                 :
+        """
+        hypervisor._connection.execute_powershell.return_value = ConnectionCompletedProcess(
+            return_code=0, args="command", stdout=output, stderr="stderr"
+        )
+
+        reports = hypervisor.measure_vms(["vm1", "vm2"])
+
+        hypervisor._connection.execute_powershell.assert_called_once_with(
+            f"Measure-VM -VMName 'vm1', 'vm2' | Select-Object {METERING_SELECT} | fl",
+            custom_exception=HyperVExecutionException,
+        )
+        assert reports["vm1"] == VMMeteringReport(
+            "vm1", 60.0, 120.0, 2048.0, 2048.0, 4096.0, 40960.0, 15.0, 300.0, 100.0, 50.0, 20.0
+        )
+        assert reports["vm2"] == VMMeteringReport("vm2", 0.5, 0.0, 1024.0, 1024.0, 1024.0, 40960.0)
+        assert hypervisor.measure_vms([]) == {}
+
+    def test_diff_metering(self):
+        before = {
+            "vm1": VMMeteringReport("vm1", duration=60, avg_cpu_mhz=100, network_inbound_mb=50, max_ram_mb=2048),
+            "vm2": VMMeteringReport("vm2", duration=60, network_inbound_mb=50),
+        }
+        after = {
+            "vm1": VMMeteringReport("vm1", duration=120, avg_cpu_mhz=150, network_inbound_mb=80, max_ram_mb=4096),
+            # metering of vm2 was reset
+            "vm2": VMMeteringReport("vm2", duration=30, network_inbound_mb=10),
+            "vm3": VMMeteringReport("vm3", duration=10),
+        }
+
+        diff = HypervHypervisor.diff_metering(before, after)
+
+        assert diff["vm1"] == VMMeteringReport(
+            "vm1", duration=60, avg_cpu_mhz=200, network_inbound_mb=30, max_ram_mb=4096
+        )
+        assert diff["vm2"] is after["vm2"] and diff["vm3"] is after["vm3"]
+
+
+class TestVMLifecycle:
+    @pytest.fixture()
+    def host(self):
+        host = EmulatedHyperVConnection(time_scale=0)
+        for vm_name in ("vm1", "vm2", "vm3"):
+            host.execute_powershell(f"New-VM '{vm_name}' -Generation 2 -Path C:\\VMs")
+        host.commands.clear()
+        return host
+
+    @pytest.fixture()
+    def hypervisor(self, host):
+        return HypervHypervisor(connection=host)
+
+    def test_start_vms_with_limit(self, host, hypervisor):
+        results = hypervisor.start_vms(["vm1", "vm2", "vm3"], max_concurrent=2, poll_interval=0)
+
+        assert all(result.succeeded and result.state == "Running" for result in results.values())
+        assert [result.action for result in results.values()] == ["start"] * 3
+        assert decode_script(host.commands[0]) == [
+            "(Start-VM -Name 'vm1' -AsJob).Id",
+            "(Start-VM -Name 'vm2' -AsJob).Id",
+        ]
+        assert decode_script(host.commands[1]) == [
+            "Get-VM -Name 'vm1', 'vm2' | Select-Object Name, State | fl",
+            "Get-Job -Id 1, 2 | Select-Object Id, State | fl",
+        ]
+        assert host.commands[2] == "(Start-VM -Name 'vm3' -AsJob).Id"
+        assert host.commands[-1] == "Remove-Job -Id 1, 2, 3 -Force"
+        assert len(host.commands) == 5
+        assert host.jobs == {}
+
+    def test_stop_and_restart_vms(self, host, hypervisor):
+        hypervisor.start_vms(["vm1", "vm2"], poll_interval=0)
+
+        restarted = hypervisor.restart_vms(["vm1", "vm2", "vm3"], poll_interval=0)
+        stopped = hypervisor.stop_vms(["vm1", "vm2"], turnoff=True, poll_interval=0)
+
+        assert [result.succeeded for result in restarted.values()] == [True, True, False]
+        assert "cannot be performed while 'vm3' is Off" in str(restarted["vm3"].error)
+        assert all(result.succeeded and result.state == "Off" for result in stopped.values())
+        assert host.vms["vm1"]["State"] == "Off"
+        assert "(Stop-VM -Name 'vm1' -Force -TurnOff -Confirm:$false -AsJob).Id" in decode_script(host.commands[-3])
+
+    def test_launch_failure(self, host, hypervisor):
+        results = hypervisor.start_vms(["vm1", "missing", "vm2"], poll_interval=0)
+
+        assert [result.succeeded for result in results.values()] == [True, False, True]
+        assert isinstance(results["missing"].error, HyperVExecutionException)
+        assert "unable to find a virtual machine" in results["missing"].error.stderr
+        assert host.commands[1] == "(Start-VM -Name 'vm2' -AsJob).Id"
+
+    def test_launches_split_by_script_length(self, host, hypervisor):
+        vm_names = [f"vm{index:03}" for index in range(120)]
+        for vm_name in vm_names:
+            host.execute_powershell(f"New-VM '{vm_name}' -Generation 2 -Path C:\\VMs")
+        host.commands.clear()
+
+        results = hypervisor.start_vms(vm_names, poll_interval=0)
+
+        assert all(result.succeeded for result in results.values())
+        assert all(len(command) <= MAX_SCRIPT_LENGTH for command in host.commands)
+        launched = [
+            command for script in host.commands for command in decode_script(script) or [] if "Start-VM" in command
+        ]
+        assert len(launched) == 120
+
+    def test_timeout(self, hypervisor):
+        hypervisor._connection = host = EmulatedHyperVConnection(latency={"start-vm": 600}, sleep=lambda _: None)
+        host.execute_powershell("New-VM 'vm1' -Generation 2 -Path C:\\VMs")
+
+        result = hypervisor.start_vms(["vm1"], timeout=0.5, poll_interval=1)["vm1"]
+
+        assert not result.succeeded
+        assert str(result.error) == "VM vm1 didn't reach 'Running' state within 0.5s, last state: Off"
+        assert host.commands[-1] == "Remove-Job -Id 1 -Force"
+        assert host.jobs == {}
+
+    def test_incorrect_max_concurrent(self, host, hypervisor):
+        with pytest.raises(HyperVException):
+            hypervisor.start_vms(["vm1"], max_concurrent=0)
+        assert host.commands == []
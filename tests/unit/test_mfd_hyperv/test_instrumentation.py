@@ -0,0 +1,127 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: MIT
+"""Tests for `mfd_hyperv` instrumentation submodule."""
+
+import pytest
+from mfd_connect import LocalConnection
+from mfd_connect.base import ConnectionCompletedProcess
+from mfd_typing import OSName
+
+from mfd_hyperv import HyperV
+from mfd_hyperv.exceptions import HyperVExecutionException
+from mfd_hyperv.hw_qos import HWQoS
+from mfd_hyperv.instrumentation import (
+    CommandMetrics,
+    CommandStats,
+    InstrumentedConnection,
+    get_command_name,
+    UNKNOWN_OPERATION,
+)
+
+
+class TestInstrumentation:
+    @pytest.fixture()
+    def connection(self, mocker):
+        conn = mocker.create_autospec(LocalConnection)
+        conn.get_os_name.return_value = OSName.WINDOWS
+        conn.execute_powershell.return_value = ConnectionCompletedProcess(
+            return_code=0, args="command", stdout="output", stderr=""
+        )
+        return conn
+
+    @pytest.mark.parametrize(
+        "command, expected",
+        [
+            ("Get-VMSwitch | select -expandproperty Name", "get-vmswitch"),
+            ("powershell.exe \"New-VMSwitch -Name 'vs' -NetAdapterName 'eth'\"", "new-vmswitch"),
+            ("(Get-Item -Path C:\\file).Length", "get-item"),
+            ('vfpctrl /switch sw0 /add-queue "5 SQ1 true 500 0 0"', "vfpctrl /add-queue"),
+            ("vfpctrl /switch sw0 /port 1234 /set-port-queue 5", "vfpctrl /set-port-queue"),
+            ("vfpctrl /list-vmswitch-port", "vfpctrl /list-vmswitch-port"),
+        ],
+    )
+    def test_get_command_name(self, command, expected):
+        assert get_command_name(command) == expected
+
+    def test_instrumented_connection_records_operation(self, connection):
+        metrics = CommandMetrics()
+        hw_qos = HWQoS(InstrumentedConnection(connection, metrics))
+
+        hw_qos.delete_scheduler_queue("sw0", "5")
+        hw_qos.delete_scheduler_queue("sw0", "6")
+
+        stats = metrics.get_stats()
+        assert list(stats) == [("HWQoS.delete_scheduler_queue", "vfpctrl /remove-queue")]
+        assert stats[("HWQoS.delete_scheduler_queue", "vfpctrl /remove-queue")].count == 2
+        assert stats[("HWQoS.delete_scheduler_queue", "vfpctrl /remove-queue")].stdout_size == 12
+        assert metrics.round_trips == 2
+
+    def test_instrumented_connection_records_failures(self, connection):
+        metrics = CommandMetrics()
+        instrumented = InstrumentedConnection(connection, metrics)
+        connection.execute_powershell.side_effect = [
+            HyperVExecutionException(returncode=1, cmd="Get-VM"),
+            ConnectionCompletedProcess(return_code=1, args="Get-VM", stdout="", stderr=""),
+        ]
+
+        with pytest.raises(HyperVExecutionException):
+            instrumented.execute_powershell("Get-VM", custom_exception=HyperVExecutionException)
+        instrumented.execute_powershell("Get-VM", expected_return_codes={})
+
+        stats = metrics.get_stats()[(UNKNOWN_OPERATION, "get-vm")]
+        assert stats.count == 2
+        assert stats.failures == 2
+
+    def test_instrumented_connection_delegates(self, connection):
+        instrumented = InstrumentedConnection(connection, CommandMetrics())
+        assert instrumented.get_os_name() == OSName.WINDOWS
+        instrumented.start_process("vfpctrl /list-vmswitch-port", shell=True)
+        connection.start_process.assert_called_once_with("vfpctrl /list-vmswitch-port", shell=True)
+
+    def test_command_stats(self):
+        stats = CommandStats()
+        stats.add(0.005, 10, False)
+        stats.add(2.0, 20, True)
+        assert stats.count == 2
+        assert stats.failures == 1
+        assert stats.min_time == 0.005
+        assert stats.max_time == 2.0
+        assert stats.mean_time == pytest.approx(1.0025)
+        assert stats.histogram[0] == 1
+        assert stats.histogram[6] == 1
+
+    def test_aggregation_and_most_expensive(self):
+        metrics = CommandMetrics()
+        metrics.record("A.a", "get-vm", 1.0, 10, False)
+        metrics.record("B.b", "get-vm", 3.0, 10, False)
+        metrics.record("B.b", "set-vm", 0.5, 0, False)
+
+        assert metrics.by_command()["get-vm"].count == 2
+        assert metrics.by_operation()["B.b"].total_time == 3.5
+        assert [key for key, _ in metrics.most_expensive(2)] == [("B.b", "get-vm"), ("A.a", "get-vm")]
+
+    def test_export_load_and_compare(self, tmp_path):
+        metrics = CommandMetrics()
+        metrics.record("A.a", "get-vm", 1.0, 10, False)
+        file_path = tmp_path / "metrics.json"
+        metrics.export(file_path)
+
+        loaded = CommandMetrics.load(file_path)
+        assert loaded.get_stats() == metrics.get_stats()
+
+        metrics.record("A.a", "get-vm", 1.0, 10, False)
+        metrics.record("A.a", "set-vm", 0.5, 0, False)
+        assert metrics.compare(loaded) == {
+            ("A.a", "get-vm"): {"count_delta": 1, "total_time_delta": 1.0},
+            ("A.a", "set-vm"): {"count_delta": 1, "total_time_delta": 0.5},
+        }
+
+    def test_hyperv_managers_share_metrics(self, connection):
+        hyperv = HyperV(connection=connection)
+        hyperv.hw_qos.delete_scheduler_queue("sw0", "5")
+        hyperv.vswitch_manager.set_vswitch_attribute("sw0", "iovenabled", True)
+
+        assert set(hyperv.metrics.get_stats()) == {
+            ("HWQoS.delete_scheduler_queue", "vfpctrl /remove-queue"),
+            ("VSwitchManager.set_vswitch_attribute", "set-vmswitch"),
+        }
@@ -0,0 +1,104 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: MIT
+"""Tests for `mfd_hyperv` HW QoS planner."""
+
+import pytest
+
+from mfd_hyperv import HyperV
+from mfd_hyperv.connections.emulated import EmulatedHyperVConnection
+from mfd_hyperv.exceptions import HyperVException
+from mfd_hyperv.qos_planner import VMDemand, max_min_fair_share
+
+VSWITCH = "VS1"
+
+
+@pytest.mark.parametrize(
+    "capacity, demands, weights, expected",
+    [
+        (100, {"a": 20, "b": 30}, None, {"a": 20, "b": 30}),
+        (100, {"a": 10, "b": 60, "c": 60}, None, {"a": 10, "b": 45, "c": 45}),
+        (90, {"a": 100, "b": 100}, {"a": 2, "b": 1}, {"a": 60, "b": 30}),
+        (100, {"a": 10, "b": 100, "c": 100}, {"a": 1, "b": 1, "c": 2}, {"a": 10, "b": 30, "c": 60}),
+        (100, {"a": 0, "b": 200}, None, {"a": 0, "b": 100}),
+        (100, {}, None, {}),
+    ],
+)
+def test_max_min_fair_share(capacity, demands, weights, expected):
+    assert max_min_fair_share(capacity, demands, weights) == pytest.approx(expected)
+
+
+@pytest.fixture()
+def host():
+    host = EmulatedHyperVConnection(time_scale=0)
+    host.execute_powershell(f"New-VMSwitch -Name '{VSWITCH}' -NetAdapterName 'SLOT 1 Port 1'")
+    for vm_name in ("vm1", "vm2", "vm3"):
+        host.execute_powershell(f"New-VM '{vm_name}' -Generation 2 -Path C:\\VMs")
+        host.execute_powershell(f"Add-VMNetworkAdapter -VMName '{vm_name}' -Name 'vnic' -SwitchName '{VSWITCH}'")
+    host.execute_powershell(f"Add-VMNetworkAdapter -VMName 'vm1' -Name 'vnic2' -SwitchName '{VSWITCH}'")
+    host.execute_powershell(f'vfpctrl /switch {VSWITCH} /set-qos-config "true false true 0x0"')
+    host.commands.clear()
+    return host
+
+
+@pytest.fixture()
+def hyperv(host):
+    return HyperV(connection=host)
+
+
+class TestQoSPlanner:
+    def test_plan_and_apply(self, host, hyperv):
+        demands = [VMDemand("vm1", 2000, burst=10000), VMDemand("vm2", 8000, weight=2), VMDemand("vm3", 8000)]
+
+        plan = hyperv.qos_planner.plan(VSWITCH, 10000, demands, reservation_ratio=0.9)
+
+        assert plan.is_valid, plan.problems
+        assert [(a.vm_name, a.sq_id, a.tx_reserve, a.tx_max) for a in plan.allocations] == [
+            ("vm1", "1", 2000, 2500),
+            ("vm2", "2", 4666, 5000),
+            ("vm3", "3", 2333, 2500),
+        ]
+        assert plan.reserved <= 9000
+        assert [len(a.ports) for a in plan.allocations] == [2, 1, 1]
+        assert len(host.commands) == 2
+
+        host.commands.clear()
+        results = hyperv.qos_planner.apply(plan)
+
+        assert [result.status for result in results] == ["succeeded"] * 7
+        assert len(host.commands) == 1
+        state = hyperv.hw_qos.get_queue_state(VSWITCH)
+        assert state.has_queue("2", sq_name="SQ2", tx_max="5000", tx_reserve="4666")
+        assert [state.get_ports(a.sq_id) for a in plan.allocations] == [a.ports for a in plan.allocations]
+        assert hyperv.hw_qos.plan_layout(plan.layout) == []
+
+    def test_cap_not_lower_than_reservation(self, hyperv):
+        plan = hyperv.qos_planner.plan(VSWITCH, 600, [VMDemand("vm1", 10, burst=1000), VMDemand("vm2", 500)])
+
+        assert [(a.tx_reserve, a.tx_max) for a in plan.allocations] == [(10, 300), (500, 500)]
+
+    def test_problems(self, host, hyperv):
+        host.execute_powershell(f'vfpctrl /switch {VSWITCH} /set-qos-config "false false false 0x0"')
+
+        plan = hyperv.qos_planner.plan(VSWITCH, 1000, [VMDemand("vm1", 100), VMDemand("missing", 100)])
+
+        assert not plan.is_valid
+        assert len(plan.problems) == 3
+        assert "missing" in plan.problems[-1]
+        with pytest.raises(HyperVException, match="cannot be applied"):
+            hyperv.qos_planner.apply(plan)
+
+    @pytest.mark.parametrize(
+        "link_speed, demands, ratio",
+        [
+            (0, [VMDemand("vm1", 100)], 1.0),
+            (1000, [VMDemand("vm1", 100)], 1.5),
+            (1000, [VMDemand("vm1", 100), VMDemand("vm1", 200)], 1.0),
+            (1000, [VMDemand("vm1", -1)], 1.0),
+            (1000, [VMDemand("vm1", 100, weight=0)], 1.0),
+            (1000, [VMDemand("vm1", 100, burst=50)], 1.0),
+        ],
+    )
+    def test_incorrect_demands(self, host, hyperv, link_speed, demands, ratio):
+        with pytest.raises(HyperVException):
+            hyperv.qos_planner.plan(VSWITCH, link_speed, demands, reservation_ratio=ratio)
+        assert host.commands == []
@@ -0,0 +1,143 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: MIT
+"""Tests for `mfd_hyperv` recording submodule."""
+
+import pytest
+from mfd_connect import LocalConnection
+from mfd_connect.base import ConnectionCompletedProcess
+from mfd_typing import OSName
+
+from mfd_hyperv import HyperV
+from mfd_hyperv.connections.batch import build_script
+from mfd_hyperv.connections.recording import (
+    RecordedCommand,
+    RecordingConnection,
+    ReplayConnection,
+    normalize_command,
+)
+from mfd_hyperv.exceptions import HyperVExecutionException, HyperVReplayException
+
+QUEUE_LIST = """
+ ITEM LIST
+===========
+
+  QOS QUEUE: 5
+      Friendly name : SQ5
+      Transmit Limit: 500
+"""
+
+
+class TestRecording:
+    @pytest.fixture()
+    def connection(self, mocker):
+        conn = mocker.create_autospec(LocalConnection)
+        conn.get_os_name.return_value = OSName.WINDOWS
+        conn.execute_powershell.return_value = ConnectionCompletedProcess(
+            return_code=0, args="command", stdout=QUEUE_LIST, stderr=""
+        )
+        return conn
+
+    @pytest.mark.parametrize(
+        "command, expected",
+        [
+            (
+                'vfpctrl  /switch sw0 /add-queue "5 SQ5 true 500 0 0"',
+                "vfpctrl /switch sw0 /add-queue '5 sq5 true 500 0 0'",
+            ),
+            ("powershell.exe \"New-VMSwitch -Name 'vs'\"", "new-vmswitch -name 'vs'"),
+            ("Get-VM 5d81e4bb-3056-4ba3-a7a5-469aeafb366d", "get-vm <guid>"),
+        ],
+    )
+    def test_normalize_command(self, command, expected):
+        assert normalize_command(command) == expected
+
+    def test_normalize_batch_script(self):
+        script = build_script(["Get-VM 5d81e4bb-3056-4ba3-a7a5-469aeafb366d", 'vfpctrl  /switch "sw0" /list-queue'])
+        other_guid = build_script(["Get-VM 0ad3c0b4-0c8e-4c4b-9f3a-1f0e4d6a2b7c", "vfpctrl /switch 'sw0' /list-queue"])
+
+        assert normalize_command(script) == "get-vm <guid>; vfpctrl /switch 'sw0' /list-queue"
+        assert normalize_command(other_guid) == normalize_command(script)
+
+    def test_record_and_replay(self, connection, tmp_path):
+        recording = RecordingConnection(connection)
+        hyperv = HyperV(connection=recording)
+        hyperv.hw_qos.create_scheduler_queue("sw0", "5", "SQ5", True, "500", "0", "0")
+        assert hyperv.hw_qos.list_scheduler_queues_with_vport("sw0", "port1") == ["5"]
+        file_path = tmp_path / "session.json"
+        recording.save(file_path)
+
+        replay = ReplayConnection(file_path, time_scale=0)
+        hyperv = HyperV(connection=replay)
+        hyperv.hw_qos.create_scheduler_queue("sw0", "5", "SQ5", True, "500", "0", "0")
+        assert hyperv.hw_qos.list_scheduler_queues_with_vport("sw0", "port1") == ["5"]
+
+        assert replay.round_trips == len(recording.records) == 2
+        assert replay.unused_records == []
+        connection.execute_powershell.assert_called()
+
+    def test_record_failed_command(self, connection):
+        recording = RecordingConnection(connection)
+        connection.execute_powershell.side_effect = HyperVExecutionException(
+            returncode=1, cmd="Get-VM vm", output="", stderr="not found"
+        )
+        with pytest.raises(HyperVExecutionException):
+            recording.execute_powershell("Get-VM vm", custom_exception=HyperVExecutionException)
+
+        record = recording.records[0]
+        assert (record.return_code, record.stderr) == (1, "not found")
+
+        replay = ReplayConnection(recording.records, time_scale=0)
+        with pytest.raises(HyperVExecutionException):
+            replay.execute_powershell("Get-VM vm", custom_exception=HyperVExecutionException)
+        assert replay.execute_powershell("Get-VM vm", expected_return_codes={}).return_code == 1
+
+    def test_record_finished_process(self, connection, mocker, tmp_path):
+        process = mocker.Mock(running=False, return_code=0, stdout_text="done")
+        connection.start_process.return_value = process
+        recording = RecordingConnection(connection)
+        recording.start_process("vfpctrl /list-vmswitch-port", shell=True)
+        recording.save(tmp_path / "session.json")
+
+        replayed = ReplayConnection(tmp_path / "session.json", time_scale=0).start_process(
+            "vfpctrl /list-vmswitch-port"
+        )
+        assert (replayed.running, replayed.return_code, replayed.stdout_text) == (False, 0, "done")
+
+    def test_replay_tolerant_matching_and_repeats(self):
+        records = [
+            RecordedCommand("execute_powershell", "Get-VMSwitch | select -expandproperty Name", stdout="first"),
+            RecordedCommand("execute_powershell", "Get-VMSwitch | select -expandproperty Name", stdout="second"),
+        ]
+        replay = ReplayConnection(records, time_scale=0)
+
+        outputs = [replay.execute_powershell("get-vmswitch  |  select -expandproperty name").stdout for _ in range(3)]
+        assert outputs == ["first", "second", "second"]
+
+        strict_replay = ReplayConnection(records, time_scale=0, strict=True)
+        with pytest.raises(HyperVReplayException):
+            strict_replay.execute_powershell("get-vmswitch | select -expandproperty name")
+
+    def test_replay_unknown_command(self):
+        replay = ReplayConnection([], time_scale=0)
+        with pytest.raises(HyperVReplayException, match="No recorded output"):
+            replay.execute_powershell("Get-VM")
+
+    def test_replay_path(self):
+        replay = ReplayConnection([], time_scale=0)
+        path = replay.path("C:\\VMs", "vm.vhdx")
+
+        assert str(path.parent) == "C:\\VMs" and path.name == "vm.vhdx"
+        with pytest.raises(HyperVReplayException, match="not supported in replay"):
+            path.exists()
+        with pytest.raises(HyperVReplayException, match="not supported in replay"):
+            path.parent.read_text()
+        assert str(ReplayConnection([], time_scale=0, os_name=OSName.LINUX).path("/tmp", "a")) == "/tmp/a"
+
+    @pytest.mark.parametrize("time_scale, expected", [(1.0, [2.0]), (0.25, [0.5]), (0, [])])
+    def test_replay_time_scale(self, mocker, time_scale, expected):
+        sleep = mocker.Mock()
+        replay = ReplayConnection(
+            [RecordedCommand("execute_powershell", "Start-VM vm", duration=2.0)], time_scale=time_scale, sleep=sleep
+        )
+        replay.execute_powershell("Start-VM vm")
+        assert [call.args[0] for call in sleep.call_args_list] == expected
@@ -0,0 +1,176 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: MIT
+"""Tests for `mfd_hyperv` persistent PowerShell session."""
+
+import base64
+import queue
+
+import pytest
+
+from mfd_hyperv import HyperV
+from mfd_hyperv.connections.emulated import EmulatedHyperVConnection
+from mfd_hyperv.connections.proxy import ConnectionProxy
+from mfd_hyperv.connections.session import (
+    EXIT_REQUEST,
+    RESULT_MARKER,
+    PowerShellSessionConnection,
+    decode_result,
+    encode_request,
+)
+from mfd_hyperv.exceptions import HyperVExecutionException, HyperVSessionException
+
+
+def encode(text: str) -> str:
+    return base64.b64encode(text.encode("utf-8")).decode("ascii")
+
+
+class FakeSessionProcess:
+    """PowerShell session process executing received commands on emulated host."""
+
+    def __init__(self, host: EmulatedHyperVConnection):
+        self.host = host
+        self.running = True
+        self.hang = False
+        self.received = []
+        self._lines = queue.Queue()
+        self._lines.put(f"{RESULT_MARKER} READY\n")
+        self.stdin_stream = self
+        self.stdout_stream = self
+
+    def write(self, line: str) -> None:
+        if not self.running:
+            raise OSError("Broken pipe")
+        line = line.strip()
+        if line == EXIT_REQUEST:
+            self.kill()
+            return
+        request_id, command = line.split(" ", 1)
+        command = base64.b64decode(command).decode("utf-8")
+        self.received.append(command)
+        if self.hang:
+            return
+        result = self.host.execute_powershell(command, expected_return_codes=None)
+        self._lines.put(
+            f"{RESULT_MARKER} {request_id} {result.return_code} {encode(result.stdout)} {encode(result.stderr)}\n"
+        )
+
+    def flush(self) -> None:
+        pass
+
+    def readline(self) -> str:
+        line = self._lines.get()
+        return "" if line is None else line
+
+    def wait(self, timeout: int = 60) -> int:
+        return 0
+
+    def kill(self, *args, **kwargs) -> None:
+        self.running = False
+        self._lines.put(None)
+
+
+class SessionHost(ConnectionProxy):
+    """Emulated host starting fake PowerShell session processes."""
+
+    def __init__(self, host: EmulatedHyperVConnection):
+        super().__init__(host)
+        self.processes = []
+        self.fail_start = False
+
+    def start_process(self, command: str, **kwargs):
+        if "-EncodedCommand" not in command:
+            return super().start_process(command, **kwargs)
+        if self.fail_start:
+            raise OSError("Access denied")
+        assert kwargs["enable_input"] is True
+        self.processes.append(FakeSessionProcess(self.wrapped_connection))
+        return self.processes[-1]
+
+
+class TestPowerShellSessionConnection:
+    @pytest.fixture()
+    def emulator(self):
+        emulator = EmulatedHyperVConnection(time_scale=0)
+        emulator.execute_powershell("New-VMSwitch -Name 'VSWITCH_01' -NetAdapterName 'SLOT 1 Port 1'")
+        emulator.execute_powershell("New-VM 'VM001' -Generation 2 -Path C:\\VMs")
+        return emulator
+
+    @pytest.fixture()
+    def host(self, emulator):
+        return SessionHost(emulator)
+
+    @pytest.fixture()
+    def session(self, host):
+        session = PowerShellSessionConnection(host, timeout=1, startup_timeout=1)
+        yield session
+        session.close()
+
+    def test_framing(self):
+        request = encode_request(7, "Get-VM 'a' | fl")
+        assert request.split(" ")[0] == "7"
+        assert decode_result(f"{RESULT_MARKER} 7 1 {encode('out')} {encode('err')}") == (7, 1, "out", "err")
+        assert decode_result(f"{RESULT_MARKER} 8 0  ") == (8, 0, "", "")
+        assert decode_result("WARNING: something") is None
+
+    def test_managers_use_session(self, host):
+        hyperv = HyperV(connection=host, persistent_session=True)
+        manager = hyperv.vm_network_interface_manager
+        for _ in range(3):
+            manager.create_vm_network_interface(vm_name="VM001", vswitch_name="VSWITCH_01", sriov=True)
+        assert len(manager.get_vm_interfaces("VM001")) == 4
+
+        assert len(host.processes) == 1
+        assert len(host.processes[0].received) == hyperv.session.statistics.calls == 10
+        assert hyperv.session.statistics.fallback_calls == 0
+        assert hyperv.metrics.round_trips == 10
+
+    def test_return_codes(self, session):
+        with pytest.raises(HyperVExecutionException) as e:
+            session.execute_powershell("Get-VM 'missing'", custom_exception=HyperVExecutionException)
+        assert "unable to find a virtual machine" in e.value.stderr
+
+        result = session.execute_powershell("Get-VM 'missing'", expected_return_codes={})
+        assert result.return_code == 1
+        assert "State" in session.execute_powershell("Get-VM 'VM001' | fl").stdout
+
+    def test_reconnect_after_session_failure(self, host, session):
+        session.execute_powershell("Get-VM")
+        host.processes[0].kill()
+
+        session.execute_powershell("Get-VM")
+        assert len(host.processes) == 2
+        assert session.statistics.reconnects == 1
+        assert session.statistics.calls == 2
+
+    def test_session_terminated_during_command(self, host, session):
+        session.execute_powershell("Get-VM")
+        host.processes[0].hang = True
+
+        with pytest.raises(HyperVSessionException, match="result of command 'Start-VM VM001' is unknown"):
+            session.execute_powershell("Start-VM VM001", timeout=0.1)
+        assert not host.processes[0].running
+        assert session.execute_powershell("Get-VM 'VM001' | fl").return_code == 0
+        assert len(host.processes) == 2
+
+    def test_fallback(self, host, session, mocker):
+        execute = mocker.spy(host.wrapped_connection, "execute_powershell")
+        session.execute_powershell("Get-VM", cwd="C:\\")
+        assert execute.call_args.kwargs == {"cwd": "C:\\"}
+
+        host.fail_start = True
+        for _ in range(4):
+            session.execute_powershell("Get-VM")
+        assert session.statistics.fallback_calls == 5
+        assert session.statistics.calls == 0
+
+    def test_statistics(self, host, mocker):
+        clock = mocker.Mock(side_effect=[0.0, 0.3, 1.0, 1.1, 2.0, 2.2])
+        session = PowerShellSessionConnection(host, clock=clock)
+        session.execute_powershell("Get-VM")
+        session.execute_powershell("Get-VM")
+
+        assert session.statistics.startup_time == pytest.approx(0.3)
+        assert session.statistics.call_time == pytest.approx(0.3)
+        assert session.statistics.saved_time == pytest.approx(0.6)
+        session.close()
+        assert not session.active
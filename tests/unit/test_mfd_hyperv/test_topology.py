@@ -0,0 +1,193 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: MIT
+"""Tests for `mfd_hyperv` topology reconciler."""
+
+import pytest
+
+from mfd_hyperv import HyperV
+from mfd_hyperv.attributes.vm_params import VMParams
+from mfd_hyperv.connections.batch import MAX_SCRIPT_LENGTH
+from mfd_hyperv.connections.emulated import EmulatedHyperVConnection
+from mfd_hyperv.exceptions import HyperVException, HyperVReconcileException
+from mfd_hyperv.topology import QueueSpec, TopologySpec, VMSpec, VNicSpec, VSwitchSpec, parse_queues
+
+MNG_VSWITCH = "managementvSwitch"
+
+
+def vm_params(name: str) -> VMParams:
+    return VMParams(
+        name=name,
+        vm_dir_path="C:\\VMs",
+        diff_disk_path=f"C:\\VMs\\{name}.vhdx",
+        mng_mac_address="52:5a:00:0a:00:01",
+        vswitch_name=MNG_VSWITCH,
+    )
+
+
+def topology(vlan_id: int = 10, tx_max: str = "1000", enable_iov: bool = True) -> TopologySpec:
+    return TopologySpec(
+        vswitches=[
+            VSwitchSpec("VS1", ["SLOT 1 Port 1"], enable_iov=enable_iov, queues=[QueueSpec("1", "SQ1", tx_max)]),
+            VSwitchSpec("VS2", ["SLOT 1 Port 2"]),
+        ],
+        vms=[
+            VMSpec(
+                name,
+                vnics=[
+                    VNicSpec("vnic1", "VS1", sriov=True, vlan_id=vlan_id),
+                    VNicSpec("vnic2", "VS2", vmq=False, rdma=True),
+                ],
+                params=vm_params(name),
+                running=True,
+            )
+            for name in ("VM001", "VM002")
+        ],
+    )
+
+
+class TestTopologyReconciler:
+    @pytest.fixture()
+    def host(self):
+        host = EmulatedHyperVConnection(time_scale=0)
+        host.execute_powershell(f"New-VMSwitch -Name '{MNG_VSWITCH}' -NetAdapterName 'MNG' -AllowManagementOS $true")
+        host.commands.clear()
+        return host
+
+    @pytest.fixture()
+    def hyperv(self, host):
+        return HyperV(connection=host)
+
+    def test_create_topology(self, host, hyperv):
+        result = hyperv.topology.reconcile(topology())
+
+        assert set(result.plan.vswitch_branches) == {"VS1", "VS2"}
+        assert set(result.plan.vm_branches) == {"VM001", "VM002"}
+        assert host.vswitches["VS1"]["IovEnabled"] is True
+        assert host.queues["VS1"]["1"]["tx_max"] == "1000"
+        adapters = {(a["VMName"], a["Name"]): a for a in host.vm_adapters if a["VMName"]}
+        assert set(adapters) == {(vm, nic) for vm in ("VM001", "VM002") for nic in ("mng", "vnic1", "vnic2")}
+        vnic1, vnic2 = adapters[("VM001", "vnic1")], adapters[("VM001", "vnic2")]
+        assert (vnic1["SwitchName"], vnic1["IovWeight"], vnic1["_vlan"]["AccessVlanId"]) == ("VS1", 100, 10)
+        assert (vnic2["SwitchName"], vnic2["VmqWeight"], vnic2["_rdma_weight"]) == ("VS2", 0, 100)
+        assert all(vm["State"] == "Running" for vm in host.vms.values())
+
+    def test_unchanged_topology_verified_in_one_round_trip(self, host, hyperv):
+        hyperv.topology.reconcile(topology())
+        host.commands.clear()
+
+        result = hyperv.topology.reconcile(topology())
+
+        assert result.plan.is_empty
+        assert str(result.plan) == "Topology is up to date"
+        assert len(host.commands) == 1
+
+    def test_drift_fixed_with_minimal_operations(self, host, hyperv):
+        hyperv.topology.reconcile(topology())
+        host.execute_powershell("Stop-VM VM002")
+
+        plan = hyperv.topology.plan(topology(vlan_id=20, tx_max="2000"))
+
+        assert [str(operation) for operation in plan.operations] == [
+            "update queue 1 on VS1",
+            "vNIC vnic1 of VM VM001: set access VLAN 20",
+            "vNIC vnic1 of VM VM002: set access VLAN 20",
+            "start VM VM002",
+        ]
+        hyperv.topology.apply(plan)
+        assert host.queues["VS1"]["1"]["tx_max"] == "2000"
+        assert host.vms["VM002"]["State"] == "Running"
+        assert hyperv.topology.plan(topology(vlan_id=20, tx_max="2000")).is_empty
+
+    def test_vswitch_recreated_when_iov_differs(self, host, hyperv):
+        hyperv.topology.reconcile(topology(enable_iov=False))
+
+        plan = hyperv.topology.plan(topology())
+
+        assert [str(operation) for operation in plan.vswitch_branches["VS1"]] == [
+            "remove vSwitch VS1",
+            "create vSwitch VS1 on SLOT 1 Port 1",
+            "create queue 1 on VS1",
+        ]
+        assert [str(operation) for operation in plan.vm_branches["VM001"]] == [
+            "vNIC vnic1 of VM VM001: connect to VS1"
+        ]
+        hyperv.topology.apply(plan)
+        assert host.vswitches["VS1"]["IovEnabled"] is True
+        assert all(a["SwitchName"] == "VS1" for a in host.vm_adapters if a["Name"] == "vnic1")
+
+    def test_queues_of_missing_vswitches_read(self, host, hyperv):
+        spec = topology()
+        spec.vswitches[1].queues.append(QueueSpec("2", "SQ2", "500"))
+        host.execute_powershell("New-VMSwitch -Name 'VS2' -NetAdapterName 'SLOT 1 Port 2'")
+        host.execute_powershell('vfpctrl /switch VS2 /add-queue "2 SQ2 true 500 0 0"')
+        host.commands.clear()
+
+        snapshot = hyperv.topology.snapshot(spec)
+
+        assert snapshot.queues == {"VS2": {"2": QueueSpec("2", "SQ2", "500")}}
+        assert len(host.commands) == 2
+
+    def test_snapshot_split_by_script_length(self, host, hyperv):
+        names = [f"VS{index:03}" for index in range(150)]
+        for name in names:
+            host.execute_powershell(f"New-VMSwitch -Name '{name}' -NetAdapterName 'Port {name}'")
+            host.execute_powershell(f'vfpctrl /switch {name} /add-queue "1 SQ1 true 500 0 0"')
+        host.commands.clear()
+        spec = TopologySpec(
+            vswitches=[VSwitchSpec(name, [f"Port {name}"], queues=[QueueSpec("1", "SQ1", "500")]) for name in names]
+        )
+
+        snapshot = hyperv.topology.snapshot(spec)
+
+        assert set(snapshot.queues) == set(names)
+        assert len(host.commands) > 1
+        assert all(len(command) <= MAX_SCRIPT_LENGTH for command in host.commands)
+
+    def test_failed_vswitch_branch_skips_vms(self, host, hyperv, mocker):
+        create_vswitch = hyperv.vswitch_manager.create_vswitch
+
+        def _create_vswitch(interface_names, vswitch_name, **kwargs):
+            if vswitch_name == "VS2":
+                raise HyperVException(f"Timeout expired. Cannot find vswitch {vswitch_name}")
+            return create_vswitch(interface_names, vswitch_name, **kwargs)
+
+        mocker.patch.object(hyperv.vswitch_manager, "create_vswitch", side_effect=_create_vswitch)
+
+        with pytest.raises(HyperVReconcileException) as e:
+            hyperv.topology.reconcile(topology())
+
+        assert set(e.value.result.errors) == {"VS2", "VM001", "VM002"}
+        assert str(e.value.result.errors["VM002"]) == "Skipped, vSwitches failed: VS2"
+        assert "VS1" in host.vswitches
+        assert host.vms == {}
+
+    def test_missing_vm_without_params(self, hyperv):
+        with pytest.raises(HyperVException, match="VM VM001 doesn't exist"):
+            hyperv.topology.plan(TopologySpec(vms=[VMSpec("VM001")]))
+
+    def test_spec_from_dict(self):
+        spec = TopologySpec.from_dict(
+            {
+                "vswitches": [
+                    {
+                        "name": "VS1",
+                        "interface_names": ["SLOT 1 Port 1"],
+                        "queues": [{"sq_id": 1, "name": "SQ1", "tx_max": 5}],
+                    }
+                ],
+                "vms": [{"name": "VM001", "params": {"name": "VM001", "cpu_count": 4}, "vnics": [{"name": "vnic1"}]}],
+            }
+        )
+
+        assert spec.vswitches[0].queues == [QueueSpec("1", "SQ1", "5")]
+        assert spec.vms[0].params.cpu_count == 4
+        assert spec.vms[0].vnics == [VNicSpec("vnic1")]
+
+    def test_parse_queues(self):
+        host = EmulatedHyperVConnection(time_scale=0)
+        host.execute_powershell("New-VMSwitch -Name 'VS1' -NetAdapterName 'SLOT 1 Port 1'")
+        host.execute_powershell('vfpctrl /switch VS1 /add-queue "3 SQ3 false 100 10 50"')
+
+        output = host.execute_powershell("vfpctrl /switch VS1 /list-queue").stdout
+
+        assert parse_queues(output) == {"3": QueueSpec("3", "SQ3", "100", limit=False, tx_reserve="10", rx_max="50")}
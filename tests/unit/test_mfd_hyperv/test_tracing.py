@@ -0,0 +1,98 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: MIT
+"""Tests for `mfd_hyperv` tracing submodule."""
+
+import json
+
+import pytest
+from mfd_connect import LocalConnection
+from mfd_connect.base import ConnectionCompletedProcess
+from mfd_typing import OSName
+
+from mfd_hyperv import HyperV
+from mfd_hyperv.exceptions import HyperVException
+from mfd_hyperv.tracing import Tracer, disable_tracing, enable_tracing, get_tracer, span, traced, tracing
+
+
+@traced(vm_name="name")
+class Traced:
+    def __init__(self):
+        self.name = "vm_1"
+
+    def outer(self, vswitch_name: str) -> str:
+        return self.inner(vswitch_name=vswitch_name)
+
+    def inner(self, vswitch_name: str) -> str:
+        with span("phase", sq_id=5):
+            return vswitch_name
+
+    def failing(self) -> None:
+        raise HyperVException("failure")
+
+    def _private(self) -> str:
+        return "private"
+
+
+class TestTracing:
+    @pytest.fixture(autouse=True)
+    def tracer(self):
+        yield
+        disable_tracing()
+
+    def test_disabled(self):
+        assert get_tracer() is None
+        assert Traced().outer("vs") == "vs"
+        with span("noop") as noop_span:
+            noop_span.set_attribute("key", "value")
+
+    def test_spans_hierarchy_and_attributes(self):
+        tracer = enable_tracing()
+        Traced().outer("vs")
+
+        spans = tracer.spans
+        assert [item["name"] for item in spans] == ["Traced.outer", "Traced.inner", "phase"]
+        assert spans[0]["args"] == {"vm_name": "vm_1", "vswitch_name": "vs"}
+        assert spans[2]["args"] == {"sq_id": "5"}
+        assert spans[0]["ts"] <= spans[1]["ts"] <= spans[2]["ts"]
+        assert spans[0]["ts"] + spans[0]["dur"] >= spans[2]["ts"] + spans[2]["dur"]
+        assert all(item["ph"] == "X" for item in spans)
+
+    def test_private_methods_not_traced(self):
+        tracer = enable_tracing()
+        assert Traced()._private() == "private"
+        assert tracer.spans == []
+
+    def test_error_attribute(self):
+        tracer = enable_tracing()
+        with pytest.raises(HyperVException):
+            Traced().failing()
+        assert "failure" in tracer.spans[0]["args"]["error"]
+
+    def test_tracing_context_exports_file(self, tmp_path):
+        file_path = tmp_path / "trace.json"
+        with tracing(file_path) as tracer:
+            assert get_tracer() is tracer
+            Traced().inner("vs")
+        assert get_tracer() is None
+
+        trace = json.loads(file_path.read_text())
+        assert trace["displayTimeUnit"] == "ms"
+        assert [event["ph"] for event in trace["traceEvents"]] == ["M", "X", "X"]
+
+    def test_host_command_spans(self, mocker):
+        conn = mocker.create_autospec(LocalConnection)
+        conn.get_os_name.return_value = OSName.WINDOWS
+        conn.execute_powershell.return_value = ConnectionCompletedProcess(
+            return_code=0, args="command", stdout="", stderr=""
+        )
+        hyperv = HyperV(connection=conn)
+
+        tracer = enable_tracing(Tracer())
+        hyperv.hw_qos.delete_scheduler_queue("sw0", "5")
+
+        assert [(item["name"], item["cat"]) for item in tracer.spans] == [
+            ("HWQoS.delete_scheduler_queue", "mfd_hyperv"),
+            ("vfpctrl /remove-queue", "host_command"),
+        ]
+        assert tracer.spans[0]["args"] == {"vswitch_name": "sw0", "sq_id": "5"}
+        assert tracer.spans[1]["args"] == {"operation": "HWQoS.delete_scheduler_queue"}
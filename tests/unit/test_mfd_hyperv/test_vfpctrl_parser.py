@@ -0,0 +1,84 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: MIT
+"""Tests for `mfd_hyperv` vfpctrl output parser."""
+
+from textwrap import dedent
+
+import pytest
+
+from mfd_hyperv.vfpctrl_parser import QueueSpec, iter_queues, iter_records, parse_line
+from mfd_hyperv.vmswitch_ports import VMSwitchPort, iter_vmswitch_ports
+from tests.unit.test_mfd_hyperv.const import out_get_all_info
+
+PORTS = dedent("""\
+
+     ITEM LIST
+    ===========
+
+    Port name             : 924950C2-4D3F-47E2-A7BA-C0E322C51C66
+    Port Friendly name    : Dynamic Ethernet Switch Port
+    Switch Friendly name  : vSwitch00
+    Port type:            : Internal
+     Port is Initialized.
+    Port name             : 88888888-4D3F-47E2-A7BA-000000000000
+    Switch Friendly name  : vSwitch00
+    Port type:            : Synthetic
+    VM name            : vm00-2019
+    Command list-vmswitch-port succeeded!
+    """)
+
+
+class TestVfpctrlParser:
+    @pytest.mark.parametrize(
+        "line, expected",
+        [
+            ("Switch Friendly name  : vSwitch00\n", ("switch friendly name", "vSwitch00")),
+            ("Port type:            : Synthetic", ("port type", "Synthetic")),
+            ("  QOS QUEUE: 2", ("qos queue", "2")),
+            ("      Current Transmit Info:", ("current transmit info", "")),
+            (" Port is Initialized.", None),
+            (": value", None),
+        ],
+    )
+    def test_parse_line(self, line, expected):
+        assert parse_line(line) == expected
+
+    def test_records_of_blocks(self):
+        records = list(iter_records(PORTS, "port NAME"))
+
+        assert records == [
+            {
+                "port name": "924950C2-4D3F-47E2-A7BA-C0E322C51C66",
+                "port friendly name": "Dynamic Ethernet Switch Port",
+                "switch friendly name": "vSwitch00",
+                "port type": "Internal",
+            },
+            {
+                "port name": "88888888-4D3F-47E2-A7BA-000000000000",
+                "switch friendly name": "vSwitch00",
+                "port type": "Synthetic",
+                "vm name": "vm00-2019",
+            },
+        ]
+        # VM name of next block isn't assigned to port listed without it
+        assert list(iter_vmswitch_ports(PORTS))[0] == VMSwitchPort(
+            "924950C2-4D3F-47E2-A7BA-C0E322C51C66", "vSwitch00", ""
+        )
+
+    def test_record_yielded_when_block_completes(self):
+        consumed = []
+
+        def lines():
+            for line in PORTS.splitlines():
+                consumed.append(line)
+                yield line
+
+        records = iter_records(lines(), "Port name")
+        assert next(records)["port type"] == "Internal"
+        assert consumed[-1].startswith("Port name") and "VM name" not in "".join(consumed)
+
+    def test_nested_sections_dont_override_values(self):
+        queues = list(iter_queues(out_get_all_info))
+
+        assert [queue.sq_id for queue in queues] == ["2", "1"]
+        assert queues[0] == QueueSpec("2", "SQ2", "10000", limit=True, tx_reserve="0", rx_max="0")
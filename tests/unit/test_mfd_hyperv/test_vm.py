@@ -8,7 +8,9 @@ from mfd_typing import MACAddress, OSName
 from mfd_typing.network_interface import InterfaceType
 
 from mfd_hyperv import HyperV
+from mfd_hyperv.attributes.vm_metering_report import VMMeteringReport
 from mfd_hyperv.attributes.vm_params import VMParams
+from mfd_hyperv.exceptions import HyperVException, HyperVInterfaceMatchingException
 from mfd_hyperv.instances.vm import VM
 
 
@@ -111,6 +113,68 @@ class TestVM:
         assert result[0].interface.vf == iface3
         assert result[1].interface.vf == iface2
 
+    def test_match_interfaces_given_interfaces(self, vm, mocker):
+        from_host_vm_interfaces = [{"name": "x", "macaddress": "000000000001"}]
+        vm.guest = mocker.Mock()
+        get_vm_interfaces = mocker.patch("mfd_hyperv.instances.vm.VM.get_vm_interfaces")
+
+        iface = mocker.Mock(mac_address=MACAddress("00:00:00:00:00:01"), interface_type=InterfaceType.VMBUS)
+        vm_iface = mocker.Mock(interface_name="X", vm=vm, sriov=False)
+        vm.hyperv.vm_network_interface_manager.vm_interfaces = [vm_iface]
+
+        result = vm.match_interfaces(from_host_vm_interfaces, [iface])
+
+        assert result == [vm_iface]
+        assert vm_iface.interface == iface
+        assert iface.owner == vm.guest
+        get_vm_interfaces.assert_not_called()
+        vm.guest.get_interfaces.assert_not_called()
+
+    def test_match_interfaces_unmatched(self, vm, mocker):
+        from_host_vm_interfaces = [
+            {"name": "x", "macaddress": "00:00:00:00:00:01"},
+            {"name": "y", "macaddress": "00:00:00:00:00:02"},
+        ]
+        iface1 = mocker.Mock(mac_address=MACAddress("00:00:00:00:00:01"), interface_type=InterfaceType.VMNIC)
+        iface2 = mocker.Mock(mac_address=MACAddress("00:00:00:00:00:03"), interface_type=InterfaceType.VMNIC)
+        vm_iface1 = mocker.Mock(interface_name="x", vm=vm, sriov=False)
+        vm_iface2 = mocker.Mock(interface_name="y", vm=vm, sriov=False)
+        vm_iface3 = mocker.Mock(interface_name="z", vm=vm, sriov=False)
+        vm.hyperv.vm_network_interface_manager.vm_interfaces = [vm_iface1, vm_iface2, vm_iface3]
+
+        with pytest.raises(HyperVInterfaceMatchingException) as exc_info:
+            vm.match_interfaces(from_host_vm_interfaces, [iface1, iface2])
+
+        diagnostic = exc_info.value.diagnostic
+        assert diagnostic.unmatched_vnics == [vm_iface2, vm_iface3]
+        assert diagnostic.unmatched_sriov_vnics == []
+        assert diagnostic.unmatched_guest_interfaces == [iface2]
+
+    def test_match_interfaces_sriov_without_vf(self, vm, mocker):
+        from_host_vm_interfaces = [{"name": "x", "macaddress": "00:00:00:00:00:01"}]
+        iface = mocker.Mock(mac_address=MACAddress("00:00:00:00:00:01"), interface_type=InterfaceType.VMNIC)
+        vm_iface = mocker.Mock(interface_name="x", vm=vm, sriov=True)
+        vm.hyperv.vm_network_interface_manager.vm_interfaces = [vm_iface]
+
+        with pytest.raises(HyperVInterfaceMatchingException) as exc_info:
+            vm.match_interfaces(from_host_vm_interfaces, [iface])
+
+        assert exc_info.value.diagnostic.unmatched_sriov_vnics == [vm_iface]
+
+    def test_match_interfaces_duplicate_mac(self, vm, mocker):
+        from_host_vm_interfaces = [{"name": "x", "macaddress": "00:00:00:00:00:01"}]
+        iface1 = mocker.Mock(mac_address=MACAddress("00:00:00:00:00:01"), interface_type=InterfaceType.VMNIC)
+        iface2 = mocker.Mock(mac_address=MACAddress("00:00:00:00:00:01"), interface_type=InterfaceType.VMBUS)
+        vf = mocker.Mock(mac_address=MACAddress("00:00:00:00:00:01"), interface_type=InterfaceType.VF)
+        vm_iface = mocker.Mock(interface_name="x", vm=vm, sriov=True)
+        vm.hyperv.vm_network_interface_manager.vm_interfaces = [vm_iface]
+
+        with pytest.raises(HyperVInterfaceMatchingException, match="duplicated MAC addresses") as exc_info:
+            vm.match_interfaces(from_host_vm_interfaces, [iface1, vf, iface2])
+
+        assert exc_info.value.diagnostic.duplicate_mac_guest_interfaces == [iface2]
+        assert vm_iface.interface == iface1
+
     def test_stop(self, vm, mocker):
         mocker.patch("mfd_hyperv.instances.vm.RPyCConnection.shutdown_platform", return_value="x")
         mocker.patch("mfd_hyperv.hypervisor.HypervHypervisor.wait_vm_stopped", return_value="x")
@@ -154,3 +218,17 @@ class TestVM:
         vm.connection.restart_platform.assert_called_once()
         sleeper.assert_not_called()
         vm.wait_functional.assert_called_once()
+
+    def test_resource_metering(self, vm, mocker):
+        hypervisor = vm.hyperv.hypervisor
+        mocker.patch.object(hypervisor, "enable_resource_metering")
+        report = VMMeteringReport("vm_name", duration=10.0)
+        mocker.patch.object(hypervisor, "measure_vms", return_value={"vm_name": report})
+
+        vm.enable_resource_metering()
+
+        hypervisor.enable_resource_metering.assert_called_once_with(["vm_name"])
+        assert vm.measure() is report
+        hypervisor.measure_vms.return_value = {}
+        with pytest.raises(HyperVException):
+            vm.measure()
@@ -0,0 +1,90 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: MIT
+"""Tests for `mfd_hyperv` cached directory of vmswitch ports."""
+
+import pytest
+
+from mfd_hyperv import HyperV
+from mfd_hyperv.connections.emulated import EmulatedHyperVConnection
+from mfd_hyperv.exceptions import HyperVException
+
+VSWITCH = "VS1"
+VM_NAMES = [f"vm{index}" for index in range(1, 6)]
+
+
+class TestVMSwitchPortDirectory:
+    @pytest.fixture()
+    def host(self):
+        host = EmulatedHyperVConnection(time_scale=0)
+        host.execute_powershell(f"New-VMSwitch -Name '{VSWITCH}' -NetAdapterName 'SLOT 1 Port 1'")
+        host.execute_powershell("New-VMSwitch -Name 'other' -NetAdapterName 'SLOT 2 Port 1'")
+        for vm_name in VM_NAMES:
+            host.execute_powershell(f"New-VM '{vm_name}' -Generation 2 -Path C:\\VMs")
+            host.execute_powershell(f"Add-VMNetworkAdapter -VMName '{vm_name}' -Name 'vnic1' -SwitchName '{VSWITCH}'")
+        host.execute_powershell(f"Add-VMNetworkAdapter -VMName 'vm1' -Name 'vnic2' -SwitchName '{VSWITCH}'")
+        host.execute_powershell("Add-VMNetworkAdapter -VMName 'vm1' -Name 'vnic3' -SwitchName 'other'")
+        host.commands.clear()
+        return host
+
+    @pytest.fixture()
+    def hyperv(self, host):
+        return HyperV(connection=host)
+
+    def test_resolve_from_one_listing(self, host, hyperv):
+        hw_qos = hyperv.hw_qos
+
+        ports = hw_qos.resolve_vmswitch_port_names(VSWITCH, VM_NAMES)
+        assert len(ports["vm1"]) == 2
+        assert all(len(ports[vm_name]) == 1 for vm_name in VM_NAMES[1:])
+        assert hw_qos.get_vmswitch_port_name(VSWITCH, "vm1") == ports["vm1"][0]
+        assert hw_qos.get_vmswitch_port_names(VSWITCH, "vm1") == ports["vm1"]
+        assert len(hw_qos.get_vmswitch_port_names("other", "vm1")) == 1
+        assert len(hw_qos.port_directory.get_switch_ports(VSWITCH)) == 6
+        assert host.commands == ["vfpctrl /list-vmswitch-port"]
+
+    def test_invalidated_by_vm_network_interface_manager(self, host, hyperv):
+        manager = hyperv.vm_network_interface_manager
+        directory = hyperv.hw_qos.port_directory
+        directory.refresh()
+
+        manager.create_vm_network_interface(vm_name="vm2", vswitch_name=VSWITCH, interface_name="vnic2")
+        assert not directory.is_cached
+        assert len(hyperv.hw_qos.get_vmswitch_port_names(VSWITCH, "vm2")) == 2
+        manager.disconnect_vm_interface("vnic2", "vm2")
+        assert len(hyperv.hw_qos.get_vmswitch_port_names(VSWITCH, "vm2")) == 1
+        manager.connect_vm_interface("vnic2", "vm2", VSWITCH)
+        assert len(hyperv.hw_qos.get_vmswitch_port_names(VSWITCH, "vm2")) == 2
+        manager.remove_vm_interface("vnic2", "vm2")
+        assert len(hyperv.hw_qos.get_vmswitch_port_names(VSWITCH, "vm2")) == 1
+
+    def test_invalidated_by_removal_of_vm(self, host, hyperv):
+        hyperv.hw_qos.get_queue_state(VSWITCH)
+
+        hyperv.hypervisor.remove_vm("vm2")
+
+        assert not hyperv.hw_qos.port_directory.is_cached
+        assert len(hyperv.hw_qos.get_queue_state(VSWITCH).port_queues) == 5
+
+    def test_invalidated_by_vswitch_manager(self, host, hyperv):
+        directory = hyperv.hw_qos.port_directory
+        directory.refresh()
+
+        hyperv.vswitch_manager.rename_vswitch("other", "renamed")
+        assert not directory.is_cached
+        assert len(hyperv.hw_qos.get_vmswitch_port_names("renamed", "vm1")) == 1
+        hyperv.vswitch_manager.remove_vswitch("renamed")
+        assert not directory.is_cached
+
+    def test_external_changes(self, host, hyperv):
+        hw_qos = hyperv.hw_qos
+        hw_qos.port_directory.refresh()
+        host.execute_powershell("New-VM 'vm6' -Generation 2 -Path C:\\VMs")
+        host.execute_powershell(f"Add-VMNetworkAdapter -VMName 'vm6' -Name 'vnic1' -SwitchName '{VSWITCH}'")
+        host.execute_powershell("Remove-VMNetworkAdapter -VMName 'vm5' -Name 'vnic1'")
+        host.commands.clear()
+
+        assert len(hw_qos.get_vmswitch_port_names(VSWITCH, "vm6")) == 1
+        assert len(host.commands) == 1
+        with pytest.raises(HyperVException, match="VM name: vm5 in output: "):
+            hw_qos.get_vmswitch_port_name(VSWITCH, "vm5")
+        assert len(host.commands) == 2
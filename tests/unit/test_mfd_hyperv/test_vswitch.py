@@ -4,8 +4,10 @@
 
 import pytest
 from mfd_connect import LocalConnection
+from mfd_network_adapter.network_adapter_owner.exceptions import NetworkAdapterIncorrectData
 from mfd_typing import OSName
 
+from mfd_hyperv.exceptions import HyperVException
 from mfd_hyperv.instances.vswitch import VSwitch
 
 
@@ -42,3 +44,36 @@ class TestVNetworkInterface:
 
         assert vswitch.name == f"vEthernet ({new_name})"
         assert vswitch.interface_name == new_name
+
+    def test_interface_discovered_with_backoff(self, mocker):
+        mocker.patch("mfd_hyperv.instances.vswitch.TimeoutCounter", return_value=False)
+        sleep = mocker.patch("mfd_hyperv.instances.vswitch.time.sleep")
+        host_adapter = mocker.Mock()
+        adapter = mocker.Mock()
+        host_adapter.owner.get_interface.side_effect = [NetworkAdapterIncorrectData("missing")] * 5 + [adapter]
+
+        vswitch = VSwitch("ifname", ["host_adapter_name"], host_adapters=[host_adapter])
+
+        assert vswitch.interface is adapter
+        assert vswitch.discovery_attempts == 6
+        assert [call.args[0] for call in sleep.call_args_list] == [0.2, 0.4, 0.8, 1.6, 2]
+        host_adapter.owner.get_interface.assert_called_with(interface_name="vEthernet (ifname)")
+
+    def test_interface_discovery_timeout(self, mocker):
+        mocker.patch("mfd_hyperv.instances.vswitch.TimeoutCounter", return_value=True)
+        mocker.patch("mfd_hyperv.instances.vswitch.time.sleep")
+        host_adapter = mocker.Mock()
+        host_adapter.owner.get_interface.side_effect = NetworkAdapterIncorrectData("missing")
+
+        with pytest.raises(HyperVException, match=r"Cannot find adapter vEthernet \(ifname\) .* after 1 attempts"):
+            VSwitch("ifname", ["host_adapter_name"], host_adapters=[host_adapter])
+
+    def test_lazy_interface(self, mocker):
+        host_adapter = mocker.Mock()
+
+        vswitch = VSwitch("ifname", ["host_adapter_name"], host_adapters=[host_adapter], lazy_interface=True)
+
+        host_adapter.owner.get_interface.assert_not_called()
+        assert vswitch.interface is host_adapter.owner.get_interface.return_value
+        assert vswitch.interface is host_adapter.owner.get_interface.return_value
+        assert vswitch.discovery_attempts == 1
@@ -2,6 +2,8 @@
 # SPDX-License-Identifier: MIT
 """Tests for `mfd_hyperv` vswitch manager submodule."""
 
+import threading
+import time
 from textwrap import dedent
 
 import pytest
@@ -9,9 +11,11 @@ from mfd_connect import LocalConnection
 from mfd_connect.base import ConnectionCompletedProcess
 from mfd_typing import OSName
 
+from mfd_hyperv import HyperV
+from mfd_hyperv.connections.emulated import EmulatedHyperVConnection
 from mfd_hyperv.exceptions import HyperVExecutionException, HyperVException
 from mfd_hyperv.instances.vswitch import VSwitch
-from mfd_hyperv.vswitch_manager import VSwitchManager
+from mfd_hyperv.vswitch_manager import VSwitchCreationSpec, VSwitchManager
 
 
 class TestVswitchManager:
@@ -268,14 +272,66 @@ class TestVswitchManager:
         )
 
         assert vswitch_manager.is_vswitch_present("managementvSwitch")
+        vswitch_manager.connection.execute_powershell.assert_called_with(
+            "Get-VMSwitch -Name 'managementvSwitch' -ErrorAction SilentlyContinue | select -expandproperty Name",
+            expected_return_codes=None,
+        )
 
         assert not vswitch_manager.is_vswitch_present("aasdfd")
 
+    def test_is_vswitch_present_failed(self, vswitch_manager):
+        vswitch_manager.connection.execute_powershell.return_value = ConnectionCompletedProcess(
+            return_code=1, args="command", stdout="", stderr="Get-VMSwitch : The term 'Get-VMSwitch' is not recognized"
+        )
+
+        with pytest.raises(HyperVExecutionException):
+            vswitch_manager.is_vswitch_present("managementvSwitch")
+
+    @pytest.mark.parametrize(
+        "out, expected",
+        [
+            ("", False),
+            ("\nName : vs\n\n", False),
+            ("\nName : vs\n\n\nName   : vEthernet (vs)\nStatus : Disconnected\n\n", False),
+            ("\nName : vs\n\n\nName   : vEthernet (vs)\nStatus : Up\n\n", True),
+        ],
+    )
+    def test_is_vswitch_ready(self, vswitch_manager, out, expected):
+        vswitch_manager.connection.execute_powershell.return_value = ConnectionCompletedProcess(
+            return_code=0, args="command", stdout=out, stderr=""
+        )
+
+        assert vswitch_manager.is_vswitch_ready("vs") is expected
+        vswitch_manager.connection.execute_powershell.assert_called_once_with(
+            "Get-VMSwitch -Name 'vs' -ErrorAction SilentlyContinue | select Name | fl; "
+            "Get-NetAdapter -Name 'vEthernet (vs)' -ErrorAction SilentlyContinue | select Name, Status | fl",
+            expected_return_codes=None,
+        )
+
+    def test_is_vswitch_ready_waits_on_host(self, vswitch_manager):
+        vswitch_manager.connection.execute_powershell.return_value = ConnectionCompletedProcess(
+            return_code=0, args="command", stdout="\nName : vs\n\n", stderr=""
+        )
+
+        assert vswitch_manager.is_vswitch_ready("vs", host_adapter=False, wait=10)
+        vswitch_manager.connection.execute_powershell.assert_called_once_with(
+            "for ($i = 0; $i -lt 40 -and -not (Get-VMSwitch -Name 'vs' -ErrorAction SilentlyContinue); $i++)"
+            " { Start-Sleep -Milliseconds 250 }; "
+            "Get-VMSwitch -Name 'vs' -ErrorAction SilentlyContinue | select Name | fl",
+            expected_return_codes=None,
+        )
+
     def test_wait_vswitch_present(self, vswitch_manager, mocker):
         mocker.patch("mfd_hyperv.vswitch_manager.TimeoutCounter", return_value=False)
-        mocker.patch("mfd_hyperv.vswitch_manager.VSwitchManager.is_vswitch_present", return_value=True)
+        is_ready = mocker.patch(
+            "mfd_hyperv.vswitch_manager.VSwitchManager.is_vswitch_ready", side_effect=[False, OSError, True]
+        )
+        sleep = mocker.patch("mfd_hyperv.vswitch_manager.time.sleep")
+
+        vswitch_manager.wait_vswitch_present("managementvSwitch", interval=1, host_adapter=True, host_wait=5)
 
-        vswitch_manager.wait_vswitch_present("managementvSwitch")
+        assert [call.args[0] for call in sleep.call_args_list] == [1, 1]
+        is_ready.assert_called_with("managementvSwitch", host_adapter=True, wait=5)
 
     def test_wait_vswitch_present_failed(self, vswitch_manager, mocker):
         mocker.patch("mfd_hyperv.vswitch_manager.TimeoutCounter", return_value=True)
@@ -289,11 +345,12 @@ class TestVswitchManager:
         vswitch_manager.rename_vswitch("vs_01", "vswitch_new_name")
 
         cmd = 'Rename-VMSwitch "vs_01" -NewName "vswitch_new_name"'
-        vswitch_manager.connection.execute_powershell.assert_called_with(cmd, custom_exception=HyperVExecutionException)
+        vswitch_manager.connection.execute_powershell.assert_called_with(
+            cmd, custom_exception=HyperVExecutionException
+        )
 
     def test_get_vswitch_mapping_one_vswitch_found(self, vswitch_manager):
-        out = dedent(
-            """
+        out = dedent("""
         Name                                             : managementvSwitch
         Id                                               : bbaaa964-2ff4-4904-b4da-121a937c6041
         Notes                                            : 
@@ -341,8 +398,7 @@ class TestVswitchManager:
         IsDeleted                                        : False
         DefaultQueueVmmqQueuePairs                       : 4
         DefaultQueueVmmqQueuePairsRequested              : 16
-        """  # noqa: E501, W605, W291
-        )
+        """)  # noqa: E501, W605, W291
         vswitch_manager.connection.execute_powershell.return_value = ConnectionCompletedProcess(
             return_code=0, args="command", stdout=out, stderr=""
         )
@@ -359,3 +415,59 @@ class TestVswitchManager:
             return_code=1, args="command", stdout="", stderr=""
         )
         assert {} == vswitch_manager.get_vswitch_mapping()
+
+    def test_generate_name_skips_existing_vswitch(self, vswitch_manager, mocker):
+        vswitch_manager.vswitches.append(mocker.Mock(interface_name="aaa_01"))
+
+        assert vswitch_manager._generate_name("aaa", False) == "aaa_02"
+
+
+class TestCreateVSwitches:
+    @pytest.fixture()
+    def hyperv(self):
+        return HyperV(connection=EmulatedHyperVConnection(time_scale=0))
+
+    def test_create_vswitches(self, hyperv, mocker):
+        manager = hyperv.vswitch_manager
+        create_vswitch = manager.create_vswitch
+        lock, active, max_active = threading.Lock(), [0], [0]
+
+        def _create_vswitch(*args, **kwargs):
+            with lock:
+                active[0] += 1
+                max_active[0] = max(max_active[0], active[0])
+            time.sleep(0.05)
+            try:
+                if kwargs["enable_iov"]:
+                    raise HyperVException("Timeout expired. Cannot find vswitch")
+                return create_vswitch(*args, **kwargs)
+            finally:
+                with lock:
+                    active[0] -= 1
+
+        mocker.patch.object(manager, "create_vswitch", side_effect=_create_vswitch)
+        specs = [VSwitchCreationSpec([f"SLOT 1 Port {port}"]) for port in range(1, 5)]
+        specs.append(VSwitchCreationSpec(["SLOT 2 Port 1", "SLOT 2 Port 2"], enable_teaming=True))
+        specs.append(VSwitchCreationSpec(["SLOT 3 Port 1"], "SRIOV", enable_iov=True, generate_name=False))
+
+        results = manager.create_vswitches(specs, max_workers=2)
+
+        assert list(results) == ["VSWITCH_01", "VSWITCH_02", "VSWITCH_03", "VSWITCH_04", "VSWITCH_05_T", "SRIOV"]
+        assert max_active[0] == 2
+        assert all(result.elapsed >= 0.05 for result in results.values())
+        assert isinstance(results["SRIOV"].error, HyperVException)
+        assert [result.vswitch.interface_name for result in results.values() if result.vswitch] == list(results)[:5]
+        assert set(hyperv.vswitch_manager.get_vswitch_mapping()) == set(list(results)[:5])
+
+    def test_lazy_create_vswitch_doesnt_poll_host_adapter(self, hyperv, mocker):
+        host = hyperv.vswitch_manager.connection
+        interface = mocker.Mock()
+
+        vswitch = hyperv.vswitch_manager.create_vswitch(["SLOT 1 Port 1"], interfaces=[interface], lazy_interface=True)
+
+        assert vswitch.owner is interface.owner
+        interface.owner.get_interface.assert_not_called()
+        assert not any("Get-NetAdapter" in command for command in host.commands)
+
+        hyperv.vswitch_manager.create_vswitch(["SLOT 1 Port 2"], interfaces=[mocker.Mock()])
+        assert any("Get-NetAdapter" in command for command in host.commands)
@@ -0,0 +1,82 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: MIT
+"""Tests for `mfd_hyperv` cached vSwitch mapping."""
+
+import pytest
+
+from mfd_hyperv import HyperV
+from mfd_hyperv.connections.emulated import EmulatedHyperVConnection
+from mfd_hyperv.vswitch_mapping import VSwitchAdapters
+
+TEAM_PORTS = [f"SLOT 2 Port {port}" for port in range(1, 7)]
+
+
+def description(port: str) -> str:
+    return f"Intel(R) Ethernet Adapter ({port})"
+
+
+class TestVSwitchMapping:
+    @pytest.fixture()
+    def host(self):
+        host = EmulatedHyperVConnection(time_scale=0)
+        host.execute_powershell("New-VMSwitch -Name 'managementvSwitch' -NetAdapterName 'Ethernet'")
+        host.execute_powershell("New-VMSwitch -Name 'internal'")
+        ports = ", ".join(f"'{port}'" for port in TEAM_PORTS)
+        host.execute_powershell(f"New-VMSwitch -Name 'team' -NetAdapterName {ports} -EnableEmbeddedTeaming $true")
+        host.commands.clear()
+        return host
+
+    @pytest.fixture()
+    def hyperv(self, host):
+        return HyperV(connection=host)
+
+    def test_forward_and_reverse_index(self, host, hyperv):
+        manager = hyperv.vswitch_manager
+
+        assert manager.mapping.vswitches["team"] == VSwitchAdapters(
+            "team", tuple(description(port) for port in TEAM_PORTS), teaming=True
+        )
+        assert manager.get_vswitch_mapping() == {
+            "managementvSwitch": description("Ethernet"),
+            "internal": "",
+            "team": description(TEAM_PORTS[0]),
+        }
+        assert manager.get_vswitch_adapters("team") == [description(port) for port in TEAM_PORTS]
+        assert manager.get_vswitch_adapters("missing") == []
+        assert manager.get_vswitch_by_adapter(description(TEAM_PORTS[5]).upper()) == "team"
+        assert manager.get_vswitch_by_adapter(description("SLOT 9 Port 1")) is None
+        assert len(host.commands) == 1
+
+    def test_invalidated_by_manager(self, host, hyperv):
+        manager = hyperv.vswitch_manager
+        manager.get_vswitch_mapping()
+
+        manager.create_vswitch(["SLOT 1 Port 1"], "vs1", generate_name=False)
+        assert manager.get_vswitch_by_adapter(description("SLOT 1 Port 1")) == "vs1"
+        manager.rename_vswitch("vs1", "vs2")
+        assert manager.get_vswitch_by_adapter(description("SLOT 1 Port 1")) == "vs2"
+        manager.remove_vswitch("vs2")
+        assert manager.get_vswitch_by_adapter(description("SLOT 1 Port 1")) is None
+        manager.remove_tested_vswitches()
+        assert manager.get_vswitch_mapping() == {"managementvSwitch": description("Ethernet")}
+
+    def test_refresh_after_external_change(self, host, hyperv):
+        manager = hyperv.vswitch_manager
+        manager.get_vswitch_mapping()
+        host.execute_powershell("Remove-VMSwitch 'team' -Force")
+
+        assert "team" in manager.get_vswitch_mapping()
+        assert "team" not in manager.get_vswitch_mapping(refresh=True)
+
+    def test_failure_not_cached(self, hyperv, mocker):
+        mapping = hyperv.vswitch_manager.mapping
+        execute_powershell = mocker.patch.object(
+            hyperv.connection,
+            "execute_powershell",
+            return_value=mocker.Mock(return_code=1, stdout="", stderr="error"),
+        )
+
+        assert hyperv.vswitch_manager.get_vswitch_mapping() == {}
+        assert not mapping.is_cached
+        assert hyperv.vswitch_manager.get_vswitch_mapping() == {}
+        assert execute_powershell.call_count == 2